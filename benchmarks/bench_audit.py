@@ -0,0 +1,98 @@
+"""
+Audit log: cost on the scan path, writer throughput and query speed, offline.
+
+    python benchmarks/bench_audit.py [--records 200000]
+
+Appends model-shaped verdicts (a phone number and a link in every message, a raw reply,
+one in fifty a scam) from the calling thread as fast as it can, the way a busy scanner
+would, then times AuditLog.append on that thread, the writer's sustained rate, bytes per
+record on disk, and reading a day back: index-only stats, a rare-verdict query and a
+full scan. Every block here holds a scam, so the verdict query shows the line prefilter;
+blocks the index rules out (other hours, other verdicts) are not even decompressed.
+Reference run (single-core VM, 200k records):
+
+    append() on the scan thread        ~6 us p50   (queue put; no disk, no JSON)
+    writer, redact + JSON + gzip       ~13,000 records/s
+    on disk                            ~50 bytes/record (~11x compression)
+    stats for the day (indexes only)   ~1 ms
+    query --verdict yes (1 in 50)      ~0.7 s   (lines without the verdict never JSON-decoded)
+    query, every record                ~2.2 s
+
+With one core the writer competes with the appending thread for the GIL, so append()
+figures here include some of its work; on a multi-core box the scan thread sees only the
+queue put.
+"""
+import argparse
+import calendar
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bharat_suraksha.audit import AuditLog, query, summarize  # noqa: E402
+
+
+def verdict(i: int) -> dict:
+    scam = i % 50 == 0
+    body = '{"is_scam": "%s", "score": %d, "explanations": {"en": "..."}}' % ("yes" if scam else "no", 92 if scam else 8)
+    return {
+        "is_scam": "yes" if scam else "no",
+        "score": 92 if scam else 8,
+        "tactics": ["urgency", "authority"] if scam else [],
+        "matched_patterns": ["KYC expiry"] if scam else [],
+        "explanations": {"en": "Asks for your OTP to unblock an account." if scam else "Ordinary conversation."},
+        "raw": f"```json\n{body}\n```",
+        "tokens": {"prompt": 310, "message_before": 40, "message_after": 40},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--records", type=int, default=200_000)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench-audit-")
+    try:
+        log = AuditLog(workdir, queue_size=args.records + 1)
+        costs = []
+        started = time.perf_counter()
+        for i in range(args.records):
+            text = f"Dear customer {i}, your account is on hold. Call 98765{i % 100000:05d} or visit http://kyc-{i % 97}.in/x?id={i}"
+            t0 = time.perf_counter()
+            log.append(text, verdict(i), "English", 640.0, surface="api", session=f"s{i % 300}")
+            costs.append(time.perf_counter() - t0)
+        appended = time.perf_counter() - started
+        log.close(timeout=600)
+        total = time.perf_counter() - started
+        stats = log.stats()
+        costs.sort()
+
+        print(f"{stats['written']:,} records ({stats['dropped']} dropped, {stats['failed']} failed)")
+        print(f"  append() p50 {costs[len(costs) // 2] * 1e6:6.1f} us, p99 {costs[int(len(costs) * 0.99)] * 1e6:6.1f} us")
+        print(f"  appended in {appended:.2f} s, all on disk after {total:.2f} s -> {stats['written'] / total:,.0f} records/s")
+        print(
+            f"  on disk {stats['bytes_out'] / stats['written']:.0f} bytes/record "
+            f"({stats['compression_ratio']:.1f}x, {stats['bytes_out'] / 2**20:.1f} MiB)"
+        )
+
+        day = time.strftime("%Y-%m-%d", time.gmtime())
+        since = float(calendar.timegm(time.strptime(day, "%Y-%m-%d")))
+        until = since + 86400
+        t0 = time.perf_counter()
+        summary = summarize(workdir, since, until)
+        print(f"  stats for {day}          {(time.perf_counter() - t0) * 1000:8.1f} ms  ({summary['records']:,} records indexed)")
+        t0 = time.perf_counter()
+        scams = sum(1 for _ in query(workdir, since, until, is_scam="yes"))
+        print(f"  query --verdict yes       {time.perf_counter() - t0:8.2f} s   ({scams:,} records)")
+        t0 = time.perf_counter()
+        every = sum(1 for _ in query(workdir, since, until))
+        print(f"  query, every record       {time.perf_counter() - t0:8.2f} s   ({every:,} records)")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
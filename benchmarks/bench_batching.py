@@ -0,0 +1,143 @@
+"""
+Throughput and prompt cost of micro-batched model calls vs one message per call.
+
+    python benchmarks/bench_batching.py [--messages 400] [--batch 8] [--wait-ms 50]
+
+The fake client charges a fixed round trip plus time per prompt token and per verdict
+written, and with --drop-rate leaves some items out of a batch reply so the individual
+retry path is exercised. Both runs send the same SMS with the same concurrency and the
+same requests-per-minute quota (charged per model call, as providers do), and report
+messages/sec, model calls and estimated prompt tokens per message. With --rpm 0 only
+concurrency limits the runs, and batches trade latency for fewer, larger calls.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bharat_suraksha.batching import MicroBatcher  # noqa: E402
+from bharat_suraksha.compaction import estimate_tokens  # noqa: E402
+from bharat_suraksha.prompt import build_prompt  # noqa: E402
+from bharat_suraksha.ratelimit import TokenBucket  # noqa: E402
+from bharat_suraksha.resilience import AsyncModelCaller, RetryPolicy, call_model_and_parse_async  # noqa: E402
+
+SAMPLES = [
+    "Dear customer your SBI account will be blocked today. Update KYC at http://sbi-kyc.xyz/{n} now",
+    "Congratulations! You won Rs {n},000 in KBC lottery. Call 9876543210 to claim.",
+    "Hi, are we still meeting at 6 for dinner? Table {n} is booked.",
+    "Your electricity connection will be disconnected tonight. Call officer at 8123456789 ref {n}",
+    "Your OTP for login is {n}. Do not share it with anyone.",
+]
+_ITEM = re.compile(r'^\[(\d+)\] """', re.M)
+_VERDICT = {
+    "is_scam": "yes",
+    "score": 90,
+    "explanations": {"en": "Urgent KYC pretext with a link.", "hi": "लिंक के साथ KYC बहाना।"},
+    "social_engineering_tactics": ["urgency"],
+    "matched_patterns": ["KYC"],
+}
+
+
+class MeteredClient:
+    def __init__(self, base_ms: float, per_token_ms: float, per_item_ms: float, drop_rate: float, seed: int):
+        self.base_ms, self.per_token_ms, self.per_item_ms = base_ms, per_token_ms, per_item_ms
+        self.drop_rate = drop_rate
+        self.rng = random.Random(seed)
+        self.calls = 0
+
+    def generate(self, prompt: str) -> str:
+        self.calls += 1
+        ids = [int(i) for i in _ITEM.findall(prompt)]
+        items = max(1, len(ids))
+        time.sleep((self.base_ms + self.per_token_ms * estimate_tokens(prompt) + self.per_item_ms * items) / 1000)
+        if not ids:
+            return json.dumps(_VERDICT, ensure_ascii=False)
+        return json.dumps([dict(_VERDICT, id=i) for i in ids if self.rng.random() >= self.drop_rate], ensure_ascii=False)
+
+
+def caller() -> AsyncModelCaller:
+    return AsyncModelCaller(RetryPolicy(hedge=False), max_threads=64)
+
+
+def limiter(rpm: float):
+    return TokenBucket.per_minute(rpm) if rpm > 0 else None
+
+
+async def one_at_a_time(client, messages, concurrency, quota):
+    model = caller()
+    gate = asyncio.Semaphore(concurrency)
+    loop = asyncio.get_running_loop()
+    tokens = 0
+
+    async def one(text):
+        nonlocal tokens
+        async with gate:
+            built = build_prompt(text, "English")
+            tokens += built.prompt_tokens
+            if quota is not None:
+                await loop.run_in_executor(None, quota.acquire)
+            return await call_model_and_parse_async(model, client, built.prompt)
+
+    results = await asyncio.gather(*(one(text) for text in messages))
+    return results, tokens
+
+
+async def batched(batcher, messages, concurrency):
+    gate = asyncio.Semaphore(concurrency)
+
+    async def one(text):
+        async with gate:
+            return await batcher.analyze(text)
+
+    return await asyncio.gather(*(one(text) for text in messages)), batcher.stats()["prompt_tokens"]
+
+
+def report(name, results, tokens, calls, elapsed):
+    failed = sum(1 for r in results if r.get("error"))
+    print(
+        f"{name:<14} {len(results) / elapsed:8.1f} msg/s  {calls:5d} model calls  "
+        f"{tokens / len(results):7.1f} prompt tokens/msg  {failed} failed"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--rpm", type=float, default=600, help="model calls per minute; 0 = unlimited")
+    parser.add_argument("--batch", type=int, default=8)
+    parser.add_argument("--wait-ms", type=float, default=50.0)
+    parser.add_argument("--base-ms", type=float, default=120.0, help="fixed round trip per call")
+    parser.add_argument("--per-token-ms", type=float, default=0.05)
+    parser.add_argument("--per-item-ms", type=float, default=15.0, help="time to write one verdict")
+    parser.add_argument("--drop-rate", type=float, default=0.02)
+    args = parser.parse_args()
+
+    messages = [SAMPLES[i % len(SAMPLES)].format(n=i) for i in range(args.messages)]
+    timing = (args.base_ms, args.per_token_ms, args.per_item_ms)
+
+    client = MeteredClient(*timing, drop_rate=0.0, seed=1)
+    started = time.perf_counter()
+    results, tokens = asyncio.run(one_at_a_time(client, messages, args.concurrency, limiter(args.rpm)))
+    report("one-at-a-time", results, tokens, client.calls, time.perf_counter() - started)
+
+    client = MeteredClient(*timing, drop_rate=args.drop_rate, seed=1)
+    batcher = MicroBatcher(
+        client, caller=caller(), max_items=args.batch, max_wait_ms=args.wait_ms, limiter=limiter(args.rpm)
+    )
+    started = time.perf_counter()
+    results, tokens = asyncio.run(batched(batcher, messages, args.concurrency))
+    report(f"batched x{args.batch}", results, tokens, client.calls, time.perf_counter() - started)
+    stats = batcher.stats()
+    print(f"  mean batch {stats['mean_batch_size']:.1f}, {stats['retried']} items retried alone, {stats['singles']} sent alone")
+    batcher.close()
+
+
+if __name__ == "__main__":
+    main()
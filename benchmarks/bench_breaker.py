@@ -0,0 +1,103 @@
+"""
+Scan latency through an upstream outage, with and without the circuit breaker.
+
+    python benchmarks/bench_breaker.py [--scans 600] [--outage 15] [--concurrency 16]
+
+The fake client answers in ~30 ms, except during an outage window (starting one second
+in) where every call hangs until the per-attempt timeout. Both runs use the same retry
+policy. Without the breaker each scan in the outage waits out its deadline; with it the
+breaker opens after the first failures, scans get the on-box estimate at once, and a
+half-open probe closes it again after the outage ends. Latency includes waiting for a
+free slot, which is where stacked-up scans hurt. Reference run (defaults):
+
+    no breaker  p50 ~5.5 s   p95 ~12.5 s   ~680 upstream calls
+    breaker     p50 ~0 ms    p95 ~2.5 s    ~185 upstream calls, ~470 scans answered on-box
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bharat_suraksha.pipeline import Scanner  # noqa: E402
+from bharat_suraksha.resilience import AsyncModelCaller, CircuitBreaker, RetryPolicy  # noqa: E402
+
+VERDICT = json.dumps(
+    {
+        "is_scam": "yes",
+        "score": 88,
+        "explanations": {"en": "KYC pretext", "hi": "KYC बहाना"},
+        "social_engineering_tactics": ["urgency"],
+        "matched_patterns": [],
+    }
+)
+
+
+class FlakyClient:
+    def __init__(self, outage_start: float, outage_seconds: float):
+        self.outage = (outage_start, outage_start + outage_seconds)
+        self.calls = 0
+
+    def generate(self, prompt: str) -> str:
+        self.calls += 1
+        now = time.monotonic()
+        if self.outage[0] <= now < self.outage[1]:
+            time.sleep(self.outage[1] - now + 0.5)  # hangs past the attempt timeout
+            raise ConnectionError("upstream unavailable")
+        time.sleep(0.03)
+        return VERDICT
+
+
+def pct(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q / 100 * len(values)))]
+
+
+async def run(scanner, client, scans, concurrency, spacing):
+    gate = asyncio.Semaphore(concurrency)
+    latencies, degraded = [], 0
+
+    async def one(i):
+        nonlocal degraded
+        await asyncio.sleep(i * spacing)
+        started = time.perf_counter()  # includes waiting for a free slot, as a queued user would
+        async with gate:
+            verdict = await scanner.ask_model_async(client, f"Your KYC expires today, update now ref {i}")
+            latencies.append((time.perf_counter() - started) * 1000)
+            degraded += bool(verdict.get("degraded"))
+
+    await asyncio.gather(*(one(i) for i in range(scans)))
+    return latencies, degraded
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scans", type=int, default=600)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--outage", type=float, default=15.0, help="seconds")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds over which scans arrive")
+    args = parser.parse_args()
+
+    policy = RetryPolicy(max_attempts=2, deadline_seconds=3.0, attempt_timeout_seconds=1.5, backoff_base_seconds=0.1, hedge=False)
+    for name, breaker in (
+        ("no breaker", None),
+        ("breaker", CircuitBreaker(window_seconds=10, min_calls=5, failure_rate=0.5, open_seconds=1.0)),
+    ):
+        scanner = Scanner(caller=AsyncModelCaller(policy, max_threads=64, breaker=breaker))
+        client = FlakyClient(time.monotonic() + 1.0, args.outage)
+        started = time.perf_counter()
+        latencies, degraded = asyncio.run(run(scanner, client, args.scans, args.concurrency, args.duration / args.scans))
+        elapsed = time.perf_counter() - started
+        state = breaker.stats() if breaker is not None else None
+        print(
+            f"{name:<11} p50 {pct(latencies, 50):6.0f} ms  p95 {pct(latencies, 95):6.0f} ms  p99 {pct(latencies, 99):6.0f} ms  "
+            f"degraded {degraded:4d}/{args.scans}  upstream calls {client.calls:4d}  wall {elapsed:5.1f}s"
+            + (f"  (opened {state['opened']}x, recovered {state['recovered']}x, final {state['state']})" if state else "")
+        )
+
+
+if __name__ == "__main__":
+    main()
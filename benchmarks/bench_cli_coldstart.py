@@ -0,0 +1,64 @@
+"""
+Cold-start benchmark for the headless CLI.
+
+    python benchmarks/bench_cli_coldstart.py [--runs 10]
+
+Times `python -m bharat_suraksha --help` (interpreter start + package import + argparse)
+and a one-message `scan --no-cache` without an API key, in fresh subprocesses. Also
+checks that importing the package pulls in neither Streamlit nor the Gemini SDK. Exits
+non-zero when the median help start exceeds cli.COLD_START_BUDGET_MS.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bharat_suraksha.cli import COLD_START_BUDGET_MS  # noqa: E402
+
+HEAVY_MODULES = ("streamlit", "google.generativeai", "numpy")
+
+
+def time_run(argv, runs, stdin=None):
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(argv, cwd=ROOT, input=stdin, capture_output=True, text=True)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples), min(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    baseline = time_run([sys.executable, "-c", "pass"], args.runs)
+    help_run = time_run([sys.executable, "-m", "bharat_suraksha", "--help"], args.runs)
+    scan_run = time_run(
+        [sys.executable, "-m", "bharat_suraksha", "scan", "--no-cache", "--api-key", ""],
+        args.runs,
+        stdin="Your KYC expires today, update at bit.ly/x9\n",
+    )
+    probe = (
+        "import sys, bharat_suraksha.cli, bharat_suraksha.pipeline;"
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    loaded = subprocess.run([sys.executable, "-c", probe], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+
+    print(f"{'python -c pass':<28} median {baseline[0]:7.1f} ms   min {baseline[1]:7.1f} ms")
+    print(f"{'--help':<28} median {help_run[0]:7.1f} ms   min {help_run[1]:7.1f} ms")
+    print(f"{'scan 1 msg (no key)':<28} median {scan_run[0]:7.1f} ms   min {scan_run[1]:7.1f} ms")
+    print(f"heavy modules on import: {loaded or 'none'}")
+    print(f"budget: {COLD_START_BUDGET_MS} ms")
+
+    if help_run[0] > COLD_START_BUDGET_MS or loaded:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
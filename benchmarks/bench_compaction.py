@@ -0,0 +1,70 @@
+"""
+Prompt compaction on a synthetic pasted WhatsApp export.
+
+    python benchmarks/bench_compaction.py [--lines 2000] [--budget 1500]
+
+Reports estimated message tokens before/after, prompt tokens, and compaction time.
+"""
+import argparse
+import base64
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bharat_suraksha.prompt import build_prompt  # noqa: E402
+
+FILLER = [
+    "Good morning everyone, have a blessed day 🙏",
+    "Forwarded",
+    "<Media omitted>",
+    "This message was deleted",
+    "Please share with all groups, very important information!!",
+    "ok",
+    "😂😂😂",
+]
+SCAM = [
+    "Earn daily 5000 from home, part time job, contact on telegram",
+    "Pay 500 registration to jobs.hr@ybl then task link bit.ly/t4sk",
+    "Your KYC will expire today, update at http://sbi-kyc.top/u or call +91 98765 43210",
+]
+
+
+def synthetic_chat(lines: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    out = []
+    for i in range(lines):
+        who = rng.choice(["Ravi", "Meena", "Uncle Ji", "+91 91234 56789"])
+        if rng.random() < 0.03:
+            body = rng.choice(SCAM)
+        elif rng.random() < 0.01:
+            body = base64.b64encode(os.urandom(400)).decode()
+        else:
+            body = rng.choice(FILLER)
+        out.append(f"[12/03/24, {10 + i // 600}:{(i // 10) % 60:02d}:{i % 60:02d}] {who}: {body}")
+    return "\n".join(out)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lines", type=int, default=2000)
+    parser.add_argument("--budget", type=int, default=1500)
+    args = parser.parse_args()
+
+    for lines in (1, 50, args.lines):
+        chat = synthetic_chat(lines)
+        started = time.perf_counter()
+        built = build_prompt(chat, "English", args.budget)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        c = built.compaction
+        print(
+            f"{lines:>6} lines: message ~{c.tokens_before:>7,} -> ~{c.tokens_after:>6,} tokens, "
+            f"prompt ~{built.prompt_tokens:>6,}, {c.lines_removed:,} lines removed, "
+            f"{c.entities} entities, {elapsed_ms:6.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
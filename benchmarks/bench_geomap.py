@@ -0,0 +1,160 @@
+"""
+Scam-report map: index build, incremental updates and filtered tile queries, offline.
+
+    python benchmarks/bench_geomap.py [--reports 300000]
+
+Generates reports clustered around the gazetteer's cities over 90 days (a third with no
+trope, the rest with one or two), loads them from a report file as the app does, then
+times tile queries at country, state and city zoom with and without trope and time
+filters. "raw scan" is the same answer computed the obvious way, by masking every report
+and counting cells, as a map that kept points would have to. Reference run (single-core
+VM, 300k reports):
+
+    load 300k reports from file            ~11 ms
+    first query at a level (builds it)     ~85-140 ms, once per level and process
+    query, country / state / city view     ~0.1-0.9 ms      raw scan ~1.4-15 ms
+    query after 1,000 new reports          ~10 ms   (folds in only the new ones)
+    GeoJSON + folium, ~1,500 squares       ~140 ms  (mostly folium's fixed template cost)
+    index memory, three levels built       ~25 MiB
+
+The app draws at most GEO_MAX_CELLS squares per view, so the map costs the same however
+many reports there are.
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bharat_suraksha.geomap import (  # noqa: E402
+    EAST,
+    NORTH,
+    PLACES,
+    REPORT_DTYPE,
+    SOUTH,
+    TROPE_NAMES,
+    WEST,
+    ReportGrid,
+    cell_bounds,
+    today,
+)
+
+VIEWS = {
+    "country (zoom 5)": (5, None),
+    "state (zoom 8)": (8, (17.0, 72.5, 20.5, 76.5)),
+    "city (zoom 12)": (12, (18.40, 73.70, 18.65, 74.05)),
+}
+
+
+def synthetic(n: int, level: int, rng: np.random.Generator) -> np.ndarray:
+    centers = np.array(list(PLACES.values()))
+    picks = centers[rng.integers(0, len(centers), n)]
+    lat = np.clip(picks[:, 0] + rng.normal(0, 0.15, n), SOUTH, NORTH - 1e-6)
+    lon = np.clip(picks[:, 1] + rng.normal(0, 0.15, n), WEST, EAST - 1e-6)
+    records = np.zeros(n, dtype=REPORT_DTYPE)
+    cells = 1 << level
+    records["x"] = ((lon - WEST) / (EAST - WEST) * cells).astype(np.uint16)
+    records["y"] = ((lat - SOUTH) / (NORTH - SOUTH) * cells).astype(np.uint16)
+    records["day"] = today() - rng.integers(0, 90, n)
+    first = np.uint32(1) << rng.integers(0, len(TROPE_NAMES), n).astype(np.uint32)
+    second = np.uint32(1) << rng.integers(0, len(TROPE_NAMES), n).astype(np.uint32)
+    kind = rng.random(n)
+    records["tropes"] = np.where(kind < 0.33, 0, np.where(kind < 0.8, first, first | second))
+    return records
+
+
+def raw_scan(records: np.ndarray, level: int, full_level: int, trope_bits: int, since_day: int, bounds) -> int:
+    keep = records["day"] >= since_day
+    if trope_bits:
+        keep &= (records["tropes"] & np.uint32(trope_bits)) != 0
+    shift = full_level - level
+    x = records["x"][keep].astype(np.int64) >> shift
+    y = records["y"][keep].astype(np.int64) >> shift
+    if bounds is not None:
+        n = 1 << level
+        south, west, north, east = bounds
+        inside = (x >= int((west - WEST) / (EAST - WEST) * n)) & (x <= int((east - WEST) / (EAST - WEST) * n))
+        inside &= (y >= int((south - SOUTH) / (NORTH - SOUTH) * n)) & (y <= int((north - SOUTH) / (NORTH - SOUTH) * n))
+        x, y = x[inside], y[inside]
+    return len(np.unique((y << level) | x))
+
+
+def timed(fn, repeat: int = 5):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--reports", type=int, default=300_000)
+    args = parser.parse_args()
+    rng = np.random.default_rng(7)
+    workdir = tempfile.mkdtemp(prefix="bench-geomap-")
+    try:
+        path = os.path.join(workdir, "geo_reports.bin")
+        probe = ReportGrid(None)
+        records = synthetic(args.reports, probe.level, rng)
+        records.tofile(path)
+
+        t0 = time.perf_counter()
+        grid = ReportGrid(path)
+        print(f"{args.reports:,} reports, grid level {grid.level}")
+        print(f"  load from file                     {(time.perf_counter() - t0) * 1000:8.1f} ms")
+        for name, (level, _) in VIEWS.items():
+            t0 = time.perf_counter()
+            grid.tiles(level)
+            print(f"  first query, {name:18s}    {(time.perf_counter() - t0) * 1000:8.1f} ms  (builds {grid.stats()['index_rows'][level]:,} rows)")
+
+        kyc = TROPE_NAMES.index("KYC expiry")
+        filters = {"everything": ([], 0, 0), "KYC, last 7 days": (["KYC expiry"], 1 << kyc, today() - 6)}
+        for name, (level, bounds) in VIEWS.items():
+            for label, (tropes, bits, since) in filters.items():
+                ms, tiles = timed(lambda: grid.tiles(level, tropes, since_day=since or None, bounds=bounds))
+                raw_ms, cells = timed(lambda: raw_scan(records, level, grid.level, bits, since, bounds))
+                assert cells == tiles.cells, (cells, tiles.cells)
+                print(f"  {name:18s} {label:17s} {ms:7.2f} ms   raw scan {raw_ms:6.1f} ms  ({tiles.reports:,} reports, {tiles.cells:,} squares)")
+
+        more = synthetic(1000, grid.level, rng)
+        with open(path, "ab") as f:
+            more.tofile(f)
+        t0 = time.perf_counter()
+        grid.tiles(5)
+        print(f"  query after 1,000 new reports      {(time.perf_counter() - t0) * 1000:8.1f} ms")
+
+        import folium
+
+        tiles = grid.tiles(7, max_cells=1500)
+        t0 = time.perf_counter()
+        features = []
+        for x, y, count in zip(tiles.x.tolist(), tiles.y.tolist(), tiles.counts.tolist()):
+            (south, west), (north, east) = cell_bounds(tiles.level, x, y)
+            features.append(
+                {
+                    "type": "Feature",
+                    "geometry": {"type": "Polygon", "coordinates": [[[west, south], [east, south], [east, north], [west, north], [west, south]]]},
+                    "properties": {"reports": count, "color": "hsl(10, 95%, 50%)", "opacity": 0.5},
+                }
+            )
+        layer = folium.FeatureGroup(name="Scam reports")
+        folium.GeoJson(
+            {"type": "FeatureCollection", "features": features},
+            style_function=lambda f: {"fillColor": f["properties"]["color"], "fillOpacity": f["properties"]["opacity"]},
+        ).add_to(layer)
+        folium.Map(location=(22.5, 80.0), zoom_start=5).add_child(layer).get_root().render()
+        print(f"  GeoJSON + folium, {len(features):,} squares        {(time.perf_counter() - t0) * 1000:8.1f} ms")
+        print(f"  index memory                       {grid.stats()['bytes'] / 2**20:8.1f} MiB")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Tail latency with and without hedged requests, against a simulated upstream.
+
+    python benchmarks/bench_hedging.py [--calls 600] [--concurrency 32]
+
+The fake client answers in ~40 ms, but 3% of calls stall for 1.5 s (a slow replica or
+a dropped packet). Both runs use the same retry policy; the hedged run sends a second
+request once the first outlives the observed p95.
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bharat_suraksha.resilience import AsyncModelCaller, RetryPolicy  # noqa: E402
+
+
+class StallingClient:
+    def __init__(self, stall_rate: float, seed: int):
+        self.stall_rate = stall_rate
+        self.rng = random.Random(seed)
+
+    def generate(self, prompt: str) -> str:
+        if self.rng.random() < self.stall_rate:
+            time.sleep(1.5)
+        else:
+            time.sleep(self.rng.lognormvariate(-3.2, 0.25))  # median ~40 ms
+        return '{"is_scam": "no", "score": 5}'
+
+
+async def run(caller: AsyncModelCaller, client, calls: int, concurrency: int):
+    gate = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(i: int):
+        async with gate:
+            started = time.perf_counter()
+            await caller.generate(client, f"message {i}")
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    await asyncio.gather(*(one(i) for i in range(calls)))
+    return latencies
+
+
+def pct(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q / 100 * len(values)))]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=600)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--stall-rate", type=float, default=0.03)
+    args = parser.parse_args()
+
+    for hedge in (False, True):
+        caller = AsyncModelCaller(RetryPolicy(hedge=hedge, attempt_timeout_seconds=5.0), max_threads=args.concurrency * 2)
+        # Prime the latency window so the hedged run has a p95 from the start.
+        asyncio.run(run(caller, StallingClient(0.0, seed=1), 50, args.concurrency))
+        latencies = asyncio.run(run(caller, StallingClient(args.stall_rate, seed=7), args.calls, args.concurrency))
+        stats = caller.stats()
+        print(
+            f"hedge={'on ' if hedge else 'off'}  p50 {statistics.median(latencies):6.1f} ms  "
+            f"p95 {pct(latencies, 95):7.1f} ms  p99 {pct(latencies, 99):7.1f} ms  "
+            f"hedged {stats['hedges']} (won {stats['hedge_wins']})"
+        )
+
+
+if __name__ == "__main__":
+    main()
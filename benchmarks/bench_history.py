@@ -0,0 +1,109 @@
+"""
+Per-session scan history: memory per session and the cost of recording a scan, offline.
+
+    python benchmarks/bench_history.py [--sessions 2000] [--scans 40]
+
+Simulates many app sessions each scanning --scans model-shaped verdicts (five
+explanations, a ~3 KB raw reply) and compares what the history holds against keeping
+every full verdict dict, as the app would if it simply appended last_parsed to a list.
+Then shrinks the ledger's budget to half of what was held and times the trimming.
+Reference run (single-core VM, 2000 sessions x 40 scans, 20 kept per session):
+
+    full verdict dicts, every scan     ~527 MB   (~6.6 KB per scan)
+    history records, 20 per session    ~110 MB   (~2.8 KB per record; ledger estimate within 1%)
+    SessionHistory.add over budget     ~19 us p50, ~47 us p99
+    CSV export, 20 records             ~0.4 ms
+
+Most of a record is the five explanations and the capped message; the raw reply, token
+counts and the rest of the verdict dict are gone.
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bharat_suraksha.history import SessionLedger  # noqa: E402
+
+EXPLANATIONS = {
+    "en": "The message creates urgency around a KYC deadline and asks you to call an unknown number. " * 2,
+    "hi": "यह संदेश केवाईसी की समय सीमा का डर दिखाकर अनजान नंबर पर कॉल करने को कहता है। " * 2,
+    "bn": "বার্তাটি কেওয়াইসি সময়সীমার ভয় দেখিয়ে অজানা নম্বরে কল করতে বলে। " * 2,
+    "ta": "இந்த செய்தி KYC காலக்கெடுவைக் கொண்டு அவசரத்தை உருவாக்கி தெரியாத எண்ணை அழைக்கச் சொல்கிறது. " * 2,
+    "te": "ఈ సందేశం KYC గడువు పేరుతో తొందర పెట్టి తెలియని నంబర్‌కు కాల్ చేయమంటుంది. " * 2,
+}
+
+
+def verdict(i: int) -> dict:
+    explanations = {code: text + str(i) for code, text in EXPLANATIONS.items()}
+    return {
+        "is_scam": "yes",
+        "score": 80 + i % 20,
+        "tactics": ["urgency", "authority"],
+        "matched_patterns": ["KYC expiry"],
+        "explanations": explanations,
+        "raw": "```json\n" + repr(explanations) * 2 + "\n```",
+        "tokens": {"prompt": 310, "message_before": 40, "message_after": 40},
+    }
+
+
+def message(i: int) -> str:
+    return f"Dear customer {i}, your KYC expires today. Update now at http://kyc-{i % 97}.in or call 98765{i % 100000:05d}. " * 3
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=2000)
+    parser.add_argument("--scans", type=int, default=40)
+    args = parser.parse_args()
+    total = args.sessions * args.scans
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = [[] for _ in range(args.sessions)]
+    for i in range(total):
+        kept[i % args.sessions].append((message(i), verdict(i)))
+    full = tracemalloc.get_traced_memory()[0] - before
+    del kept
+    gc.collect()
+
+    ledger = SessionLedger(budget_bytes=1 << 40)
+    before = tracemalloc.get_traced_memory()[0]
+    histories = [ledger.open(f"session-{n}") for n in range(args.sessions)]
+    for i in range(total):
+        histories[i % args.sessions].add(message(i), verdict(i), "Hindi")
+    held = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    stats = ledger.stats()
+
+    print(f"{args.sessions:,} sessions x {args.scans} scans, {ledger.entries} kept per session")
+    print(f"  full verdict dicts, every scan   {full / 1e6:8.1f} MB  ({full / total / 1e3:.1f} KB per scan)")
+    print(
+        f"  history records                  {held / 1e6:8.1f} MB  ({held / stats['entries'] / 1e3:.1f} KB per record; "
+        f"ledger estimate {stats['bytes'] / 1e6:.1f} MB)"
+    )
+
+    ledger.budget_bytes = stats["bytes"] // 2
+    costs = []
+    for i in range(total, total + 20_000):
+        t0 = time.perf_counter()
+        histories[i % args.sessions].add(message(i), verdict(i), "Hindi")
+        costs.append(time.perf_counter() - t0)
+    costs.sort()
+    stats = ledger.stats()
+    print(
+        f"  add() p50 {costs[len(costs) // 2] * 1e6:6.1f} us, p99 {costs[int(len(costs) * 0.99)] * 1e6:6.1f} us "
+        f"over a {ledger.budget_bytes / 1e6:.1f} MB budget ({stats['bytes'] / 1e6:.1f} MB held, {stats['evicted']:,} trimmed)"
+    )
+
+    full_session = max(histories, key=len)
+    t0 = time.perf_counter()
+    full_session.to_csv("Hindi")
+    print(f"  CSV export, {len(full_session)} records        {(time.perf_counter() - t0) * 1000:6.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
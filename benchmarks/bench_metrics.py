@@ -0,0 +1,64 @@
+"""
+Cost of the stage metrics on the scan hot path, disabled vs enabled.
+
+    python benchmarks/bench_metrics.py [--scans 20000]
+
+Runs Scanner with an in-memory verdict cache and a zero-latency stub model, so only the
+pipeline's own work is timed and instrumentation is as large a share as it can get: a
+bare timer() block, a cache-hit lookup (one timer and one counter) and a full model
+scan (each includes asyncio.run, which makes it noisy). Reference run (single-core VM):
+
+    timer() block      disabled ~0.6 us    enabled ~3 us
+    cache-hit lookup   disabled ~17 us     enabled ~23 us
+    model scan (stub)  disabled ~1.0 ms    enabled ~1.15 ms   (run-to-run noise is similar)
+
+Against a real model call (hundreds of ms) the enabled cost is far below 0.1%.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bharat_suraksha.cache import VerdictCache  # noqa: E402
+from bharat_suraksha.metrics import METRICS  # noqa: E402
+from bharat_suraksha.model import StubModelClient  # noqa: E402
+from bharat_suraksha.pipeline import Scanner  # noqa: E402
+
+
+def per_call_us(fn, n):
+    started = time.perf_counter()
+    for i in range(n):
+        fn(i)
+    return (time.perf_counter() - started) / n * 1e6
+
+
+def bare_timer(_):
+    with METRICS.timer("bench"):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scans", type=int, default=20000)
+    args = parser.parse_args()
+
+    client = StubModelClient()
+    rows = []
+    for enabled in (False, True):
+        METRICS.enabled = enabled
+        METRICS.reset()
+        scanner = Scanner(cache=VerdictCache(None, memory_entries=1024))
+        scanner.scan("Your KYC expires today, update now", client)
+        cached = per_call_us(lambda _: scanner.lookup("Your KYC expires today, update now"), args.scans)
+        fresh = per_call_us(lambda i: scanner.scan(f"Your KYC expires today, ref {i}", client), max(1, args.scans // 10))
+        rows.append((enabled, per_call_us(bare_timer, args.scans * 10), cached, fresh))
+
+    for enabled, timer_us, cached, fresh in rows:
+        label = "enabled " if enabled else "disabled"
+        print(f"{label}  timer() block {timer_us:6.2f} us   cache hit lookup {cached:6.1f} us   model scan (stub) {fresh:7.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Qubit engine: the per-message loop it replaced vs one vectorized batch.
+
+    python benchmarks/bench_qubit.py [--n 100000]
+
+"legacy" rebuilds the Hadamard matrix and does a 2x2 complex matmul plus
+np.random.choice per message (sleeps removed; with them each message also cost
+0.9 s of wall clock). "batch" is qubit.collapse_batch over all scores at once.
+"""
+import argparse
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bharat_suraksha.qubit import collapse_batch, make_rng  # noqa: E402
+
+
+def legacy_one(score, rng):
+    p1 = min(1.0, max(0.0, score / 100.0))
+    state = np.array([math.sqrt(1 - p1), math.sqrt(p1)], dtype=complex).reshape(2, 1)
+    H = (1 / math.sqrt(2)) * np.array([[1, 1], [1, -1]], dtype=complex)
+    superposed = (H @ state).flatten()
+    probs = np.abs(superposed) ** 2
+    probs = probs / probs.sum()
+    return int(rng.choice([0, 1], p=[float(probs[0]), float(probs[1])]))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=100_000)
+    args = parser.parse_args()
+    scores = make_rng(0).integers(0, 101, args.n)
+
+    legacy_n = min(args.n, 20_000)
+    rng = make_rng(1)
+    started = time.perf_counter()
+    for score in scores[:legacy_n]:
+        legacy_one(int(score), rng)
+    legacy_us = (time.perf_counter() - started) / legacy_n * 1e6
+
+    started = time.perf_counter()
+    batch = collapse_batch(scores, make_rng(1))
+    batch_us = (time.perf_counter() - started) / args.n * 1e6
+
+    print(f"legacy loop : {legacy_us:8.2f} µs/message (measured on {legacy_n:,})")
+    print(f"batch       : {batch_us:8.3f} µs/message over {args.n:,}  ({legacy_us / batch_us:,.0f}x)")
+    print(f"scam measurements: {int(batch.measured.sum()):,} / {args.n:,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Reputation index: lookup latency and memory at feed scale.
+
+    python benchmarks/bench_reputation.py [--entries 20000000] [--checks 20000]
+
+Writes an index of random 64-bit hashes plus a few real entries to a temp dir, maps it
+and times ReputationIndex.check on SMS-sized messages (entity extraction + one
+searchsorted over the mapped file) and a bare lookup of pre-extracted entities.
+Reference run (single-core VM, 20M entries, 191 MiB file; the model call these replace takes hundreds of ms):
+
+    build (write_index, sort + dedupe)  ~7 s
+    map a built file                    ~0.3 ms   (RSS +0 MiB until pages are touched)
+    check, message with no entities     ~6 us
+    check, link + phone, miss           ~30 us
+    check, known-bad link, hit          ~27 us
+    lookup, 3 entities, miss            ~15 us
+
+Most of a check is entity extraction and hashing; the binary search itself is a few
+microseconds. Resident memory grows only by the file pages lookups touch (~34 MiB here,
+mostly kernel fault-around), and those are page cache shared by every process mapping it.
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bharat_suraksha.reputation import Entity, ReputationIndex, entity_hash, extract_entities, write_index  # noqa: E402
+
+KNOWN_BAD = [Entity("domain", "sbi-kyc.xyz"), Entity("url", "bit.ly/3xYzAbC"), Entity("upi", "fraud.pay@ybl")]
+MESSAGES = {
+    "no entities": "Hi beta, reached home safely. Will call after dinner.",
+    "link + phone, miss": "Your parcel is held at customs. Pay at https://indiapost-track.in/pay or call 9123456780",
+    "known-bad link, hit": "Dear customer your SBI account will be blocked today. Update KYC at http://sbi-kyc.xyz now",
+}
+
+
+def rss_mib() -> float:
+    with open("/proc/self/status") as fh:
+        for line in fh:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def per_call_us(fn, n):
+    fn()
+    started = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - started) / n * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entries", type=int, default=20_000_000)
+    parser.add_argument("--checks", type=int, default=20000)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench-reputation-")
+    path = os.path.join(workdir, "reputation.idx")
+    try:
+        rng = np.random.default_rng(1)
+        hashes = rng.integers(0, 2**64, size=args.entries, dtype=np.uint64, endpoint=False)
+        hashes[: len(KNOWN_BAD)] = [entity_hash(e) for e in KNOWN_BAD]
+        feed_ids = np.zeros(args.entries, dtype=np.uint16)
+        started = time.perf_counter()
+        entries = write_index(path, hashes, feed_ids, ["synthetic"])
+        build_s = time.perf_counter() - started
+        del hashes, feed_ids
+
+        rss = rss_mib()
+        started = time.perf_counter()
+        index = ReputationIndex(path, reload_seconds=3600)
+        map_ms = (time.perf_counter() - started) * 1000
+        print(f"{entries:,} entries, {os.path.getsize(path) / 2**20:.0f} MiB file")
+        print(f"  build (write_index)         {build_s:8.2f} s")
+        print(f"  map a built file            {map_ms:8.2f} ms  (RSS +{rss_mib() - rss:.0f} MiB)")
+        for name, text in MESSAGES.items():
+            us = per_call_us(lambda: index.check(text), args.checks)
+            print(f"  check, {name:<20} {us:8.1f} us  hits={len(index.check(text))}")
+        entities = extract_entities(MESSAGES["link + phone, miss"])
+        print(f"  lookup, {len(entities)} entities, miss   {per_call_us(lambda: index.lookup(entities), args.checks):8.1f} us")
+        print(f"  RSS after lookups           +{rss_mib() - rss:.0f} MiB")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
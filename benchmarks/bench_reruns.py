@@ -0,0 +1,177 @@
+"""
+Server CPU per UI interaction in the Streamlit app, measured on a real server, offline.
+
+    python benchmarks/bench_reruns.py [--repeat 30] [--app streamlit_app.py]
+
+Starts `streamlit run` headless with the fake Gemini model (benchmarks/fake_gemini.py)
+patched in, connects to it over the app's own websocket protocol the way a browser tab
+does, scans one message, then repeats each interaction and reports the server process's
+CPU time per interaction (/proc/<pid>/stat, so Linux only). Widgets inside an
+st.fragment are rerun with that fragment's id, exactly as the frontend sends them.
+
+Pass --app with an older copy of the app (git show REV:streamlit_app.py > /tmp/app.py)
+to compare before and after. Reference run (single-core VM, 30 repeats; the middle
+column is fragments and the memoized card without the gc.freeze() in the app, where
+Streamlit's post-run gc.collect() over the whole heap is most of what is left):
+
+    interaction          whole-page reruns   fragments + memo   + frozen heap
+    type in message box  ~128 ms             ~92 ms             ~6 ms
+    1930 button          ~120 ms             ~99 ms             ~5 ms
+    report button        ~117 ms             ~86 ms             ~5 ms
+    admin panel toggle   ~104 ms             ~91 ms             ~5 ms
+    change language      ~125 ms             ~116 ms            ~25 ms
+
+Changing language stays a whole-page rerun (every label changes); the result card is
+rebuilt once per language and then served from session state.
+"""
+import argparse
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from websockets.sync.client import connect
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MESSAGE = "Dear customer your SBI account will be blocked today. Update KYC at http://sbi-kyc.xyz now"
+
+# Runs the app under test with the fake model in place of google.generativeai's.
+WRAPPER = """\
+import sys
+sys.path[:0] = [{root!r}, {benchmarks!r}]
+import google.generativeai as genai
+from fake_gemini import FakeGenerativeModel
+genai.GenerativeModel = lambda name, **kwargs: FakeGenerativeModel(name, latency="fixed:30", seed=1)
+APP = {app!r}
+exec(compile(open(APP, encoding="utf-8").read(), APP, "exec"))
+"""
+
+
+def server_cpu_ms(pid: int) -> float:
+    with open(f"/proc/{pid}/stat") as fh:
+        fields = fh.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) * 1000.0 / os.sysconf("SC_CLK_TCK")
+
+
+class Browser:
+    """One tab: keeps widget values like the frontend and sends them with every rerun."""
+
+    def __init__(self, ws):
+        self.ws = ws
+        self.widgets = {}  # label -> (widget id, fragment id, element type)
+        self.values = {}  # widget id -> (field, value)
+        self.text = []
+
+    def rerun(self, trigger=None, fragment_id=""):
+        msg = BackMsg()
+        msg.rerun_script.query_string = ""
+        msg.rerun_script.fragment_id = fragment_id
+        for widget_id, (field, value) in self.values.items():
+            state = msg.rerun_script.widget_states.widgets.add()
+            state.id = widget_id
+            setattr(state, field, value)
+        if trigger is not None:
+            state = msg.rerun_script.widget_states.widgets.add()
+            state.id = trigger
+            state.trigger_value = True
+        self.ws.send(msg.SerializeToString())
+        self.text = []
+        while True:
+            fwd = ForwardMsg()
+            fwd.ParseFromString(self.ws.recv(timeout=60))
+            kind = fwd.WhichOneof("type")
+            if kind == "script_finished":
+                return
+            if kind == "delta" and fwd.delta.WhichOneof("type") == "new_element":
+                element = fwd.delta.new_element
+                name = element.WhichOneof("type")
+                widget = getattr(element, name)
+                if getattr(widget, "id", ""):
+                    self.widgets[widget.label] = (widget.id, fwd.delta.fragment_id, name)
+                elif name == "markdown":
+                    self.text.append(widget.body)
+
+    def set(self, label, field, value):
+        widget_id, fragment_id, _ = self.widgets[label]
+        self.values[widget_id] = (field, value)
+        self.rerun(fragment_id=fragment_id)
+
+    def click(self, label):
+        widget_id, fragment_id, _ = self.widgets[label]
+        self.rerun(trigger=widget_id, fragment_id=fragment_id)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--app", default=os.path.join(ROOT, "streamlit_app.py"))
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench-reruns-")
+    os.makedirs(os.path.join(workdir, ".streamlit"))
+    with open(os.path.join(workdir, ".streamlit", "secrets.toml"), "w") as fh:
+        fh.write('GOOGLE_API_KEY = "fake-key"\n')
+    with open(os.path.join(workdir, "app.py"), "w") as fh:
+        fh.write(WRAPPER.format(root=ROOT, benchmarks=os.path.join(ROOT, "benchmarks"), app=os.path.abspath(args.app)))
+    port = free_port()
+    env = dict(os.environ, BHARAT_SURAKSHA_DATA_DIR=os.path.join(workdir, "data"))
+    server = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", "app.py", "--server.headless", "true", "--server.port", str(port),
+         "--browser.gatherUsageStats", "false", "--server.fileWatcherType", "none"],
+        cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        for _ in range(100):
+            try:
+                urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1)
+                break
+            except OSError:
+                time.sleep(0.2)
+        with connect(f"ws://127.0.0.1:{port}/_stcore/stream", subprotocols=["streamlit"], max_size=None) as ws:
+            measure(Browser(ws), server.pid, args.repeat, args.app)
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def measure(tab: Browser, pid: int, repeat: int, app: str) -> None:
+    tab.rerun()
+    text_area = next(label for label, (_, _, kind) in tab.widgets.items() if kind == "text_area")
+    tab.values[tab.widgets[text_area][0]] = ("string_value", MESSAGE)
+    tab.click("🔍 Analyze (Deep Intent)")
+    assert any("Risk Score" in body for body in tab.text), "scan did not render a result"
+
+    languages = ["Hindi", "English"]
+    interactions = {
+        "type in message box": lambda i: tab.set(text_area, "string_value", f"{MESSAGE} {i}"),
+        "1930 button": lambda i: tab.click("Call 1930 Helpline"),
+        "report button": lambda i: tab.click("Report to Cybercrime.gov.in"),
+        "admin panel toggle": lambda i: tab.set("Admin: stage metrics", "bool_value", i % 2 == 0),
+        "change language": lambda i: tab.set("Language / भाषा", "string_value", languages[i % 2]),
+    }
+    print(f"{os.path.relpath(os.path.abspath(app), ROOT)}: server CPU per interaction, mean of {repeat}")
+    for name, action in interactions.items():
+        if name.split()[0] == "admin" and "Admin: stage metrics" not in tab.widgets:
+            continue  # apps from before the admin panel
+        action(0)  # the first run of a code path is not representative
+        started = server_cpu_ms(pid)
+        for i in range(1, repeat + 1):
+            action(i)
+        print(f"  {name:<20} {(server_cpu_ms(pid) - started) / repeat:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
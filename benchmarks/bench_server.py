@@ -0,0 +1,106 @@
+"""
+HTTP scanning service under 100 concurrent keep-alive clients, fully offline.
+
+    python benchmarks/bench_server.py [--clients 100] [--requests 20] [--latency-ms 80]
+
+Starts the service in-process on a free port with StubModelClient (fixed latency) and no
+verdict cache, so every answer is either a model call or coalesced onto one. Each client
+holds one HTTP/1.1 connection and sends its requests back to back; --hot of the traffic
+repeats a small set of messages (a campaign hitting many phones at once), the rest is
+unique. Reports requests/sec, latency percentiles and model calls per request.
+
+Reference run (defaults, single-core VM, stub latency 80 ms, 32 scan slots):
+
+    throughput   ~525 req/s, 0 errors
+    latency      p50 ~165 ms  p95 ~480 ms  p99 ~570 ms
+    model calls  ~0.56 per request (~910 of 2000 requests coalesced)
+
+Unique messages queue for one of the 32 slots, which is where the tail comes from. With
+BHARAT_SURAKSHA_MODEL_HEDGE=0 the hedges that queueing provokes disappear (~0.55 calls
+per request, p95 ~340 ms).
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bharat_suraksha import config  # noqa: E402
+from bharat_suraksha.model import StubModelClient  # noqa: E402
+from bharat_suraksha.pipeline import Scanner  # noqa: E402
+from bharat_suraksha.server import ScanHTTPServer, ScanService  # noqa: E402
+
+HOT = [
+    "Dear customer your SBI account will be blocked today. Update KYC at http://sbi-kyc.xyz now",
+    "Your electricity connection will be disconnected tonight. Call officer at 8123456789",
+    "Congratulations! You won Rs 25,00,000 in KBC lottery. Call 9876543210 to claim.",
+    "FedEx: your parcel is held at customs. Pay Rs 49 at http://fdx-in.top/pay",
+]
+
+
+def pct(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q / 100 * len(values)))]
+
+
+def client(port, n, hot, seed, latencies, failures):
+    rng = random.Random(seed)
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    for i in range(n):
+        text = rng.choice(HOT) if rng.random() < hot else f"Hi, it's {seed}-{i}. Are we still on for lunch?"
+        body = json.dumps({"text": text})
+        started = time.perf_counter()
+        conn.request("POST", "/v1/scan", body, {"Content-Type": "application/json"})
+        response = conn.getresponse()
+        response.read()
+        latencies.append((time.perf_counter() - started) * 1000)
+        if response.status != 200:
+            failures.append(response.status)
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=20, help="per client")
+    parser.add_argument("--latency-ms", type=float, default=80.0, help="stub model latency")
+    parser.add_argument("--hot", type=float, default=0.5, help="share of traffic repeating a hot message")
+    parser.add_argument("--max-concurrency", type=int, default=config.SERVER_MAX_CONCURRENCY)
+    args = parser.parse_args()
+
+    model = StubModelClient(latency_ms=args.latency_ms)
+    service = ScanService(Scanner(), model, max_concurrency=args.max_concurrency)
+    server = ScanHTTPServer(("127.0.0.1", 0), service)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+
+    latencies, failures = [], []
+    threads = [
+        threading.Thread(target=client, args=(port, args.requests, args.hot, seed, latencies, failures))
+        for seed in range(args.clients)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    server.shutdown()
+    server.server_close()
+    stats = service.stats()
+    service.close()
+
+    total = len(latencies)
+    print(f"{args.clients} clients x {args.requests} requests, stub model {args.latency_ms:.0f} ms, concurrency {args.max_concurrency}")
+    print(f"  throughput  {total / elapsed:8.1f} req/s  ({total} requests in {elapsed:.2f}s, {len(failures)} non-200)")
+    print(f"  latency     p50 {pct(latencies, 50):.0f} ms  p95 {pct(latencies, 95):.0f} ms  p99 {pct(latencies, 99):.0f} ms")
+    print(f"  model calls {model.calls} ({model.calls / total:.2f} per request), coalesced {stats['coalesced']}")
+
+
+if __name__ == "__main__":
+    main()
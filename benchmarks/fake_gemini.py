@@ -0,0 +1,175 @@
+"""
+Deterministic offline stand-in for google.generativeai.GenerativeModel.
+
+FakeGenerativeModel implements generate_content (plain and stream=True) and replays
+recorded verdict replies from fixtures/gemini_replies.json, with a seeded latency
+distribution, an error rate (exceptions carrying HTTP codes, as google.api_core raises)
+and a malformed-reply rate (fenced JSON with prose, truncated JSON, or no JSON at all).
+Same seed, same sequence of replies, delays and failures.
+
+    model = FakeGenerativeModel(latency="lognormal:400:0.4", error_rate=0.02, malformed_rate=0.05)
+    client = fake_gemini_client(model)   # a real GeminiClient whose SDK model is the fake
+    scanner.scan(text, client)
+
+Batch prompts ([i] \"\"\"...\"\"\" items) get an id-tagged array, so the micro-batcher can be
+driven too; translation prompts get {code: "[code] <source text>"}. Shared by
+benchmarks/suite.py and anyone poking at the model path without a key.
+"""
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "gemini_replies.json")
+
+_BATCH_ITEM = re.compile(r'^\[(\d+)\] """', re.M)
+_TRANSLATION = re.compile(r'^Return ONLY a JSON object \{"(\w+)": .*?^Explanation: """(.*?)"""', re.M | re.S)
+
+# HTTP codes a failing call carries, and how often each is picked.
+ERROR_MIX: Tuple[Tuple[int, str], ...] = (
+    (503, "The service is currently unavailable."),
+    (503, "The service is currently unavailable."),
+    (429, "Resource has been exhausted (e.g. check quota)."),
+    (504, "Deadline Exceeded"),
+    (500, "An internal error has occurred."),
+)
+MALFORMED_KINDS = ("fenced", "truncated", "prose")
+
+
+def load_replies(path: str = FIXTURES) -> List[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+class FakeAPIError(Exception):
+    """Shaped like google.api_core.exceptions.GoogleAPICallError: an HTTP code and a message."""
+
+    def __init__(self, code: int, message: str):
+        super().__init__(f"{code} {message}")
+        self.code = code
+        self.message = message
+
+
+class LatencyProfile:
+    """
+    Seconds per call, from a spec string (milliseconds):
+      "0" | "fixed:80" | "uniform:50:150" | "lognormal:MEDIAN:SIGMA"
+    lognormal is the usual shape of API latency: most calls near the median, a long tail.
+    """
+
+    def __init__(self, spec: str = "0"):
+        self.spec = spec
+        kind, *params = spec.split(":") if ":" in spec else ("fixed", spec)
+        self.kind = kind
+        self.params = [float(p) for p in params]
+        if kind not in ("fixed", "uniform", "lognormal") or len(self.params) != {"fixed": 1, "uniform": 2, "lognormal": 2}[kind]:
+            raise ValueError(f"Bad latency spec {spec!r}")
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "fixed":
+            ms = self.params[0]
+        elif self.kind == "uniform":
+            ms = rng.uniform(*self.params)
+        else:
+            median, sigma = self.params
+            ms = rng.lognormvariate(math.log(median), sigma) if median > 0 else 0.0
+        return max(0.0, ms) / 1000.0
+
+
+class FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+def malform(text: str, kind: str) -> str:
+    if kind == "fenced":
+        return f"Here is my analysis:\n```json\n{text}\n```\nStay safe!"
+    if kind == "truncated":
+        return text[: max(1, int(len(text) * 0.6))]
+    return "I think this message is probably a scam because it asks for your OTP. Please be careful."
+
+
+class FakeGenerativeModel:
+    """Thread-safe; draws from one seeded RNG, so concurrent callers stay reproducible in aggregate."""
+
+    def __init__(
+        self,
+        model_name: str = "fake-gemini",
+        generation_config: Optional[Dict[str, Any]] = None,
+        replies: Optional[Sequence[Dict[str, Any]]] = None,
+        latency: str = "0",
+        error_rate: float = 0.0,
+        malformed_rate: float = 0.0,
+        seed: int = 0,
+        chunk_chars: int = 24,
+    ):
+        self.model_name = model_name
+        self.generation_config = generation_config
+        self.replies = list(replies) if replies is not None else load_replies()
+        self.latency = LatencyProfile(latency)
+        self.error_rate = error_rate
+        self.malformed_rate = malformed_rate
+        self.chunk_chars = chunk_chars
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.counts: Counter = Counter()
+
+    def _draw(self, prompt: str) -> Tuple[float, Optional[FakeAPIError], str]:
+        with self._lock:
+            rng = self._rng
+            self.counts["calls"] += 1
+            delay = self.latency.sample(rng)
+            if rng.random() < self.error_rate:
+                code, message = rng.choice(ERROR_MIX)
+                self.counts[f"error_{code}"] += 1
+                return delay, FakeAPIError(code, message), ""
+            ids = [int(i) for i in _BATCH_ITEM.findall(prompt)]
+            translation = _TRANSLATION.search(prompt)
+            if translation:
+                code, explanation = translation.groups()
+                text = json.dumps({code: f"[{code}] {explanation}"}, ensure_ascii=False)
+            elif ids:
+                text = json.dumps([dict(rng.choice(self.replies), id=i) for i in ids], ensure_ascii=False)
+            else:
+                text = json.dumps(rng.choice(self.replies), ensure_ascii=False)
+            if rng.random() < self.malformed_rate:
+                kind = rng.choice(MALFORMED_KINDS)
+                self.counts[f"malformed_{kind}"] += 1
+                text = malform(text, kind)
+            return delay, None, text
+
+    def generate_content(self, prompt: Any, stream: bool = False, **kwargs: Any):
+        # generation_config / request_options are accepted and ignored, as the SDK's are for us.
+        delay, error, text = self._draw(str(prompt))
+        if stream:
+            return self._stream(delay, error, text)
+        time.sleep(delay)
+        if error is not None:
+            raise error
+        return FakeResponse(text)
+
+    def _stream(self, delay: float, error: Optional[FakeAPIError], text: str) -> Iterator[FakeResponse]:
+        chunks = [text[i : i + self.chunk_chars] for i in range(0, len(text), self.chunk_chars)] or [""]
+        per_chunk = delay / len(chunks)
+        for i, chunk in enumerate(chunks):
+            time.sleep(per_chunk)
+            if error is not None and i >= len(chunks) // 2:
+                raise error
+            yield FakeResponse(chunk)
+
+    def count_tokens(self, contents: Any) -> Dict[str, int]:
+        return {"total_tokens": max(1, len(str(contents)) // 4)}
+
+
+def fake_gemini_client(model: Optional[FakeGenerativeModel] = None, structured: bool = True):
+    """GeminiClient with the fake already connected: the real client code path, no SDK or key."""
+    from bharat_suraksha.model import GeminiClient
+
+    client = GeminiClient("fake-key", structured=structured)
+    client._model = model or FakeGenerativeModel()
+    return client
@@ -0,0 +1,38 @@
+"""
+Bharat Suraksha scanner internals shared by the Streamlit app and offline tools.
+
+The headless analysis core is importable without Streamlit:
+
+    from bharat_suraksha import Scanner, GeminiClient
+    verdict = Scanner.from_config().scan(text, GeminiClient(api_key))
+
+Exports resolve lazily so `import bharat_suraksha` stays cheap.
+"""
+from importlib import import_module
+
+_EXPORTS = {
+    "Scanner": "bharat_suraksha.pipeline",
+    "GeminiClient": "bharat_suraksha.model",
+    "StubModelClient": "bharat_suraksha.model",
+    "ScanService": "bharat_suraksha.server",
+    "METRICS": "bharat_suraksha.metrics",
+    "ModelUnavailable": "bharat_suraksha.model",
+    "call_model_and_parse": "bharat_suraksha.model",
+    "build_deep_intent_prompt": "bharat_suraksha.prompt",
+    "PROMPT_VERSION": "bharat_suraksha.prompt",
+    "LANGUAGE_CODES": "bharat_suraksha.languages",
+    "ReputationIndex": "bharat_suraksha.reputation",
+    "AuditLog": "bharat_suraksha.audit",
+    "extract_entities": "bharat_suraksha.reputation",
+    "parse_model_response": "bharat_suraksha.parsing",
+    "risk_level": "bharat_suraksha.risk",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(import_module(module), name)
@@ -0,0 +1,5 @@
+import sys
+
+from bharat_suraksha.cli import main
+
+sys.exit(main())
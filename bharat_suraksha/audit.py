@@ -0,0 +1,800 @@
+"""
+Append-only audit log: every analysis as one compact, redacted JSON record.
+
+    log = AuditLog(config.AUDIT_DIR)
+    log.append(text, verdict, "Hindi", latency_ms, surface="app", session=session_id)
+    for record in query(config.AUDIT_DIR, since=day_start, until=day_end, is_scam="yes"):
+        ...
+
+append() only puts the verdict on a bounded queue; a daemon writer thread redacts,
+serializes and compresses it, so a scan never waits on the disk. When the queue is full
+the record is dropped and counted instead of slowing the scan down.
+
+Records go to gzip JSONL segments under <dir>/<UTC day>/, each writer process appending
+to its own segment, closed at UTC midnight or by size or age. A segment is a run of gzip
+members ("blocks"): `gzip -dc` reads it whole, and every block also decompresses on its
+own. Beside each segment, <segment>.idx holds the time range and verdict and source
+counts of its closed blocks, rewritten atomically as blocks close, so a query only
+decompresses blocks that can match. The open block is sync-flushed after every batch;
+a crash loses at most the batch being written, and queries read that unindexed tail
+with a decompressor that tolerates truncation.
+
+Nothing identifying is stored in the clear. Message text, explanation and model reply are
+redacted (phone numbers, emails, UPI IDs, card / Aadhaar / account numbers, PAN, OTPs,
+API keys, link query strings); the exact text, the session id and listed entity values
+are kept only as keyed BLAKE2b hashes. With the key (config.AUDIT_KEY or <dir>/.key) an
+investigator can still find every record of a known message:
+
+    python -m bharat_suraksha.audit stats --day 2026-10-18
+    python -m bharat_suraksha.audit query --day 2026-10-18 --verdict yes
+    python -m bharat_suraksha.audit query --text "Your SBI account will be blocked..."
+"""
+import argparse
+import atexit
+import calendar
+import hashlib
+import itertools
+import json
+import os
+import queue
+import re
+import secrets
+import sys
+import threading
+import time
+import zlib
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from bharat_suraksha import config
+from bharat_suraksha.metrics import METRICS
+
+INDEX_VERSION = 1
+SEGMENT_SUFFIX = ".jsonl.gz"
+INDEX_SUFFIX = ".idx"
+KEY_FILE = ".key"
+# Context values stored as keyed hashes rather than verbatim.
+HASHED_CONTEXT = ("session", "user")
+
+_BATCH_RECORDS = 512  # records the writer takes off the queue per write
+_DAY = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+_SEQUENCE = itertools.count()
+_STOP = object()
+
+
+# ---------------------------
+# Redaction and keyed hashes
+# ---------------------------
+_KEY = re.compile(r"AIza[0-9A-Za-z_\-]{30,}")
+_URL_QUERY = re.compile(r"(https?://[^\s?#]+)[?#]\S*")
+# Lookbehinds keep these from rescanning a long word from every position inside it.
+_EMAIL = re.compile(r"(?<![\w.+-])[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+_UPI = re.compile(r"(?<![\w.-])[\w.-]{2,}@[A-Za-z][A-Za-z0-9]+\b")
+# Digit runs, spaces and hyphens allowed inside; _redact_numbers decides what each one is.
+_DIGIT_RUN = re.compile(r"[+\d][\d -]*\d")
+# A keyword, then any short run of connector words ("OTP is", "A/c no:", "Ref number -").
+_CONNECTORS = r"(?:\W*\b(?:is|no|num|number|id|was|ending|with)\b)*\W{1,20}$"
+_OTP_BEFORE = re.compile(r"(?i)\b(?:otp|pin|cvv|code|passcode|password)" + _CONNECTORS)
+_ACCOUNT_BEFORE = re.compile(r"(?i)\b(?:a/c|acct|account|ref|txn|utr|transaction)" + _CONNECTORS)
+_OTP_AFTER = re.compile(r"(?i)\W{1,3}is\s+(?:your|the)\b")
+
+
+def _is_pan(text: str, start: int, end: int) -> bool:
+    """The 4 digits at text[start:end] sit inside a PAN (AAAAA9999A)."""
+    letters = text[max(0, start - 5) : start]
+    return (
+        len(letters) == 5
+        and letters.isascii()
+        and letters.isalpha()
+        and letters.isupper()
+        and text[end : end + 1].isupper()
+        and not text[max(0, start - 6) : max(0, start - 5)].isalnum()
+        and not text[end + 1 : end + 2].isalnum()
+    )
+
+
+def _redact_numbers(text: str) -> str:
+    pieces: List[str] = []
+    last = 0
+    for match in _DIGIT_RUN.finditer(text):
+        start, end = match.span()
+        run = match.group()
+        digits = run.replace(" ", "").replace("-", "").lstrip("+")
+        if len(digits) < 3:
+            continue
+        if len(digits) >= 9:
+            # Mobile numbers with or without +91 / 0; anything else this long is a card,
+            # Aadhaar, account or landline number.
+            if len(digits) == 12 and digits.startswith("91"):
+                digits = digits[2:]
+            elif len(digits) == 11 and digits[0] == "0":
+                digits = digits[1:]
+            replacement = "[phone]" if len(digits) == 10 and digits[0] in "6789" else "[number]"
+        elif len(run) == 4 and _is_pan(text, start, end):
+            start, end, replacement = start - 5, end + 1, "[pan]"
+        elif _OTP_BEFORE.search(text, max(0, start - 40), start) or _OTP_AFTER.match(text, end):
+            replacement = "[otp]"
+        elif len(digits) >= 6 and _ACCOUNT_BEFORE.search(text, max(0, start - 40), start):
+            replacement = "[number]"
+        else:
+            # Amounts, dates, times: kept.
+            continue
+        pieces.append(text[last:start])
+        pieces.append(replacement)
+        last = end
+    if not pieces:
+        return text
+    pieces.append(text[last:])
+    return "".join(pieces)
+
+
+def redact(text: str, limit: Optional[int] = None) -> str:
+    """
+    text with personal identifiers replaced by placeholders ([phone], [upi], [email],
+    [number], [pan], [otp], [key]) and link query strings dropped, cut to limit chars.
+    """
+    if limit is not None:
+        # Cut generously first so a long paste costs bounded regex work.
+        text = text[: limit * 2]
+    if "AIza" in text:
+        text = _KEY.sub("[key]", text)
+    if "://" in text:
+        text = _URL_QUERY.sub(r"\1?[query]", text)
+    if "@" in text:
+        text = _UPI.sub("[upi]", _EMAIL.sub("[email]", text))
+    text = _redact_numbers(text)
+    return text if limit is None else text[:limit]
+
+
+def load_key(directory: str, secret: Optional[str] = config.AUDIT_KEY) -> bytes:
+    """32-byte hashing key: derived from secret, else read from (or created at) <directory>/.key."""
+    if secret:
+        return hashlib.blake2b(secret.encode("utf-8"), digest_size=32).digest()
+    path = os.path.join(directory, KEY_FILE)
+    try:
+        with open(path, "rb") as fh:
+            return fh.read()
+    except FileNotFoundError:
+        pass
+    os.makedirs(directory, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "wb") as fh:
+        fh.write(secrets.token_bytes(32))
+    try:
+        # link() fails if another process won the race; everyone then reads its key.
+        os.link(tmp, path)
+    except FileExistsError:
+        pass
+    finally:
+        os.remove(tmp)
+    with open(path, "rb") as fh:
+        return fh.read()
+
+
+def keyed_hash(value: str, key: bytes) -> str:
+    return hashlib.blake2b(value.encode("utf-8", "replace"), key=key, digest_size=16).hexdigest()
+
+
+def text_hash(text: str, key: bytes) -> str:
+    """Keyed hash of a message, insensitive to whitespace differences."""
+    return keyed_hash(" ".join(text.split()), key)
+
+
+# ---------------------------
+# Records
+# ---------------------------
+class _Entry(NamedTuple):
+    ts: float
+    text: str
+    verdict: Dict[str, Any]
+    language: Optional[str]
+    latency_ms: Optional[float]
+    model: Optional[str]
+    prompt_version: Optional[str]
+    context: Dict[str, Any]
+
+
+def audit_record(
+    entry: _Entry,
+    key: bytes,
+    text_chars: int = config.AUDIT_TEXT_CHARS,
+    raw_chars: int = config.AUDIT_RAW_CHARS,
+) -> Dict[str, Any]:
+    """The redacted record for one analysis; runs on the writer thread."""
+    from bharat_suraksha.bulk import verdict_source
+    from bharat_suraksha.languages import DEFAULT_CODE, pick_explanation
+
+    verdict = entry.verdict
+    record: Dict[str, Any] = {"ts": round(entry.ts, 3)}
+    for name, value in entry.context.items():
+        if value is not None:
+            record[name] = keyed_hash(str(value), key) if name in HASHED_CONTEXT else str(value)[:64]
+    record.update(
+        {
+            "source": verdict_source(verdict),
+            "is_scam": verdict.get("is_scam"),
+            "score": verdict.get("score"),
+            "tactics": [redact(str(t), 120) for t in verdict.get("tactics") or []],
+            "matched_patterns": [redact(str(p), 120) for p in verdict.get("matched_patterns") or []],
+            "language": entry.language,
+            "model": entry.model,
+            "prompt_version": entry.prompt_version,
+        }
+    )
+    if entry.latency_ms is not None:
+        record["latency_ms"] = round(entry.latency_ms, 1)
+    for name in ("error", "degraded"):
+        if verdict.get(name):
+            record[name] = verdict[name]
+    cascade = verdict.get("cascade")
+    if cascade:
+        record["tier0"] = cascade.get("decision")
+    tokens = verdict.get("tokens")
+    if tokens:
+        record["prompt_tokens"] = tokens.get("prompt")
+    reputation = verdict.get("reputation")
+    if reputation:
+        record["reputation"] = [
+            {"kind": hit["kind"], "feed": hit.get("source"), "hash": keyed_hash(f"{hit['kind']}:{hit['value']}", key)}
+            for hit in reputation.get("hits", [])
+        ]
+    record["text_hash"] = text_hash(entry.text, key)
+    record["chars"] = len(entry.text)
+    record["text"] = redact(entry.text, text_chars)
+    explanations = verdict.get("explanations")
+    if isinstance(explanations, dict):
+        _, explanation = pick_explanation(explanations, DEFAULT_CODE)
+        if explanation:
+            record["explanation"] = redact(explanation, text_chars)
+    raw = verdict.get("raw")
+    if raw:
+        record["raw"] = redact(str(raw), raw_chars)
+    return record
+
+
+def _day(ts: float) -> str:
+    return time.strftime("%Y-%m-%d", time.gmtime(ts))
+
+
+def _atomic_json(path: str, obj: Any) -> None:
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(obj, fh, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+# ---------------------------
+# Segments
+# ---------------------------
+class _Block:
+    __slots__ = ("compressor", "records", "first_ts", "last_ts", "verdicts", "sources")
+
+    def __init__(self, first_ts: float):
+        self.compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31: gzip member
+        self.records = 0
+        self.first_ts = first_ts
+        self.last_ts = first_ts
+        self.verdicts: Counter = Counter()
+        self.sources: Counter = Counter()
+
+
+class _Segment:
+    """One open segment file and the index of its closed blocks; used by the writer thread only."""
+
+    def __init__(self, directory: str, started: float):
+        self.day = _day(started)
+        folder = os.path.join(directory, self.day)
+        os.makedirs(folder, exist_ok=True)
+        name = f"{time.strftime('%H%M%S', time.gmtime(started))}-{os.getpid()}-{next(_SEQUENCE)}"
+        self.path = os.path.join(folder, name + SEGMENT_SUFFIX)
+        self.index_path = os.path.join(folder, name + INDEX_SUFFIX)
+        self.fh = open(self.path, "xb")
+        self.started = started
+        self.offset = 0  # end of the last closed block
+        self.size = 0  # bytes in the file
+        self.bytes_in = 0  # uncompressed JSON
+        self.blocks: List[Dict[str, Any]] = []
+        self.block: Optional[_Block] = None
+
+    def write(self, rows: Sequence[Tuple[Dict[str, Any], bytes]]) -> int:
+        # Writers on several threads stamp records just before queueing them, so times
+        # within a batch are only nearly in order.
+        first_ts = min(record["ts"] for record, _ in rows)
+        if self.block is None:
+            self.block = _Block(first_ts)
+        block = self.block
+        data = b"".join(line for _, line in rows)
+        for record, _ in rows:
+            block.verdicts[str(record["is_scam"])] += 1
+            block.sources[record["source"]] += 1
+        block.records += len(rows)
+        block.first_ts = min(block.first_ts, first_ts)
+        block.last_ts = max(block.last_ts, max(record["ts"] for record, _ in rows))
+        # Sync flush: everything written so far decompresses, without ending the member.
+        out = block.compressor.compress(data) + block.compressor.flush(zlib.Z_SYNC_FLUSH)
+        self.fh.write(out)
+        self.fh.flush()
+        self.size += len(out)
+        self.bytes_in += len(data)
+        return len(out)
+
+    def close_block(self) -> int:
+        block = self.block
+        if block is None:
+            return 0
+        out = block.compressor.flush()
+        self.fh.write(out)
+        self.fh.flush()
+        self.size += len(out)
+        self.blocks.append(
+            {
+                "offset": self.offset,
+                "length": self.size - self.offset,
+                "records": block.records,
+                "first_ts": block.first_ts,
+                "last_ts": block.last_ts,
+                "verdicts": dict(block.verdicts),
+                "sources": dict(block.sources),
+            }
+        )
+        self.offset = self.size
+        self.block = None
+        self.write_index(closed=False)
+        return len(out)
+
+    def close(self) -> int:
+        written = self.close_block()
+        os.fsync(self.fh.fileno())
+        self.fh.close()
+        self.write_index(closed=True)
+        return written
+
+    def abandon(self) -> None:
+        try:
+            self.fh.close()
+        except OSError:
+            pass
+
+    def write_index(self, closed: bool) -> None:
+        verdicts: Counter = Counter()
+        sources: Counter = Counter()
+        for block in self.blocks:
+            verdicts.update(block["verdicts"])
+            sources.update(block["sources"])
+        _atomic_json(
+            self.index_path,
+            {
+                "version": INDEX_VERSION,
+                "segment": os.path.basename(self.path),
+                "started": self.started,
+                "closed": closed,
+                "records": sum(block["records"] for block in self.blocks),
+                "first_ts": self.blocks[0]["first_ts"] if self.blocks else None,
+                "last_ts": max((block["last_ts"] for block in self.blocks), default=None),
+                "bytes": self.size,
+                "verdicts": dict(verdicts),
+                "sources": dict(sources),
+                "blocks": self.blocks,
+            },
+        )
+
+
+# ---------------------------
+# Writer
+# ---------------------------
+class AuditLog:
+    """
+    Thread-safe; append() never blocks. One instance per process and directory (the
+    Scanner's); several processes may share a directory, each writing its own segments.
+    """
+
+    def __init__(
+        self,
+        directory: str = config.AUDIT_DIR,
+        key: Optional[bytes] = None,
+        queue_size: int = config.AUDIT_QUEUE_SIZE,
+        segment_bytes: int = config.AUDIT_SEGMENT_BYTES,
+        segment_seconds: float = config.AUDIT_SEGMENT_SECONDS,
+        block_records: int = config.AUDIT_BLOCK_RECORDS,
+        block_seconds: float = config.AUDIT_BLOCK_SECONDS,
+        text_chars: int = config.AUDIT_TEXT_CHARS,
+        raw_chars: int = config.AUDIT_RAW_CHARS,
+    ):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.key = key if key is not None else load_key(directory)
+        self.segment_bytes = segment_bytes
+        self.segment_seconds = segment_seconds
+        self.block_records = max(1, block_records)
+        self.block_seconds = block_seconds
+        self.text_chars = text_chars
+        self.raw_chars = raw_chars
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max(1, queue_size))
+        self._lock = threading.Lock()
+        self._counts: Counter = Counter()
+        self._segment: Optional[_Segment] = None
+        self._closed = False
+        self._last_error: Optional[str] = None
+        self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._thread.start()
+        # Records still queued at interpreter exit are written, not lost with the daemon thread.
+        atexit.register(self.close)
+
+    def append(
+        self,
+        text: str,
+        verdict: Dict[str, Any],
+        language: Optional[str] = None,
+        latency_ms: Optional[float] = None,
+        model: Optional[str] = None,
+        prompt_version: Optional[str] = None,
+        **context: Any,
+    ) -> bool:
+        """Queue one analysis; False if it was dropped (queue full or log closed)."""
+        if self._closed:
+            return False
+        snapshot = dict(verdict)
+        if isinstance(snapshot.get("explanations"), dict):
+            # Translations may still be added to the caller's verdict while the writer reads it.
+            snapshot["explanations"] = dict(snapshot["explanations"])
+        entry = _Entry(time.time(), text, snapshot, language, latency_ms, model, prompt_version, context)
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            with self._lock:
+                self._counts["dropped"] += 1
+            METRICS.inc("audit_records", outcome="dropped")
+            return False
+        with self._lock:
+            self._counts["accepted"] += 1
+        return True
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Wait until everything appended so far is on disk (block still open); False on timeout."""
+        with self._lock:
+            target = self._counts["accepted"]
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline and self._thread.is_alive():
+            with self._lock:
+                if self._counts["written"] + self._counts["failed"] >= target:
+                    return True
+            time.sleep(0.005)
+        return False
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Write what is queued, close the segment and its index, stop the writer. Idempotent."""
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            return
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        stop = False
+        while not stop:
+            batch: List[_Entry] = []
+            try:
+                item = self._queue.get(timeout=1.0)
+                while True:
+                    if item is _STOP:
+                        stop = True
+                        break
+                    batch.append(item)
+                    if len(batch) >= _BATCH_RECORDS:
+                        break
+                    item = self._queue.get_nowait()
+            except queue.Empty:
+                pass
+            with self._lock:
+                written_before = self._counts["written"]
+            try:
+                if batch:
+                    self._write(batch)
+                self._roll(time.time(), stop)
+            except Exception as exc:
+                # A full or read-only disk must not take the writer (or any scan) down.
+                with self._lock:
+                    unwritten = len(batch) - (self._counts["written"] - written_before)
+                self._fail(unwritten, exc)
+
+    def _write(self, batch: List[_Entry]) -> None:
+        with METRICS.timer("audit_write"):
+            rows = []
+            for entry in batch:
+                record = audit_record(entry, self.key, self.text_chars, self.raw_chars)
+                line = json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+                rows.append((record, line))
+            # Consecutive records of one UTC day go to that day's segment.
+            for day, group in itertools.groupby(rows, key=lambda row: _day(row[0]["ts"])):
+                group = list(group)
+                if self._segment is not None and self._segment.day != day:
+                    self._close_segment()
+                if self._segment is None:
+                    self._segment = _Segment(self.directory, group[0][0]["ts"])
+                written = self._segment.write(group)
+                with self._lock:
+                    self._counts["written"] += len(group)
+                    self._counts["bytes_in"] += sum(len(line) for _, line in group)
+                    self._counts["bytes_out"] += written
+        METRICS.inc("audit_records", len(batch), outcome="written")
+
+    def _roll(self, now: float, stop: bool) -> None:
+        segment = self._segment
+        if segment is None:
+            return
+        if (
+            stop
+            or _day(now) != segment.day
+            or segment.bytes_in >= self.segment_bytes
+            or now - segment.started >= self.segment_seconds
+        ):
+            self._close_segment()
+        elif segment.block is not None and (
+            segment.block.records >= self.block_records or now - segment.block.first_ts >= self.block_seconds
+        ):
+            written = segment.close_block()
+            with self._lock:
+                self._counts["blocks"] += 1
+                self._counts["bytes_out"] += written
+
+    def _close_segment(self) -> None:
+        segment, self._segment = self._segment, None
+        had_block = segment.block is not None
+        written = segment.close()
+        with self._lock:
+            self._counts["segments"] += 1
+            self._counts["blocks"] += int(had_block)
+            self._counts["bytes_out"] += written
+
+    def _fail(self, records: int, exc: Exception) -> None:
+        if self._segment is not None:
+            # Start a fresh segment next time; the broken one keeps what its index covers.
+            self._segment.abandon()
+            self._segment = None
+        with self._lock:
+            self._counts["failed"] += records
+            self._counts["errors"] += 1
+            self._last_error = f"{type(exc).__name__}: {exc}"
+        METRICS.inc("audit_records", records, outcome="failed")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self._counts)
+            last_error = self._last_error
+        bytes_in, bytes_out = counts.get("bytes_in", 0), counts.get("bytes_out", 0)
+        return {
+            "directory": self.directory,
+            "queued": self._queue.qsize(),
+            "accepted": counts.get("accepted", 0),
+            "written": counts.get("written", 0),
+            "dropped": counts.get("dropped", 0),
+            "failed": counts.get("failed", 0),
+            "segments_closed": counts.get("segments", 0),
+            "blocks_closed": counts.get("blocks", 0),
+            "bytes_in": bytes_in,
+            "bytes_out": bytes_out,
+            "compression_ratio": bytes_in / bytes_out if bytes_out else None,
+            "last_error": last_error,
+        }
+
+
+# ---------------------------
+# Reading
+# ---------------------------
+def read_index(segment_path: str) -> Dict[str, Any]:
+    """A segment's index; an empty one (everything unindexed) if missing or unreadable."""
+    try:
+        with open(segment_path[: -len(SEGMENT_SUFFIX)] + INDEX_SUFFIX, encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return {"blocks": [], "closed": False, "records": 0, "verdicts": {}, "sources": {}}
+
+
+def iter_segments(directory: str, since: Optional[float] = None, until: Optional[float] = None) -> Iterator[str]:
+    """Segment paths in day and start-time order, limited to the UTC days [since, until) touches."""
+    try:
+        days = sorted(name for name in os.listdir(directory) if _DAY.match(name))
+    except FileNotFoundError:
+        return
+    if since is not None:
+        days = [day for day in days if day >= _day(since)]
+    if until is not None:
+        days = [day for day in days if day <= _day(until - 0.001)]
+    for day in days:
+        folder = os.path.join(directory, day)
+        for name in sorted(os.listdir(folder)):
+            if name.endswith(SEGMENT_SUFFIX):
+                yield os.path.join(folder, name)
+
+
+def _inflate(data: bytes) -> bytes:
+    """Concatenated gzip members; a truncated last member yields what it holds."""
+    out = []
+    while data:
+        decompressor = zlib.decompressobj(31)
+        try:
+            out.append(decompressor.decompress(data))
+        except zlib.error:
+            break
+        if not decompressor.eof:
+            break
+        data = decompressor.unused_data
+    return b"".join(out)
+
+
+def _block_matches(block: Dict[str, Any], since, until, is_scam, source) -> bool:
+    if since is not None and block["last_ts"] < since:
+        return False
+    if until is not None and block["first_ts"] >= until:
+        return False
+    if is_scam is not None and not block["verdicts"].get(is_scam):
+        return False
+    if source is not None and not block["sources"].get(source):
+        return False
+    return True
+
+
+def query(
+    directory: str = config.AUDIT_DIR,
+    since: Optional[float] = None,
+    until: Optional[float] = None,
+    is_scam: Optional[str] = None,
+    source: Optional[str] = None,
+    text: Optional[str] = None,
+    session: Optional[str] = None,
+    key: Optional[bytes] = None,
+    limit: Optional[int] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Records with since <= ts < until (epoch seconds), in write order per segment, optionally
+    only those with a verdict, a verdict source, an exact message text or an app session.
+    Blocks whose index rules them out are never read or decompressed.
+    """
+    if (text is not None or session is not None) and key is None:
+        key = load_key(directory)
+    wanted_text = text_hash(text, key) if text is not None else None
+    wanted_session = keyed_hash(session, key) if session is not None else None
+    # Records are written with compact separators, so a matching line contains these
+    # bytes verbatim; lines without them are skipped before JSON decoding.
+    needles = [
+        json.dumps({name: value}, ensure_ascii=False, separators=(",", ":"))[1:-1].encode("utf-8")
+        for name, value in (("is_scam", is_scam), ("source", source), ("text_hash", wanted_text), ("session", wanted_session))
+        if value is not None
+    ]
+    found = 0
+    for path in iter_segments(directory, since, until):
+        index = read_index(path)
+        spans = [
+            (block["offset"], block["length"])
+            for block in index["blocks"]
+            if _block_matches(block, since, until, is_scam, source)
+        ]
+        if not index["closed"]:
+            # Records after the last closed block: the open block or a crashed writer's tail.
+            tail = index["blocks"][-1]["offset"] + index["blocks"][-1]["length"] if index["blocks"] else 0
+            spans.append((tail, None))
+        with open(path, "rb") as fh:
+            for offset, length in spans:
+                fh.seek(offset)
+                data = _inflate(fh.read() if length is None else fh.read(length))
+                # A line without its newline is a torn write; skip it.
+                for line in data.split(b"\n")[:-1]:
+                    if needles and not all(needle in line for needle in needles):
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    ts = record.get("ts", 0)
+                    if (since is not None and ts < since) or (until is not None and ts >= until):
+                        continue
+                    if is_scam is not None and record.get("is_scam") != is_scam:
+                        continue
+                    if source is not None and record.get("source") != source:
+                        continue
+                    if wanted_text is not None and record.get("text_hash") != wanted_text:
+                        continue
+                    if wanted_session is not None and record.get("session") != wanted_session:
+                        continue
+                    yield record
+                    found += 1
+                    if limit is not None and found >= limit:
+                        return
+
+
+def summarize(directory: str = config.AUDIT_DIR, since: Optional[float] = None, until: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Counts from the indexes alone, nothing decompressed: records per verdict and source in
+    closed blocks overlapping [since, until), plus the bytes not indexed yet (open blocks).
+    """
+    verdicts: Counter = Counter()
+    sources: Counter = Counter()
+    segments = records = size = unindexed = 0
+    first_ts = last_ts = None
+    for path in iter_segments(directory, since, until):
+        index = read_index(path)
+        segments += 1
+        try:
+            file_size = os.path.getsize(path)
+        except OSError:
+            continue
+        size += file_size
+        indexed = 0
+        for block in index["blocks"]:
+            indexed = block["offset"] + block["length"]
+            if not _block_matches(block, since, until, None, None):
+                continue
+            records += block["records"]
+            verdicts.update(block["verdicts"])
+            sources.update(block["sources"])
+            first_ts = block["first_ts"] if first_ts is None else min(first_ts, block["first_ts"])
+            last_ts = block["last_ts"] if last_ts is None else max(last_ts, block["last_ts"])
+        unindexed += max(0, file_size - indexed)
+    return {
+        "segments": segments,
+        "records": records,
+        "verdicts": dict(verdicts),
+        "sources": dict(sources),
+        "first_ts": first_ts,
+        "last_ts": last_ts,
+        "bytes": size,
+        "unindexed_bytes": unindexed,
+    }
+
+
+# ---------------------------
+# CLI
+# ---------------------------
+def _epoch(value: str) -> float:
+    """ISO date or datetime to epoch seconds; naive values are UTC."""
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def _range(args: argparse.Namespace) -> Tuple[Optional[float], Optional[float]]:
+    if args.day:
+        start = calendar.timegm(time.strptime(args.day, "%Y-%m-%d"))
+        return float(start), float(start + 86400)
+    return (_epoch(args.since) if args.since else None), (_epoch(args.until) if args.until else None)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m bharat_suraksha.audit", description="Audit log of every analysis")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    stats_cmd = commands.add_parser("stats", help="verdict and source counts from the segment indexes")
+    query_cmd = commands.add_parser("query", help="matching records as JSONL")
+    for command in (stats_cmd, query_cmd):
+        command.add_argument("--dir", default=config.AUDIT_DIR)
+        command.add_argument("--day", help="UTC day, YYYY-MM-DD")
+        command.add_argument("--since", help="ISO date/time (UTC unless it has an offset)")
+        command.add_argument("--until", help="ISO date/time, exclusive")
+    query_cmd.add_argument("--verdict", help="is_scam value: yes, no, suspect, unknown")
+    query_cmd.add_argument("--source", help="reputation, cache, template, tier0 or model")
+    query_cmd.add_argument("--text", help="exact message text (matched by keyed hash)")
+    query_cmd.add_argument("--session", help="app session id (matched by keyed hash)")
+    query_cmd.add_argument("--limit", type=int)
+
+    args = parser.parse_args(argv)
+    since, until = _range(args)
+    if args.command == "stats":
+        started = time.perf_counter()
+        report = summarize(args.dir, since, until)
+        report["seconds"] = round(time.perf_counter() - started, 4)
+        json.dump(report, sys.stdout, indent=2, ensure_ascii=False)
+        sys.stdout.write("\n")
+        return 0
+    for record in query(args.dir, since, until, args.verdict, args.source, args.text, args.session, limit=args.limit):
+        sys.stdout.write(json.dumps(record, ensure_ascii=False) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,236 @@
+"""
+Micro-batching of model calls for high-volume callers (bulk runs, API clients).
+
+Short SMS cost far fewer tokens than the instruction header that wraps them, so sending
+them one per call mostly pays for the header again and again. MicroBatcher collects
+messages until it has max_items of them or max_wait_ms has passed since the first one,
+sends them as one indexed prompt, and demultiplexes the JSON array back to one verdict
+per message. Any message whose item is missing or invalid in the reply is retried on its
+own with the normal single-message prompt, so one bad item never fails its neighbours. A
+batch call that fails outright (quota, auth, open circuit) is not repeated per message:
+every message in it gets the failed verdict, as a failed single call would.
+
+Messages too long to share a prompt (after compaction) skip the queue and go alone.
+The batcher runs its own event loop thread; sync callers (bulk worker threads) use
+analyze_sync, coroutines on any other loop await analyze.
+"""
+import asyncio
+import threading
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from bharat_suraksha.compaction import Compaction, compact_message
+from bharat_suraksha.parsing import BATCH_RESPONSE_SCHEMA, parse_batch_response
+from bharat_suraksha.prompt import DEFAULT_MESSAGE_BUDGET, build_batch_prompt, build_prompt
+from bharat_suraksha.ratelimit import TokenBucket
+from bharat_suraksha.resilience import AsyncModelCaller, ModelCallError, call_model_and_parse_async, error_verdict
+
+Verdict = Dict[str, Any]
+_Item = Tuple[str, Compaction, "asyncio.Future"]
+
+
+class MicroBatcher:
+    """
+    One batcher per (client, language). `limiter` and `admit` (a shared-quota admission,
+    see scheduler.py), when given, are charged once per model call (a whole batch or one
+    individual retry), which is what provider quotas count.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        caller: Optional[AsyncModelCaller] = None,
+        max_items: int = 8,
+        max_wait_ms: float = 50.0,
+        language: str = "English",
+        budget_tokens: int = DEFAULT_MESSAGE_BUDGET,
+        max_item_tokens: int = 400,
+        limiter: Optional[TokenBucket] = None,
+        admit: Optional[Callable[[int], None]] = None,
+        output_tokens_per_item: int = 400,
+    ):
+        self.client = client
+        # Batch calls are slower than single ones; keep them out of the interactive
+        # caller's latency window so they do not skew its hedging threshold.
+        self.caller = caller or AsyncModelCaller()
+        self.max_items = max(1, max_items)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.language = language
+        self.budget_tokens = budget_tokens
+        self.max_item_tokens = max_item_tokens
+        self.limiter = limiter
+        self.admit = admit
+        self.output_tokens_per_item = output_tokens_per_item
+        self._counts: Counter = Counter()
+        self._counts_lock = threading.Lock()
+        self._tasks: Set["asyncio.Task"] = set()
+        self._loop = asyncio.new_event_loop()
+        self._queue: "asyncio.Queue[_Item]" = asyncio.Queue()
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run_loop, name="micro-batcher", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+    def _run_loop(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        self._tasks.add(self._loop.create_task(self._collect()))
+        self._loop.call_soon(self._ready.set)
+        self._loop.run_forever()
+
+    def _count(self, name: str, n: int = 1) -> None:
+        with self._counts_lock:
+            self._counts[name] += n
+
+    # ---------------------------
+    # Public API
+    # ---------------------------
+    async def analyze(self, text: str) -> Verdict:
+        """Verdict for one message; batched with whatever else arrives within the window."""
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(self._submit(text), self._loop))
+
+    def analyze_sync(self, text: str) -> Verdict:
+        return asyncio.run_coroutine_threadsafe(self._submit(text), self._loop).result()
+
+    def close(self) -> None:
+        """Stop the loop thread. Callers still waiting on a queued message get CancelledError."""
+        if not self._loop.is_running():
+            return
+        asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop)
+        self._thread.join(timeout=5)
+        if not self._loop.is_running():
+            self._loop.close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._counts_lock:
+            counts = dict(self._counts)
+        batches, messages = counts.get("batches", 0), counts.get("messages", 0)
+        model_calls = batches + counts.get("singles", 0) + counts.get("retried", 0)
+        return {
+            "messages": messages,
+            "batches": batches,
+            "batched_messages": counts.get("batched_messages", 0),
+            "mean_batch_size": counts.get("batched_messages", 0) / batches if batches else 0.0,
+            "singles": counts.get("singles", 0),  # oversized, or alone in their window
+            "retried": counts.get("retried", 0),  # items the batch reply did not answer
+            "failed_batches": counts.get("failed_batches", 0),
+            "model_calls": model_calls,
+            "prompt_tokens": counts.get("prompt_tokens", 0),
+            "prompt_tokens_per_message": counts.get("prompt_tokens", 0) / messages if messages else 0.0,
+        }
+
+    # ---------------------------
+    # Loop side
+    # ---------------------------
+    async def _submit(self, text: str) -> Verdict:
+        self._count("messages")
+        compaction = compact_message(text, self.budget_tokens)
+        if compaction.tokens_after > self.max_item_tokens or self.max_items == 1:
+            self._count("singles")
+            return await self._single(text)
+        future = self._loop.create_future()
+        await self._queue.put((text, compaction, future))
+        return await future
+
+    async def _collect(self) -> None:
+        while True:
+            batch: List[_Item] = [await self._queue.get()]
+            window_ends = self._loop.time() + self.max_wait
+            while len(batch) < self.max_items:
+                remaining = window_ends - self._loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            task = self._loop.create_task(self._flush(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _shutdown(self) -> None:
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        while not self._queue.empty():
+            self._queue.get_nowait()[2].cancel()
+        self._loop.stop()
+
+    async def _acquire(self, prompt_tokens: int, items: int) -> None:
+        if self.limiter is not None:
+            await self._loop.run_in_executor(None, self.limiter.acquire)
+        if self.admit is not None:
+            await self._loop.run_in_executor(None, self.admit, prompt_tokens + self.output_tokens_per_item * items)
+
+    async def _single(self, text: str) -> Verdict:
+        built = build_prompt(text, self.language, self.budget_tokens)
+        self._count("prompt_tokens", built.prompt_tokens)
+        await self._acquire(built.prompt_tokens, 1)
+        parsed = await call_model_and_parse_async(self.caller, self.client, built.prompt)
+        parsed["tokens"] = {
+            "message_before": built.compaction.tokens_before,
+            "message_after": built.compaction.tokens_after,
+            "prompt": built.prompt_tokens,
+        }
+        return parsed
+
+    async def _flush(self, batch: List[_Item]) -> None:
+        if len(batch) == 1:
+            text, _, future = batch[0]
+            self._count("singles")
+            await self._settle(future, self._single(text))
+            return
+
+        texts = [text for text, _, _ in batch]
+        # Each message keeps the budget it would have had on its own.
+        built = build_batch_prompt(texts, self.language, self.budget_tokens * len(texts))
+        self._count("batches")
+        self._count("batched_messages", len(texts))
+        self._count("prompt_tokens", built.prompt_tokens)
+        started = time.monotonic()
+        try:
+            await self._acquire(built.prompt_tokens, len(texts))
+            reply = await self.caller.generate(self.client, built.prompt, response_schema=BATCH_RESPONSE_SCHEMA)
+            results = parse_batch_response(reply, len(texts))
+        except ModelCallError as exc:
+            # The whole call failed; single calls now would mostly fail the same way.
+            self._count("failed_batches")
+            results = {i: error_verdict(exc) for i in range(len(texts))}
+        except Exception as exc:
+            # Anything else would end this task with every caller still waiting.
+            self._count("failed_batches")
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        latency_ms = (time.monotonic() - started) * 1000
+
+        retries = []
+        for i, (text, compaction, future) in enumerate(batch):
+            parsed = results.get(i)
+            if parsed is None:
+                self._count("retried")
+                retries.append(self._settle(future, self._single(text)))
+                continue
+            parsed["tokens"] = {
+                "message_before": compaction.tokens_before,
+                "message_after": compaction.tokens_after,
+                "prompt": built.prompt_tokens // len(texts),  # this message's share
+            }
+            parsed["batch"] = {"size": len(texts), "latency_ms": latency_ms}
+            if not future.done():
+                future.set_result(parsed)
+        if retries:
+            await asyncio.gather(*retries)
+
+    @staticmethod
+    async def _settle(future: "asyncio.Future", work) -> None:
+        try:
+            result = await work
+        except Exception as exc:
+            if not future.done():
+                future.set_exception(exc)
+            return
+        if not future.done():
+            future.set_result(result)
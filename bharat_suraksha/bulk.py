@@ -0,0 +1,276 @@
+"""
+Bulk analysis of exported SMS dumps (CSV or JSONL).
+
+Rows are parsed lazily and fed to a bounded worker pool, so memory stays flat whatever
+the file size. Each worker first tries the cheap on-box lookups (verdict cache, template
+index, tier-0 classifier); only rows that still need the model take a token from the
+rate limiter, so cache hits never queue behind quota. Verdicts are appended to a JSONL
+file as they complete. That file doubles as the checkpoint: a rerun over the same input
+skips every row already written, so a crashed run never re-bills finished rows. Empty
+or unparseable rows are written as {"row": i, "skipped": "empty"} records, so they count
+as finished too. Failed rows go to a separate errors file and are retried on the next run.
+"""
+import csv
+import hashlib
+import io
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, Optional, Set, Tuple
+
+import numpy as np
+
+from bharat_suraksha.qubit import collapse_batch
+from bharat_suraksha.ratelimit import TokenBucket
+
+TEXT_FIELDS = ("text", "message", "sms", "body", "content", "msg")
+
+Row = Tuple[int, Optional[str]]
+
+
+# ---------------------------
+# Streaming input
+# ---------------------------
+def _detect_text_field(fields: Iterable[str]) -> Optional[str]:
+    by_lower = {f.strip().lower(): f for f in fields if f}
+    for candidate in TEXT_FIELDS:
+        if candidate in by_lower:
+            return by_lower[candidate]
+    return None
+
+
+def iter_rows(fileobj: BinaryIO, filename: str, text_field: Optional[str] = None) -> Iterator[Row]:
+    """
+    Yield (row_index, text) pairs from a CSV or JSONL byte stream without reading it all.
+    Rows that cannot be parsed or have no text yield None so they are reported, not dropped.
+    """
+    wrapper = io.TextIOWrapper(fileobj, encoding="utf-8-sig", errors="replace", newline="")
+    try:
+        if filename.lower().endswith(".csv"):
+            reader = csv.DictReader(wrapper)
+            column = text_field or _detect_text_field(reader.fieldnames or [])
+            if column is None:
+                raise ValueError(f"No text column found; expected one of {', '.join(TEXT_FIELDS)}")
+            for index, record in enumerate(reader):
+                yield index, record.get(column) or None
+        else:
+            index = 0
+            for line in wrapper:
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    yield index, None
+                else:
+                    if isinstance(record, str):
+                        yield index, record or None
+                    else:
+                        column = text_field or _detect_text_field(record.keys())
+                        value = record.get(column) if column else None
+                        yield index, value if isinstance(value, str) and value else None
+                index += 1
+    finally:
+        # Hand the underlying stream back to the caller instead of closing it.
+        wrapper.detach()
+
+
+def count_rows(fileobj: BinaryIO, filename: str, text_field: Optional[str] = None) -> int:
+    """Count rows with one streaming pass, then rewind."""
+    count = sum(1 for _ in iter_rows(fileobj, filename, text_field))
+    fileobj.seek(0)
+    return count
+
+
+def fingerprint(fileobj: BinaryIO, *parts: str, chunk_size: int = 1 << 20) -> str:
+    """Stable run id for an input file plus settings (text field, prompt version...)."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    for chunk in iter(lambda: fileobj.read(chunk_size), b""):
+        digest.update(chunk)
+    fileobj.seek(0)
+    return digest.hexdigest()[:16]
+
+
+def verdict_source(verdict: Dict[str, Any]) -> str:
+    if verdict.get("reputation"):
+        return "reputation"
+    if verdict.get("cache_hit"):
+        return "cache"
+    if verdict.get("near_duplicate"):
+        return "template"
+    cascade = verdict.get("cascade")
+    if cascade and cascade.get("decision") != "escalate":
+        return "tier0"
+    return "model"
+
+
+# ---------------------------
+# Runner
+# ---------------------------
+@dataclass
+class BulkProgress:
+    total: Optional[int] = None
+    done: int = 0  # rows written by this run
+    resumed: int = 0  # rows skipped because an earlier run finished them
+    local: int = 0  # rows answered without a model call
+    model_calls: int = 0
+    failed: int = 0
+    skipped: int = 0  # empty or unparseable rows, written as skipped records
+    started: float = field(default_factory=time.monotonic)
+    finished: bool = False
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    @property
+    def rows_per_second(self) -> float:
+        elapsed = self.elapsed
+        return (self.done + self.failed) / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def eta_seconds(self) -> Optional[float]:
+        if self.total is None or not self.rows_per_second:
+            return None
+        remaining = self.total - self.done - self.failed - self.resumed - self.skipped
+        return max(0.0, remaining / self.rows_per_second)
+
+
+class BulkRunner:
+    """
+    lookup(text) -> verdict or None   : cheap on-box stages, never rate limited
+    call_model(text) -> verdict       : model call; a verdict with an 'error' key counts as failed
+    """
+
+    def __init__(
+        self,
+        lookup: Callable[[str], Optional[Dict[str, Any]]],
+        call_model: Callable[[str], Dict[str, Any]],
+        output_path: str,
+        workers: int = 8,
+        limiter: Optional[TokenBucket] = None,
+        progress_interval: float = 0.5,
+        rng: Optional[np.random.Generator] = None,
+    ):
+        self.lookup = lookup
+        self.call_model = call_model
+        self.output_path = output_path
+        self.errors_path = os.path.splitext(output_path)[0] + ".errors.jsonl"
+        self.workers = max(1, workers)
+        self.limiter = limiter
+        self.progress_interval = progress_interval
+        self.rng = rng
+
+    def completed_rows(self) -> Set[int]:
+        """Row indices already written to the output file by earlier (possibly crashed) runs."""
+        done: Set[int] = set()
+        if not os.path.exists(self.output_path):
+            return done
+        with open(self.output_path, encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    done.add(int(json.loads(line)["row"]))
+                except (ValueError, KeyError, TypeError):
+                    # A torn final line from a crash; that row is simply redone.
+                    continue
+        return done
+
+    def _process(self, index: int, text: str) -> Tuple[int, str, Optional[Dict[str, Any]], bool, Optional[str]]:
+        try:
+            verdict = self.lookup(text)
+            if verdict is not None:
+                return index, text, verdict, False, None
+            if self.limiter is not None:
+                self.limiter.acquire()
+            verdict = self.call_model(text)
+            if verdict.get("error"):
+                return index, text, None, True, str(verdict["error"])
+            return index, text, verdict, True, None
+        except Exception as exc:
+            return index, text, None, False, f"{type(exc).__name__}: {exc}"
+
+    def run(
+        self,
+        rows: Iterable[Row],
+        total: Optional[int] = None,
+        on_progress: Optional[Callable[[BulkProgress], None]] = None,
+    ) -> BulkProgress:
+        directory = os.path.dirname(self.output_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        done_before = self.completed_rows()
+        progress = BulkProgress(total=total)
+        window = self.workers * 4
+        last_report = 0.0
+
+        def report(force: bool = False) -> None:
+            nonlocal last_report
+            now = time.monotonic()
+            if on_progress and (force or now - last_report >= self.progress_interval):
+                last_report = now
+                on_progress(progress)
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bulk") as pool, open(
+            self.output_path, "a", encoding="utf-8"
+        ) as out, open(self.errors_path, "a", encoding="utf-8") as errors:
+
+            def drain(pending: Set[Future], return_when: str) -> Set[Future]:
+                finished, still_pending = wait(pending, return_when=return_when)
+                records = []
+                for future in finished:
+                    index, text, verdict, called_model, error = future.result()
+                    progress.model_calls += int(called_model)
+                    if error is not None:
+                        progress.failed += 1
+                        errors.write(json.dumps({"row": index, "error": error}, ensure_ascii=False) + "\n")
+                        continue
+                    source = verdict_source(verdict)
+                    progress.local += int(source != "model")
+                    progress.done += 1
+                    record = {
+                        "row": index,
+                        "text": text,
+                        "is_scam": verdict.get("is_scam"),
+                        "score": verdict.get("score"),
+                        "tactics": verdict.get("tactics") or [],
+                        "matched_patterns": verdict.get("matched_patterns") or [],
+                        "source": source,
+                    }
+                    records.append(record)
+                if records:
+                    # Qubit collapse for the whole completed batch in one vectorized call.
+                    batch = collapse_batch([r["score"] if r["score"] is not None else 50 for r in records], self.rng)
+                    for record, p_scam, measured in zip(records, batch.probabilities[:, 1], batch.measured):
+                        record["quantum_scam_probability"] = round(float(p_scam), 4)
+                        record["quantum_measured"] = int(measured)
+                        # One line per row, flushed so a crash loses at most the rows in flight.
+                        out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                out.flush()
+                errors.flush()
+                report()
+                return still_pending
+
+            pending: Set[Future] = set()
+            for index, text in rows:
+                if index in done_before:
+                    progress.resumed += 1
+                    continue
+                if not text:
+                    # Nothing to analyse, now or on a rerun; record it so reruns skip it.
+                    out.write(json.dumps({"row": index, "skipped": "empty"}) + "\n")
+                    progress.skipped += 1
+                    continue
+                pending.add(pool.submit(self._process, index, text))
+                if len(pending) >= window:
+                    pending = drain(pending, FIRST_COMPLETED)
+            while pending:
+                pending = drain(pending, FIRST_COMPLETED)
+
+        progress.finished = True
+        report(force=True)
+        return progress
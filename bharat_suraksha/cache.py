@@ -0,0 +1,191 @@
+"""
+Two-tier verdict cache: an in-process LRU in front of an on-disk SQLite store.
+
+Entries are keyed on a hash of the normalized message, the prompt version and the model
+name, so a prompt or model change never serves stale verdicts. Both tiers hold the
+parsed verdict serialized as JSON, which keeps callers from mutating cached state.
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+_WHITESPACE = re.compile(r"\s+")
+
+# How many writes between TTL/size sweeps of the SQLite tier.
+_SWEEP_EVERY = 64
+
+
+def normalize_message(message: str) -> str:
+    """
+    Canonical form used for hashing: NFKC, case-folded, whitespace collapsed.
+    Forwarded copies of the same SMS differ mostly in spacing and case.
+    """
+    text = unicodedata.normalize("NFKC", message or "").casefold()
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def cache_key(message: str, prompt_version: str, model_name: str) -> str:
+    digest = hashlib.sha256()
+    for part in (prompt_version, model_name, normalize_message(message)):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+class VerdictCache:
+    """
+    Thread-safe LRU + SQLite verdict cache with TTL and size-bounded eviction.
+
+    `path=None` keeps the cache memory-only (useful for tests and ephemeral workers).
+    """
+
+    def __init__(
+        self,
+        path: Optional[str],
+        memory_entries: int = 2048,
+        disk_entries: int = 200_000,
+        ttl_seconds: float = 7 * 24 * 3600,
+    ):
+        self.path = path
+        self.memory_entries = max(0, memory_entries)
+        self.disk_entries = max(0, disk_entries)
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, Tuple[float, str, float]]" = OrderedDict()
+        self._writes = 0
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "saved_ms": 0.0}
+        self._db: Optional[sqlite3.Connection] = None
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS verdicts (
+                    key TEXT PRIMARY KEY,
+                    payload TEXT NOT NULL,
+                    latency_ms REAL NOT NULL,
+                    expires_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS verdicts_accessed ON verdicts(accessed_at)")
+
+    # ---------------------------
+    # Lookups
+    # ---------------------------
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires_at, payload, latency_ms = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                    self._stats["saved_ms"] += latency_ms
+                    return json.loads(payload)
+                del self._memory[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT payload, latency_ms, expires_at FROM verdicts WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    payload, latency_ms, expires_at = row
+                    if expires_at > now:
+                        self._db.execute("UPDATE verdicts SET accessed_at = ? WHERE key = ?", (now, key))
+                        self._remember(key, expires_at, payload, latency_ms)
+                        self._stats["disk_hits"] += 1
+                        self._stats["saved_ms"] += latency_ms
+                        return json.loads(payload)
+                    self._db.execute("DELETE FROM verdicts WHERE key = ?", (key,))
+
+            self._stats["misses"] += 1
+            return None
+
+    def put(self, key: str, parsed: Dict[str, Any], latency_ms: float = 0.0) -> None:
+        now = time.time()
+        expires_at = now + self.ttl_seconds
+        payload = json.dumps(parsed, ensure_ascii=False, separators=(",", ":"))
+        with self._lock:
+            self._remember(key, expires_at, payload, latency_ms)
+            if self._db is None:
+                return
+            self._db.execute(
+                "INSERT OR REPLACE INTO verdicts (key, payload, latency_ms, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, payload, float(latency_ms), expires_at, now),
+            )
+            self._writes += 1
+            if self._writes % _SWEEP_EVERY == 0:
+                self._sweep(now)
+
+    def update(self, key: str, parsed: Dict[str, Any]) -> bool:
+        """
+        Replace the verdict stored under key, keeping its expiry and recorded latency (e.g.
+        to add a translated explanation). False when key is not cached or has expired.
+        """
+        now = time.time()
+        payload = json.dumps(parsed, ensure_ascii=False, separators=(",", ":"))
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and entry[0] > now:
+                self._memory[key] = (entry[0], payload, entry[2])
+            if self._db is not None:
+                updated = self._db.execute(
+                    "UPDATE verdicts SET payload = ? WHERE key = ? AND expires_at > ?", (payload, key, now)
+                ).rowcount
+                return bool(updated) or (entry is not None and entry[0] > now)
+            return entry is not None and entry[0] > now
+
+    def _remember(self, key: str, expires_at: float, payload: str, latency_ms: float) -> None:
+        if not self.memory_entries:
+            return
+        self._memory[key] = (expires_at, payload, latency_ms)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _sweep(self, now: float) -> None:
+        self._db.execute("DELETE FROM verdicts WHERE expires_at <= ?", (now,))
+        (count,) = self._db.execute("SELECT COUNT(*) FROM verdicts").fetchone()
+        overflow = count - self.disk_entries
+        if overflow > 0:
+            self._db.execute(
+                "DELETE FROM verdicts WHERE key IN (SELECT key FROM verdicts ORDER BY accessed_at LIMIT ?)",
+                (overflow,),
+            )
+
+    # ---------------------------
+    # Maintenance & reporting
+    # ---------------------------
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM verdicts")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_entries"] = len(self._memory)
+            if self._db is not None:
+                (stats["disk_entries"],) = self._db.execute("SELECT COUNT(*) FROM verdicts").fetchone()
+            else:
+                stats["disk_entries"] = 0
+        hits = stats["memory_hits"] + stats["disk_hits"]
+        lookups = hits + stats["misses"]
+        stats["hits"] = hits
+        stats["hit_rate"] = hits / lookups if lookups else 0.0
+        return stats
@@ -0,0 +1,481 @@
+"""
+WhatsApp chat exports, analyzed as a timeline of overlapping windows.
+
+A whole exported chat pasted as one message either overflows the prompt or buries the
+scam turn under months of small talk. Here the export (.txt, or the .zip WhatsApp
+shares) is read line by line and parsed lazily into messages. Messages are grouped into
+sender turns, and turns into sliding windows sized for one prompt. Windows are scanned
+concurrently through the normal pipeline (reputation, cache, templates, tier-0, model),
+and the verdicts fold into a ChatTimeline that shows where risk spikes.
+
+Memory stays flat whatever the export size:
+  - only the current window's turns are held;
+  - repeated forwards are remembered as 8-byte hashes in a bounded LRU;
+  - at most `concurrency` scans are in flight;
+  - the timeline keeps a fixed number of buckets plus the top few windows.
+
+A forward seen earlier in the chat (same text, at least FORWARD_MIN_CHARS long) is left
+out of later windows and only counted, so a chain message forwarded fifty times costs
+one analysis, not fifty.
+"""
+import asyncio
+import hashlib
+import heapq
+import io
+import re
+import zipfile
+from collections import Counter, OrderedDict, deque
+from datetime import datetime
+from typing import Any, Awaitable, BinaryIO, Callable, Deque, Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+from bharat_suraksha import config
+from bharat_suraksha.compaction import estimate_tokens, is_boilerplate
+
+Verdict = Dict[str, Any]
+
+# Shorter repeats ("ok", "Good morning") are conversation, not forwards.
+FORWARD_MIN_CHARS = 40
+# Distinct long messages remembered for forward detection (~100 bytes each).
+FORWARD_MEMORY = 100_000
+# One message's text is cut here; the rest of a pasted essay adds nothing to a verdict.
+MAX_MESSAGE_CHARS = 4000
+# Longest physical line read at once; a longer one is read in pieces.
+_MAX_LINE_CHARS = 1 << 16
+
+# Android: "12/03/24, 10:15 pm - Name: text"; iOS: "[12/03/24, 10:15:32 AM] Name: text".
+_HEADER = re.compile(
+    r"^\[?(\d{1,2})[/.-](\d{1,2})[/.-](\d{2,4}),?\s+(\d{1,2}):(\d{2})(?::(\d{2}))?"
+    r"[\s\u202f]*([AaPp]\.?\s?[Mm]\.?)?\]?\s*(?:-\s+)?(.*)$"
+)
+# Direction marks iOS puts before timestamps and media notices.
+_MARKS = re.compile("[\u200e\u200f\u202a-\u202e]")
+
+
+class ChatMessage(NamedTuple):
+    index: int  # position among the export's messages, system notices included
+    when: Optional[datetime]
+    sender: str
+    text: str
+
+
+class ChatWindow(NamedTuple):
+    number: int  # 0-based, in chat order
+    first: int  # index of the first and last message covered
+    last: int
+    start: Optional[datetime]
+    end: Optional[datetime]
+    senders: Tuple[str, ...]
+    text: str  # "Sender: message" lines, as sent to the scanner
+
+
+# ---------------------------
+# Parsing
+# ---------------------------
+def _open_text(fileobj: BinaryIO, filename: str) -> Tuple[io.TextIOWrapper, Optional[zipfile.ZipFile]]:
+    """Text stream over the chat; for a .zip, its chat member (media files are ignored)."""
+    archive = None
+    if filename.lower().endswith(".zip") or zipfile.is_zipfile(fileobj):
+        fileobj.seek(0)
+        try:
+            archive = zipfile.ZipFile(fileobj)
+        except zipfile.BadZipFile:
+            # Not a ValueError subclass; callers report ValueErrors to the user.
+            raise ValueError("Not a valid WhatsApp export archive") from None
+        names = [n for n in archive.namelist() if n.lower().endswith(".txt")]
+        if not names:
+            archive.close()
+            raise ValueError("No .txt chat found in the archive")
+        # WhatsApp names it _chat.txt (iOS) or "WhatsApp Chat with X.txt" (Android).
+        names.sort(key=lambda n: (not n.endswith("_chat.txt"), "WhatsApp Chat" not in n, n))
+        try:
+            fileobj = archive.open(names[0])
+        except zipfile.BadZipFile:
+            archive.close()
+            raise ValueError("Not a valid WhatsApp export archive") from None
+    else:
+        fileobj.seek(0)
+    return io.TextIOWrapper(fileobj, encoding="utf-8-sig", errors="replace", newline=None), archive
+
+
+def _timestamp(
+    day: str, month: str, year: str, hour: str, minute: str, second: Optional[str], meridiem: Optional[str], month_first: bool
+) -> Optional[datetime]:
+    d, m, y, h = int(day), int(month), int(year), int(hour)
+    if month_first:
+        d, m = m, d
+    if y < 100:
+        y += 2000
+    if meridiem:
+        h = h % 12 + (12 if meridiem[0] in "pP" else 0)
+    try:
+        return datetime(y, m, d, h, int(minute), int(second or 0))
+    except ValueError:
+        return None
+
+
+def iter_chat_messages(fileobj: BinaryIO, filename: str) -> Iterator[ChatMessage]:
+    """
+    Yield messages from a WhatsApp export without reading it all. Continuation lines join
+    the message above them; system notices, media placeholders and deleted-message stubs
+    take an index but are not yielded.
+    """
+    stream, archive = _open_text(fileobj, filename)
+    index = -1
+    when: Optional[datetime] = None
+    sender: Optional[str] = None
+    parts: List[str] = []
+    chars = 0
+    # Day-first (Indian locale) until a date proves the export is month-first.
+    month_first = False
+
+    def finish() -> Optional[ChatMessage]:
+        if sender is None:
+            return None
+        text = "\n".join(parts).strip()
+        if not text or is_boilerplate(text):
+            return None
+        return ChatMessage(index, when, sender, text)
+
+    try:
+        while True:
+            line = stream.readline(_MAX_LINE_CHARS)
+            if not line:
+                break
+            line = _MARKS.sub("", line.rstrip("\n"))
+            header = _HEADER.match(line)
+            if header is None:
+                if sender is not None and chars < MAX_MESSAGE_CHARS:
+                    parts.append(line[: MAX_MESSAGE_CHARS - chars])
+                    chars += len(line) + 1
+                continue
+            message = finish()
+            if message is not None:
+                yield message
+            index += 1
+            if not month_first and int(header.group(2)) > 12 >= int(header.group(1)):
+                month_first = True
+            when = _timestamp(*header.group(1, 2, 3, 4, 5, 6, 7), month_first)
+            name, sep, text = header.group(8).partition(": ")
+            # No "Name: " means a system notice ("X added Y", the encryption banner).
+            sender = name.strip() if sep else None
+            parts, chars = [text[:MAX_MESSAGE_CHARS]], len(text)
+        message = finish()
+        if message is not None:
+            yield message
+    finally:
+        if archive is not None:
+            stream.close()
+            archive.close()
+        else:
+            # Hand the caller's stream back instead of closing it.
+            stream.detach()
+
+
+def looks_like_chat_export(text: str, lines: int = 40, min_headers: int = 5) -> bool:
+    """True when the first lines of a paste are mostly WhatsApp message headers."""
+    head = text.lstrip()[:8000].splitlines()[:lines]
+    return sum(1 for line in head if _HEADER.match(_MARKS.sub("", line))) >= min(min_headers, max(2, len(head) // 2))
+
+
+# ---------------------------
+# Windows
+# ---------------------------
+class _Turn:
+    __slots__ = ("sender", "lines", "first", "last", "start", "end", "tokens")
+
+    def __init__(self, message: ChatMessage, tokens: int):
+        self.sender = message.sender
+        self.lines = [message.text]
+        self.first = self.last = message.index
+        self.start = self.end = message.when
+        self.tokens = tokens
+
+    def add(self, message: ChatMessage, tokens: int) -> None:
+        self.lines.append(message.text)
+        self.last, self.end = message.index, message.when or self.end
+        self.tokens += tokens
+
+
+def _forward_key(text: str) -> Optional[bytes]:
+    normalized = " ".join(text.casefold().split())
+    if len(normalized) < FORWARD_MIN_CHARS:
+        return None
+    return hashlib.blake2b(normalized.encode("utf-8"), digest_size=8).digest()
+
+
+def iter_turns(messages: Iterable[ChatMessage], max_tokens: int, stats: Optional[Counter] = None) -> Iterator[_Turn]:
+    """
+    Consecutive messages from one sender, capped at max_tokens, with repeated forwards
+    left out (counted in stats["repeated_forwards"]).
+    """
+    stats = stats if stats is not None else Counter()
+    seen: "OrderedDict[bytes, None]" = OrderedDict()
+    turn: Optional[_Turn] = None
+    for message in messages:
+        stats["messages"] += 1
+        key = _forward_key(message.text)
+        if key is not None:
+            if key in seen:
+                seen.move_to_end(key)
+                stats["repeated_forwards"] += 1
+                continue
+            seen[key] = None
+            if len(seen) > FORWARD_MEMORY:
+                seen.popitem(last=False)
+        tokens = estimate_tokens(message.text) + estimate_tokens(message.sender) + 2
+        if turn is not None and turn.sender == message.sender and turn.tokens + tokens <= max_tokens:
+            turn.add(message, tokens)
+            continue
+        if turn is not None:
+            stats["turns"] += 1
+            yield turn
+        turn = _Turn(message, tokens)
+    if turn is not None:
+        stats["turns"] += 1
+        yield turn
+
+
+def _window(number: int, turns: Iterable[_Turn]) -> ChatWindow:
+    turns = list(turns)
+    text = "\n".join(f"{turn.sender}: {line}" for turn in turns for line in turn.lines)
+    return ChatWindow(
+        number,
+        turns[0].first,
+        turns[-1].last,
+        turns[0].start,
+        turns[-1].end,
+        tuple(dict.fromkeys(turn.sender for turn in turns)),
+        text,
+    )
+
+
+def iter_windows(
+    messages: Iterable[ChatMessage],
+    max_turns: int = config.CHAT_WINDOW_TURNS,
+    stride: int = config.CHAT_WINDOW_STRIDE,
+    max_tokens: int = config.CHAT_WINDOW_TOKENS,
+    stats: Optional[Counter] = None,
+) -> Iterator[ChatWindow]:
+    """
+    Sliding windows over sender turns: each holds up to max_turns turns and max_tokens
+    tokens, and the next starts stride turns later (the rest overlap). A window is only
+    emitted if it reaches past the previous one, so the tail never repeats a window.
+    """
+    stats = stats if stats is not None else Counter()
+    max_turns, stride = max(1, max_turns), max(1, min(stride, max_turns))
+    window: Deque[_Turn] = deque()
+    tokens = 0
+    emitted_through = -1
+    number = 0
+    for turn in iter_turns(messages, max_tokens, stats):
+        if window and (len(window) >= max_turns or tokens + turn.tokens > max_tokens):
+            if window[-1].last > emitted_through:
+                yield _window(number, window)
+                number += 1
+                emitted_through = window[-1].last
+            for _ in range(min(stride, len(window))):
+                tokens -= window.popleft().tokens
+            while window and tokens + turn.tokens > max_tokens:
+                tokens -= window.popleft().tokens
+        window.append(turn)
+        tokens += turn.tokens
+    if window and window[-1].last > emitted_through:
+        yield _window(number, window)
+        number += 1
+    stats["windows"] += number
+
+
+# ---------------------------
+# Timeline
+# ---------------------------
+def _iso(when: Optional[datetime]) -> Optional[str]:
+    return when.isoformat(timespec="minutes") if when else None
+
+
+class ChatTimeline:
+    """
+    Window verdicts folded into at most max_points buckets in chat order. When a new
+    window would exceed that, neighbouring buckets merge pairwise (keeping the highest
+    score), so a chat of any length costs the same memory. The top_n riskiest windows
+    are kept whole for display.
+    """
+
+    def __init__(self, max_points: int = config.CHAT_TIMELINE_POINTS, top_n: int = 5):
+        self.max_points = max(2, max_points)
+        self.top_n = top_n
+        self.level = 0  # each bucket covers 2**level consecutive windows
+        self._buckets: Dict[int, Dict[str, Any]] = {}
+        self._top: List[Tuple[int, int, Dict[str, Any]]] = []  # min-heap of (score, -number, spike)
+        self.counts: Counter = Counter()
+
+    def add(self, window: ChatWindow, verdict: Verdict) -> None:
+        from bharat_suraksha.bulk import verdict_source
+
+        score = int(verdict.get("score", 0) or 0)
+        is_scam = verdict.get("is_scam")
+        source = "local_fallback" if verdict.get("degraded") else verdict_source(verdict)
+        self.counts["windows"] += 1
+        self.counts[f"source_{source}"] += 1
+        self.counts[f"is_scam_{is_scam}"] += 1
+        point = {
+            "first": window.first,
+            "last": window.last,
+            "start": window.start,
+            "end": window.end,
+            "score": score,
+            "windows": 1,
+            "scam_windows": int(is_scam == "yes"),
+        }
+        key = window.number >> self.level
+        self._buckets[key] = _merge(self._buckets[key], point) if key in self._buckets else point
+        while len(self._buckets) > self.max_points:
+            self.level += 1
+            merged: Dict[int, Dict[str, Any]] = {}
+            for old_key, bucket in self._buckets.items():
+                new_key = old_key >> 1
+                merged[new_key] = _merge(merged[new_key], bucket) if new_key in merged else bucket
+            self._buckets = merged
+
+        spike = (score, -window.number)
+        if len(self._top) < self.top_n or spike > self._top[0][:2]:
+            entry = {
+                "window": window.number,
+                "first": window.first,
+                "last": window.last,
+                "start": _iso(window.start),
+                "end": _iso(window.end),
+                "senders": list(window.senders),
+                "score": score,
+                "is_scam": is_scam,
+                "source": source,
+                "tactics": verdict.get("tactics") or [],
+                "matched_patterns": verdict.get("matched_patterns") or [],
+                "explanations": verdict.get("explanations") or {},
+                "text": window.text,
+            }
+            if len(self._top) < self.top_n:
+                heapq.heappush(self._top, (*spike, entry))
+            else:
+                heapq.heapreplace(self._top, (*spike, entry))
+
+    def points(self) -> List[Dict[str, Any]]:
+        """Buckets in chat order; score is the highest window score in the bucket."""
+        return [
+            dict(bucket, start=_iso(bucket["start"]), end=_iso(bucket["end"]))
+            for _, bucket in sorted(self._buckets.items())
+        ]
+
+    def spikes(self) -> List[Dict[str, Any]]:
+        """Riskiest windows, highest score first (earlier window on ties)."""
+        return [entry for _, _, entry in sorted(self._top, key=lambda item: (-item[0], -item[1]))]
+
+    def summary(self) -> Dict[str, Any]:
+        spikes = self.spikes()
+        peak = spikes[0] if spikes else None
+        return {
+            "windows": self.counts["windows"],
+            "scam_windows": self.counts["is_scam_yes"],
+            "suspect_windows": self.counts["is_scam_suspect"],
+            "max_score": peak["score"] if peak else 0,
+            "is_scam": "yes" if self.counts["is_scam_yes"] else "suspect" if self.counts["is_scam_suspect"] else "no",
+            "sources": {k[len("source_"):]: v for k, v in sorted(self.counts.items()) if k.startswith("source_")},
+            "windows_per_point": 1 << self.level,
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"summary": self.summary(), "timeline": self.points(), "spikes": self.spikes()}
+
+
+def _merge(a: Dict[str, Any], b: Dict[str, Any]) -> Dict[str, Any]:
+    if a["first"] > b["first"]:
+        a, b = b, a
+    return {
+        "first": a["first"],
+        "last": max(a["last"], b["last"]),
+        "start": a["start"] or b["start"],
+        "end": b["end"] or a["end"],
+        "score": max(a["score"], b["score"]),
+        "windows": a["windows"] + b["windows"],
+        "scam_windows": a["scam_windows"] + b["scam_windows"],
+    }
+
+
+# ---------------------------
+# Analysis
+# ---------------------------
+ScanFn = Callable[[str], Awaitable[Verdict]]
+ProgressFn = Callable[[ChatTimeline, Counter], None]
+
+
+async def analyze_windows_async(
+    windows: Iterable[ChatWindow],
+    scan: ScanFn,
+    concurrency: int = config.CHAT_CONCURRENCY,
+    timeline: Optional[ChatTimeline] = None,
+    stats: Optional[Counter] = None,
+    on_progress: Optional[ProgressFn] = None,
+) -> ChatTimeline:
+    """
+    Scan windows with at most concurrency in flight, pulling the next window only as a
+    slot frees up. Windows with identical text (a chat that is one forward over and over)
+    share one scan while it is in flight; later repeats hit the verdict cache.
+    """
+    timeline = timeline if timeline is not None else ChatTimeline()
+    stats = stats if stats is not None else Counter()
+    inflight: Dict[str, "asyncio.Future[Verdict]"] = {}
+
+    async def one(window: ChatWindow) -> Tuple[ChatWindow, Verdict]:
+        shared = inflight.get(window.text)
+        if shared is not None:
+            stats["shared_scans"] += 1
+            return window, dict(await asyncio.shield(shared))
+        future = inflight[window.text] = asyncio.ensure_future(scan(window.text))
+        try:
+            return window, await future
+        finally:
+            inflight.pop(window.text, None)
+
+    def collect(done: Set["asyncio.Task[Tuple[ChatWindow, Verdict]]"]) -> None:
+        for task in done:
+            timeline.add(*task.result())
+        if on_progress is not None:
+            on_progress(timeline, stats)
+
+    pending: Set["asyncio.Task[Tuple[ChatWindow, Verdict]]"] = set()
+    try:
+        for window in windows:
+            pending.add(asyncio.ensure_future(one(window)))
+            if len(pending) >= max(1, concurrency):
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                collect(done)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            collect(done)
+    finally:
+        for task in pending:
+            task.cancel()
+    return timeline
+
+
+def analyze_chat(
+    fileobj: BinaryIO,
+    filename: str,
+    scan: ScanFn,
+    concurrency: int = config.CHAT_CONCURRENCY,
+    max_turns: int = config.CHAT_WINDOW_TURNS,
+    stride: int = config.CHAT_WINDOW_STRIDE,
+    max_tokens: int = config.CHAT_WINDOW_TOKENS,
+    on_progress: Optional[ProgressFn] = None,
+) -> Tuple[ChatTimeline, Counter]:
+    """
+    Parse, window and scan one export; blocking. scan is usually
+    `lambda text: scanner.scan_async(text, client, language, admit=admit)`. Returns the
+    timeline and the ingestion counters (messages, repeated_forwards, turns, windows,
+    shared_scans).
+    """
+    from bharat_suraksha.resilience import run_sync
+
+    stats: Counter = Counter()
+    windows = iter_windows(iter_chat_messages(fileobj, filename), max_turns, stride, max_tokens, stats)
+    timeline = run_sync(analyze_windows_async(windows, scan, concurrency, stats=stats, on_progress=on_progress))
+    return timeline, stats
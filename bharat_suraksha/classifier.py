@@ -0,0 +1,380 @@
+"""
+Tier-0 on-box scam classifier.
+
+A logistic regression over hashed word 1-2 grams, character 3-5 grams and the trope
+registry hits, written in plain NumPy so it runs with no external service.
+Messages it is confident about are decided locally; only those whose probability falls
+inside the configurable (low, high) band escalate to the forensic AI model.
+
+Labelled data is JSONL with one {"text": ..., "label": ...} object per line, where the
+label is 1/0, true/false or one of "scam"/"yes"/"safe"/"no".
+
+    python -m bharat_suraksha.classifier train --data labelled.jsonl --model tier0.npz
+    python -m bharat_suraksha.classifier evaluate --data holdout.jsonl --model tier0.npz
+    python -m bharat_suraksha.classifier export --model tier0.npz --out tier0-deploy.npz
+"""
+import argparse
+import json
+import math
+import re
+import sys
+import threading
+import time
+import zlib
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from bharat_suraksha.cache import normalize_message
+from bharat_suraksha.tropes import matched_tropes
+
+DEFAULT_BITS = 18
+CHAR_NGRAMS = (3, 4, 5)
+_WORD = re.compile(r"\w+")
+
+
+# ---------------------------
+# Feature hashing
+# ---------------------------
+def _row(text: str, mask: int) -> Tuple[np.ndarray, np.ndarray]:
+    norm = normalize_message(text)
+    counts: Dict[int, float] = {}
+    crc = zlib.crc32
+
+    words = _WORD.findall(norm)
+    grams = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    for gram in grams:
+        h = crc(gram.encode("utf-8"), 0x77) & mask
+        counts[h] = counts.get(h, 0.0) + 1.0
+    padded = f" {norm} "
+    for n in CHAR_NGRAMS:
+        for i in range(len(padded) - n + 1):
+            h = crc(padded[i : i + n].encode("utf-8"), 0x63) & mask
+            counts[h] = counts.get(h, 0.0) + 1.0
+    for name in matched_tropes(text):
+        h = crc(name.encode("utf-8"), 0x70) & mask
+        # Trope hits are strong, sparse signals; weight them above a single n-gram.
+        counts[h] = counts.get(h, 0.0) + 4.0
+
+    if not counts:
+        return np.zeros(0, dtype=np.uint32), np.zeros(0, dtype=np.float32)
+    indices = np.fromiter(counts.keys(), dtype=np.uint32, count=len(counts))
+    values = np.log1p(np.fromiter(counts.values(), dtype=np.float32, count=len(counts)))
+    values /= np.linalg.norm(values)
+    return indices, values
+
+
+def featurize(texts: Iterable[str], bits: int = DEFAULT_BITS) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Hash texts into a CSR matrix (indptr, indices, values) with 2**bits columns."""
+    mask = (1 << bits) - 1
+    indptr = [0]
+    index_chunks: List[np.ndarray] = []
+    value_chunks: List[np.ndarray] = []
+    for text in texts:
+        indices, values = _row(text, mask)
+        index_chunks.append(indices)
+        value_chunks.append(values)
+        indptr.append(indptr[-1] + len(indices))
+    if not index_chunks:
+        return np.zeros(1, dtype=np.int64), np.zeros(0, dtype=np.uint32), np.zeros(0, dtype=np.float32)
+    return np.asarray(indptr, dtype=np.int64), np.concatenate(index_chunks), np.concatenate(value_chunks)
+
+
+def _sigmoid(z: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-np.clip(z, -35.0, 35.0)))
+
+
+# ---------------------------
+# Model
+# ---------------------------
+class Tier0Model:
+    def __init__(self, weights: np.ndarray, bias: float, bits: int = DEFAULT_BITS):
+        self.weights = weights.astype(np.float32, copy=False)
+        self.bias = float(bias)
+        self.bits = bits
+
+    def decision_function(self, texts: Sequence[str]) -> np.ndarray:
+        """Vectorized batch scoring: one featurization pass, one weighted bincount."""
+        indptr, indices, values = featurize(texts, self.bits)
+        n_rows = len(indptr) - 1
+        rows = np.repeat(np.arange(n_rows), np.diff(indptr))
+        return np.bincount(rows, weights=self.weights[indices] * values, minlength=n_rows) + self.bias
+
+    def predict_proba(self, texts: Sequence[str]) -> np.ndarray:
+        return _sigmoid(self.decision_function(texts))
+
+    def predict(self, texts: Sequence[str], threshold: float = 0.5) -> np.ndarray:
+        return (self.predict_proba(texts) >= threshold).astype(np.int8)
+
+    @classmethod
+    def train(
+        cls,
+        texts: Sequence[str],
+        labels: Sequence[int],
+        bits: int = DEFAULT_BITS,
+        epochs: int = 150,
+        learning_rate: float = 0.05,
+        l2: float = 1e-5,
+    ) -> "Tier0Model":
+        """Full-batch Adam on the L2-regularized log loss."""
+        indptr, indices, values = featurize(texts, bits)
+        y = np.asarray(labels, dtype=np.float64)
+        n_rows, n_features = len(y), 1 << bits
+        rows = np.repeat(np.arange(n_rows), np.diff(indptr))
+        w = np.zeros(n_features, dtype=np.float64)
+        b = 0.0
+        m_w, v_w = np.zeros_like(w), np.zeros_like(w)
+        m_b = v_b = 0.0
+        beta1, beta2, eps = 0.9, 0.999, 1e-8
+        for step in range(1, epochs + 1):
+            z = np.bincount(rows, weights=w[indices] * values, minlength=n_rows) + b
+            err = (_sigmoid(z) - y) / n_rows
+            grad_w = np.bincount(indices, weights=values * err[rows], minlength=n_features) + l2 * w
+            grad_b = float(err.sum())
+            m_w = beta1 * m_w + (1 - beta1) * grad_w
+            v_w = beta2 * v_w + (1 - beta2) * grad_w * grad_w
+            m_b = beta1 * m_b + (1 - beta1) * grad_b
+            v_b = beta2 * v_b + (1 - beta2) * grad_b * grad_b
+            correction1, correction2 = 1 - beta1**step, 1 - beta2**step
+            w -= learning_rate * (m_w / correction1) / (np.sqrt(v_w / correction2) + eps)
+            b -= learning_rate * (m_b / correction1) / (math.sqrt(v_b / correction2) + eps)
+        return cls(w, b, bits)
+
+    # ---------------------------
+    # Persistence
+    # ---------------------------
+    def save(self, path: str) -> None:
+        with open(path, "wb") as fh:
+            np.savez(fh, format="dense", bits=self.bits, bias=self.bias, weights=self.weights)
+
+    def export(self, path: str, prune: float = 1e-3) -> Dict[str, Any]:
+        """
+        Write a deployment artifact: near-zero weights dropped, the rest stored sparse as float16.
+        """
+        keep = np.flatnonzero(np.abs(self.weights) >= prune).astype(np.uint32)
+        with open(path, "wb") as fh:
+            np.savez_compressed(
+                fh,
+                format="sparse",
+                bits=self.bits,
+                bias=self.bias,
+                indices=keep,
+                values=self.weights[keep].astype(np.float16),
+            )
+        return {"kept_weights": int(len(keep)), "total_weights": int(len(self.weights))}
+
+    @classmethod
+    def load(cls, path: str) -> "Tier0Model":
+        with np.load(path) as data:
+            bits = int(data["bits"])
+            bias = float(data["bias"])
+            if str(data["format"]) == "sparse":
+                weights = np.zeros(1 << bits, dtype=np.float32)
+                weights[data["indices"]] = data["values"].astype(np.float32)
+            else:
+                weights = data["weights"]
+        return cls(weights, bias, bits)
+
+
+# ---------------------------
+# Cascade: decide locally or escalate to the model
+# ---------------------------
+class Tier0Cascade:
+    """
+    Wraps a Tier0Model with a confidence band. Probabilities <= low are decided SAFE,
+    >= high SCAM; anything in between escalates. Keeps counters and latency samples so
+    the model traffic and p50 latency removed by the cascade can be reported.
+    """
+
+    def __init__(self, model: Tier0Model, low: float = 0.1, high: float = 0.9, window: int = 2048):
+        if not 0.0 <= low <= high <= 1.0:
+            raise ValueError("Cascade band must satisfy 0 <= low <= high <= 1")
+        self.model = model
+        self.low = low
+        self.high = high
+        self._lock = threading.Lock()
+        self._counts = {"safe": 0, "scam": 0, "escalate": 0}
+        self._local_ms: deque = deque(maxlen=window)
+        self._escalated_ms: deque = deque(maxlen=window)
+
+    def _decision(self, probability: float) -> str:
+        if probability <= self.low:
+            return "safe"
+        if probability >= self.high:
+            return "scam"
+        return "escalate"
+
+    def decide_batch(self, texts: Sequence[str]) -> List[Dict[str, Any]]:
+        started = time.perf_counter()
+        probabilities = self.model.predict_proba(texts)
+        per_item_ms = (time.perf_counter() - started) * 1000 / max(1, len(texts))
+        results = []
+        with self._lock:
+            for p in probabilities:
+                decision = self._decision(float(p))
+                self._counts[decision] += 1
+                if decision != "escalate":
+                    self._local_ms.append(per_item_ms)
+                results.append(
+                    {
+                        "tier": 0,
+                        "decision": decision,
+                        "probability": round(float(p), 4),
+                        "band": [self.low, self.high],
+                        "latency_ms": round(per_item_ms, 3),
+                    }
+                )
+        return results
+
+    def decide(self, text: str) -> Dict[str, Any]:
+        return self.decide_batch([text])[0]
+
+    def record_escalation_latency(self, latency_ms: float) -> None:
+        """Record end-to-end latency of an escalated message (tier-0 + model)."""
+        with self._lock:
+            self._escalated_ms.append(latency_ms)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self._counts)
+            local_ms = list(self._local_ms)
+            escalated_ms = list(self._escalated_ms)
+        local = counts["safe"] + counts["scam"]
+        total = local + counts["escalate"]
+        return {
+            **counts,
+            "local": local,
+            "total": total,
+            "model_traffic_removed": local / total if total else 0.0,
+            "p50_local_ms": float(np.median(local_ms)) if local_ms else None,
+            "p50_escalated_ms": float(np.median(escalated_ms)) if escalated_ms else None,
+            "p50_all_ms": float(np.median(local_ms + escalated_ms)) if local_ms or escalated_ms else None,
+        }
+
+
+def local_verdict(text: str, cascade_result: Dict[str, Any]) -> Dict[str, Any]:
+    """Build a parse_model_response-shaped verdict for a message decided on-box."""
+    probability = cascade_result["probability"]
+    is_scam = "yes" if cascade_result["decision"] == "scam" else "no"
+    explanation = (
+        f"Decided on-box by the tier-0 classifier (scam probability {probability:.0%}); "
+        "the forensic AI model was not called."
+    )
+    verdict = {
+        "is_scam": is_scam,
+        "score": int(round(probability * 100)),
+        "explanations": {"en": explanation},
+        "tactics": [],
+        "matched_patterns": matched_tropes(text),
+        "cascade": cascade_result,
+    }
+    verdict["raw"] = json.dumps(cascade_result)
+    return verdict
+
+
+# ---------------------------
+# Labelled data, evaluation & CLI
+# ---------------------------
+_POSITIVE = {"1", "true", "yes", "scam", "spam", "fraud"}
+_NEGATIVE = {"0", "false", "no", "safe", "ham", "benign"}
+
+
+def load_labelled(path: str) -> Tuple[List[str], List[int]]:
+    texts, labels = [], []
+    with open(path, encoding="utf-8") as fh:
+        for line_no, line in enumerate(fh, 1):
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            label = str(record.get("label", "")).strip().lower()
+            if label in _POSITIVE:
+                labels.append(1)
+            elif label in _NEGATIVE:
+                labels.append(0)
+            else:
+                raise ValueError(f"{path}:{line_no}: unrecognised label {record.get('label')!r}")
+            texts.append(record.get("text", ""))
+    return texts, labels
+
+
+def _roc_auc(y: np.ndarray, p: np.ndarray) -> Optional[float]:
+    positives = int(y.sum())
+    negatives = len(y) - positives
+    if not positives or not negatives:
+        return None
+    ranks = np.empty(len(p))
+    ranks[np.argsort(p, kind="mergesort")] = np.arange(1, len(p) + 1)
+    return float((ranks[y == 1].sum() - positives * (positives + 1) / 2) / (positives * negatives))
+
+
+def evaluate(model: Tier0Model, texts: Sequence[str], labels: Sequence[int], low: float = 0.1, high: float = 0.9) -> Dict[str, Any]:
+    y = np.asarray(labels, dtype=np.int8)
+    started = time.perf_counter()
+    p = model.predict_proba(texts)
+    elapsed = time.perf_counter() - started
+    predicted = (p >= 0.5).astype(np.int8)
+    tp = int(((predicted == 1) & (y == 1)).sum())
+    fp = int(((predicted == 1) & (y == 0)).sum())
+    fn = int(((predicted == 0) & (y == 1)).sum())
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    local = (p <= low) | (p >= high)
+    return {
+        "n": int(len(y)),
+        "accuracy": float((predicted == y).mean()) if len(y) else 0.0,
+        "precision": precision,
+        "recall": recall,
+        "f1": 2 * precision * recall / (precision + recall) if precision + recall else 0.0,
+        "roc_auc": _roc_auc(y, p),
+        "band": [low, high],
+        "escalation_rate": float(1 - local.mean()) if len(y) else 0.0,
+        "local_accuracy": float((predicted[local] == y[local]).mean()) if local.any() else None,
+        "messages_per_second": len(y) / elapsed if elapsed else None,
+    }
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m bharat_suraksha.classifier", description="Tier-0 scam classifier")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    train_cmd = commands.add_parser("train", help="train a model on labelled JSONL")
+    train_cmd.add_argument("--data", required=True)
+    train_cmd.add_argument("--model", required=True, help="output .npz path")
+    train_cmd.add_argument("--bits", type=int, default=DEFAULT_BITS)
+    train_cmd.add_argument("--epochs", type=int, default=150)
+    train_cmd.add_argument("--learning-rate", type=float, default=0.05)
+    train_cmd.add_argument("--l2", type=float, default=1e-5)
+
+    eval_cmd = commands.add_parser("evaluate", help="report metrics and escalation rate on labelled JSONL")
+    eval_cmd.add_argument("--data", required=True)
+    eval_cmd.add_argument("--model", required=True)
+    eval_cmd.add_argument("--low", type=float, default=0.1)
+    eval_cmd.add_argument("--high", type=float, default=0.9)
+
+    export_cmd = commands.add_parser("export", help="write a pruned, float16 deployment artifact")
+    export_cmd.add_argument("--model", required=True)
+    export_cmd.add_argument("--out", required=True)
+    export_cmd.add_argument("--prune", type=float, default=1e-3)
+
+    args = parser.parse_args(argv)
+    if args.command == "train":
+        texts, labels = load_labelled(args.data)
+        started = time.perf_counter()
+        model = Tier0Model.train(texts, labels, bits=args.bits, epochs=args.epochs, learning_rate=args.learning_rate, l2=args.l2)
+        model.save(args.model)
+        report = {"trained_on": len(texts), "seconds": round(time.perf_counter() - started, 2), "model": args.model}
+    elif args.command == "evaluate":
+        texts, labels = load_labelled(args.data)
+        report = evaluate(Tier0Model.load(args.model), texts, labels, args.low, args.high)
+    else:
+        report = Tier0Model.load(args.model).export(args.out, args.prune)
+        report["out"] = args.out
+    json.dump(report, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
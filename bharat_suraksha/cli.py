@@ -0,0 +1,261 @@
+"""
+Command-line scanner: `python -m bharat_suraksha scan [FILE ...]`.
+
+Reads messages from files or stdin (one per line, or one per file with --whole) and writes
+one JSON verdict per line. `chat` turns a WhatsApp export into a risk timeline, and `serve`
+runs the same pipeline as a local HTTP JSON service. Startup is kept cheap: numpy-backed
+stages and the Gemini SDK are imported only when a message actually needs them.
+"""
+import argparse
+import json
+import os
+import sys
+from typing import IO, Iterator, List, Optional, Tuple
+
+from bharat_suraksha import config
+from bharat_suraksha.model import MODEL_NAME, GeminiClient, ModelUnavailable
+from bharat_suraksha.risk import risk_level
+
+# Target for `python -m bharat_suraksha --help`; checked by benchmarks/bench_cli_coldstart.py.
+COLD_START_BUDGET_MS = 300
+
+Message = Tuple[str, Optional[int], str]  # (source, line number or None, text)
+
+
+def _iter_messages(paths: List[str], whole: bool, stdin: IO[str]) -> Iterator[Message]:
+    sources = paths or ["-"]
+    for path in sources:
+        fh = stdin if path == "-" else open(path, encoding="utf-8", errors="replace")
+        try:
+            if whole:
+                text = fh.read().strip()
+                if text:
+                    yield path, None, text
+                continue
+            for number, line in enumerate(fh, start=1):
+                text = line.strip()
+                if text:
+                    yield path, number, text
+        finally:
+            if fh is not stdin:
+                fh.close()
+
+
+def _record(source: str, line: Optional[int], text: str, verdict: dict, raw: bool, qubit: Optional[dict] = None) -> dict:
+    record = {"source": source, "line": line, "text": text}
+    if verdict.get("error"):
+        record["error"] = verdict["error"]
+        if verdict.get("message"):
+            record["message"] = verdict["message"]
+        if not verdict.get("degraded"):
+            return record
+    if verdict.get("degraded"):
+        # On-box estimate; the model did not answer this one.
+        record["degraded"] = verdict["degraded"]
+    score = int(verdict.get("score", 0) or 0)
+    record.update(
+        {
+            "is_scam": verdict.get("is_scam"),
+            "score": score,
+            "risk": risk_level(score),
+            "tactics": verdict.get("tactics") or [],
+            "matched_patterns": verdict.get("matched_patterns") or [],
+            "explanations": verdict.get("explanations") or {},
+        }
+    )
+    if verdict.get("reputation"):
+        record["reputation"] = verdict["reputation"]["hits"]
+    if verdict.get("tokens"):
+        record["tokens"] = verdict["tokens"]
+    if qubit is not None:
+        record["quantum_measured"] = qubit["measured"]
+    if raw:
+        record["raw"] = verdict.get("raw", "")
+    return record
+
+
+def _start_metrics(args: argparse.Namespace):
+    """Process-wide metrics registry, switched on when --metrics or --metrics-file asks for it."""
+    from bharat_suraksha.metrics import METRICS
+
+    if args.metrics or args.metrics_file:
+        METRICS.enabled = True
+    return METRICS
+
+
+def cmd_scan(args: argparse.Namespace, stdin: IO[str] = sys.stdin, stdout: IO[str] = sys.stdout) -> int:
+    from bharat_suraksha.pipeline import Scanner
+
+    metrics = _start_metrics(args)
+    scanner = Scanner.from_config(use_cache=not args.no_cache)
+    scanner.model_name = args.model
+    if args.budget is not None:
+        scanner.budget_tokens = args.budget
+    client = GeminiClient(args.api_key, args.model, structured=not args.no_schema) if args.api_key else None
+    out = open(args.output, "a", encoding="utf-8") if args.output else stdout
+    rng = None
+    if args.quantum:
+        from bharat_suraksha.qubit import make_rng, simulate_qubit_and_collapse
+
+        rng = make_rng(args.seed)
+    failures = 0
+    try:
+        for source, line, text in _iter_messages(args.files, args.whole, stdin):
+            try:
+                verdict = scanner.scan(text, client, args.language, context={"surface": "cli"})
+            except ModelUnavailable as exc:
+                verdict = {"error": "model_unavailable", "message": str(exc)}
+            failures += bool(verdict.get("error"))
+            qubit = None
+            if rng is not None and not verdict.get("error"):
+                with metrics.timer("qubit_collapse"):
+                    qubit = simulate_qubit_and_collapse(int(verdict.get("score", 50) or 0), rng)
+            out.write(json.dumps(_record(source, line, text, verdict, args.raw, qubit), ensure_ascii=False) + "\n")
+            out.flush()
+    finally:
+        if out is not stdout:
+            out.close()
+        scanner.save_templates()
+        if args.metrics_file:
+            metrics.write_prometheus(args.metrics_file)
+    return 1 if failures else 0
+
+
+def cmd_chat(args: argparse.Namespace, stdout: IO[str] = sys.stdout) -> int:
+    from bharat_suraksha.chats import analyze_chat
+    from bharat_suraksha.model import StubModelClient
+    from bharat_suraksha.pipeline import Scanner
+
+    metrics = _start_metrics(args)
+    scanner = Scanner.from_config(use_cache=not args.no_cache)
+    scanner.model_name = args.model
+    if args.stub_model:
+        client = StubModelClient()
+    else:
+        client = GeminiClient(args.api_key, args.model, structured=not args.no_schema) if args.api_key else None
+    try:
+        with open(args.export, "rb") as fh:
+            timeline, stats = analyze_chat(
+                fh,
+                args.export,
+                lambda text: scanner.scan_async(text, client, args.language, context={"surface": "chat"}),
+                concurrency=args.concurrency,
+                max_turns=args.window_turns,
+                stride=args.stride,
+                max_tokens=args.window_tokens,
+            )
+    except ModelUnavailable as exc:
+        print(f"bharat-suraksha: {exc} (pass --api-key or --stub-model)", file=sys.stderr)
+        return 2
+    finally:
+        scanner.save_templates()
+        if args.metrics_file:
+            metrics.write_prometheus(args.metrics_file)
+    report = timeline.to_dict()
+    report["ingest"] = dict(stats)
+    out = open(args.output, "w", encoding="utf-8") if args.output else stdout
+    try:
+        json.dump(report, out, ensure_ascii=False, indent=2)
+        out.write("\n")
+    finally:
+        if out is not stdout:
+            out.close()
+    return 0
+
+
+def cmd_serve(args: argparse.Namespace) -> int:
+    from bharat_suraksha.model import StubModelClient
+    from bharat_suraksha.pipeline import Scanner
+    from bharat_suraksha.server import ScanService, serve
+
+    metrics = _start_metrics(args)
+    if args.metrics_file:
+        metrics.start_file_exporter(args.metrics_file, config.METRICS_FILE_INTERVAL_SECONDS)
+    scanner = Scanner.from_config(use_cache=not args.no_cache)
+    scanner.model_name = args.model
+    if args.stub_model:
+        client = StubModelClient(latency_ms=args.stub_latency_ms)
+    elif args.api_key:
+        client = GeminiClient(args.api_key, args.model)
+    else:
+        raise ValueError("No API key: pass --api-key, set GOOGLE_API_KEY, or use --stub-model")
+    batcher = scanner.batcher(client, args.language, max_items=args.batch_size) if args.batch_size > 1 else None
+    service = ScanService(scanner, client, args.language, max_concurrency=args.max_concurrency, batcher=batcher)
+    print(f"bharat-suraksha: serving on http://{args.host}:{args.port}", file=sys.stderr)
+    serve(service, args.host, args.port, verbose=args.verbose)
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="bharat-suraksha", description="Scan SMS / chat messages for scams.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    scan = sub.add_parser("scan", help="Scan messages from files or stdin; writes JSONL verdicts")
+    scan.add_argument("files", nargs="*", help="Input files ('-' or none for stdin)")
+    scan.add_argument("--whole", action="store_true", help="Treat each file as one message instead of one per line")
+    scan.add_argument("--api-key", default=os.getenv("GOOGLE_API_KEY"), help="Gemini API key (default: $GOOGLE_API_KEY)")
+    scan.add_argument("--model", default=MODEL_NAME)
+    scan.add_argument("--language", default="English", help="Preferred explanation language")
+    scan.add_argument("--budget", type=int, help="Message token budget before compaction drops lines")
+    scan.add_argument("--output", "-o", help="Append JSONL verdicts here instead of stdout")
+    scan.add_argument("--no-schema", action="store_true", help="Do not constrain replies to the verdict JSON schema")
+    scan.add_argument("--raw", action="store_true", help="Include the raw model response")
+    scan.add_argument("--quantum", action="store_true", help="Add the Quantum Digital Dharma measurement")
+    scan.add_argument("--seed", type=int, help="Seed for --quantum measurements (reproducible output)")
+    scan.add_argument("--no-cache", action="store_true", help="Skip the verdict cache and template index")
+    scan.add_argument("--metrics", action="store_true", default=config.METRICS_ENABLED, help="Collect per-stage timings")
+    scan.add_argument(
+        "--metrics-file", default=config.METRICS_FILE, help="Write Prometheus text metrics here when the run ends"
+    )
+    scan.set_defaults(func=cmd_scan)
+
+    chat = sub.add_parser("chat", help="Analyze a WhatsApp chat export (.txt or .zip) as a risk timeline")
+    chat.add_argument("export", help="Exported chat: the .txt, or the .zip WhatsApp shares")
+    chat.add_argument("--api-key", default=os.getenv("GOOGLE_API_KEY"), help="Gemini API key (default: $GOOGLE_API_KEY)")
+    chat.add_argument("--model", default=MODEL_NAME)
+    chat.add_argument("--language", default="English", help="Preferred explanation language")
+    chat.add_argument("--stub-model", action="store_true", help="Answer from an offline stub instead of Gemini")
+    chat.add_argument("--concurrency", type=int, default=config.CHAT_CONCURRENCY, help="Windows scanned at once")
+    chat.add_argument("--window-turns", type=int, default=config.CHAT_WINDOW_TURNS, help="Sender turns per window")
+    chat.add_argument("--stride", type=int, default=config.CHAT_WINDOW_STRIDE, help="Turns between window starts")
+    chat.add_argument("--window-tokens", type=int, default=config.CHAT_WINDOW_TOKENS, help="Estimated tokens per window")
+    chat.add_argument("--output", "-o", help="Write the JSON report here instead of stdout")
+    chat.add_argument("--no-schema", action="store_true", help="Do not constrain replies to the verdict JSON schema")
+    chat.add_argument("--no-cache", action="store_true", help="Skip the verdict cache and template index")
+    chat.add_argument("--metrics", action="store_true", default=config.METRICS_ENABLED, help="Collect per-stage timings")
+    chat.add_argument(
+        "--metrics-file", default=config.METRICS_FILE, help="Write Prometheus text metrics here when the run ends"
+    )
+    chat.set_defaults(func=cmd_chat)
+
+    serve = sub.add_parser("serve", help="Run the local HTTP JSON scanning service")
+    serve.add_argument("--host", default=config.SERVER_HOST)
+    serve.add_argument("--port", type=int, default=config.SERVER_PORT)
+    serve.add_argument("--api-key", default=os.getenv("GOOGLE_API_KEY"), help="Gemini API key (default: $GOOGLE_API_KEY)")
+    serve.add_argument("--model", default=MODEL_NAME)
+    serve.add_argument("--language", default="English", help="Default explanation language")
+    serve.add_argument("--stub-model", action="store_true", help="Answer from an offline stub instead of Gemini")
+    serve.add_argument("--stub-latency-ms", type=float, default=0.0, help="Simulated stub model latency")
+    serve.add_argument("--max-concurrency", type=int, default=config.SERVER_MAX_CONCURRENCY, help="Scans running at once")
+    serve.add_argument("--batch-size", type=int, default=1, help="Micro-batch up to N messages per model call (1 = off)")
+    serve.add_argument("--no-cache", action="store_true", help="Skip the verdict cache and template index")
+    serve.add_argument("--verbose", action="store_true", help="Log every request to stderr")
+    serve.add_argument(
+        "--metrics", action="store_true", default=config.METRICS_ENABLED, help="Collect per-stage timings (GET /metrics)"
+    )
+    serve.add_argument("--metrics-file", default=config.METRICS_FILE, help="Also rewrite Prometheus text metrics here periodically")
+    serve.set_defaults(func=cmd_serve)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except (OSError, ValueError) as exc:
+        print(f"bharat-suraksha: {exc}", file=sys.stderr)
+        return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+"""
+Process-wide pool of model clients, one per distinct API key.
+
+Building a Gemini client imports the SDK and sets up a gRPC channel, which costs far more
+than the scan it serves. The pool builds each client once, shares it across reruns and
+sessions that use the same key, and drops clients that have sat idle. Keys are held only
+as SHA-256 digests in the pool's index; the raw key lives inside its own client.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from bharat_suraksha.model import MODEL_NAME, GeminiClient
+
+
+def _key_id(api_key: str) -> str:
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+
+
+class _Entry:
+    __slots__ = ("client", "last_used", "ready")
+
+    def __init__(self):
+        self.client: Any = None
+        self.last_used = time.monotonic()
+        self.ready = threading.Event()
+
+
+class ClientPool:
+    """
+    Thread-safe keyed pool. `factory(api_key)` must return a connected client; concurrent
+    requests for a key that is still being built wait for that one build instead of racing.
+    """
+
+    def __init__(
+        self,
+        factory: Optional[Callable[[str], Any]] = None,
+        max_clients: int = 64,
+        idle_seconds: float = 30 * 60,
+        model_name: str = MODEL_NAME,
+        structured: bool = True,
+    ):
+        self.factory = factory or self._gemini_factory
+        self.model_name = model_name
+        self.structured = structured
+        self.max_clients = max(1, max_clients)
+        self.idle_seconds = idle_seconds
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._constructions = 0
+        self._construct_ms_total = 0.0
+        self._construct_ms_last: Optional[float] = None
+
+    def _gemini_factory(self, api_key: str) -> GeminiClient:
+        client = GeminiClient(api_key, self.model_name, structured=self.structured)
+        client.connect()
+        return client
+
+    def _evict(self, now: float) -> None:
+        # Caller holds the lock. Entries are kept in least-recently-used order.
+        while self._entries:
+            key_id, entry = next(iter(self._entries.items()))
+            idle = now - entry.last_used > self.idle_seconds
+            if not (idle or len(self._entries) > self.max_clients) or not entry.ready.is_set():
+                break
+            del self._entries[key_id]
+            self._evictions += 1
+
+    def get(self, api_key: str) -> Any:
+        """Client for api_key, building it on first use. Build errors propagate and are not cached."""
+        key_id = _key_id(api_key)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key_id)
+            owner = entry is None
+            if owner:
+                entry = _Entry()
+                self._entries[key_id] = entry
+                self._misses += 1
+            else:
+                self._hits += 1
+                self._entries.move_to_end(key_id)
+            entry.last_used = now
+
+        if not owner:
+            entry.ready.wait()
+            if entry.client is None:
+                # The build we waited on failed; try again ourselves.
+                return self.get(api_key)
+            return entry.client
+
+        started = time.perf_counter()
+        try:
+            entry.client = self.factory(api_key)
+        except Exception:
+            with self._lock:
+                if self._entries.get(key_id) is entry:
+                    del self._entries[key_id]
+            raise
+        finally:
+            entry.ready.set()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self._constructions += 1
+            self._construct_ms_total += elapsed_ms
+            self._construct_ms_last = elapsed_ms
+            self._evict(time.monotonic())
+        return entry.client
+
+    def warm(self, api_key: Optional[str], background: bool = True) -> Optional[threading.Thread]:
+        """
+        Build (and, if the client supports it, warm up) the client for api_key ahead of the
+        first scan. Errors are swallowed; the scan path reports them when it needs the client.
+        """
+        if not api_key:
+            return None
+
+        def run() -> None:
+            try:
+                client = self.get(api_key)
+                if hasattr(client, "warm_up"):
+                    client.warm_up()
+            except Exception:
+                pass
+
+        if not background:
+            run()
+            return None
+        thread = threading.Thread(target=run, name="client-warmup", daemon=True)
+        thread.start()
+        return thread
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._evict(time.monotonic())
+            lookups = self._hits + self._misses
+            return {
+                "clients": len(self._entries),
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "reuse_rate": self._hits / lookups if lookups else 0.0,
+                "construct_ms_last": self._construct_ms_last,
+                "construct_ms_mean": self._construct_ms_total / self._constructions if self._constructions else None,
+            }
@@ -0,0 +1,167 @@
+"""
+Prompt compaction for long pasted chats.
+
+A pasted WhatsApp thread is mostly noise to the model: timestamps, "Forwarded" banners,
+the same disclaimer ten times, media placeholders and base64 blobs. compact_message keeps
+what the verdict depends on, within a token budget:
+
+  1. strip chat timestamps and forwarding / system boilerplate;
+  2. replace long base64-like blobs with a placeholder;
+  3. collapse repeated lines to one copy with a count;
+  4. move URLs, phone numbers, UPI ids and emails that occur more than once into a compact
+     entity table and reference them by tag;
+  5. if still over budget, keep the highest-signal lines (trope hits from the local
+     matcher, entities) in their original order and mark the gaps.
+
+Short SMS pass through unchanged, so their cache keys and prompts stay stable.
+"""
+import re
+from typing import Dict, List, NamedTuple, Tuple
+
+from bharat_suraksha.tropes import find_tropes
+
+_CHAT_PREFIX = re.compile(
+    r"^\s*\[?\d{1,2}[/.-]\d{1,2}[/.-]\d{2,4},?\s+\d{1,2}:\d{2}(?::\d{2})?\s*(?:[AaPp]\.?[Mm]\.?)?\]?\s*(?:-\s*)?"
+)
+_BOILERPLATE = re.compile(
+    r"^(?:forwarded(?: many times)?|<media omitted>|<attached: [^>]*>|this message was deleted|"
+    r"you deleted this message|messages and calls are end-to-end encrypted.*|.*\bimage omitted|"
+    r".*\bsticker omitted|missed (?:voice|video) call|null)$",
+    re.I,
+)
+_BLOB = re.compile(r"(?<![\w/+=])[A-Za-z0-9+/]{48,}={0,2}(?![\w/+=])")
+_ENTITY_PATTERNS: Tuple[Tuple[str, "re.Pattern[str]"], ...] = (
+    ("U", re.compile(r"(?:https?://|www\.)\S+|\b[a-z0-9-]+\.(?:ly|gl|gd|in|com|xyz|top|link|co)/\S*", re.I)),
+    ("E", re.compile(r"\b[\w.+-]+@[\w-]+\.[\w.]+\b")),
+    ("V", re.compile(r"\b[\w.-]{2,}@[a-z]{2,}\b(?!\.)", re.I)),  # UPI id (no dot after @)
+    ("P", re.compile(r"(?<!\d)(?:\+?91[\s-]?)?[6-9]\d{4}[\s-]?\d{5}(?!\d)")),
+)
+
+
+def is_boilerplate(body: str) -> bool:
+    """Media placeholders, deleted-message stubs and WhatsApp system notices."""
+    return bool(_BOILERPLATE.match(body.strip()))
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap local token estimate: ~4 chars/token for ASCII, ~2 for other scripts (Indic
+    scripts tokenize much less densely). Good enough for budgeting; no API call.
+    """
+    if not text:
+        return 0
+    non_ascii = 0 if text.isascii() else len(text) - len(text.encode("ascii", "ignore"))
+    return (len(text) - non_ascii + 3) // 4 + (non_ascii + 1) // 2
+
+
+class Compaction(NamedTuple):
+    text: str
+    tokens_before: int
+    tokens_after: int
+    lines_removed: int  # boilerplate + duplicates + dropped for budget
+    entities: int  # entries in the entity table
+
+    @property
+    def compacted(self) -> bool:
+        return self.tokens_after < self.tokens_before
+
+
+def _clean_lines(message: str) -> Tuple[List[str], int]:
+    lines: List[str] = []
+    removed = 0
+    for raw in message.splitlines():
+        line = _CHAT_PREFIX.sub("", raw).strip()
+        if not line:
+            continue
+        # Strip a leading "Name: " only to test for boilerplate; keep the speaker otherwise.
+        body = line.split(": ", 1)[1] if ": " in line[:40] else line
+        if is_boilerplate(body):
+            removed += 1
+            continue
+        lines.append(_BLOB.sub("[blob]", line))
+    return lines, removed
+
+
+def _collapse_repeats(lines: List[str]) -> Tuple[List[str], int]:
+    counts: Dict[str, int] = {}
+    order: List[str] = []
+    for line in lines:
+        key = " ".join(line.lower().split())
+        if key in counts:
+            counts[key] += 1
+        else:
+            counts[key] = 1
+            order.append(line)
+    out = []
+    for line in order:
+        n = counts[" ".join(line.lower().split())]
+        out.append(f"{line} (x{n})" if n > 1 else line)
+    return out, len(lines) - len(order)
+
+
+def _entity_table(lines: List[str]) -> Tuple[List[str], List[str]]:
+    text = "\n".join(lines)
+    table: List[str] = []
+    for prefix, pattern in _ENTITY_PATTERNS:
+        seen: Dict[str, int] = {}
+        for match in pattern.finditer(text):
+            seen[match.group()] = seen.get(match.group(), 0) + 1
+        repeated = [value for value, n in seen.items() if n > 1]
+        for i, value in enumerate(sorted(repeated, key=len, reverse=True), start=1):
+            tag = f"[{prefix}{i}]"
+            text = text.replace(value, tag)
+            table.append(f"{tag}={value}")
+    return text.split("\n"), table
+
+
+def _line_signal(line: str) -> int:
+    score = 3 * len(find_tropes(line))
+    score += sum(2 for _, pattern in _ENTITY_PATTERNS if pattern.search(line))
+    score += 2 * line.count("[U") + line.count("[P") + line.count("[V")
+    return score
+
+
+def _fit_budget(lines: List[str], budget: int, reserved: int) -> Tuple[List[str], int]:
+    """Keep the highest-signal lines (ties: earlier first) that fit, in original order."""
+    costs = [estimate_tokens(line) + 1 for line in lines]
+    ranked = sorted(range(len(lines)), key=lambda i: (-_line_signal(lines[i]), i))
+    keep = set()
+    used = reserved
+    # The opening line usually carries the pretext; keep it when it fits.
+    for i in [0] + ranked:
+        if i not in keep and used + costs[i] <= budget:
+            keep.add(i)
+            used += costs[i]
+    out: List[str] = []
+    gap = 0
+    for i, line in enumerate(lines):
+        if i in keep:
+            if gap:
+                out.append(f"[... {gap} lines omitted ...]")
+                gap = 0
+            out.append(line)
+        else:
+            gap += 1
+    if gap:
+        out.append(f"[... {gap} lines omitted ...]")
+    return out, len(lines) - len(keep)
+
+
+def compact_message(message: str, budget_tokens: int = 1500) -> Compaction:
+    message = message or ""
+    before = estimate_tokens(message)
+    if before <= budget_tokens and "\n" not in message.strip() and not _BLOB.search(message):
+        return Compaction(message, before, before, 0, 0)
+
+    lines, removed = _clean_lines(message)
+    lines, duplicates = _collapse_repeats(lines)
+    lines, table = _entity_table(lines)
+    table_text = "Entities: " + "; ".join(table) if table else ""
+    dropped = 0
+    if sum(estimate_tokens(line) + 1 for line in lines) + estimate_tokens(table_text) > budget_tokens:
+        lines, dropped = _fit_budget(lines, budget_tokens, estimate_tokens(table_text))
+    text = "\n".join(lines + ([table_text] if table_text else []))
+    if estimate_tokens(text) >= before:
+        # Nothing worth saving; send the original so the model sees exactly what was pasted.
+        return Compaction(message, before, before, 0, 0)
+    return Compaction(text, before, estimate_tokens(text), removed + duplicates + dropped, len(table))
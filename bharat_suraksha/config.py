@@ -0,0 +1,229 @@
+"""
+Runtime settings for the scanner. Every value can be overridden from the environment
+so the same code runs unchanged on Streamlit Cloud, in a container or on a laptop.
+"""
+import os
+from typing import Optional
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def _env_optional_int(name: str) -> Optional[int]:
+    try:
+        return int(os.environ[name])
+    except (KeyError, ValueError):
+        return None
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+# ---------------------------
+# Storage
+# ---------------------------
+DATA_DIR = os.environ.get("BHARAT_SURAKSHA_DATA_DIR", ".bharat_suraksha")
+
+# ---------------------------
+# Verdict cache
+# ---------------------------
+VERDICT_CACHE_PATH = os.environ.get("BHARAT_SURAKSHA_VERDICT_CACHE", os.path.join(DATA_DIR, "verdicts.sqlite3"))
+VERDICT_CACHE_MEMORY_ENTRIES = _env_int("BHARAT_SURAKSHA_CACHE_MEMORY_ENTRIES", 2048)
+VERDICT_CACHE_DISK_ENTRIES = _env_int("BHARAT_SURAKSHA_CACHE_DISK_ENTRIES", 200_000)
+VERDICT_CACHE_TTL_SECONDS = _env_float("BHARAT_SURAKSHA_CACHE_TTL_SECONDS", 7 * 24 * 3600)
+
+# ---------------------------
+# Near-duplicate template index
+# ---------------------------
+TEMPLATE_INDEX_PATH = os.environ.get("BHARAT_SURAKSHA_TEMPLATE_INDEX", os.path.join(DATA_DIR, "templates.npz"))
+TEMPLATE_MIN_SIMILARITY = _env_float("BHARAT_SURAKSHA_TEMPLATE_MIN_SIMILARITY", 0.95)
+TEMPLATE_INDEX_SAVE_EVERY = _env_int("BHARAT_SURAKSHA_TEMPLATE_SAVE_EVERY", 256)
+
+# ---------------------------
+# Tier-0 classifier cascade
+# ---------------------------
+TIER0_MODEL_PATH = os.environ.get("BHARAT_SURAKSHA_TIER0_MODEL", os.path.join(DATA_DIR, "tier0.npz"))
+TIER0_LOW = _env_float("BHARAT_SURAKSHA_TIER0_LOW", 0.1)
+TIER0_HIGH = _env_float("BHARAT_SURAKSHA_TIER0_HIGH", 0.9)
+
+# ---------------------------
+# Reputation index (known-bad domains, links, phone numbers and UPI IDs)
+# ---------------------------
+# Built offline with `python -m bharat_suraksha.reputation build`; absent means no checks.
+REPUTATION_INDEX_PATH = os.environ.get("BHARAT_SURAKSHA_REPUTATION_INDEX", os.path.join(DATA_DIR, "reputation.idx"))
+# How often scans stat the index file to pick up a rebuilt one.
+REPUTATION_RELOAD_SECONDS = _env_float("BHARAT_SURAKSHA_REPUTATION_RELOAD_SECONDS", 30.0)
+REPUTATION_SCORE = _env_int("BHARAT_SURAKSHA_REPUTATION_SCORE", 97)
+
+# ---------------------------
+# Bulk analysis
+# ---------------------------
+BULK_DIR = os.environ.get("BHARAT_SURAKSHA_BULK_DIR", os.path.join(DATA_DIR, "bulk"))
+# Default tuned to a modest paid-tier Gemini quota; the UI lets operators lower it for free-tier keys.
+BULK_REQUESTS_PER_MINUTE = _env_int("BHARAT_SURAKSHA_BULK_RPM", 60)
+BULK_WORKERS = _env_int("BHARAT_SURAKSHA_BULK_WORKERS", 8)
+
+# ---------------------------
+# Model client pool
+# ---------------------------
+CLIENT_POOL_MAX_CLIENTS = _env_int("BHARAT_SURAKSHA_CLIENT_POOL_MAX", 64)
+CLIENT_POOL_IDLE_SECONDS = _env_float("BHARAT_SURAKSHA_CLIENT_POOL_IDLE_SECONDS", 30 * 60)
+
+# ---------------------------
+# Model call deadlines, retries and hedging
+# ---------------------------
+MODEL_DEADLINE_SECONDS = _env_float("BHARAT_SURAKSHA_MODEL_DEADLINE_SECONDS", 20.0)
+MODEL_ATTEMPT_TIMEOUT_SECONDS = _env_float("BHARAT_SURAKSHA_MODEL_ATTEMPT_TIMEOUT_SECONDS", 10.0)
+MODEL_MAX_ATTEMPTS = _env_int("BHARAT_SURAKSHA_MODEL_MAX_ATTEMPTS", 3)
+MODEL_BACKOFF_BASE_SECONDS = _env_float("BHARAT_SURAKSHA_MODEL_BACKOFF_BASE_SECONDS", 0.5)
+MODEL_BACKOFF_MAX_SECONDS = _env_float("BHARAT_SURAKSHA_MODEL_BACKOFF_MAX_SECONDS", 4.0)
+# Hedged requests double-bill the slowest ~5% of calls; set to 0 on tight quotas.
+MODEL_HEDGE = _env_int("BHARAT_SURAKSHA_MODEL_HEDGE", 1) != 0
+MODEL_HEDGE_MIN_SAMPLES = _env_int("BHARAT_SURAKSHA_MODEL_HEDGE_MIN_SAMPLES", 20)
+MODEL_CALL_THREADS = _env_int("BHARAT_SURAKSHA_MODEL_CALL_THREADS", 32)
+# Circuit breaker: stop calling a failing upstream and answer on-box until a probe succeeds.
+BREAKER_ENABLED = _env_int("BHARAT_SURAKSHA_BREAKER", 1) != 0
+BREAKER_WINDOW_SECONDS = _env_float("BHARAT_SURAKSHA_BREAKER_WINDOW_SECONDS", 60.0)
+BREAKER_MIN_CALLS = _env_int("BHARAT_SURAKSHA_BREAKER_MIN_CALLS", 10)
+BREAKER_FAILURE_RATE = _env_float("BHARAT_SURAKSHA_BREAKER_FAILURE_RATE", 0.5)
+BREAKER_SLOW_CALL_MS = _env_float("BHARAT_SURAKSHA_BREAKER_SLOW_CALL_MS", 8000.0)
+BREAKER_SLOW_CALL_RATE = _env_float("BHARAT_SURAKSHA_BREAKER_SLOW_CALL_RATE", 0.5)
+BREAKER_OPEN_SECONDS = _env_float("BHARAT_SURAKSHA_BREAKER_OPEN_SECONDS", 30.0)
+BREAKER_HALF_OPEN_PROBES = _env_int("BHARAT_SURAKSHA_BREAKER_HALF_OPEN_PROBES", 1)
+# Constrain replies to parsing.RESPONSE_SCHEMA (JSON MIME type + response schema).
+MODEL_STRUCTURED_OUTPUT = _env_int("BHARAT_SURAKSHA_MODEL_STRUCTURED_OUTPUT", 1) != 0
+
+# ---------------------------
+# Shared app-key quota (signed-out sessions all use st.secrets["GOOGLE_API_KEY"])
+# ---------------------------
+QUOTA_REQUESTS_PER_MINUTE = _env_float("BHARAT_SURAKSHA_QUOTA_RPM", 60.0)
+QUOTA_TOKENS_PER_MINUTE = _env_float("BHARAT_SURAKSHA_QUOTA_TPM", 1_000_000.0)
+# Interactive scans are shed to the on-box estimate past this queue depth or wait.
+QUOTA_MAX_QUEUE_DEPTH = _env_int("BHARAT_SURAKSHA_QUOTA_MAX_QUEUE_DEPTH", 50)
+QUOTA_MAX_WAIT_SECONDS = _env_float("BHARAT_SURAKSHA_QUOTA_MAX_WAIT_SECONDS", 10.0)
+# Reply tokens charged per call on top of the estimated prompt tokens (five explanations,
+# three of them in Indic scripts).
+QUOTA_OUTPUT_TOKENS_ESTIMATE = _env_int("BHARAT_SURAKSHA_QUOTA_OUTPUT_TOKENS", 700)
+
+# ---------------------------
+# Prompt compaction
+# ---------------------------
+# Estimated message tokens allowed into a prompt; longer pastes are compacted to fit.
+PROMPT_MESSAGE_TOKEN_BUDGET = _env_int("BHARAT_SURAKSHA_PROMPT_TOKEN_BUDGET", 1500)
+
+# ---------------------------
+# WhatsApp chat exports
+# ---------------------------
+# Consecutive messages from one sender form a turn. A window holds up to CHAT_WINDOW_TURNS
+# turns and CHAT_WINDOW_TOKENS estimated tokens; the next starts CHAT_WINDOW_STRIDE turns
+# later, so a scam spanning a window boundary is still seen whole in one of them.
+CHAT_WINDOW_TURNS = _env_int("BHARAT_SURAKSHA_CHAT_WINDOW_TURNS", 12)
+CHAT_WINDOW_STRIDE = _env_int("BHARAT_SURAKSHA_CHAT_WINDOW_STRIDE", 8)
+CHAT_WINDOW_TOKENS = _env_int("BHARAT_SURAKSHA_CHAT_WINDOW_TOKENS", 700)
+CHAT_CONCURRENCY = _env_int("BHARAT_SURAKSHA_CHAT_CONCURRENCY", 8)
+# Timeline resolution; longer chats merge neighbouring windows so memory stays flat.
+CHAT_TIMELINE_POINTS = _env_int("BHARAT_SURAKSHA_CHAT_TIMELINE_POINTS", 240)
+
+# ---------------------------
+# Multilingual explanations
+# ---------------------------
+# Verdicts missing the viewer's language (tier-0, templates) get one small translation
+# call, stored with the verdict; 0 serves English instead.
+EXPLANATION_TRANSLATE = _env_int("BHARAT_SURAKSHA_EXPLANATION_TRANSLATE", 1) != 0
+# Translations of identical explanations (tier-0 and template wording repeats) kept in memory.
+TRANSLATION_CACHE_ENTRIES = _env_int("BHARAT_SURAKSHA_TRANSLATION_CACHE_ENTRIES", 4096)
+
+# ---------------------------
+# Micro-batching (bulk and API callers)
+# ---------------------------
+# A batch is sent once it holds BATCH_MAX_ITEMS messages or BATCH_MAX_WAIT_MS after its first.
+BATCH_MAX_ITEMS = _env_int("BHARAT_SURAKSHA_BATCH_MAX_ITEMS", 8)
+BATCH_MAX_WAIT_MS = _env_float("BHARAT_SURAKSHA_BATCH_MAX_WAIT_MS", 50.0)
+# Messages longer than this (estimated tokens, after compaction) are always sent alone.
+BATCH_MAX_ITEM_TOKENS = _env_int("BHARAT_SURAKSHA_BATCH_MAX_ITEM_TOKENS", 400)
+
+# ---------------------------
+# HTTP scanning service (python -m bharat_suraksha serve)
+# ---------------------------
+SERVER_HOST = os.environ.get("BHARAT_SURAKSHA_SERVER_HOST", "127.0.0.1")
+SERVER_PORT = _env_int("BHARAT_SURAKSHA_SERVER_PORT", 8765)
+# Scans running at once; identical in-flight messages share one slot.
+SERVER_MAX_CONCURRENCY = _env_int("BHARAT_SURAKSHA_SERVER_MAX_CONCURRENCY", 32)
+# Scans queued behind those before new requests get 503 + Retry-After.
+SERVER_MAX_PENDING = _env_int("BHARAT_SURAKSHA_SERVER_MAX_PENDING", 1024)
+SERVER_MAX_BATCH = _env_int("BHARAT_SURAKSHA_SERVER_MAX_BATCH", 100)
+SERVER_MAX_BODY_BYTES = _env_int("BHARAT_SURAKSHA_SERVER_MAX_BODY_BYTES", 1 << 20)
+# Idle keep-alive connections are closed after this long.
+SERVER_KEEPALIVE_SECONDS = _env_float("BHARAT_SURAKSHA_SERVER_KEEPALIVE_SECONDS", 30.0)
+
+# ---------------------------
+# Stage metrics
+# ---------------------------
+# Per-stage latency histograms and counters; near-free when off. GET /metrics on the
+# service, --metrics-file on the CLI, or the admin panel in the app read them.
+METRICS_ENABLED = _env_int("BHARAT_SURAKSHA_METRICS", 0) != 0
+# When set, Prometheus text is rewritten here every METRICS_FILE_INTERVAL_SECONDS.
+METRICS_FILE = os.environ.get("BHARAT_SURAKSHA_METRICS_FILE") or None
+METRICS_FILE_INTERVAL_SECONDS = _env_float("BHARAT_SURAKSHA_METRICS_FILE_INTERVAL", 15.0)
+
+# ---------------------------
+# Audit log
+# ---------------------------
+# Every analysis as one redacted record in gzip JSONL segments under AUDIT_DIR/<UTC day>/.
+AUDIT_ENABLED = _env_int("BHARAT_SURAKSHA_AUDIT", 1) != 0
+AUDIT_DIR = os.environ.get("BHARAT_SURAKSHA_AUDIT_DIR", os.path.join(DATA_DIR, "audit"))
+# Secret for the keyed hashes of texts, sessions and listed entities. Unset -> a random
+# key kept in AUDIT_DIR/.key; share it with investigators who look records up by text.
+AUDIT_KEY = os.environ.get("BHARAT_SURAKSHA_AUDIT_KEY") or None
+# Records waiting for the writer thread; past this, scans drop their record rather than wait.
+AUDIT_QUEUE_SIZE = _env_int("BHARAT_SURAKSHA_AUDIT_QUEUE_SIZE", 10_000)
+# A segment closes at UTC midnight, after this much uncompressed JSON or after this long.
+AUDIT_SEGMENT_BYTES = _env_int("BHARAT_SURAKSHA_AUDIT_SEGMENT_BYTES", 64 * 2**20)
+AUDIT_SEGMENT_SECONDS = _env_float("BHARAT_SURAKSHA_AUDIT_SEGMENT_SECONDS", 3600.0)
+# Segments are sequences of independently decompressible blocks, indexed by time and
+# verdict; a block closes after this many records or seconds.
+AUDIT_BLOCK_RECORDS = _env_int("BHARAT_SURAKSHA_AUDIT_BLOCK_RECORDS", 2000)
+AUDIT_BLOCK_SECONDS = _env_float("BHARAT_SURAKSHA_AUDIT_BLOCK_SECONDS", 60.0)
+# Redacted message text and raw model reply kept per record, in characters.
+AUDIT_TEXT_CHARS = _env_int("BHARAT_SURAKSHA_AUDIT_TEXT_CHARS", 2000)
+AUDIT_RAW_CHARS = _env_int("BHARAT_SURAKSHA_AUDIT_RAW_CHARS", 4000)
+
+# ---------------------------
+# Per-session scan history (app)
+# ---------------------------
+# Each session keeps its last HISTORY_ENTRIES scans as compact records: the message capped
+# at HISTORY_TEXT_CHARS, no raw model reply. The result on screen keeps HISTORY_RAW_CHARS of it.
+HISTORY_ENTRIES = _env_int("BHARAT_SURAKSHA_HISTORY_ENTRIES", 20)
+HISTORY_TEXT_CHARS = _env_int("BHARAT_SURAKSHA_HISTORY_TEXT_CHARS", 1000)
+HISTORY_RAW_CHARS = _env_int("BHARAT_SURAKSHA_HISTORY_RAW_CHARS", 4000)
+# All sessions' histories together; past this the least recently active sessions lose
+# their oldest records first.
+HISTORY_MEMORY_BYTES = _env_int("BHARAT_SURAKSHA_HISTORY_MEMORY_BYTES", 32 * 2**20)
+
+# ---------------------------
+# Scam-report map
+# ---------------------------
+# Users may add where they received a message; reports are snapped to a grid cell (no
+# text, no session) and appended here. 0 hides the location field and the map.
+GEO_ENABLED = _env_int("BHARAT_SURAKSHA_GEO", 1) != 0
+GEO_REPORTS_PATH = os.environ.get("BHARAT_SURAKSHA_GEO_REPORTS", os.path.join(DATA_DIR, "geo_reports.bin"))
+# Finest grid: 2**level cells across India per axis (12 -> ~850 m, the most kept).
+GEO_GRID_LEVEL = min(_env_int("BHARAT_SURAKSHA_GEO_GRID_LEVEL", 12), 12)
+# Tiles drawn per map view (busiest first), and the fewest reports a drawn cell may hold
+# so one person's report is not pinpointed at street zoom.
+GEO_MAX_CELLS = _env_int("BHARAT_SURAKSHA_GEO_MAX_CELLS", 1500)
+GEO_MIN_CELL_REPORTS = _env_int("BHARAT_SURAKSHA_GEO_MIN_CELL_REPORTS", 2)
+
+# ---------------------------
+# Quantum Digital Dharma engine
+# ---------------------------
+# Unset -> fresh entropy per session; set an integer for reproducible measurements.
+QUBIT_SEED = _env_optional_int("BHARAT_SURAKSHA_QUBIT_SEED")
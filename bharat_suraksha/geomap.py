@@ -0,0 +1,349 @@
+"""
+Scam-report map: where users who opted in received scam messages, aggregated into grid
+tiles per zoom level so the map never plots individual reports.
+
+A report is a grid cell, a UTC day and the tropes it matched. Reports are appended as
+10-byte records to one file (several app processes can share it) and never carry the
+message, the session or exact coordinates: a location is snapped to a cell of the finest
+grid (2**level cells across India on each axis, ~850 m at level 12) before it is stored.
+
+For each zoom level the grid keeps one table of (trope, day, cell) -> count, sorted on
+that packed key. Cells are numbered row by row, so a trope, a day range and the rows of
+the map view are slices found by binary search, and only the rows in them are summed by
+cell. Tables absorb new reports lazily: a query merges just the records added since
+that level was last asked for. Trope 0 counts every report once; a report matching two
+selected tropes counts under each.
+
+    grid = ReportGrid()
+    grid.add(18.52, 73.86, ["KYC expiry"])
+    tiles = grid.tiles(level_for_zoom(6), tropes=["KYC expiry"], since_day=today() - 6)
+"""
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, Iterable, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from bharat_suraksha import config
+from bharat_suraksha.tropes import TROPES
+
+# Bounding box the grid covers (mainland India and the islands, with some margin).
+SOUTH, NORTH = 6.0, 37.6
+WEST, EAST = 68.0, 97.6
+MAX_LEVEL = 12  # cell ids are packed into 24 bits
+
+REPORT_DTYPE = np.dtype([("x", "<u2"), ("y", "<u2"), ("day", "<u2"), ("tropes", "<u4")])
+TROPE_NAMES: Tuple[str, ...] = tuple(t.name for t in TROPES)
+_TROPE_BITS = {name.lower(): i for i, name in enumerate(TROPE_NAMES)}
+assert len(TROPE_NAMES) < 32, "trope bitmask is 32 bits"
+
+_DAY_SHIFT = 24
+_TROPE_SHIFT = 40
+_CELL_MASK = (1 << _DAY_SHIFT) - 1
+
+# Where reports come from, by name; anything else is entered as "lat, lon".
+PLACES: Dict[str, Tuple[float, float]] = {
+    "agartala": (23.831, 91.286), "agra": (27.177, 78.008), "ahmedabad": (23.023, 72.571),
+    "aizawl": (23.727, 92.718), "amritsar": (31.634, 74.872), "aurangabad": (19.876, 75.343),
+    "bengaluru": (12.972, 77.595), "bhopal": (23.260, 77.413), "bhubaneswar": (20.296, 85.825),
+    "chandigarh": (30.733, 76.779), "chennai": (13.083, 80.271), "coimbatore": (11.017, 76.956),
+    "cuttack": (20.462, 85.883), "dehradun": (30.317, 78.032), "delhi": (28.704, 77.102),
+    "dhanbad": (23.795, 86.430), "gangtok": (27.339, 88.606), "gaya": (24.796, 85.008),
+    "ghaziabad": (28.669, 77.454), "gurugram": (28.459, 77.027), "guwahati": (26.144, 91.736),
+    "gwalior": (26.218, 78.182), "hubballi": (15.365, 75.124), "hyderabad": (17.385, 78.487),
+    "imphal": (24.817, 93.936), "indore": (22.720, 75.858), "itanagar": (27.084, 93.605),
+    "jabalpur": (23.181, 79.986), "jaipur": (26.912, 75.787), "jammu": (32.727, 74.857),
+    "jamshedpur": (22.805, 86.203), "jamtara": (23.963, 86.803), "jodhpur": (26.239, 73.024),
+    "kanpur": (26.449, 80.331), "kochi": (9.931, 76.267), "kohima": (25.674, 94.110),
+    "kolkata": (22.573, 88.364), "kota": (25.214, 75.864), "kozhikode": (11.259, 75.780),
+    "lucknow": (26.847, 80.947), "ludhiana": (30.901, 75.857), "madurai": (9.925, 78.120),
+    "mangaluru": (12.914, 74.856), "meerut": (28.984, 77.706), "mumbai": (19.076, 72.878),
+    "mysuru": (12.296, 76.639), "nagpur": (21.146, 79.088), "nashik": (19.998, 73.790),
+    "noida": (28.535, 77.391), "nuh": (28.104, 77.001), "panaji": (15.491, 73.828),
+    "patna": (25.594, 85.138), "prayagraj": (25.435, 81.846), "puducherry": (11.941, 79.808),
+    "pune": (18.520, 73.857), "raipur": (21.251, 81.630), "rajkot": (22.303, 70.802),
+    "ranchi": (23.344, 85.310), "salem": (11.664, 78.146), "shillong": (25.578, 91.893),
+    "shimla": (31.105, 77.173), "siliguri": (26.727, 88.395), "srinagar": (34.084, 74.797),
+    "surat": (21.170, 72.831), "thiruvananthapuram": (8.524, 76.936), "tiruchirappalli": (10.790, 78.705),
+    "udaipur": (24.585, 73.712), "vadodara": (22.307, 73.181), "varanasi": (25.318, 82.974),
+    "vijayawada": (16.506, 80.648), "visakhapatnam": (17.687, 83.218), "warangal": (17.968, 79.594),
+}
+_ALIASES = {
+    "bangalore": "bengaluru", "bombay": "mumbai", "calcutta": "kolkata", "madras": "chennai",
+    "new delhi": "delhi", "gurgaon": "gurugram", "trivandrum": "thiruvananthapuram", "cochin": "kochi",
+    "allahabad": "prayagraj", "mysore": "mysuru", "mangalore": "mangaluru", "vizag": "visakhapatnam",
+    "pondicherry": "puducherry", "banaras": "varanasi", "benares": "varanasi", "trichy": "tiruchirappalli",
+    "mewat": "nuh", "hubli": "hubballi", "calicut": "kozhikode", "baroda": "vadodara", "poona": "pune",
+}
+_LAT_LON = re.compile(r"^\s*(-?\d{1,2}(?:\.\d+)?)\s*[, ]\s*(-?\d{1,3}(?:\.\d+)?)\s*$")
+
+
+def resolve_location(text: str) -> Optional[Tuple[float, float]]:
+    """(lat, lon) for a known city name or "lat, lon" inside the grid; None otherwise."""
+    if not text or not text.strip():
+        return None
+    match = _LAT_LON.match(text)
+    if match:
+        lat, lon = float(match.group(1)), float(match.group(2))
+    else:
+        name = " ".join(text.lower().replace(",", " ").split())
+        point = PLACES.get(_ALIASES.get(name, name))
+        if point is None:
+            return None
+        lat, lon = point
+    if not (SOUTH <= lat < NORTH and WEST <= lon < EAST):
+        return None
+    return lat, lon
+
+
+def today(now: Optional[float] = None) -> int:
+    """UTC day number (days since 1970-01-01)."""
+    return int((time.time() if now is None else now) // 86400)
+
+
+def level_for_zoom(zoom: float, max_level: int = config.GEO_GRID_LEVEL) -> int:
+    """Grid level whose cells are ~20 px at a Leaflet zoom level."""
+    return int(min(max(round(zoom), 0), max_level))
+
+
+def cell_bounds(level: int, x: int, y: int) -> Tuple[Tuple[float, float], Tuple[float, float]]:
+    """((south, west), (north, east)) of cell (x, y) at level."""
+    n = 1 << level
+    height, width = (NORTH - SOUTH) / n, (EAST - WEST) / n
+    return (SOUTH + y * height, WEST + x * width), (SOUTH + (y + 1) * height, WEST + (x + 1) * width)
+
+
+def trope_mask(names: Iterable[str]) -> int:
+    """Bitmask of the registry tropes among names (case-insensitive); others are ignored."""
+    mask = 0
+    for name in names:
+        bit = _TROPE_BITS.get(str(name).strip().lower())
+        if bit is not None:
+            mask |= 1 << bit
+    return mask
+
+
+def _column(lon: float, n: int) -> int:
+    return min(max(int((lon - WEST) / (EAST - WEST) * n), 0), n - 1)
+
+
+def _row(lat: float, n: int) -> int:
+    return min(max(int((lat - SOUTH) / (NORTH - SOUTH) * n), 0), n - 1)
+
+
+class Tiles(NamedTuple):
+    level: int
+    x: np.ndarray  # cell columns
+    y: np.ndarray  # cell rows
+    counts: np.ndarray
+    reports: int  # in view, before max_cells and min_count
+    cells: int  # in view, before max_cells and min_count
+    rows: int  # index rows summed to answer the query
+
+
+class _Level:
+    __slots__ = ("keys", "counts", "merged", "first_day", "last_day")
+
+    def __init__(self):
+        self.keys = np.empty(0, dtype=np.int64)
+        self.counts = np.empty(0, dtype=np.int64)
+        self.merged = 0  # reports folded in so far
+        self.first_day, self.last_day = 1 << 16, -1
+
+
+class ReportGrid:
+    """
+    Process-wide report index. path=None keeps reports in memory only. Thread-safe; other
+    processes appending to the same file are picked up on the next query.
+    """
+
+    def __init__(self, path: Optional[str] = config.GEO_REPORTS_PATH, level: int = config.GEO_GRID_LEVEL):
+        if not 0 <= level <= MAX_LEVEL:
+            raise ValueError(f"level must be 0..{MAX_LEVEL}")
+        self.path = path
+        self.level = level
+        self._lock = threading.Lock()
+        self._reports = np.empty(1024, dtype=REPORT_DTYPE)
+        self._count = 0
+        self._file_bytes = 0
+        self._levels: Dict[int, _Level] = {}
+        self._appended = 0
+        self._refresh()
+
+    # ---------------------------
+    # Writing
+    # ---------------------------
+    def add(self, lat: float, lon: float, tropes: Iterable[str] = (), when: Optional[float] = None) -> bool:
+        """Record one report; False if the point is outside the grid."""
+        if not (SOUTH <= lat < NORTH and WEST <= lon < EAST):
+            return False
+        n = 1 << self.level
+        record = np.zeros(1, dtype=REPORT_DTYPE)
+        record["x"] = int((lon - WEST) / (EAST - WEST) * n)
+        record["y"] = int((lat - SOUTH) / (NORTH - SOUTH) * n)
+        record["day"] = today(when)
+        record["tropes"] = trope_mask(tropes)
+        with self._lock:
+            if self.path is None:
+                self._ingest(record)
+            else:
+                # One small O_APPEND write per report; records from other processes
+                # interleave whole, and everyone reads them back through _refresh.
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                try:
+                    os.write(fd, record.tobytes())
+                finally:
+                    os.close(fd)
+            self._appended += 1
+        return True
+
+    def add_many(self, records: np.ndarray) -> None:
+        """Bulk-load REPORT_DTYPE records (imports, benchmarks); memory-only grids only."""
+        if self.path is not None:
+            raise ValueError("add_many is for memory-only grids")
+        with self._lock:
+            self._ingest(np.asarray(records, dtype=REPORT_DTYPE))
+            self._appended += len(records)
+
+    def _ingest(self, records: np.ndarray) -> None:
+        needed = self._count + len(records)
+        if needed > len(self._reports):
+            grown = np.empty(max(needed, 2 * len(self._reports)), dtype=REPORT_DTYPE)
+            grown[: self._count] = self._reports[: self._count]
+            self._reports = grown
+        self._reports[self._count : needed] = records
+        self._count = needed
+
+    def _refresh(self) -> None:
+        """Read whole records appended to the file since the last look."""
+        if self.path is None:
+            return
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return
+        whole = size - size % REPORT_DTYPE.itemsize  # a concurrent write may be half done
+        if whole <= self._file_bytes:
+            return
+        with open(self.path, "rb") as f:
+            f.seek(self._file_bytes)
+            data = f.read(whole - self._file_bytes)
+        self._file_bytes += len(data)
+        self._ingest(np.frombuffer(data, dtype=REPORT_DTYPE))
+
+    # ---------------------------
+    # Reading
+    # ---------------------------
+    def _table(self, level: int) -> _Level:
+        """level's table with every report so far folded in."""
+        table = self._levels.setdefault(level, _Level())
+        if table.merged == self._count:
+            return table
+        new = self._reports[table.merged : self._count]
+        shift = self.level - level
+        cell = (new["y"].astype(np.int64) >> shift << level) | (new["x"].astype(np.int64) >> shift)
+        base = (new["day"].astype(np.int64) << _DAY_SHIFT) | cell
+        parts = [base]  # trope 0: every report
+        masks = new["tropes"]
+        for bit in range(len(TROPE_NAMES)):
+            hit = (masks & np.uint32(1 << bit)) != 0
+            if hit.any():
+                parts.append(base[hit] | ((bit + 1) << _TROPE_SHIFT))
+        added, inverse = np.unique(np.concatenate(parts), return_inverse=True)
+        added_counts = np.bincount(inverse, minlength=len(added)).astype(np.int64)
+        # Fold the (small, sorted) new keys into the sorted table without re-sorting it.
+        at = np.searchsorted(table.keys, added)
+        known = at < len(table.keys)
+        known[known] = table.keys[at[known]] == added[known]
+        np.add.at(table.counts, at[known], added_counts[known])
+        table.keys = np.insert(table.keys, at[~known], added[~known])
+        table.counts = np.insert(table.counts, at[~known], added_counts[~known])
+        table.first_day = min(table.first_day, int(new["day"].min()))
+        table.last_day = max(table.last_day, int(new["day"].max()))
+        table.merged = self._count
+        return table
+
+    def tiles(
+        self,
+        level: int,
+        tropes: Optional[Sequence[str]] = None,
+        since_day: Optional[int] = None,
+        until_day: Optional[int] = None,
+        bounds: Optional[Tuple[float, float, float, float]] = None,
+        max_cells: int = config.GEO_MAX_CELLS,
+        min_count: int = 1,
+    ) -> Tiles:
+        """
+        Report counts per cell at level for the given tropes (None or empty: every report)
+        and UTC days [since_day, until_day], inside bounds (south, west, north, east).
+        At most max_cells cells, the busiest first; cells under min_count are left out.
+        """
+        level = min(max(level, 0), self.level)
+        n = 1 << level
+        since = 0 if since_day is None else max(since_day, 0)
+        until = (1 << (_TROPE_SHIFT - _DAY_SHIFT)) - 1 if until_day is None else until_day
+        ids = [0] if not tropes else sorted({_TROPE_BITS[t.lower()] + 1 for t in tropes if t.lower() in _TROPE_BITS})
+        if bounds is not None:
+            south, west, north, east = bounds
+            x0, x1 = _column(west, n), _column(east, n)
+            y0, y1 = _row(south, n), _row(north, n)
+        with self._lock:
+            self._refresh()
+            table = self._table(level)
+            since, until = max(since, table.first_day), min(until, table.last_day)
+            if since > until:
+                ids = []
+            days = np.arange(since, until + 1, dtype=np.int64)
+            starts, stops = [], []
+            for trope_id in ids:
+                if bounds is None:
+                    # Whole grid: one slice from since's first cell to until's last.
+                    starts.append([(trope_id << _TROPE_SHIFT) | (since << _DAY_SHIFT)])
+                    stops.append([(trope_id << _TROPE_SHIFT) | ((until + 1) << _DAY_SHIFT)])
+                else:
+                    # Cells are row-major, so the view's rows are one slice per day.
+                    prefix = (trope_id << _TROPE_SHIFT) | (days << _DAY_SHIFT)
+                    starts.append(prefix | (y0 << level))
+                    stops.append(prefix | ((y1 + 1) << level))
+            if starts:
+                lo = np.searchsorted(table.keys, np.concatenate(starts))
+                hi = np.searchsorted(table.keys, np.concatenate(stops))
+                lengths = hi - lo
+                # Row numbers of every slice, without a Python loop over the slices.
+                offsets = np.repeat(lo - np.cumsum(lengths) + lengths, lengths)
+                index = np.arange(int(lengths.sum()), dtype=np.int64) + offsets
+                keys, counts = table.keys[index], table.counts[index]
+            else:
+                keys = counts = np.empty(0, dtype=np.int64)
+        if not len(keys):
+            empty = np.empty(0, dtype=np.int64)
+            return Tiles(level, empty, empty, empty, 0, 0, 0)
+        rows = len(keys)
+        cells, inverse = np.unique(keys & _CELL_MASK, return_inverse=True)
+        counts = np.bincount(inverse, weights=counts, minlength=len(cells)).astype(np.int64)
+        x, y = cells & ((1 << level) - 1), cells >> level
+        if bounds is not None:
+            inside = (x >= x0) & (x <= x1)
+            x, y, counts = x[inside], y[inside], counts[inside]
+        reports, in_view = int(counts.sum()), len(counts)
+        if min_count > 1:
+            keep = counts >= min_count
+            x, y, counts = x[keep], y[keep], counts[keep]
+        if len(counts) > max_cells:
+            top = np.argpartition(counts, len(counts) - max_cells)[-max_cells:]
+            x, y, counts = x[top], y[top], counts[top]
+        return Tiles(level, x, y, counts, reports, in_view, rows)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._refresh()
+            return {
+                "reports": self._count,
+                "appended": self._appended,
+                "levels_built": sorted(self._levels),
+                "index_rows": {level: len(t.keys) for level, t in sorted(self._levels.items())},
+                "bytes": self._reports.nbytes + sum(t.keys.nbytes + t.counts.nbytes for t in self._levels.values()),
+            }
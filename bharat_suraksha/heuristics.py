@@ -0,0 +1,66 @@
+"""
+Local scam heuristics for degraded mode.
+
+When the forensic AI is not consulted (upstream outage, open circuit breaker, shed by the
+shared-key scheduler) a scan still needs a usable answer. heuristic_assessment scores a
+message from the shared trope registry plus a few keyword signals that scam SMS almost
+always carry: a pressure deadline, a threat, a credential request, a money hook, a link
+or a call-back number. It is deliberately conservative: no signals gives a low score,
+but the verdict layer never reports such a message as cleared.
+"""
+import re
+from typing import List, NamedTuple, Tuple
+
+from bharat_suraksha.tropes import matched_tropes
+
+# (signal, tactic it evidences, pattern)
+SIGNALS: Tuple[Tuple[str, str, "re.Pattern[str]"], ...] = (
+    (
+        "deadline",
+        "urgency",
+        re.compile(
+            r"\b(?:urgent(?:ly)?|immediately|today|tonight|within \d+ ?(?:hours?|hrs?|minutes?|mins?)|last chance|"
+            r"expires?|expiring|turant|abhi|jaldi)\b|तुरंत|आज ही",
+            re.I,
+        ),
+    ),
+    (
+        "threat",
+        "fear",
+        re.compile(
+            r"\b(?:blocked|suspended|deactivated|disconnected|arrest(?:ed)?|legal action|police|penalty|fine|"
+            r"band ho jayega|kat jayegi)\b|बंद|गिरफ्तार",
+            re.I,
+        ),
+    ),
+    ("credential", "phishing", re.compile(r"\b(?:otp|pin|cvv|password|kyc|aadhaa?r|pan card|login|verify)\b", re.I)),
+    (
+        "money",
+        "baiting",
+        re.compile(r"(?:₹|\brs\.?\s?\d|\binr\b|\b(?:lottery|prize|won|winner|refund|cashback|reward|loan approved)\b)", re.I),
+    ),
+    ("link", "phishing", re.compile(r"(?:https?://|www\.)\S+|\b[a-z0-9-]+\.(?:ly|gl|gd|xyz|top|link|click)/\S*", re.I)),
+    ("callback", "pretexting", re.compile(r"(?<!\d)(?:\+?91[\s-]?)?[6-9]\d{4}[\s-]?\d{5}(?!\d)")),
+)
+
+
+class Assessment(NamedTuple):
+    score: int  # 0-100
+    patterns: List[str]  # trope names
+    signals: List[str]
+    tactics: List[str]
+
+
+def heuristic_assessment(text: str) -> Assessment:
+    """Trope hits weigh most; each distinct keyword signal adds on top. Capped at 95."""
+    text = text or ""
+    patterns = matched_tropes(text)
+    signals: List[str] = []
+    tactics: List[str] = []
+    for name, tactic, pattern in SIGNALS:
+        if pattern.search(text):
+            signals.append(name)
+            if tactic not in tactics:
+                tactics.append(tactic)
+    score = 10 + 25 * min(2, len(patterns)) + 12 * len(signals)
+    return Assessment(min(95, score), patterns, signals, tactics)
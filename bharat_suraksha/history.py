@@ -0,0 +1,285 @@
+"""
+Per-session scan history for the app: a fixed-size ring of compact records, plus a
+process-wide ledger that caps what all sessions' histories hold together.
+
+A record keeps what the result card and a CSV export need (verdict, score, tactics, the
+explanations, a capped copy of the message) in a slotted object; the raw model reply is
+not kept (the audit log has a redacted copy). Histories live in each session's state and
+are registered weakly with the ledger, so a closed session's history is freed with it.
+Past the ledger's byte budget the oldest records of the least recently active sessions
+are dropped first.
+
+    ledger = SessionLedger()
+    history = ledger.open(session_id)
+    history.add(text, verdict, "Hindi")
+    history.to_csv("Hindi")
+"""
+import csv
+import io
+import itertools
+import sys
+import threading
+import time
+import weakref
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from bharat_suraksha import config
+from bharat_suraksha.bulk import verdict_source
+from bharat_suraksha.languages import language_code, pick_explanation
+from bharat_suraksha.risk import risk_level
+
+CSV_COLUMNS = (
+    "scanned_at_utc",
+    "language",
+    "is_scam",
+    "score",
+    "risk",
+    "source",
+    "tactics",
+    "matched_patterns",
+    "explanation",
+    "message",
+)
+# Spreadsheets evaluate cells starting with these; scam texts are attacker-written.
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+_IDS = itertools.count(1)
+
+
+def trim_raw(verdict: Dict[str, Any], limit: int = config.HISTORY_RAW_CHARS) -> Dict[str, Any]:
+    """Shallow copy of verdict with its raw model reply cut to limit characters (same dict if short)."""
+    raw = verdict.get("raw")
+    if not isinstance(raw, str) or len(raw) <= limit:
+        return verdict
+    trimmed = dict(verdict)
+    trimmed["raw"] = raw[:limit] + f"\n… [{len(raw) - limit:,} more characters not kept]"
+    return trimmed
+
+
+def _cell(value: str) -> str:
+    return "'" + value if value.startswith(_FORMULA_PREFIXES) else value
+
+
+class HistoryEntry:
+    """One scan, compacted. text is capped; chars is the length of the message as scanned."""
+
+    __slots__ = (
+        "id",
+        "ts",
+        "text",
+        "chars",
+        "language",
+        "is_scam",
+        "score",
+        "tactics",
+        "matched_patterns",
+        "explanations",
+        "source",
+        "nbytes",
+    )
+
+    def __init__(self, text: str, verdict: Dict[str, Any], language: str, text_chars: int):
+        self.id = next(_IDS)
+        self.ts = time.time()
+        self.text = text[:text_chars]
+        self.chars = len(text)
+        self.language = language
+        self.is_scam = str(verdict.get("is_scam", ""))
+        self.score = int(verdict.get("score", 50) or 0)
+        self.tactics = tuple(verdict.get("tactics") or verdict.get("social_engineering_tactics") or ())
+        self.matched_patterns = tuple(verdict.get("matched_patterns") or ())
+        self.explanations = {code: value for code, value in (verdict.get("explanations") or {}).items() if value}
+        self.source = "local_fallback" if verdict.get("degraded") else verdict_source(verdict)
+        self.nbytes = self._sizeof()
+
+    def _sizeof(self) -> int:
+        size = sys.getsizeof(self) + sys.getsizeof(self.tactics) + sys.getsizeof(self.matched_patterns)
+        size += sum(sys.getsizeof(s) for s in (self.text, self.is_scam, *self.tactics, *self.matched_patterns))
+        size += sys.getsizeof(self.explanations) + sum(sys.getsizeof(s) for s in self.explanations.values())
+        return size
+
+    @property
+    def truncated(self) -> bool:
+        return self.chars > len(self.text)
+
+    def verdict(self) -> Dict[str, Any]:
+        """A fresh verdict dict for the result card; marked with where it came from."""
+        verdict = {
+            "is_scam": self.is_scam,
+            "score": self.score,
+            "tactics": list(self.tactics),
+            "matched_patterns": list(self.matched_patterns),
+            "explanations": dict(self.explanations),
+            "history": {"id": self.id, "ts": self.ts, "source": self.source},
+        }
+        if self.source == "local_fallback":
+            verdict["degraded"] = "history"
+        return verdict
+
+    def row(self, code: str) -> List[Any]:
+        _, explanation = pick_explanation(self.explanations, code)
+        return [
+            time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(self.ts)),
+            self.language,
+            self.is_scam,
+            self.score,
+            risk_level(self.score),
+            self.source,
+            _cell("; ".join(self.tactics)),
+            _cell("; ".join(self.matched_patterns)),
+            _cell(explanation),
+            _cell(self.text),
+        ]
+
+
+class SessionHistory:
+    """Ring of the last `entries` scans of one session. Mutated only under its ledger's lock."""
+
+    def __init__(self, ledger: "SessionLedger", session_id: str, entries: int, text_chars: int):
+        self.session_id = session_id
+        self.text_chars = text_chars
+        self.nbytes = 0
+        self._ledger = ledger
+        self._entries: Deque[HistoryEntry] = deque(maxlen=max(1, entries))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, text: str, verdict: Dict[str, Any], language: str) -> HistoryEntry:
+        entry = HistoryEntry(text, verdict, language, self.text_chars)
+        ledger = self._ledger
+        with ledger._lock:
+            if len(self._entries) == self._entries.maxlen:
+                self._charge(-self._entries[0].nbytes)
+            self._entries.append(entry)
+            self._charge(entry.nbytes)
+            ledger._touch(self)
+            ledger._enforce(keep=self)
+        return entry
+
+    def entries(self) -> List[HistoryEntry]:
+        """Newest first."""
+        with self._ledger._lock:
+            return list(reversed(self._entries))
+
+    def get(self, entry_id: int) -> Optional[HistoryEntry]:
+        with self._ledger._lock:
+            entry = next((e for e in self._entries if e.id == entry_id), None)
+            if entry is not None:
+                self._ledger._touch(self)
+            return entry
+
+    def clear(self) -> None:
+        with self._ledger._lock:
+            self._entries.clear()
+            self._charge(-self.nbytes)
+            self._ledger._forget(self.session_id)
+
+    def _charge(self, nbytes: int) -> None:
+        self.nbytes += nbytes
+        self._ledger._bytes += nbytes
+
+    def _drop_oldest(self) -> None:
+        self._charge(-self._entries.popleft().nbytes)
+
+    def to_csv(self, language: str = "English") -> str:
+        """Oldest first, explanations in language (else English); cells safe to open in a spreadsheet."""
+        code = language_code(language)
+        with self._ledger._lock:
+            entries = list(self._entries)
+        out = io.StringIO()
+        writer = csv.writer(out)
+        writer.writerow(CSV_COLUMNS)
+        writer.writerows(entry.row(code) for entry in entries)
+        return out.getvalue()
+
+
+class SessionLedger:
+    """
+    Process-wide registry of session histories with one byte budget across all of them.
+    Sizes are estimates (sys.getsizeof of each record and its strings), kept as a running
+    total as records come and go; sessions holding records are ordered by last activity,
+    so trimming starts at the front without scanning or sorting every session.
+    """
+
+    def __init__(
+        self,
+        budget_bytes: int = config.HISTORY_MEMORY_BYTES,
+        entries: int = config.HISTORY_ENTRIES,
+        text_chars: int = config.HISTORY_TEXT_CHARS,
+    ):
+        self.budget_bytes = max(0, budget_bytes)
+        self.entries = entries
+        self.text_chars = text_chars
+        self._lock = threading.Lock()
+        self._histories: "weakref.WeakValueDictionary[str, SessionHistory]" = weakref.WeakValueDictionary()
+        # Sessions holding records, least recently active first, with the bytes each held
+        # when last charged; sessions that ended are settled from _ended on the next call.
+        self._active: "OrderedDict[str, Tuple[weakref.ref, List[int]]]" = OrderedDict()
+        self._ended: List[weakref.ref] = []
+        self._bytes = 0
+        self._evicted = 0
+
+    def open(self, session_id: str) -> SessionHistory:
+        """The session's history; the caller keeps it alive (in session state)."""
+        with self._lock:
+            history = self._histories.get(session_id)
+            if history is None:
+                history = SessionHistory(self, session_id, self.entries, self.text_chars)
+                self._histories[session_id] = history
+            return history
+
+    def _touch(self, history: SessionHistory) -> None:
+        self._settle()
+        slot = self._active.get(history.session_id)
+        if slot is None or slot[0]() is not history:
+            # The weakref callback may run on any thread, even one holding the lock, so it
+            # only queues the ended session.
+            self._active[history.session_id] = (weakref.ref(history, self._ended.append), [history.nbytes])
+        else:
+            slot[1][0] = history.nbytes
+            self._active.move_to_end(history.session_id)
+
+    def _forget(self, session_id: str) -> None:
+        self._active.pop(session_id, None)
+
+    def _settle(self) -> None:
+        """Release the bytes of sessions whose history was garbage-collected."""
+        while self._ended:
+            ref = self._ended.pop()
+            for session_id, (held, nbytes) in list(self._active.items()):
+                if held is ref:
+                    del self._active[session_id]
+                    self._bytes -= nbytes[0]
+                    break
+
+    def _enforce(self, keep: SessionHistory) -> None:
+        """Trim least recently active sessions first; keep's newest record always survives."""
+        while self._bytes > self.budget_bytes and self._active:
+            session_id, (ref, held) = next(iter(self._active.items()))
+            history = ref()
+            if history is None:
+                del self._active[session_id]
+                self._bytes -= held[0]
+                continue
+            floor = 1 if history is keep else 0
+            while self._bytes > self.budget_bytes and len(history) > floor:
+                history._drop_oldest()
+                self._evicted += 1
+            held[0] = history.nbytes
+            if history is keep:
+                return  # keep was just touched, so every other session is already empty
+            if not history:
+                del self._active[session_id]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._settle()
+            histories = [ref() for ref, _ in self._active.values()]
+            return {
+                "sessions": len(self._histories),
+                "entries": sum(len(h) for h in histories if h is not None),
+                "bytes": self._bytes,
+                "budget_bytes": self.budget_bytes,
+                "evicted": self._evicted,
+            }
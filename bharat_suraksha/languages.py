@@ -0,0 +1,57 @@
+"""
+Languages verdicts are explained in, by UI name, with their ISO 639-1 codes.
+
+The model writes one explanation per code in the same call, so switching language never
+needs another scan. Verdicts that arrive with fewer (tier-0, on-box estimates, entries
+indexed before a language was added) fall back to English, or are translated on demand
+by Scanner.explanation.
+"""
+from typing import Dict, Mapping, Optional, Tuple
+
+# UI name -> ISO 639-1 code. Order is the order the prompt asks for them in.
+LANGUAGE_CODES: Dict[str, str] = {
+    "English": "en",
+    "Hindi": "hi",
+    "Bengali": "bn",
+    "Tamil": "ta",
+    "Telugu": "te",
+}
+EXPLANATION_CODES: Tuple[str, ...] = tuple(LANGUAGE_CODES.values())
+DEFAULT_CODE = "en"
+
+_BY_CODE = {code: name for name, code in LANGUAGE_CODES.items()}
+
+
+def language_code(language: Optional[str]) -> str:
+    """ISO code for a UI name or a code ("Tamil", "ta", "TA"); anything unknown is English."""
+    if not language:
+        return DEFAULT_CODE
+    if language in LANGUAGE_CODES:
+        return LANGUAGE_CODES[language]
+    code = language.strip().lower()
+    if code in _BY_CODE:
+        return code
+    for name, known in LANGUAGE_CODES.items():
+        if name.lower() == code:
+            return known
+    return DEFAULT_CODE
+
+
+def language_name(code: str) -> str:
+    return _BY_CODE.get(code, code)
+
+
+def pick_explanation(explanations: Optional[Mapping[str, str]], code: str) -> Tuple[Optional[str], str]:
+    """
+    (code served, text): the requested language if present, else English, else whatever
+    the verdict has. (None, "") when it has no explanation at all.
+    """
+    explanations = explanations or {}
+    for candidate in (code, DEFAULT_CODE):
+        text = explanations.get(candidate)
+        if text:
+            return candidate, text
+    for candidate, text in explanations.items():
+        if text:
+            return candidate, text
+    return None, ""
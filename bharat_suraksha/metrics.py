@@ -0,0 +1,222 @@
+"""
+Per-stage latency histograms and counters, exportable as Prometheus text.
+
+    with METRICS.timer("model_call"):
+        ...
+    METRICS.inc("scans", source="cache")
+
+Disabled by default (BHARAT_SURAKSHA_METRICS=1 or the admin panel turns it on). While
+disabled, timer() hands back one shared no-op context manager and inc()/observe() return
+after a single attribute check, so instrumented hot paths cost next to nothing.
+
+Histograms use fixed millisecond buckets: observing is a bisect plus two increments, and
+p50/p95/p99 are interpolated within the bucket that holds the rank, as Prometheus'
+histogram_quantile does. Names and labels are kept few and static on purpose.
+"""
+import bisect
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from bharat_suraksha import config
+
+# Upper bounds in milliseconds; a final +Inf bucket is implicit.
+BUCKETS_MS: Tuple[float, ...] = (
+    0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 15, 20, 30, 50, 75, 100, 150, 200, 300, 500, 750,
+    1000, 1500, 2000, 3000, 5000, 7500, 10000, 15000, 20000, 30000, 60000,
+)
+PREFIX = "bharat_suraksha"
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    __slots__ = ("counts", "count", "sum_ms")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.sum_ms = 0.0
+
+    def observe(self, ms: float) -> None:
+        # Caller holds the registry lock.
+        self.counts[bisect.bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.sum_ms += ms
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if seen + n >= rank and n:
+                lower = BUCKETS_MS[i - 1] if i else 0.0
+                upper = BUCKETS_MS[i] if i < len(BUCKETS_MS) else BUCKETS_MS[-1]
+                return lower + (upper - lower) * (rank - seen) / n
+            seen += n
+        return BUCKETS_MS[-1]
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    __slots__ = ("registry", "stage", "started")
+
+    def __init__(self, registry: "Registry", stage: str):
+        self.registry = registry
+        self.stage = stage
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.registry.observe(self.stage, (time.perf_counter() - self.started) * 1000)
+        return False
+
+
+class Registry:
+    """Thread-safe; one process-wide instance (METRICS) is shared by every caller."""
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, Histogram] = {}
+        self._counters: Dict[Tuple[str, LabelKey], float] = {}
+
+    def timer(self, stage: str):
+        """Context manager timing one stage; a shared no-op while disabled."""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, stage)
+
+    def observe(self, stage: str, ms: float) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = Histogram()
+            histogram.observe(ms)
+
+    def inc(self, name: str, n: float = 1, **labels: str) -> None:
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + n
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    # ---------------------------
+    # Reading / export
+    # ---------------------------
+    def stage_summary(self) -> List[Dict[str, Any]]:
+        """One row per stage: count, mean and p50/p95/p99 in ms, slowest p95 first."""
+        with self._lock:
+            rows = [
+                {
+                    "stage": stage,
+                    "count": h.count,
+                    "mean_ms": h.sum_ms / h.count if h.count else None,
+                    "p50_ms": h.quantile(0.50),
+                    "p95_ms": h.quantile(0.95),
+                    "p99_ms": h.quantile(0.99),
+                }
+                for stage, h in self._histograms.items()
+            ]
+        return sorted(rows, key=lambda row: -(row["p95_ms"] or 0))
+
+    def counters(self) -> Dict[str, float]:
+        """Flat {'name{label="v"}': value} view for display."""
+        with self._lock:
+            items = list(self._counters.items())
+        return {name + _labels(labels): value for (name, labels), value in sorted(items)}
+
+    def prometheus_text(self) -> str:
+        """Prometheus text exposition format (v0.0.4)."""
+        with self._lock:
+            histograms = {stage: (list(h.counts), h.count, h.sum_ms) for stage, h in self._histograms.items()}
+            counters = list(self._counters.items())
+        lines: List[str] = []
+        metric = f"{PREFIX}_stage_duration_seconds"
+        lines.append(f"# HELP {metric} Wall time per scan stage.")
+        lines.append(f"# TYPE {metric} histogram")
+        for stage in sorted(histograms):
+            counts, count, sum_ms = histograms[stage]
+            cumulative = 0
+            for bound, n in zip(BUCKETS_MS + (float("inf"),), counts):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else repr(bound / 1000.0)
+                lines.append(f'{metric}_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+            lines.append(f'{metric}_sum{{stage="{stage}"}} {sum_ms / 1000.0!r}')
+            lines.append(f'{metric}_count{{stage="{stage}"}} {count}')
+        declared = set()
+        for (name, labels), value in sorted(counters):
+            full = f"{PREFIX}_{name}_total"
+            if full not in declared:
+                declared.add(full)
+                lines.append(f"# TYPE {full} counter")
+            lines.append(f"{full}{_labels(labels)} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str) -> None:
+        """Atomically write the exposition text, e.g. for node_exporter's textfile collector."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            fh.write(self.prometheus_text())
+        os.replace(tmp, path)
+
+    def start_file_exporter(self, path: str, interval_seconds: float = 15.0) -> threading.Thread:
+        """Rewrite path every interval on a daemon thread; write errors are ignored."""
+
+        def run() -> None:
+            while True:
+                time.sleep(interval_seconds)
+                try:
+                    self.write_prometheus(path)
+                except OSError:
+                    pass
+
+        thread = threading.Thread(target=run, name="metrics-exporter", daemon=True)
+        thread.start()
+        return thread
+
+
+def _number(value: float) -> str:
+    """Full precision; :g keeps six digits, so a counter past 1e6 would look flat."""
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _labels(labels: LabelKey) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+METRICS = Registry(enabled=config.METRICS_ENABLED)
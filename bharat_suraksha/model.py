@@ -0,0 +1,195 @@
+"""
+Model clients and the defensive call wrapper.
+
+Any object with `generate(prompt) -> str` is a model client, so tests, workers and the
+HTTP service can plug in their own. Objects exposing the google.generativeai
+`generate_content(prompt)` interface are accepted as well. `google.generativeai` is
+imported only when a GeminiClient first connects.
+"""
+import json
+import re
+import threading
+import time
+from typing import Any, Dict, Iterator, Optional, Protocol
+
+from bharat_suraksha.parsing import RESPONSE_SCHEMA, failed_verdict, parse_model_response
+
+MODEL_NAME = "gemini-1.5-flash"
+
+
+class ModelClient(Protocol):
+    def generate(self, prompt: str) -> str:
+        ...
+
+
+class ModelUnavailable(RuntimeError):
+    """No model client could be configured (missing key, bad key, no network)."""
+
+
+def response_text(response: Any) -> str:
+    # Extract text safely; the response object shape may vary by client version
+    if hasattr(response, "text") and response.text:
+        return response.text
+    if hasattr(response, "candidates") and response.candidates:
+        first = response.candidates[0]
+        return getattr(first, "content", getattr(first, "text", str(first)))
+    return str(response)
+
+
+def _chunk_text(chunk: Any) -> str:
+    # Stream chunks without parts (e.g. the final finish-reason chunk) raise on .text
+    try:
+        return chunk.text or ""
+    except (AttributeError, ValueError):
+        return ""
+
+
+class GeminiClient:
+    """
+    Lazily-connected google.generativeai client bound to one API key.
+
+    The key goes into this client's own GenerativeServiceClient instead of the
+    process-global `genai.configure`, so sessions with different keys can share a process.
+    """
+
+    def __init__(self, api_key: Optional[str], model_name: str = MODEL_NAME, structured: bool = True):
+        self.api_key = api_key
+        self.model_name = model_name
+        # Structured output: JSON MIME type + RESPONSE_SCHEMA, so replies parse strictly.
+        self.structured = structured
+        self._model = None
+        self._lock = threading.Lock()
+
+    def connect(self):
+        if self._model is None:
+            if not self.api_key:
+                raise ModelUnavailable("No API key available")
+            with self._lock:
+                if self._model is None:
+                    import google.ai.generativelanguage as glm
+                    import google.generativeai as genai
+
+                    generation_config = None
+                    if self.structured:
+                        generation_config = {"response_mime_type": "application/json", "response_schema": RESPONSE_SCHEMA}
+                    model = genai.GenerativeModel(self.model_name, generation_config=generation_config)
+                    model._client = glm.GenerativeServiceClient(client_options={"api_key": self.api_key})
+                    self._model = model
+        return self._model
+
+    def warm_up(self) -> None:
+        """Connect and open the channel with a free count_tokens call; failures are ignored."""
+        model = self.connect()
+        try:
+            model.count_tokens("ping")
+        except Exception:
+            pass
+
+    # generate_text passes the per-attempt timeout and per-call schema through to the SDK.
+    supports_request_options = True
+
+    def generate(self, prompt: str, timeout: Optional[float] = None, response_schema: Optional[Dict[str, Any]] = None) -> str:
+        kwargs: Dict[str, Any] = {}
+        if timeout is not None:
+            kwargs["request_options"] = {"timeout": timeout}
+        if response_schema is not None and self.structured:
+            kwargs["generation_config"] = {"response_mime_type": "application/json", "response_schema": response_schema}
+        return response_text(self.connect().generate_content(prompt, **kwargs))
+
+    def generate_stream(self, prompt: str, timeout: Optional[float] = None) -> Iterator[str]:
+        request_options = {"timeout": timeout} if timeout is not None else None
+        for chunk in self.connect().generate_content(prompt, stream=True, request_options=request_options):
+            text = _chunk_text(chunk)
+            if text:
+                yield text
+
+
+class StubModelClient:
+    """
+    Offline stand-in for the model: scores each message from local trope hits and answers
+    in the verdict JSON shape (an id-tagged array for batch prompts). For tests, load
+    benchmarks and running the HTTP service without a key; never for real verdicts.
+    """
+
+    _MESSAGE = re.compile(r'^Message: """(.*?)"""$', re.S | re.M)
+    _BATCH_ITEM = re.compile(r'^\[(\d+)\] """(.*?)"""$', re.S | re.M)
+
+    def __init__(self, latency_ms: float = 0.0):
+        self.latency_ms = latency_ms
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    @staticmethod
+    def verdict_for(message: str) -> Dict[str, Any]:
+        from bharat_suraksha.tropes import matched_tropes
+
+        tropes = matched_tropes(message)
+        score = min(95, 10 + 35 * len(tropes))
+        return {
+            "is_scam": "yes" if score > 66 else "suspect" if score > 33 else "no",
+            "score": score,
+            "explanations": {
+                "en": f"Offline stub: matched {', '.join(tropes)}." if tropes else "Offline stub: no known scam pattern.",
+                "hi": "ऑफ़लाइन स्टब उत्तर।",
+            },
+            "social_engineering_tactics": ["pretexting"] if tropes else [],
+            "matched_patterns": tropes,
+        }
+
+    def generate(self, prompt: str) -> str:
+        with self._lock:
+            self.calls += 1
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000.0)
+        items = self._BATCH_ITEM.findall(prompt)
+        if items:
+            return json.dumps([dict(self.verdict_for(text), id=int(i)) for i, text in items], ensure_ascii=False)
+        match = self._MESSAGE.search(prompt)
+        return json.dumps(self.verdict_for(match.group(1) if match else prompt), ensure_ascii=False)
+
+
+def stream_text(model: Any, prompt: str, timeout: Optional[float] = None) -> Iterator[str]:
+    """Yield response text chunks; clients without a streaming method yield one chunk."""
+    if hasattr(model, "generate_stream"):
+        if timeout is not None and getattr(model, "supports_request_options", False):
+            yield from model.generate_stream(prompt, timeout=timeout)
+        else:
+            yield from model.generate_stream(prompt)
+    elif hasattr(model, "generate"):
+        yield generate_text(model, prompt, timeout)
+    else:
+        for chunk in model.generate_content(prompt, stream=True):
+            text = _chunk_text(chunk)
+            if text:
+                yield text
+
+
+def generate_text(
+    model: Any, prompt: str, timeout: Optional[float] = None, response_schema: Optional[Dict[str, Any]] = None
+) -> str:
+    """
+    Text reply from any client. Timeout and schema reach clients that declare
+    supports_request_options; others get the bare prompt.
+    """
+    if hasattr(model, "generate"):
+        if getattr(model, "supports_request_options", False):
+            return model.generate(prompt, timeout=timeout, response_schema=response_schema)
+        return model.generate(prompt)
+    return response_text(model.generate_content(prompt))
+
+
+def call_model_and_parse(model: Any, prompt: str) -> Dict[str, Any]:
+    """
+    Call the model with defensive error handling.
+    Validate against the verdict schema (one repair pass); fall back to safe heuristics.
+    On failure the result carries an 'error' key so callers can warn and skip caching.
+    """
+    try:
+        raw_text = generate_text(model, prompt)
+    except Exception as e:
+        # Keep error minimal for user, but include fallback raw JSON for debug
+        parsed = failed_verdict()
+        parsed["raw"] = json.dumps({"error": "model_call_failed", "message": str(e)})
+        parsed["error"] = "model_call_failed"
+        return parsed
+    return parse_model_response(raw_text)
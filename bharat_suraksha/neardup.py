@@ -0,0 +1,315 @@
+"""
+Near-duplicate scam template index.
+
+Scam campaigns reuse one template with a different name, amount, phone number or short
+link. Messages are masked (URLs, UPI IDs, phone numbers, amounts, salutation names),
+shingled into word 3-grams and reduced to a 64-bit SimHash. Similarity is
+1 - hamming_distance / 64.
+
+The index is array-backed: signatures live in one uint64 array and every band of the
+signature has a sorted key array plus a parallel id array, so a lookup is a handful of
+`searchsorted` calls followed by a vectorized popcount over the candidates. By the
+pigeonhole principle, splitting the signature into `max_distance + 1` bands guarantees
+that any signature within `max_distance` bits shares at least one band exactly.
+Recent inserts sit in a small unsorted tail that is scanned linearly and merged into
+the sorted bands in bulk.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# ---------------------------
+# Masking & shingling
+# ---------------------------
+_URL = re.compile(
+    r"(?:https?://|www\.)\S+|\b[a-z0-9][a-z0-9-]*(?:\.[a-z0-9-]+)*\.(?:com|in|net|org|co|info|xyz|top|site|online|link|app|ly|me|io|cc|gl)\b(?:/\S*)?",
+    re.I,
+)
+_EMAIL = re.compile(r"\b[\w.+-]+@[\w-]+\.[\w.-]+\b")
+_UPI = re.compile(r"\b[\w.-]{2,}@[a-z]{2,}\b", re.I)
+_PHONE = re.compile(r"(?:\+?91[\s-]?)?\b[6-9]\d{4}[\s-]?\d{5}\b")
+_NUMBER = re.compile(r"(?:(?:rs\.?|inr|₹)\s*)?(?<![^\W\d_])\d[\d,]*(?:\.\d+)?", re.I)
+_NAME = re.compile(
+    r"\b((?i:dear|hi|hello|mr\.?|mrs\.?|ms\.?|shri|smt\.?|sir|madam|customer))\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+){0,2})"
+)
+_TOKEN = re.compile(r"<\w+>|\w+")
+_DIGIT = re.compile(r"\d")
+
+SHINGLE_SIZE = 3
+SIGNATURE_BITS = 64
+# Words left after masking that a message needs to be matched as a template. Shorter ones
+# ("Call <phone>", a bare <url>) would all share one signature, so they go to the model.
+MIN_CONTENT_TOKENS = SHINGLE_SIZE + 2
+
+
+def mask_message(message: str) -> str:
+    """
+    Replace the parts of a message that vary between copies of one template.
+    Names are only masked after a salutation, where they are reliably the recipient.
+    """
+    text = _URL.sub(" <url> ", message or "")
+    if "@" in text:
+        text = _EMAIL.sub(" <email> ", text)
+        text = _UPI.sub(" <upi> ", text)
+    has_digits = _DIGIT.search(text) is not None
+    if has_digits:
+        text = _PHONE.sub(" <phone> ", text)
+    text = _NAME.sub(lambda m: f"{m.group(1)} <name>", text)
+    if has_digits:
+        text = _NUMBER.sub(" <num> ", text)
+    return " ".join(text.casefold().split())
+
+
+def shingles(masked: str, size: int = SHINGLE_SIZE) -> List[str]:
+    tokens = _TOKEN.findall(masked)
+    if len(tokens) <= size:
+        return [" ".join(tokens)] if tokens else []
+    return [" ".join(tokens[i : i + size]) for i in range(len(tokens) - size + 1)]
+
+
+def has_template_content(masked: str, minimum: int = MIN_CONTENT_TOKENS) -> bool:
+    """True when masked keeps at least minimum real (non-placeholder) tokens."""
+    return sum(1 for token in _TOKEN.findall(masked) if not token.startswith("<")) >= minimum
+
+
+def simhash(masked: str) -> int:
+    grams = shingles(masked)
+    if not grams:
+        return 0
+    digests = b"".join(hashlib.blake2b(g.encode("utf-8"), digest_size=8).digest() for g in grams)
+    bits = np.unpackbits(np.frombuffer(digests, dtype=np.uint8).reshape(len(grams), 8), axis=1)
+    votes = bits.sum(axis=0, dtype=np.int64) * 2 > len(grams)
+    return int(np.packbits(votes).view(np.uint64)[0])
+
+
+def popcount64(values: np.ndarray) -> np.ndarray:
+    """Vectorized popcount for uint64 arrays (SWAR; avoids relying on numpy>=2 bitwise_count)."""
+    v = values.astype(np.uint64, copy=True)
+    v -= (v >> np.uint64(1)) & np.uint64(0x5555555555555555)
+    v = (v & np.uint64(0x3333333333333333)) + ((v >> np.uint64(2)) & np.uint64(0x3333333333333333))
+    v = (v + (v >> np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    return ((v * np.uint64(0x0101010101010101)) >> np.uint64(56)).astype(np.int64)
+
+
+def max_distance_for(min_similarity: float) -> int:
+    return max(0, min(SIGNATURE_BITS - 1, int((1.0 - min_similarity) * SIGNATURE_BITS + 1e-9)))
+
+
+# ---------------------------
+# Index
+# ---------------------------
+class TemplateIndex:
+    """
+    Array-backed SimHash index mapping scam templates to the verdict that was issued for them.
+    All public methods are thread-safe.
+    """
+
+    def __init__(self, max_distance: int = 3, merge_every: int = 1024, template_chars: int = 200):
+        self.max_distance = max_distance
+        self.merge_every = merge_every
+        self.template_chars = template_chars
+        n_bands = max_distance + 1
+        edges = np.linspace(0, SIGNATURE_BITS, n_bands + 1).astype(int)
+        self._bands: List[Tuple[np.uint64, np.uint64]] = []
+        for lo, hi in zip(edges[:-1], edges[1:]):
+            width = int(hi - lo)
+            self._bands.append((np.uint64(lo), np.uint64((1 << width) - 1)))
+        widest = max(int(hi - lo) for lo, hi in zip(edges[:-1], edges[1:]))
+        self._key_dtype = np.uint16 if widest <= 16 else np.uint32 if widest <= 32 else np.uint64
+
+        self._lock = threading.RLock()
+        self._save_lock = threading.Lock()  # one writer of the .tmp file at a time
+        self._size = 0
+        self._sigs = np.zeros(1024, dtype=np.uint64)
+        self._offsets = np.zeros(1025, dtype=np.int64)
+        self._blob = bytearray()
+        self._indexed = 0
+        self._band_keys = [np.zeros(0, dtype=self._key_dtype) for _ in self._bands]
+        self._band_ids = [np.zeros(0, dtype=np.uint32) for _ in self._bands]
+        self.hits = 0
+        self.misses = 0
+        self.too_short = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _band_values(self, sigs: np.ndarray, band: int) -> np.ndarray:
+        shift, mask = self._bands[band]
+        return ((sigs >> shift) & mask).astype(self._key_dtype)
+
+    # ---------------------------
+    # Lookup
+    # ---------------------------
+    def _nearest(self, sig: int) -> Tuple[int, int]:
+        """Return (id, distance) of the closest indexed signature within max_distance, or (-1, -1)."""
+        parts = []
+        for band, (shift, mask) in enumerate(self._bands):
+            keys = self._band_keys[band]
+            if not len(keys):
+                break
+            # Search with a scalar of the key dtype; a Python int would upcast the whole array.
+            key = keys.dtype.type((sig >> int(shift)) & int(mask))
+            lo = keys.searchsorted(key, side="left")
+            hi = keys.searchsorted(key, side="right")
+            if hi > lo:
+                parts.append(self._band_ids[band][lo:hi])
+        best_id, best_distance = -1, self.max_distance + 1
+        target = np.uint64(sig)
+        if parts:
+            candidates = np.concatenate(parts) if len(parts) > 1 else parts[0]
+            distances = popcount64(self._sigs[candidates] ^ target)
+            pos = int(np.argmin(distances))
+            best_id, best_distance = int(candidates[pos]), int(distances[pos])
+        if self._size > self._indexed:
+            distances = popcount64(self._sigs[self._indexed : self._size] ^ target)
+            pos = int(np.argmin(distances))
+            if distances[pos] < best_distance:
+                best_id, best_distance = self._indexed + pos, int(distances[pos])
+        if best_distance > self.max_distance:
+            return -1, -1
+        return best_id, best_distance
+
+    def lookup(self, message: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the stored verdict for the closest known template, annotated with
+        `near_duplicate: {"template", "similarity", "distance"}`, or None. Messages
+        without enough words of their own besides links, numbers and names are never matched.
+        """
+        masked = mask_message(message)
+        if not has_template_content(masked):
+            with self._lock:
+                self.too_short += 1
+            return None
+        sig = simhash(masked)
+        with self._lock:
+            idx, distance = self._nearest(sig)
+            if idx < 0:
+                self.misses += 1
+                return None
+            self.hits += 1
+            payload = bytes(self._blob[self._offsets[idx] : self._offsets[idx + 1]])
+        record = json.loads(payload)
+        verdict = record["verdict"]
+        verdict["near_duplicate"] = {
+            "template": record["template"],
+            "similarity": round(1.0 - distance / SIGNATURE_BITS, 4),
+            "distance": distance,
+        }
+        return verdict
+
+    # ---------------------------
+    # Inserts
+    # ---------------------------
+    def add(self, message: str, verdict: Dict[str, Any]) -> bool:
+        """
+        Index a model-verified verdict. Exact signature duplicates are skipped so
+        repeated forwards don't grow the index, and messages too short to be a template
+        are not indexed. Returns True when a new entry was added.
+        """
+        masked = mask_message(message)
+        if not has_template_content(masked):
+            return False
+        sig = simhash(masked)
+        stored = {k: v for k, v in verdict.items() if k not in ("raw", "near_duplicate", "cache_hit")}
+        payload = json.dumps(
+            {"template": masked[: self.template_chars], "verdict": stored},
+            ensure_ascii=False,
+            separators=(",", ":"),
+        ).encode("utf-8")
+        with self._lock:
+            idx, distance = self._nearest(sig)
+            if idx >= 0 and distance == 0:
+                return False
+            self._append(sig, payload)
+            if self._size - self._indexed >= self.merge_every:
+                self._merge_tail()
+            return True
+
+    def _append(self, sig: int, payload: bytes) -> None:
+        if self._size == len(self._sigs):
+            self._sigs = np.resize(self._sigs, len(self._sigs) * 2)
+            self._offsets = np.resize(self._offsets, len(self._sigs) + 1)
+        self._sigs[self._size] = sig
+        self._blob.extend(payload)
+        self._size += 1
+        self._offsets[self._size] = len(self._blob)
+
+    def _merge_tail(self) -> None:
+        if self._size == self._indexed:
+            return
+        tail_ids = np.arange(self._indexed, self._size, dtype=np.uint32)
+        tail_sigs = self._sigs[self._indexed : self._size]
+        for band in range(len(self._bands)):
+            tail_keys = self._band_values(tail_sigs, band)
+            order = np.argsort(tail_keys, kind="stable")
+            tail_keys, ids = tail_keys[order], tail_ids[order]
+            positions = np.searchsorted(self._band_keys[band], tail_keys, side="right")
+            self._band_keys[band] = np.insert(self._band_keys[band], positions, tail_keys)
+            self._band_ids[band] = np.insert(self._band_ids[band], positions, ids)
+        self._indexed = self._size
+
+    # ---------------------------
+    # Persistence
+    # ---------------------------
+    def save(self, path: str) -> None:
+        """
+        Write the index atomically. Only the snapshot is taken under the lock; rows are
+        append-only and merges build new band arrays, so the views stay valid while the
+        file is written and lookups carry on.
+        """
+        with self._lock:
+            self._merge_tail()
+            arrays = {
+                "meta": np.array([self.max_distance, self.template_chars], dtype=np.int64),
+                "sigs": self._sigs[: self._size],
+                "offsets": self._offsets[: self._size + 1],
+                "blob": np.frombuffer(bytes(self._blob), dtype=np.uint8),
+            }
+            for band in range(len(self._bands)):
+                arrays[f"band_keys_{band}"] = self._band_keys[band]
+                arrays[f"band_ids_{band}"] = self._band_ids[band]
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._save_lock:
+            tmp = path + ".tmp"
+            with open(tmp, "wb") as fh:
+                np.savez(fh, **arrays)
+            os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str, merge_every: int = 1024) -> "TemplateIndex":
+        with np.load(path) as data:
+            max_distance, template_chars = (int(v) for v in data["meta"])
+            index = cls(max_distance=max_distance, merge_every=merge_every, template_chars=template_chars)
+            sigs = data["sigs"]
+            index._size = index._indexed = len(sigs)
+            index._sigs = np.resize(sigs, max(1024, len(sigs)))
+            index._offsets = np.resize(data["offsets"], len(index._sigs) + 1)
+            index._blob = bytearray(data["blob"].tobytes())
+            for band in range(len(index._bands)):
+                index._band_keys[band] = data[f"band_keys_{band}"]
+                index._band_ids[band] = data[f"band_ids_{band}"]
+        return index
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": self._size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "too_short": self.too_short,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "bytes": int(
+                    self._sigs.nbytes
+                    + self._offsets.nbytes
+                    + len(self._blob)
+                    + sum(k.nbytes + i.nbytes for k, i in zip(self._band_keys, self._band_ids))
+                ),
+            }
@@ -0,0 +1,430 @@
+"""
+Parsing of the model's verdict, whole or streamed.
+
+With structured output on, the model is constrained to RESPONSE_SCHEMA and the reply is
+validated into a typed Verdict. Anything that does not validate gets one local repair
+pass (code fences, trailing commas, smart quotes, Python literals, truncation) before
+the caller decides whether to re-ask. The old regex heuristics survive only as the last
+resort, and every outcome is counted in PARSE_STATS so that path can be watched.
+"""
+import json
+import math
+import re
+import threading
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from bharat_suraksha.languages import EXPLANATION_CODES
+from bharat_suraksha.metrics import METRICS
+from bharat_suraksha.tropes import matched_tropes
+
+IS_SCAM_VALUES = ("yes", "no", "suspect")
+
+# Gemini response_schema (OpenAPI subset understood by google.generativeai).
+RESPONSE_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "is_scam": {"type": "string", "format": "enum", "enum": list(IS_SCAM_VALUES)},
+        "score": {"type": "integer"},
+        "explanations": {
+            "type": "object",
+            "properties": {code: {"type": "string"} for code in EXPLANATION_CODES},
+            "required": list(EXPLANATION_CODES),
+        },
+        "social_engineering_tactics": {"type": "array", "items": {"type": "string"}},
+        "matched_patterns": {"type": "array", "items": {"type": "string"}},
+    },
+    "required": ["is_scam", "score", "explanations", "social_engineering_tactics", "matched_patterns"],
+}
+
+# Micro-batched prompts: one array item per message, tagged with the message id.
+BATCH_RESPONSE_SCHEMA: Dict[str, Any] = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "properties": {"id": {"type": "integer"}, **RESPONSE_SCHEMA["properties"]},
+        "required": ["id"] + RESPONSE_SCHEMA["required"],
+    },
+}
+
+
+def translation_schema(code: str) -> Dict[str, Any]:
+    """Schema for a build_translation_prompt reply: {code: "..."}."""
+    return {"type": "object", "properties": {code: {"type": "string"}}, "required": [code]}
+
+
+_FENCE = re.compile(r"^\s*```[A-Za-z]*[ \t]*\n?(.*?)\n?[ \t]*```\s*$", re.S)
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+_SMART_QUOTES = str.maketrans({"\u201c": '"', "\u201d": '"', "\u2018": "'", "\u2019": "'"})
+_PY_LITERALS = re.compile(r"(?<![\w\"])(True|False|None)(?![\w\"])")
+
+
+class VerdictParseError(ValueError):
+    pass
+
+
+# ---------------------------
+# Typed verdict
+# ---------------------------
+@dataclass
+class Verdict:
+    is_scam: str
+    score: int
+    explanations: Dict[str, str] = field(default_factory=dict)
+    tactics: List[str] = field(default_factory=list)
+    matched_patterns: List[str] = field(default_factory=list)
+
+    @classmethod
+    def from_mapping(cls, data: Any) -> "Verdict":
+        """Strict validation of the model's JSON object; raises VerdictParseError."""
+        if not isinstance(data, dict):
+            raise VerdictParseError("verdict is not a JSON object")
+        is_scam = data.get("is_scam")
+        if not isinstance(is_scam, str) or is_scam.strip().lower() not in IS_SCAM_VALUES:
+            raise VerdictParseError(f"is_scam must be one of {IS_SCAM_VALUES}, got {is_scam!r}")
+        score = data.get("score")
+        if isinstance(score, float) and not math.isfinite(score):
+            # json accepts Infinity, NaN and 1e400; int() of those raises, not a parse error.
+            raise VerdictParseError(f"score must be finite, got {score!r}")
+        if isinstance(score, bool) or not isinstance(score, (int, float)) or score != int(score):
+            raise VerdictParseError(f"score must be an integer, got {score!r}")
+        explanations = data.get("explanations", {})
+        if not isinstance(explanations, dict) or not all(isinstance(v, str) for v in explanations.values()):
+            raise VerdictParseError("explanations must map language codes to strings")
+        lists = {}
+        for key in ("social_engineering_tactics", "matched_patterns"):
+            value = data.get(key, [])
+            if not isinstance(value, list) or not all(isinstance(v, str) for v in value):
+                raise VerdictParseError(f"{key} must be a list of strings")
+            lists[key] = value
+        return cls(
+            is_scam=is_scam.strip().lower(),
+            score=max(0, min(100, int(score))),
+            explanations=explanations,
+            tactics=lists["social_engineering_tactics"],
+            matched_patterns=lists["matched_patterns"],
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The dict shape cached, indexed and rendered everywhere else."""
+        return asdict(self)
+
+
+def failed_verdict() -> Dict[str, Any]:
+    """Conservative placeholder verdict used when the model call itself failed."""
+    return Verdict(is_scam="suspect", score=50).to_dict()
+
+
+# ---------------------------
+# Parse statistics
+# ---------------------------
+class ParseStats:
+    """Thread-safe outcome counters: strict | repaired | reasked | fallback."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts: Counter = Counter()
+
+    def record(self, outcome: str) -> None:
+        with self._lock:
+            self._counts[outcome] += 1
+        METRICS.inc("parse_outcomes", outcome=outcome)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self._counts)
+        total = sum(counts.values())
+        parsed = total - counts.get("fallback", 0)
+        return {
+            "total": total,
+            "strict": counts.get("strict", 0),
+            "repaired": counts.get("repaired", 0),
+            "reasked": counts.get("reasked", 0),
+            "fallback": counts.get("fallback", 0),
+            "success_rate": parsed / total if total else 1.0,
+        }
+
+
+PARSE_STATS = ParseStats()
+
+
+# ---------------------------
+# Strict parse, repair, heuristics
+# ---------------------------
+def extract_json_text(text: str) -> str:
+    """The JSON object inside text: fence removed, surrounding prose trimmed."""
+    fenced = _FENCE.match(text)
+    if fenced:
+        text = fenced.group(1)
+    text = text.strip()
+    if not text.startswith("{"):
+        start, end = text.find("{"), text.rfind("}")
+        if 0 <= start < end:
+            return text[start : end + 1]
+    return text
+
+
+def _close_truncated(text: str) -> str:
+    """Close an unterminated string and any open brackets left by a cut-off response."""
+    stack = []
+    in_string = escape = False
+    for ch in text:
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+        elif ch in "}]" and stack:
+            stack.pop()
+    if in_string:
+        text += '"'
+    text = text.rstrip().rstrip(",")
+    return text + "".join(reversed(stack))
+
+
+def repair_json(text: str) -> str:
+    """One cheap, local repair pass over almost-JSON. Never calls the model."""
+    text = extract_json_text(text.translate(_SMART_QUOTES))
+    start = text.find("{")
+    if start > 0:
+        text = text[start:]
+    text = _PY_LITERALS.sub(lambda m: {"True": "true", "False": "false", "None": "null"}[m.group(1)], text)
+    text = _close_truncated(text)
+    return _TRAILING_COMMA.sub(r"\1", text)
+
+
+def parse_verdict(text: str) -> Tuple[Verdict, str]:
+    """
+    Strictly parse a model reply. Returns (verdict, "strict" | "repaired");
+    raises VerdictParseError when even the repaired text does not validate.
+    """
+    try:
+        return Verdict.from_mapping(json.loads(extract_json_text(text))), "strict"
+    except (ValueError, TypeError):
+        pass
+    try:
+        return Verdict.from_mapping(json.loads(repair_json(text))), "repaired"
+    except (ValueError, TypeError) as exc:
+        raise VerdictParseError(str(exc)) from exc
+
+
+def parse_translation(text: str, code: str) -> Optional[str]:
+    """The translated explanation from a translation reply, or None if it has none."""
+    for candidate in (extract_json_text, repair_json):
+        try:
+            data = json.loads(candidate(text))
+        except (ValueError, TypeError):
+            continue
+        value = data.get(code) if isinstance(data, dict) else None
+        return value.strip() if isinstance(value, str) and value.strip() else None
+    return None
+
+
+def _array_items(text: str) -> List[Any]:
+    """
+    Items of the first JSON array in text. Decodes item by item, so a reply cut off
+    mid-array still yields every item that arrived complete.
+    """
+    fenced = _FENCE.match(text)
+    body = (fenced.group(1) if fenced else text).translate(_SMART_QUOTES)
+    start = body.find("[")
+    if start < 0:
+        return []
+    try:
+        items = json.loads(_TRAILING_COMMA.sub(r"\1", body[start : body.rfind("]") + 1]))
+        if isinstance(items, list):
+            return items
+    except ValueError:
+        pass
+    decoder = json.JSONDecoder()
+    items: List[Any] = []
+    index = start + 1
+    while True:
+        while index < len(body) and body[index] in " \t\r\n,":
+            index += 1
+        if index >= len(body) or body[index] == "]":
+            return items
+        try:
+            item, index = decoder.raw_decode(body, index)
+        except ValueError:
+            return items
+        items.append(item)
+
+
+def parse_batch_response(text: str, count: int) -> Dict[int, Dict[str, Any]]:
+    """
+    Demultiplex a batched reply into {id: verdict dict} for ids 0..count-1. Items use the
+    same strict validation and repair as single replies; an item that is missing, invalid,
+    duplicated or out of range is left out so the caller retries that message alone.
+    """
+    items = _array_items(text)
+    results: Dict[int, Dict[str, Any]] = {}
+    duplicates = set()
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        item_id = item.get("id")
+        if isinstance(item_id, bool) or not isinstance(item_id, int) or not 0 <= item_id < count:
+            continue
+        if item_id in results:
+            duplicates.add(item_id)
+            continue
+        raw = json.dumps({k: v for k, v in item.items() if k != "id"}, ensure_ascii=False)
+        try:
+            verdict, outcome = parse_verdict(raw)
+        except VerdictParseError:
+            continue
+        PARSE_STATS.record(outcome)
+        parsed = verdict.to_dict()
+        parsed["raw"] = raw
+        parsed["parse"] = outcome
+        results[item_id] = parsed
+    for item_id in duplicates:
+        # Two answers for one message: trust neither.
+        results.pop(item_id, None)
+    return results
+
+
+def heuristic_verdict(text: str) -> Dict[str, Any]:
+    """Last-resort regex heuristics for replies that are not JSON at all."""
+    score = 50
+    m = re.search(r"(\b[0-9]{1,3}\b)\s*(%|percent)?", text)
+    if m:
+        try:
+            c = int(m.group(1))
+            if 0 <= c <= 100:
+                score = c
+        except:
+            pass
+    is_scam = "suspect"
+    if re.search(r"\b(scam|fraud|fake|malicious|phish)\b", text, re.I):
+        is_scam = "yes"
+    elif re.search(r"\b(safe|benign|not a scam|trustworthy)\b", text, re.I):
+        is_scam = "no"
+    # trope detection: one pass of the shared compiled matcher
+    matched = matched_tropes(text)
+    return {
+        "is_scam": is_scam,
+        "score": score,
+        "explanations": {"en": text},
+        "tactics": [],
+        "matched_patterns": matched,
+    }
+
+
+def parse_model_response(text: str) -> Dict[str, Any]:
+    """
+    Parse the model's reply: strict schema validation, then one repair pass, then regex
+    heuristics. Returns the normalized verdict dict with 'raw' and 'parse' (the outcome).
+    """
+    try:
+        verdict, outcome = parse_verdict(text)
+        parsed = verdict.to_dict()
+    except VerdictParseError:
+        parsed, outcome = heuristic_verdict(text), "fallback"
+    PARSE_STATS.record(outcome)
+    parsed["raw"] = text
+    parsed["parse"] = outcome
+    return parsed
+
+
+# ---------------------------
+# Incremental parsing of a streamed response
+# ---------------------------
+def _normalize_field(key: str, value: Any) -> Optional[Dict[str, Any]]:
+    if key == "is_scam":
+        return {"is_scam": value}
+    if key == "score":
+        try:
+            return {"score": max(0, min(100, int(value)))}
+        except (TypeError, ValueError, OverflowError):
+            return None
+    if key == "explanations":
+        return {"explanations": value if isinstance(value, dict) else {}}
+    if key == "social_engineering_tactics":
+        return {"tactics": value if isinstance(value, list) else []}
+    if key == "matched_patterns":
+        return {"matched_patterns": value if isinstance(value, list) else []}
+    return None
+
+
+class IncrementalVerdictParser:
+    """
+    Feed response chunks as they arrive; each top-level field of the verdict object is
+    reported as soon as its value is complete. Scanning is linear: every character is
+    visited once, however the chunks are split.
+    """
+
+    def __init__(self):
+        self.fields: Dict[str, Any] = {}
+        self.complete = False
+        self._buffer = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._member_start = 0
+
+    @property
+    def text(self) -> str:
+        return self._buffer
+
+    def feed(self, chunk: str) -> Dict[str, Any]:
+        """Append chunk; return the fields completed by it (already normalized)."""
+        self._buffer += chunk
+        buf = self._buffer
+        new: Dict[str, Any] = {}
+        i = self._pos
+        while i < len(buf) and not self.complete:
+            ch = buf[i]
+            if self._depth == 0:
+                # Preamble such as a ```json fence line: wait for the object to open.
+                if ch == "{":
+                    self._depth = 1
+                    self._member_start = i + 1
+            elif self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._emit(buf[self._member_start : i], new)
+                    self.complete = True
+            elif ch == "," and self._depth == 1:
+                self._emit(buf[self._member_start : i], new)
+                self._member_start = i + 1
+            i += 1
+        self._pos = i
+        return new
+
+    def _emit(self, member: str, new: Dict[str, Any]) -> None:
+        if not member.strip():
+            return
+        try:
+            data = json.loads("{" + member + "}")
+        except ValueError:
+            return
+        for key, value in data.items():
+            field = _normalize_field(key, value)
+            if field:
+                new.update(field)
+                self.fields.update(field)
+
+    def result(self) -> Dict[str, Any]:
+        """Final verdict: the full parse of everything received, with the usual fallbacks."""
+        return parse_model_response(self._buffer)
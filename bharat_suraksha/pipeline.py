@@ -0,0 +1,702 @@
+"""
+Headless scan pipeline: known-bad reputation index -> exact verdict cache ->
+near-duplicate templates -> tier-0 classifier -> model.
+
+Scanner owns the process-wide lookup stages and the model caller (deadlines, retries,
+hedging); the model client is passed per call because keys are per session. The async
+methods let bulk and API callers run many scans on one event loop. Nothing here touches Streamlit, and numpy-backed stages are
+imported only when a Scanner is built from config.
+"""
+import asyncio
+import atexit
+import json
+import os
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from bharat_suraksha import config
+from bharat_suraksha.batching import MicroBatcher
+from bharat_suraksha.cache import VerdictCache, cache_key
+from bharat_suraksha.compaction import estimate_tokens
+from bharat_suraksha.languages import DEFAULT_CODE, EXPLANATION_CODES, language_code, pick_explanation
+from bharat_suraksha.metrics import METRICS
+from bharat_suraksha.model import MODEL_NAME, ModelUnavailable, stream_text
+from bharat_suraksha.parsing import IncrementalVerdictParser, failed_verdict, parse_translation, translation_schema
+from bharat_suraksha.prompt import PROMPT_VERSION, build_prompt, build_translation_prompt
+from bharat_suraksha.ratelimit import TokenBucket
+from bharat_suraksha.scheduler import Admission, QuotaShed
+from bharat_suraksha.heuristics import heuristic_assessment
+from bharat_suraksha.resilience import (
+    AsyncModelCaller,
+    CircuitBreaker,
+    ModelCallError,
+    RetryPolicy,
+    call_model_and_parse_async,
+    parse_or_reask_async,
+    classify_error,
+    run_sync,
+)
+
+Verdict = Dict[str, Any]
+# on_update(fields_so_far, first_verdict_ms) during a streamed model call
+StreamCallback = Callable[[Dict[str, Any], Optional[float]], None]
+
+# Why a verdict is an on-box estimate, by degraded reason.
+DEGRADED_REASONS = {
+    "shed": "The shared AI key is at capacity",
+    "circuit_open": "The forensic AI is failing right now and calls to it are paused",
+    "timeout": "The forensic AI did not answer in time",
+    "unavailable": "The forensic AI is unavailable",
+    "rate_limited": "The AI quota is exhausted",
+}
+
+# Added to a verdict per scan, never part of what the cache stores.
+PER_SCAN_KEYS = ("cache_hit", "tokens", "timing", "cascade", "batch")
+
+# How a requested explanation language was served: already in the verdict, from the
+# in-memory translation memo, by a translation call, or English instead.
+EXPLANATION_OUTCOMES = ("stored", "memo", "translated", "fallback")
+
+
+# ---------------------------
+# Stage constructors (config-driven)
+# ---------------------------
+def open_verdict_cache(path: Optional[str] = config.VERDICT_CACHE_PATH) -> VerdictCache:
+    return VerdictCache(
+        path,
+        memory_entries=config.VERDICT_CACHE_MEMORY_ENTRIES,
+        disk_entries=config.VERDICT_CACHE_DISK_ENTRIES,
+        ttl_seconds=config.VERDICT_CACHE_TTL_SECONDS,
+    )
+
+
+def open_template_index(path: str = config.TEMPLATE_INDEX_PATH):
+    """Near-duplicate template index; loaded from disk when present."""
+    from bharat_suraksha.neardup import TemplateIndex, max_distance_for
+
+    if os.path.exists(path):
+        try:
+            return TemplateIndex.load(path)
+        except Exception:
+            # A corrupt index only costs model calls; start a fresh one.
+            pass
+    return TemplateIndex(max_distance=max_distance_for(config.TEMPLATE_MIN_SIMILARITY))
+
+
+def open_reputation_index(path: str = config.REPUTATION_INDEX_PATH):
+    """Known-bad entity index; empty until a built file appears at path."""
+    from bharat_suraksha.reputation import ReputationIndex
+
+    return ReputationIndex(path, reload_seconds=config.REPUTATION_RELOAD_SECONDS)
+
+
+def open_audit_log(directory: str = config.AUDIT_DIR):
+    """Background audit writer, or None when auditing is off or directory is not writable."""
+    if not config.AUDIT_ENABLED:
+        return None
+    from bharat_suraksha.audit import AuditLog
+
+    try:
+        return AuditLog(directory)
+    except OSError:
+        # A read-only disk costs the audit trail, not the scanner.
+        return None
+
+
+def load_tier0_cascade(path: str = config.TIER0_MODEL_PATH):
+    """Tier-0 classifier cascade, or None when no trained model has been deployed."""
+    if not os.path.exists(path):
+        return None
+    from bharat_suraksha.classifier import Tier0Cascade, Tier0Model
+
+    try:
+        model = Tier0Model.load(path)
+    except Exception:
+        return None
+    return Tier0Cascade(model, low=config.TIER0_LOW, high=config.TIER0_HIGH)
+
+
+def make_circuit_breaker() -> CircuitBreaker:
+    return CircuitBreaker(
+        window_seconds=config.BREAKER_WINDOW_SECONDS,
+        min_calls=config.BREAKER_MIN_CALLS,
+        failure_rate=config.BREAKER_FAILURE_RATE,
+        slow_call_ms=config.BREAKER_SLOW_CALL_MS,
+        slow_call_rate=config.BREAKER_SLOW_CALL_RATE,
+        open_seconds=config.BREAKER_OPEN_SECONDS,
+        half_open_probes=config.BREAKER_HALF_OPEN_PROBES,
+    )
+
+
+def make_model_caller() -> AsyncModelCaller:
+    policy = RetryPolicy(
+        max_attempts=config.MODEL_MAX_ATTEMPTS,
+        deadline_seconds=config.MODEL_DEADLINE_SECONDS,
+        attempt_timeout_seconds=config.MODEL_ATTEMPT_TIMEOUT_SECONDS,
+        backoff_base_seconds=config.MODEL_BACKOFF_BASE_SECONDS,
+        backoff_max_seconds=config.MODEL_BACKOFF_MAX_SECONDS,
+        hedge=config.MODEL_HEDGE,
+        hedge_min_samples=config.MODEL_HEDGE_MIN_SAMPLES,
+    )
+    breaker = make_circuit_breaker() if config.BREAKER_ENABLED else None
+    return AsyncModelCaller(policy, max_threads=config.MODEL_CALL_THREADS, breaker=breaker)
+
+
+# ---------------------------
+# Scanner
+# ---------------------------
+class Scanner:
+    """
+    Thread-safe: the stages carry their own locks, so one Scanner serves every session,
+    bulk worker and CLI invocation in a process.
+    """
+
+    def __init__(
+        self,
+        cache: Optional[VerdictCache] = None,
+        templates=None,
+        cascade=None,
+        model_name: str = MODEL_NAME,
+        prompt_version: str = PROMPT_VERSION,
+        templates_path: Optional[str] = None,
+        caller: Optional[AsyncModelCaller] = None,
+        budget_tokens: int = config.PROMPT_MESSAGE_TOKEN_BUDGET,
+        translate: bool = config.EXPLANATION_TRANSLATE,
+        translation_entries: int = config.TRANSLATION_CACHE_ENTRIES,
+        reputation=None,
+        audit_log=None,
+    ):
+        self.reputation = reputation
+        self.audit_log = audit_log
+        self.cache = cache
+        self.templates = templates
+        self.cascade = cascade
+        self.model_name = model_name
+        self.prompt_version = prompt_version
+        self.templates_path = templates_path
+        self.caller = caller or make_model_caller()
+        self.budget_tokens = budget_tokens
+        self._tokens: Counter = Counter()
+        self._tokens_lock = threading.Lock()
+        self.translate = translate
+        self.translation_entries = max(0, translation_entries)
+        self._translations: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+        self._explanations: Counter = Counter()
+        self._explanations_lock = threading.Lock()
+        # Template index saves run on a background thread, never on a scan.
+        self._templates_lock = threading.Lock()
+        self._templates_unsaved = 0
+        self._templates_wake = threading.Event()
+        self._templates_saver: Optional[threading.Thread] = None
+        if templates is not None and templates_path:
+            atexit.register(self.save_templates)
+
+    @classmethod
+    def from_config(cls, use_cache: bool = True) -> "Scanner":
+        if not use_cache:
+            return cls(cascade=load_tier0_cascade(), reputation=open_reputation_index(), audit_log=open_audit_log())
+        return cls(
+            reputation=open_reputation_index(),
+            audit_log=open_audit_log(),
+            cache=open_verdict_cache(),
+            templates=open_template_index(),
+            cascade=load_tier0_cascade(),
+            templates_path=config.TEMPLATE_INDEX_PATH,
+        )
+
+    def key(self, text: str) -> str:
+        return cache_key(text, self.prompt_version, self.model_name)
+
+    def lookup(self, text: str) -> Tuple[Optional[Verdict], Optional[Dict[str, Any]]]:
+        """
+        Run the cheap on-box stages. Returns (verdict, tier0_decision); verdict is None
+        when the message has to go to the model. Reputation runs first so a newly listed
+        link overrides a verdict cached before it was listed.
+        """
+        if self.reputation is not None:
+            with METRICS.timer("reputation"):
+                hits = self.reputation.check(text)
+            if hits:
+                from bharat_suraksha.reputation import reputation_verdict
+
+                METRICS.inc("scans", source="reputation")
+                return reputation_verdict(text, hits, len(self.reputation)), None
+
+        if self.cache is not None:
+            with METRICS.timer("cache_lookup"):
+                parsed = self.cache.get(self.key(text))
+            if parsed is not None:
+                parsed["cache_hit"] = True
+                METRICS.inc("scans", source="cache")
+                return parsed, None
+
+        if self.templates is not None:
+            with METRICS.timer("template_lookup"):
+                parsed = self.templates.lookup(text)
+            if parsed is not None:
+                parsed["raw"] = json.dumps(parsed, ensure_ascii=False, indent=2)
+                METRICS.inc("scans", source="template")
+                return parsed, None
+
+        decision = None
+        if self.cascade is not None:
+            from bharat_suraksha.classifier import local_verdict
+
+            with METRICS.timer("tier0"):
+                decision = self.cascade.decide(text)
+            if decision["decision"] != "escalate":
+                METRICS.inc("scans", source="tier0")
+                return local_verdict(text, decision), decision
+        METRICS.inc("scans", source="model")
+        return None, decision
+
+    def _prompt(self, text: str, language: str) -> Tuple[str, Dict[str, int]]:
+        """Compacted prompt plus its token report (estimated tokens before/after compaction)."""
+        with METRICS.timer("prompt_build"):
+            built = build_prompt(text, language, self.budget_tokens)
+        tokens = {
+            "message_before": built.compaction.tokens_before,
+            "message_after": built.compaction.tokens_after,
+            "prompt": built.prompt_tokens,
+        }
+        self._record_tokens(tokens)
+        return built.prompt, tokens
+
+    def _record_tokens(self, tokens: Dict[str, int]) -> None:
+        with self._tokens_lock:
+            self._tokens["requests"] += 1
+            self._tokens["compacted"] += int(tokens["message_after"] < tokens["message_before"])
+            for key, value in tokens.items():
+                self._tokens[key] += value
+
+    def token_stats(self) -> Dict[str, Any]:
+        with self._tokens_lock:
+            counts = dict(self._tokens)
+        before, after = counts.get("message_before", 0), counts.get("message_after", 0)
+        return {
+            "requests": counts.get("requests", 0),
+            "compacted": counts.get("compacted", 0),
+            "message_tokens_before": before,
+            "message_tokens_after": after,
+            "prompt_tokens": counts.get("prompt", 0),
+            "saved_ratio": 1 - after / before if before else 0.0,
+        }
+
+    def local_fallback(self, text: str, reason: str) -> Verdict:
+        """
+        On-box estimate for a message the model did not answer (reason: shed, circuit_open
+        or the failure category): keyword and trope heuristics, raised to the tier-0
+        probability when a classifier is deployed. Marked 'degraded' and never cached, so
+        a later scan gets the full analysis.
+        """
+        METRICS.inc("fallbacks", reason=reason)
+        assessment = heuristic_assessment(text)
+        score, source = assessment.score, "keyword and scam-pattern heuristics"
+        if self.cascade is not None:
+            probability = float(self.cascade.model.predict_proba([text])[0])
+            if probability * 100 > score:
+                score, source = int(round(probability * 100)), "the tier-0 classifier"
+        verdict = {
+            # Without the model, never clear a message outright.
+            "is_scam": "yes" if score > 66 else "suspect",
+            "score": score,
+            "explanations": {
+                "en": f"{DEGRADED_REASONS.get(reason, 'The forensic AI call failed')}, so this is an on-box estimate "
+                f"from {source}. Scan again later for the full analysis."
+            },
+            "tactics": assessment.tactics,
+            "matched_patterns": assessment.patterns,
+            "degraded": reason,
+        }
+        verdict["raw"] = json.dumps({"degraded": reason, "signals": assessment.signals, "score": score})
+        return verdict
+
+    def _degrade(self, text: str, failed: Verdict) -> Verdict:
+        """Replace a failed model verdict (placeholder 50) with the on-box estimate, keeping the error."""
+        verdict = self.local_fallback(text, failed["error"])
+        verdict["error"] = failed["error"]
+        verdict["raw"] = failed.get("raw", verdict["raw"])
+        return verdict
+
+    def _admission_tokens(self, tokens: Dict[str, int]) -> int:
+        return tokens["prompt"] + config.QUOTA_OUTPUT_TOKENS_ESTIMATE
+
+    async def ask_model_async(
+        self, client: Any, text: str, language: str = "English", admit: Optional[Admission] = None
+    ) -> Verdict:
+        """
+        Call the model and remember a successful verdict in the cache and template index.
+        admit, when given, is charged once per scan before the call; if it sheds the scan,
+        the result is local_fallback.
+        """
+        prompt, tokens = self._prompt(text, language)
+        if admit is not None:
+            try:
+                await asyncio.get_running_loop().run_in_executor(None, admit, self._admission_tokens(tokens))
+            except QuotaShed:
+                return self.local_fallback(text, "shed")
+        return await self._call_model_async(client, text, prompt, tokens)
+
+    async def _call_model_async(self, client: Any, text: str, prompt: str, tokens: Dict[str, int]) -> Verdict:
+        """The model call of ask_model_async for a prompt already built, counted and admitted."""
+        started = time.monotonic()
+        parsed = await call_model_and_parse_async(self.caller, client, prompt)
+        latency_ms = (time.monotonic() - started) * 1000
+        if parsed.get("error"):
+            parsed = self._degrade(text, parsed)
+        else:
+            self.remember(text, parsed, latency_ms)
+        parsed["tokens"] = tokens
+        return parsed
+
+    def ask_model(self, client: Any, text: str, language: str = "English", admit: Optional[Admission] = None) -> Verdict:
+        return run_sync(self.ask_model_async(client, text, language, admit))
+
+    def batcher(
+        self,
+        client: Any,
+        language: str = "English",
+        max_items: int = config.BATCH_MAX_ITEMS,
+        max_wait_ms: float = config.BATCH_MAX_WAIT_MS,
+        limiter: Optional[TokenBucket] = None,
+        admit: Optional[Admission] = None,
+    ) -> MicroBatcher:
+        """
+        Micro-batcher for client, with its own caller so batch latencies stay out of the
+        interactive hedging window. Close it when the run is over.
+        """
+        return MicroBatcher(
+            client,
+            # Same upstream, so the same breaker.
+            caller=AsyncModelCaller(self.caller.policy, max_threads=config.MODEL_CALL_THREADS, breaker=self.caller.breaker),
+            max_items=max_items,
+            max_wait_ms=max_wait_ms,
+            language=language,
+            budget_tokens=self.budget_tokens,
+            max_item_tokens=config.BATCH_MAX_ITEM_TOKENS,
+            limiter=limiter,
+            admit=admit,
+            output_tokens_per_item=config.QUOTA_OUTPUT_TOKENS_ESTIMATE,
+        )
+
+    async def ask_model_batched_async(self, batcher: MicroBatcher, text: str) -> Verdict:
+        """ask_model_async through a micro-batcher: same caching, shared model calls."""
+        started = time.monotonic()
+        return self._batched_result(text, await batcher.analyze(text), started)
+
+    def ask_model_batched(self, batcher: MicroBatcher, text: str) -> Verdict:
+        """Blocking form for worker threads; the batcher's own loop does the waiting."""
+        started = time.monotonic()
+        return self._batched_result(text, batcher.analyze_sync(text), started)
+
+    def _batched_result(self, text: str, parsed: Verdict, started: float) -> Verdict:
+        # Per-call details stay out of the cache, as on the single path.
+        tokens, batch = parsed.pop("tokens"), parsed.pop("batch", None)
+        if parsed.get("error"):
+            parsed = self._degrade(text, parsed)
+        else:
+            self.remember(text, parsed, (time.monotonic() - started) * 1000)
+        self._record_tokens(tokens)
+        parsed["tokens"] = tokens
+        if batch is not None:
+            parsed["batch"] = batch
+        return parsed
+
+    def ask_model_streaming(
+        self,
+        client: Any,
+        text: str,
+        language: str = "English",
+        on_update: Optional[StreamCallback] = None,
+        admit: Optional[Admission] = None,
+    ) -> Verdict:
+        """
+        Stream the model's answer for the interactive path, reporting verdict fields as they
+        complete. The result carries timing {first_verdict_ms, total_ms}. A stream that fails
+        before any field arrived falls back to the buffered call of ask_model (deadlines, retries,
+        hedging) with the same prompt.
+        Admission works as in ask_model_async.
+        """
+        prompt, tokens = self._prompt(text, language)
+        if admit is not None:
+            try:
+                admit(self._admission_tokens(tokens))
+            except QuotaShed:
+                return self.local_fallback(text, "shed")
+        breaker = self.caller.breaker
+        if breaker is not None and not breaker.allow():
+            METRICS.inc("model_errors", category="circuit_open")
+            parsed = self._degrade(text, {"error": "circuit_open"})
+            parsed["tokens"] = tokens
+            return parsed
+        parser = IncrementalVerdictParser()
+        started = time.monotonic()
+        first_verdict_ms: Optional[float] = None
+        try:
+            for chunk in stream_text(client, prompt, timeout=self.caller.policy.attempt_timeout_seconds):
+                new = parser.feed(chunk)
+                if not new:
+                    continue
+                if first_verdict_ms is None and ("is_scam" in new or "score" in new):
+                    first_verdict_ms = (time.monotonic() - started) * 1000
+                if on_update is not None:
+                    on_update(dict(parser.fields), first_verdict_ms)
+        except Exception as exc:
+            self.caller.record_outcome(classify_error(exc), (time.monotonic() - started) * 1000)
+            METRICS.inc("model_errors", category=classify_error(exc))
+            if not parser.fields:
+                # Already admitted and counted; the retry path is part of the same scan.
+                return run_sync(self._call_model_async(client, text, prompt, tokens))
+            # Keep what already arrived; the caller shows it with the error.
+            parsed = failed_verdict()
+            parsed.update(parser.fields)
+            parsed["raw"] = parser.text
+            parsed["error"] = classify_error(exc)
+            parsed["tokens"] = tokens
+            return parsed
+        total_ms = (time.monotonic() - started) * 1000
+        self.caller.record_outcome(None, total_ms)
+        self.caller.record_stream(first_verdict_ms, total_ms)
+        # The incremental fields were for display; the verdict comes from the whole reply,
+        # with the same repair and one-shot re-ask as the buffered path.
+        parsed = run_sync(parse_or_reask_async(self.caller, client, prompt, parser.text))
+        self.remember(text, parsed, total_ms)
+        parsed["timing"] = {"first_verdict_ms": first_verdict_ms if first_verdict_ms is not None else total_ms, "total_ms": total_ms}
+        parsed["tokens"] = tokens
+        return parsed
+
+    # ---------------------------
+    # Explanations per language
+    # ---------------------------
+    async def explanation_async(
+        self,
+        parsed: Verdict,
+        language: str,
+        client: Any = None,
+        text: Optional[str] = None,
+        admit: Optional[Admission] = None,
+    ) -> Tuple[Optional[str], str]:
+        """
+        (code served, explanation) for language, a UI name or ISO code. Model verdicts
+        carry every language already. One without it (tier-0, template entries from before
+        a language was added) gets a small translation call when client is given; the
+        result goes into parsed["explanations"] and, for a cached verdict of text, back
+        into the verdict cache, so toggling language or rescanning never asks again. On-box
+        estimates, failed calls and a shed admission are served in English.
+        """
+        stored = self._stored_explanation(parsed, language)
+        if stored is not None:
+            return stored
+        code = language_code(language)
+        explanations = parsed["explanations"]
+        source_code, source = pick_explanation(explanations, DEFAULT_CODE)
+        translated, outcome = None, "fallback"
+        if source and client is not None and self.translate and not parsed.get("degraded") and not parsed.get("error"):
+            translated, outcome = self._memoized_translation(code, source), "memo"
+            if translated is None:
+                translated, outcome = await self._translate(client, source, code, admit), "translated"
+        if translated is None:
+            self._count_explanation(code, "fallback")
+            return source_code, source
+        explanations[code] = translated
+        if text is not None:
+            self._store_explanations(text, parsed)
+        self._count_explanation(code, outcome)
+        return code, translated
+
+    def explanation(
+        self,
+        parsed: Verdict,
+        language: str,
+        client: Any = None,
+        text: Optional[str] = None,
+        admit: Optional[Admission] = None,
+    ) -> Tuple[Optional[str], str]:
+        stored = self._stored_explanation(parsed, language)
+        if stored is not None:
+            return stored
+        return run_sync(self.explanation_async(parsed, language, client, text, admit))
+
+    def _stored_explanation(self, parsed: Verdict, language: str) -> Optional[Tuple[str, str]]:
+        code = language_code(language)
+        explanations = parsed.get("explanations")
+        if not isinstance(explanations, dict):
+            explanations = parsed["explanations"] = {}
+        if not explanations.get(code):
+            return None
+        self._count_explanation(code, "stored")
+        return code, explanations[code]
+
+    def _memoized_translation(self, code: str, source: str) -> Optional[str]:
+        with self._explanations_lock:
+            translated = self._translations.get((code, source))
+            if translated is not None:
+                self._translations.move_to_end((code, source))
+            return translated
+
+    async def _translate(self, client: Any, source: str, code: str, admit: Optional[Admission]) -> Optional[str]:
+        prompt = build_translation_prompt(source, code)
+        if admit is not None:
+            try:
+                # The reply is the explanation again, several times the tokens in an Indic script.
+                tokens = estimate_tokens(prompt) + 3 * estimate_tokens(source)
+                await asyncio.get_running_loop().run_in_executor(None, admit, tokens)
+            except QuotaShed:
+                return None
+        try:
+            with METRICS.timer("translate"):
+                reply = await self.caller.generate(client, prompt, response_schema=translation_schema(code))
+        except ModelCallError:
+            return None
+        translated = parse_translation(reply, code)
+        if translated is not None and self.translation_entries:
+            with self._explanations_lock:
+                self._translations[(code, source)] = translated
+                while len(self._translations) > self.translation_entries:
+                    self._translations.popitem(last=False)
+        return translated
+
+    def _store_explanations(self, text: str, parsed: Verdict) -> None:
+        """Write the grown explanations back to the cached verdict of text, if it is one."""
+        if self.cache is None or parsed.get("near_duplicate") or parsed.get("degraded") or parsed.get("error"):
+            return
+        if parsed.get("reputation"):
+            return  # decided from the index; never cached
+        cascade = parsed.get("cascade")
+        if cascade is not None and cascade.get("decision") != "escalate":
+            return  # decided on-box; never cached
+        self.cache.update(self.key(text), {k: v for k, v in parsed.items() if k not in PER_SCAN_KEYS})
+
+    def _count_explanation(self, code: str, outcome: str) -> None:
+        with self._explanations_lock:
+            self._explanations[(code, outcome)] += 1
+        METRICS.inc("explanations", language=code, outcome=outcome)
+
+    def explanation_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Per language code: requests by outcome and hit_rate, the share served without a
+        model call in that language's own words (stored in the verdict or memoized).
+        """
+        with self._explanations_lock:
+            counts = dict(self._explanations)
+        stats: Dict[str, Dict[str, Any]] = {}
+        for code in EXPLANATION_CODES + tuple(sorted({c for c, _ in counts} - set(EXPLANATION_CODES))):
+            row = {outcome: counts.get((code, outcome), 0) for outcome in EXPLANATION_OUTCOMES}
+            requests = sum(row.values())
+            if not requests:
+                continue
+            row["requests"] = requests
+            row["hit_rate"] = (row["stored"] + row["memo"]) / requests
+            stats[code] = row
+        return stats
+
+    def remember(self, text: str, parsed: Verdict, latency_ms: float = 0.0) -> None:
+        """Cache and index a model verdict; failures and heuristic guesses (parse "fallback") are not kept."""
+        if parsed.get("error") or parsed.get("parse") == "fallback":
+            return
+        if self.cache is not None:
+            self.cache.put(self.key(text), parsed, latency_ms)
+        if self.templates is not None and self.templates.add(text, parsed) and self.templates_path:
+            with self._templates_lock:
+                self._templates_unsaved += 1
+                if self._templates_unsaved < config.TEMPLATE_INDEX_SAVE_EVERY:
+                    return
+                if self._templates_saver is None:
+                    self._templates_saver = threading.Thread(target=self._run_template_saver, name="template-saver", daemon=True)
+                    self._templates_saver.start()
+            self._templates_wake.set()
+
+    def _run_template_saver(self) -> None:
+        while True:
+            self._templates_wake.wait()
+            self._templates_wake.clear()
+            self.save_templates()
+
+    def save_templates(self) -> bool:
+        """Write the template index if it has unsaved entries; False if nothing was written."""
+        with self._templates_lock:
+            unsaved, self._templates_unsaved = self._templates_unsaved, 0
+        if not unsaved or self.templates is None or not self.templates_path:
+            return False
+        try:
+            self.templates.save(self.templates_path)
+        except OSError:
+            with self._templates_lock:
+                self._templates_unsaved += unsaved  # retried on the next save
+            return False
+        return True
+
+    def audit(
+        self, text: str, parsed: Verdict, language: Optional[str] = None, latency_ms: Optional[float] = None, **context: Any
+    ) -> None:
+        """Queue one analysis for the audit log, if there is one; never blocks. context: surface=, session=."""
+        if self.audit_log is not None:
+            self.audit_log.append(text, parsed, language, latency_ms, self.model_name, self.prompt_version, **context)
+
+    async def scan_async(
+        self,
+        text: str,
+        client: Any = None,
+        language: str = "English",
+        batcher: Optional[MicroBatcher] = None,
+        admit: Optional[Admission] = None,
+        context: Optional[Dict[str, Any]] = None,
+    ) -> Verdict:
+        """
+        Full pipeline for one message. Raises ModelUnavailable when the message needs the
+        model and neither a client nor a batcher was given. admit is charged for direct
+        model calls (a batcher carries its own). The result is audited with context.
+        """
+        started = time.monotonic()
+        parsed, decision = self.lookup(text)
+        if parsed is not None:
+            latency_ms = (time.monotonic() - started) * 1000
+            METRICS.observe("scan", latency_ms)
+            self.audit(text, parsed, language, latency_ms, **(context or {}))
+            return parsed
+        if batcher is not None:
+            parsed = await self.ask_model_batched_async(batcher, text)
+        elif client is None:
+            raise ModelUnavailable("Message needs the model but no model client is configured")
+        else:
+            parsed = await self.ask_model_async(client, text, language, admit)
+        if decision is not None:
+            parsed["cascade"] = decision
+            self.cascade.record_escalation_latency((time.monotonic() - started) * 1000)
+        latency_ms = (time.monotonic() - started) * 1000
+        METRICS.observe("scan", latency_ms)
+        self.audit(text, parsed, language, latency_ms, **(context or {}))
+        return parsed
+
+    def scan(
+        self,
+        text: str,
+        client: Any = None,
+        language: str = "English",
+        batcher: Optional[MicroBatcher] = None,
+        context: Optional[Dict[str, Any]] = None,
+    ) -> Verdict:
+        return run_sync(self.scan_async(text, client, language, batcher, context=context))
+
+    async def scan_many(
+        self,
+        texts: Iterable[str],
+        client: Any = None,
+        language: str = "English",
+        concurrency: int = 16,
+        batcher: Optional[MicroBatcher] = None,
+    ) -> List[Verdict]:
+        """
+        Scan messages concurrently on the running loop; results keep input order. With a
+        batcher, messages that reach the model share prompts; size concurrency to at least
+        its max_items or batches never fill.
+        """
+        gate = asyncio.Semaphore(max(1, concurrency))
+
+        async def one(text: str) -> Verdict:
+            async with gate:
+                return await self.scan_async(text, client, language, batcher)
+
+        return await asyncio.gather(*(one(text) for text in texts))
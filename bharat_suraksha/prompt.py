@@ -0,0 +1,123 @@
+"""
+Advanced forensic AI prompt builder.
+
+The instruction header never changes between calls, so it is rendered once and reused;
+only the (compacted) message is formatted per request.
+"""
+from functools import lru_cache
+from typing import List, NamedTuple, Sequence
+
+from bharat_suraksha.compaction import Compaction, compact_message, estimate_tokens
+from bharat_suraksha.languages import LANGUAGE_CODES, language_name
+from bharat_suraksha.tropes import prompt_trope_text
+
+# Bump PROMPT_VERSION whenever build_deep_intent_prompt changes so cached verdicts are not reused.
+PROMPT_VERSION = "deep-intent-v4"
+
+# Message tokens allowed into the prompt before compaction starts dropping low-signal lines.
+DEFAULT_MESSAGE_BUDGET = 1500
+
+
+_INTRO = (
+    "You are a Digital Forensic Investigator specialized in scams in India. "
+    "Analyze the following message for intent and social engineering tactics."
+)
+_COMPACTION_NOTE = (
+    'Long chats may be compacted: "(xN)" marks a line repeated N times, "[... N lines omitted ...]" '
+    "marks dropped low-signal lines, and tags like [U1] or [P1] refer to the Entities table at the end."
+)
+_EXPLANATION_KEYS = ", ".join(f"'{code}'" for code in LANGUAGE_CODES.values())
+_EXPLANATION_NAMES = ", ".join(LANGUAGE_CODES)
+_FIELDS = f"""- is_scam: "yes"|"no"|"suspect"
+- score: integer 0-100 (100 => certain scam)
+- explanations: object with keys {_EXPLANATION_KEYS} (the same concise explanation in {_EXPLANATION_NAMES}, each in its own script)
+- social_engineering_tactics: array of tactics detected (e.g., "urgency", "authority", "pretexting", "fear", "phishing", "baiting")
+- matched_patterns: array of pattern strings you matched (from known Indian tropes)"""
+
+
+@lru_cache(maxsize=1)
+def prompt_header() -> str:
+    """
+    Instructions for Gemini acting as a Digital Forensic Investigator. Asks for a strict
+    JSON object with fields:
+      is_scam: yes|no|suspect
+      score: int 0-100
+      explanations: {"en": "...", "hi": "...", "bn": "...", "ta": "...", "te": "..."}
+      social_engineering_tactics: [ "urgency", "authority", "fear", "phishing", ... ]
+      matched_patterns: [...]
+    """
+    return f"""
+{_INTRO}
+{_COMPACTION_NOTE}
+Return ONLY a JSON object (no explanation text) with these fields:
+{_FIELDS}
+
+Look specifically for these tropes: {prompt_trope_text()}
+"""
+
+
+@lru_cache(maxsize=1)
+def batch_prompt_header() -> str:
+    """Same instructions for several messages at once, answered as one indexed JSON array."""
+    return f"""
+{_INTRO.replace("the following message", "each of the following messages independently")}
+{_COMPACTION_NOTE}
+Each message is introduced by its id in square brackets, e.g. [3].
+Return ONLY a JSON array (no explanation text) with exactly one object per message, each with these fields:
+- id: the message id (integer)
+{_FIELDS}
+
+Look specifically for these tropes: {prompt_trope_text()}
+"""
+
+
+class PromptBuild(NamedTuple):
+    prompt: str
+    compaction: Compaction
+    prompt_tokens: int  # estimated, header included
+
+
+def build_prompt(message: str, language: str, budget_tokens: int = DEFAULT_MESSAGE_BUDGET) -> PromptBuild:
+    """Compact the message to budget and wrap it in the pre-rendered header."""
+    compaction = compact_message(message, budget_tokens)
+    prompt = f'{prompt_header()}Message: """{compaction.text}"""\n\nEnsure score is an integer and return valid JSON only.\n'
+    return PromptBuild(prompt, compaction, estimate_tokens(prompt))
+
+
+def build_deep_intent_prompt(message: str, language: str, budget_tokens: int = DEFAULT_MESSAGE_BUDGET) -> str:
+    """
+    Build a 'Deep Intent Analysis' prompt instructing Gemini to act as a Digital Forensic Investigator.
+    """
+    return build_prompt(message, language, budget_tokens).prompt
+
+
+def build_batch_prompt(messages: Sequence[str], language: str, budget_tokens: int = DEFAULT_MESSAGE_BUDGET) -> PromptBuild:
+    """
+    One prompt for several messages, ids 0..n-1. Each message is compacted against its
+    share of the budget; the compaction report covers the batch as a whole.
+    """
+    share = max(1, budget_tokens // max(1, len(messages)))
+    parts: List[str] = []
+    before = after = removed = entities = 0
+    for i, message in enumerate(messages):
+        c = compact_message(message, share)
+        parts.append(f'[{i}] """{c.text}"""')
+        before, after = before + c.tokens_before, after + c.tokens_after
+        removed, entities = removed + c.lines_removed, entities + c.entities
+    body = "\n".join(parts)
+    prompt = f"{batch_prompt_header()}Messages:\n{body}\n\nEnsure every score is an integer and return valid JSON only.\n"
+    return PromptBuild(prompt, Compaction(body, before, after, removed, entities), estimate_tokens(prompt))
+
+
+def build_translation_prompt(explanation: str, code: str) -> str:
+    """
+    Small follow-up prompt for a verdict missing one language: translate its English
+    explanation, answered as {code: "..."}.
+    """
+    name = language_name(code)
+    return (
+        f"Translate this explanation of a scam check into {name}, in {name} script. Keep it concise "
+        f"and keep names, numbers and URLs unchanged.\n"
+        f'Return ONLY a JSON object {{"{code}": "<translation>"}}.\n\n'
+        f'Explanation: """{explanation}"""\n'
+    )
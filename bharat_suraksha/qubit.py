@@ -0,0 +1,76 @@
+"""
+Quantum Digital Dharma Engine (qubit simulation), vectorized.
+
+Each score maps to a qubit |ψ> = α|0> + β|1> with |β|^2 = score/100. A Hadamard gate puts
+it in superposition and a measurement collapses it. The state is real, so H|ψ> reduces to
+((α+β)/√2, (α-β)/√2) and a whole batch is a few array expressions with no per-message
+matrix build or matmul. Measurements come from a caller-supplied np.random.Generator, so
+runs are reproducible. Nothing here sleeps; animation is the UI's business.
+"""
+import math
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Union
+
+import numpy as np
+
+_SQRT_HALF = 1 / math.sqrt(2)
+
+
+def hadamard_matrix():
+    return _SQRT_HALF * np.array([[1, 1], [1, -1]], dtype=complex)
+
+
+def make_rng(seed: Optional[int] = None) -> np.random.Generator:
+    return np.random.default_rng(seed)
+
+
+class QubitBatch(NamedTuple):
+    initial_amplitudes: np.ndarray  # (n, 2): α, β
+    superposed_amplitudes: np.ndarray  # (n, 2): H|ψ>
+    probabilities: np.ndarray  # (n, 2): |0>, |1> after H
+    measured: np.ndarray  # (n,) int8: 0 safe, 1 scam
+
+    def __len__(self) -> int:
+        return len(self.measured)
+
+    def result(self, i: int) -> Dict[str, Any]:
+        """One row in the dict shape the UI and JSON outputs use."""
+        return {
+            "initial_amplitudes": [round(float(x), 4) for x in self.initial_amplitudes[i]],
+            "superposed_amplitudes": [round(float(x), 4) for x in self.superposed_amplitudes[i]],
+            "probabilities": [round(float(x), 4) for x in self.probabilities[i]],
+            "measured": int(self.measured[i]),
+        }
+
+    def results(self) -> List[Dict[str, Any]]:
+        return [self.result(i) for i in range(len(self))]
+
+
+def collapse_batch(scores: Union[Sequence[float], np.ndarray], rng: Optional[np.random.Generator] = None) -> QubitBatch:
+    """
+    Simulate and measure one qubit per score (0-100) in a single vectorized pass.
+    """
+    rng = rng if rng is not None else make_rng()
+    p1 = np.clip(np.asarray(scores, dtype=np.float64) / 100.0, 0.0, 1.0)
+    a0 = np.sqrt(1.0 - p1)
+    a1 = np.sqrt(p1)
+    s0 = (a0 + a1) * _SQRT_HALF
+    s1 = (a0 - a1) * _SQRT_HALF
+    # |s0|^2 + |s1|^2 == 1 analytically; renormalize to absorb rounding.
+    q0, q1 = s0 * s0, s1 * s1
+    total = q0 + q1
+    q0, q1 = q0 / total, q1 / total
+    measured = (rng.random(p1.shape[0]) < q1).astype(np.int8)
+    return QubitBatch(
+        initial_amplitudes=np.stack([a0, a1], axis=1),
+        superposed_amplitudes=np.stack([s0, s1], axis=1),
+        probabilities=np.stack([q0, q1], axis=1),
+        measured=measured,
+    )
+
+
+def simulate_qubit_and_collapse(model_score: int, rng: Optional[np.random.Generator] = None) -> Dict[str, Any]:
+    """
+    Simulate qubit |ψ> = α|0> + β|1> where |β|^2 ~= model_score/100, apply Hadamard and
+    measure. Returns a dict with amplitudes, probabilities, and measured outcome (0 safe, 1 scam).
+    """
+    return collapse_batch([model_score], rng).result(0)
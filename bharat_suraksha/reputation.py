@@ -0,0 +1,427 @@
+"""
+Known-bad links, phone numbers and UPI IDs, checked on-box before any model call.
+
+extract_entities pulls URLs (short links included), bare domains, Indian mobile numbers
+and UPI IDs out of a message and normalizes them the same way feed entries are. The
+reputation index is one file holding a sorted uint64 array of 64-bit entity hashes plus a
+parallel uint16 array of feed ids; it is memory-mapped, so tens of millions of entries
+cost ~10 bytes each of page cache shared by every process, and a lookup is one
+searchsorted over the message's handful of hashes. A domain also matches its listed
+parent domains, and a short link matches as the full host/path as well as its host.
+
+Feeds are plain text, one entry per line ("#" comments; optional "domain:", "url:",
+"phone:" or "upi:" prefix, otherwise the kind is inferred):
+
+    python -m bharat_suraksha.reputation build --feed phishing_domains.txt --feed chakshu_numbers.txt
+    python -m bharat_suraksha.reputation check "Update KYC at http://sbi-kyc.xyz/login"
+
+Builds replace the file atomically; a running ReputationIndex notices the new file within
+reload_seconds and swaps it in without a restart. With 64-bit hashes a false match needs a
+collision, roughly n / 2**64 per lookup.
+"""
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+import threading
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from bharat_suraksha import config
+
+KINDS = ("domain", "url", "phone", "upi")
+
+# Bare hosts: any label(.label)+.tld with an alphabetic TLD, taken whole up to the first
+# character that cannot be part of a host, so amazon.in.verify-kyc.ru is never cut short.
+_URL = re.compile(
+    r"(?:https?://|www\.)[^\s<>\"'`]+"
+    r"|\b[a-z0-9](?:[a-z0-9-]{0,61}[a-z0-9])?(?:\.[a-z0-9](?:[a-z0-9-]{0,61}[a-z0-9])?)*"
+    r"\.[a-z]{2,24}(?![a-z0-9-]|\.[a-z0-9])"
+    r"(?:/[^\s<>\"'`]*)?",
+    re.I,
+)
+_PHONE = re.compile(r"(?<![\d+])(?:\+?91[\s-]?|0)?([6-9]\d{4})[\s-]?(\d{5})(?!\d)")
+_UPI = re.compile(r"(?<![\w.-])([\w.-]{2,256}@[a-z][a-z0-9]{1,63})\b(?!\.)", re.I)
+# Runs of digits, spaces and dashes; the full phone pattern only runs inside them.
+_DIGIT_RUN = re.compile(r"\+?\d[\d\s-]{8,}\d")
+_TRAILING = ".,;:!?)]}'\"*"
+
+
+class Entity(NamedTuple):
+    kind: str
+    value: str
+
+
+class Hit(NamedTuple):
+    kind: str
+    value: str  # as normalized and looked up
+    source: str  # feed the entry came from
+
+
+# ---------------------------
+# Extraction & normalization
+# ---------------------------
+def _host(host: str) -> str:
+    host = host.rsplit("@", 1)[-1].split(":", 1)[0].strip(_TRAILING).rstrip(".").casefold()
+    if not host.isascii():
+        try:
+            host = host.encode("idna").decode("ascii")
+        except UnicodeError:
+            pass
+    return host
+
+
+def normalize_url(url: str) -> Tuple[str, str]:
+    """(host, host/path) for a URL or bare domain; path is "" when there is none."""
+    url = url.strip().strip(_TRAILING)
+    if "://" in url:
+        url = url.split("://", 1)[1]
+    for sep in "?#":
+        url = url.split(sep, 1)[0]
+    host, _, path = url.partition("/")
+    host = _host(host)
+    path = path.strip(_TRAILING).rstrip("/")
+    return host, f"{host}/{path}" if path else ""
+
+
+def parent_domains(host: str) -> List[str]:
+    """host and its parents down to two labels: a.b.evil.xyz -> a.b.evil.xyz, b.evil.xyz, evil.xyz."""
+    labels = host.split(".")
+    return [".".join(labels[i:]) for i in range(max(1, len(labels) - 1))]
+
+
+def extract_entities(text: str) -> List[Entity]:
+    """Normalized, de-duplicated entities in text, in order of appearance."""
+    seen: Dict[Entity, None] = {}
+    for token in text.split() if "." in text else ():
+        if "." not in token or "." not in token.strip(_TRAILING):
+            continue
+        for match in _URL.finditer(token):
+            host, url = normalize_url(match.group())
+            if url:
+                seen[Entity("url", url)] = None
+            if "." in host:
+                seen[Entity("domain", host)] = None
+    if "@" in text:
+        for match in _UPI.finditer(text):
+            seen[Entity("upi", match.group(1).casefold())] = None
+    for run in _DIGIT_RUN.finditer(text):
+        for match in _PHONE.finditer(text, run.start(), run.end()):
+            seen[Entity("phone", match.group(1) + match.group(2))] = None
+    return list(seen)
+
+
+def feed_entity(line: str) -> Optional[Entity]:
+    """Parse one feed line; None for blanks, comments and lines that normalize to nothing."""
+    line = line.split("#", 1)[0].strip()
+    if not line:
+        return None
+    field = line.split(",", 1)[0].strip()
+    kind, sep, rest = field.partition(":")
+    kind = kind.strip().lower()
+    if sep and kind in KINDS and not rest.startswith("//"):
+        field = rest.strip()
+    else:
+        kind = ""
+    if kind == "phone" or (not kind and _PHONE.fullmatch(field)):
+        digits = re.sub(r"\D", "", field)[-10:]
+        return Entity("phone", digits) if len(digits) == 10 else None
+    if not field:
+        return None
+    value = field.split()[0]
+    if kind == "upi" or (not kind and "@" in value and "/" not in value):
+        return Entity("upi", value.casefold())
+    host, url = normalize_url(value)
+    if url and kind != "domain":
+        return Entity("url", url)
+    return Entity("domain", host) if host else None
+
+
+def entity_hash(entity: Entity) -> int:
+    digest = hashlib.blake2b(f"{entity.kind}\x00{entity.value}".encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def _lookup_keys(entities: Sequence[Entity]) -> List[Tuple[Entity, int]]:
+    keys = []
+    for entity in entities:
+        if entity.kind == "domain":
+            for domain in parent_domains(entity.value):
+                parent = Entity("domain", domain)
+                keys.append((parent, entity_hash(parent)))
+        else:
+            keys.append((entity, entity_hash(entity)))
+    return keys
+
+
+# ---------------------------
+# Index file
+# ---------------------------
+# MAGIC | entries (u64) | meta length (u64) | hashes u64[entries] | feed ids u16[entries] | meta JSON
+MAGIC = b"BSREP001"
+_HEADER = struct.Struct("<8sQQ")
+
+
+def write_index(path: str, hashes: np.ndarray, feed_ids: np.ndarray, feeds: Sequence[str], meta: Optional[Dict[str, Any]] = None) -> int:
+    """
+    Sort, de-duplicate (the first feed listing an entry wins) and write atomically.
+    Returns the number of entries written.
+    """
+    hashes = np.asarray(hashes, dtype="<u8")
+    feed_ids = np.asarray(feed_ids, dtype="<u2")
+    order = np.argsort(hashes, kind="stable")
+    hashes, feed_ids = hashes[order], feed_ids[order]
+    if len(hashes):
+        first = np.empty(len(hashes), dtype=bool)
+        first[0] = True
+        np.not_equal(hashes[1:], hashes[:-1], out=first[1:])
+        hashes, feed_ids = hashes[first], feed_ids[first]
+    body = json.dumps(dict(meta or {}, feeds=list(feeds), entries=int(len(hashes)), built_at=time.time())).encode("utf-8")
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as fh:
+        fh.write(_HEADER.pack(MAGIC, len(hashes), len(body)))
+        fh.write(hashes.tobytes())
+        fh.write(feed_ids.tobytes())
+        fh.write(body)
+    os.replace(tmp, path)
+    return int(len(hashes))
+
+
+def build_index(feed_paths: Sequence[str], path: str, chunk: int = 1 << 20) -> Dict[str, Any]:
+    """Build the index file from feed files; each feed's file name is its source label."""
+    if len(feed_paths) > 0xFFFF:
+        raise ValueError("At most 65535 feeds")
+    parts: List[np.ndarray] = []
+    ids: List[np.ndarray] = []
+    kinds = dict.fromkeys(KINDS, 0)
+    for feed_id, feed_path in enumerate(feed_paths):
+        pending: List[int] = []
+        with open(feed_path, encoding="utf-8", errors="replace") as fh:
+            for line in fh:
+                entity = feed_entity(line)
+                if entity is None:
+                    continue
+                kinds[entity.kind] += 1
+                pending.append(entity_hash(entity))
+                if len(pending) >= chunk:
+                    parts.append(np.array(pending, dtype="<u8"))
+                    ids.append(np.full(len(pending), feed_id, dtype="<u2"))
+                    pending = []
+        if pending:
+            parts.append(np.array(pending, dtype="<u8"))
+            ids.append(np.full(len(pending), feed_id, dtype="<u2"))
+    hashes = np.concatenate(parts) if parts else np.zeros(0, dtype="<u8")
+    feed_ids = np.concatenate(ids) if ids else np.zeros(0, dtype="<u2")
+    feeds = [os.path.basename(p) for p in feed_paths]
+    entries = write_index(path, hashes, feed_ids, feeds, {"kinds": kinds})
+    return {"entries": entries, "lines": int(len(hashes)), "kinds": kinds, "feeds": feeds, "path": path}
+
+
+class _Loaded(NamedTuple):
+    hashes: np.ndarray  # views of the mapped file, sorted
+    feed_ids: np.ndarray
+    feeds: List[str]
+    meta: Dict[str, Any]
+    stamp: Optional[Tuple[int, int, int]]  # (inode, size, mtime_ns) of the file mapped
+
+
+_EMPTY = _Loaded(np.zeros(0, dtype="<u8"), np.zeros(0, dtype="<u2"), [], {}, None)
+
+
+def _stamp(path: str) -> Optional[Tuple[int, int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_ino, st.st_size, st.st_mtime_ns
+
+
+def _map(path: str) -> _Loaded:
+    stamp = _stamp(path)
+    with open(path, "rb") as fh:
+        magic, entries, meta_len = _HEADER.unpack(fh.read(_HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a reputation index")
+        fh.seek(_HEADER.size + entries * 10)
+        meta = json.loads(fh.read(meta_len).decode("utf-8"))
+        if not entries:
+            return _EMPTY._replace(feeds=meta.get("feeds", []), meta=meta, stamp=stamp)
+        # Plain ndarray views of one shared mapping (np.memmap's subclass overhead is a
+        # few microseconds per operation); the arrays keep the mapping alive.
+        mapped = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+    hashes = np.frombuffer(mapped, dtype="<u8", count=entries, offset=_HEADER.size)
+    feed_ids = np.frombuffer(mapped, dtype="<u2", count=entries, offset=_HEADER.size + entries * 8)
+    return _Loaded(hashes, feed_ids, meta.get("feeds", []), meta, stamp)
+
+
+class ReputationIndex:
+    """
+    Read-only view of the index file at path (may not exist yet). Thread-safe: lookups
+    read one immutable snapshot, and a reload swaps the snapshot in a single assignment;
+    mappings of replaced files stay valid until the last reader drops them.
+    """
+
+    def __init__(self, path: Optional[str] = None, reload_seconds: float = 30.0):
+        self.path = path
+        self.reload_seconds = reload_seconds
+        self._loaded = _EMPTY
+        self._lock = threading.Lock()
+        self._next_check = 0.0
+        self._stats = {"lookups": 0, "hits": 0, "reloads": 0, "load_errors": 0}
+        if path:
+            self.maybe_reload(force=True)
+
+    def __len__(self) -> int:
+        return len(self._loaded.hashes)
+
+    # ---------------------------
+    # Hot reload
+    # ---------------------------
+    def maybe_reload(self, force: bool = False) -> bool:
+        """Map the file again if it was replaced; stats it at most every reload_seconds."""
+        now = time.monotonic()
+        if not self.path or (not force and now < self._next_check):
+            return False
+        with self._lock:
+            if not force and now < self._next_check:
+                return False
+            self._next_check = now + self.reload_seconds
+            stamp = _stamp(self.path)
+            if stamp == self._loaded.stamp:
+                return False
+            if stamp is None:
+                self._loaded = _EMPTY
+                return True
+            try:
+                self._loaded = _map(self.path)
+            except (OSError, ValueError, struct.error):
+                # Half-copied or foreign file: keep serving the previous snapshot.
+                self._stats["load_errors"] += 1
+                return False
+            self._stats["reloads"] += 1
+            return True
+
+    # ---------------------------
+    # Lookups
+    # ---------------------------
+    def lookup(self, entities: Sequence[Entity]) -> List[Hit]:
+        loaded = self._loaded
+        if not entities or not len(loaded.hashes):
+            return []
+        keys = _lookup_keys(entities)
+        wanted = np.array([h for _, h in keys], dtype="<u8")
+        positions = loaded.hashes.searchsorted(wanted)
+        # Past-the-end positions clip onto the last entry, which then simply does not match.
+        found = (loaded.hashes.take(positions, mode="clip") == wanted).tolist()
+        hits = []
+        for i, matched in enumerate(found):
+            if matched:
+                entity = keys[i][0]
+                feed_id = int(loaded.feed_ids[positions[i]])
+                hits.append(Hit(entity.kind, entity.value, loaded.feeds[feed_id] if feed_id < len(loaded.feeds) else "?"))
+        return hits
+
+    def check(self, text: str) -> List[Hit]:
+        """Known-bad entities in text; [] quickly while the index is empty."""
+        self.maybe_reload()
+        if not len(self._loaded.hashes):
+            return []
+        hits = self.lookup(extract_entities(text))
+        with self._lock:
+            self._stats["lookups"] += 1
+            self._stats["hits"] += bool(hits)
+        return hits
+
+    def stats(self) -> Dict[str, Any]:
+        loaded = self._loaded
+        with self._lock:
+            stats = dict(self._stats)
+        stats["entries"] = len(loaded.hashes)
+        stats["bytes"] = int(loaded.hashes.nbytes + loaded.feed_ids.nbytes)
+        stats["feeds"] = list(loaded.feeds)
+        stats["built_at"] = loaded.meta.get("built_at")
+        stats["hit_rate"] = stats["hits"] / stats["lookups"] if stats["lookups"] else 0.0
+        return stats
+
+
+# ---------------------------
+# Verdict
+# ---------------------------
+_DESCRIBE = {"domain": "the website {}", "url": "the link {}", "phone": "the phone number {}", "upi": "the UPI ID {}"}
+
+
+def reputation_verdict(text: str, hits: Sequence[Hit], entries: int = 0) -> Dict[str, Any]:
+    """parse_model_response-shaped SCAM verdict for a message with known-bad entities."""
+    from bharat_suraksha.heuristics import heuristic_assessment
+
+    listed = ", ".join(_DESCRIBE[hit.kind].format(hit.value) for hit in hits)
+    feeds = ", ".join(dict.fromkeys(hit.source for hit in hits))
+    assessment = heuristic_assessment(text)
+    tactics = list(assessment.tactics)
+    if any(hit.kind in ("domain", "url") for hit in hits) and "phishing" not in tactics:
+        tactics.append("phishing")
+    evidence = {"hits": [hit._asdict() for hit in hits], "entries": entries}
+    verdict = {
+        "is_scam": "yes",
+        "score": config.REPUTATION_SCORE,
+        "explanations": {
+            "en": f"Contains {listed}, listed as malicious in the local reputation feed ({feeds}); "
+            "the forensic AI model was not called."
+        },
+        "tactics": tactics,
+        "matched_patterns": assessment.patterns,
+        "reputation": evidence,
+    }
+    verdict["raw"] = json.dumps(evidence, ensure_ascii=False)
+    return verdict
+
+
+# ---------------------------
+# CLI
+# ---------------------------
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m bharat_suraksha.reputation", description="Known-bad entity index")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build_cmd = commands.add_parser("build", help="build the index from feed files (replaces it atomically)")
+    build_cmd.add_argument("--feed", action="append", required=True, help="feed file; repeat for several")
+    build_cmd.add_argument("--out", default=config.REPUTATION_INDEX_PATH)
+
+    check_cmd = commands.add_parser("check", help="list known-bad entities in messages")
+    check_cmd.add_argument("texts", nargs="+")
+    check_cmd.add_argument("--index", default=config.REPUTATION_INDEX_PATH)
+
+    stats_cmd = commands.add_parser("stats", help="describe an index file")
+    stats_cmd.add_argument("--index", default=config.REPUTATION_INDEX_PATH)
+
+    args = parser.parse_args(argv)
+    if args.command == "build":
+        started = time.perf_counter()
+        report = build_index(args.feed, args.out)
+        report["seconds"] = round(time.perf_counter() - started, 2)
+    elif args.command == "check":
+        index = ReputationIndex(args.index)
+        report = {
+            "results": [
+                {"text": text, "entities": [e._asdict() for e in extract_entities(text)], "hits": [h._asdict() for h in index.check(text)]}
+                for text in args.texts
+            ]
+        }
+    else:
+        report = ReputationIndex(args.index).stats()
+    json.dump(report, sys.stdout, indent=2, ensure_ascii=False)
+    sys.stdout.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,474 @@
+"""
+Asyncio model call path with deadlines, retries and hedged requests.
+
+The SDK call is blocking, so each attempt runs on a shared thread pool and the event loop
+only waits on it. That lets one loop drive many analyses at once (bulk, HTTP) and lets
+the caller give up at a deadline even when the upstream never answers.
+
+Per call:
+  - an overall deadline and a per-attempt timeout (also passed to the SDK when supported);
+  - retries with full-jitter exponential backoff, only for retryable error categories;
+  - once enough latencies are observed, a hedged second request if the first is still
+    running after the observed p95. Whichever answers first wins.
+
+Failures surface as ModelCallError with a category instead of one opaque error.
+
+A CircuitBreaker shared by every caller of the same upstream watches attempt outcomes. When
+the rolling error or slow-call rate crosses its threshold it opens, and calls fail at once
+with "circuit_open" instead of each waiting out its deadline; after a cool-down it lets a
+probe through (half-open) and closes again when the probe succeeds.
+"""
+import asyncio
+import json
+import random
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Optional
+
+from bharat_suraksha.metrics import METRICS
+from bharat_suraksha.model import generate_text
+from bharat_suraksha.parsing import PARSE_STATS, VerdictParseError, failed_verdict, parse_model_response, parse_verdict
+
+RETRYABLE = frozenset({"timeout", "rate_limited", "unavailable"})
+# Categories that say the upstream itself is unhealthy. Auth, bad requests and quota are
+# per-key problems and must not trip the breaker for every session.
+BREAKER_FAILURES = frozenset({"timeout", "unavailable", "model_call_failed"})
+
+
+class ModelCallError(RuntimeError):
+    def __init__(self, category: str, message: str = ""):
+        super().__init__(message or category)
+        self.category = category
+
+    @property
+    def retryable(self) -> bool:
+        return self.category in RETRYABLE
+
+
+def classify_error(exc: BaseException) -> str:
+    """
+    Map an exception from any client to timeout | rate_limited | unavailable | auth |
+    invalid_request | model_call_failed. google.api_core exceptions carry an HTTP `code`.
+    """
+    if isinstance(exc, ModelCallError):
+        return exc.category
+    if isinstance(exc, (asyncio.TimeoutError, TimeoutError)):
+        return "timeout"
+    code = getattr(exc, "code", None)
+    message = str(exc).lower()
+    if code in (401, 403) or "api key" in message or "api_key" in message:
+        return "auth"
+    if code == 429 or "quota" in message or "rate limit" in message:
+        return "rate_limited"
+    if code in (504, 408) or "deadline" in message or "timed out" in message:
+        return "timeout"
+    if code in (500, 502, 503) or isinstance(exc, ConnectionError):
+        return "unavailable"
+    if code == 400:
+        return "invalid_request"
+    return "model_call_failed"
+
+
+@dataclass
+class RetryPolicy:
+    max_attempts: int = 3
+    deadline_seconds: float = 20.0  # whole call, including retries and backoff
+    attempt_timeout_seconds: float = 10.0
+    backoff_base_seconds: float = 0.5
+    backoff_max_seconds: float = 4.0
+    hedge: bool = True
+    hedge_min_samples: int = 20  # latencies needed before p95 is trusted
+
+    def backoff(self, retry: int) -> float:
+        """Full jitter: uniform in [0, min(max, base * 2**retry)]."""
+        return random.uniform(0.0, min(self.backoff_max_seconds, self.backoff_base_seconds * (2 ** retry)))
+
+
+class LatencyTracker:
+    """Sliding window of successful attempt latencies (ms), safe to share across loops."""
+
+    def __init__(self, window: int = 512):
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, latency_ms: float) -> None:
+        with self._lock:
+            self._samples.append(latency_ms)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._samples)
+
+    def percentile(self, q: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        index = min(len(samples) - 1, max(0, int(round(q / 100.0 * (len(samples) - 1)))))
+        return samples[index]
+
+
+class CircuitBreaker:
+    """
+    closed -> open when, over the last window_seconds (and at least min_calls attempts),
+    the failure rate or the rate of calls slower than slow_call_ms reaches its threshold.
+    open -> half_open after open_seconds. half_open admits half_open_probes calls at a
+    time; a healthy probe closes the breaker, an unhealthy one re-opens it.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(
+        self,
+        window_seconds: float = 60.0,
+        min_calls: int = 10,
+        failure_rate: float = 0.5,
+        slow_call_ms: float = 8000.0,
+        slow_call_rate: float = 0.5,
+        open_seconds: float = 30.0,
+        half_open_probes: int = 1,
+    ):
+        self.window_seconds = window_seconds
+        self.min_calls = max(1, min_calls)
+        self.failure_rate = failure_rate
+        self.slow_call_ms = slow_call_ms
+        self.slow_call_rate = slow_call_rate
+        self.open_seconds = open_seconds
+        self.half_open_probes = max(1, half_open_probes)
+        self._outcomes: Deque = deque()  # (monotonic time, failed, slow)
+        self._failed = self._slow = 0  # running counts over _outcomes
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._probes = 0
+        self._lock = threading.Lock()
+        self._counts: Counter = Counter()
+
+    def _trim(self, now: float) -> None:
+        while self._outcomes and now - self._outcomes[0][0] > self.window_seconds:
+            _, failed, slow = self._outcomes.popleft()
+            self._failed -= failed
+            self._slow -= slow
+
+    def _open(self, now: float) -> None:
+        self._state = self.OPEN
+        self._opened_at = now
+        self._probes = 0
+        self._outcomes.clear()
+        self._failed = self._slow = 0
+        self._counts["opened"] += 1
+
+    def _advance(self, now: float) -> str:
+        if self._state == self.OPEN and now - self._opened_at >= self.open_seconds:
+            self._state = self.HALF_OPEN
+            self._probes = 0
+        return self._state
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._advance(time.monotonic())
+
+    def allow(self) -> bool:
+        """May a call go upstream now? In half-open this reserves a probe slot."""
+        with self._lock:
+            state = self._advance(time.monotonic())
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and self._probes < self.half_open_probes:
+                self._probes += 1
+                return True
+            self._counts["short_circuited"] += 1
+            return False
+
+    def record(self, failed: Optional[bool], latency_ms: float) -> None:
+        """
+        Outcome of one upstream attempt. failed=None is neutral (a per-key error): it only
+        frees the probe slot it may have held.
+        """
+        now = time.monotonic()
+        with self._lock:
+            state = self._advance(now)
+            if state == self.HALF_OPEN:
+                self._probes = max(0, self._probes - 1)
+                if failed is None:
+                    return
+                if failed or latency_ms >= self.slow_call_ms:
+                    self._open(now)
+                else:
+                    self._state = self.CLOSED
+                    self._counts["closed"] += 1
+                return
+            if state == self.OPEN or failed is None:
+                return
+            slow = latency_ms >= self.slow_call_ms
+            self._outcomes.append((now, bool(failed), slow))
+            self._failed += bool(failed)
+            self._slow += slow
+            self._trim(now)
+            total = len(self._outcomes)
+            if total < self.min_calls:
+                return
+            if self._failed / total >= self.failure_rate or self._slow / total >= self.slow_call_rate:
+                self._open(now)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            now = time.monotonic()
+            state = self._advance(now)
+            self._trim(now)
+            total, failures, slow = len(self._outcomes), self._failed, self._slow
+            return {
+                "state": state,
+                "window_calls": total,
+                "window_failure_rate": failures / total if total else 0.0,
+                "window_slow_rate": slow / total if total else 0.0,
+                "opened": self._counts.get("opened", 0),
+                "recovered": self._counts.get("closed", 0),
+                "short_circuited": self._counts.get("short_circuited", 0),
+                "open_for_seconds": now - self._opened_at if state != self.CLOSED else 0.0,
+            }
+
+
+def _consume(future: "asyncio.Future") -> None:
+    # Abandoned attempts (hedge losers, timeouts) still finish on their thread; read their
+    # exception so asyncio does not log it as never retrieved.
+    if not future.cancelled():
+        future.exception()
+
+
+class AsyncModelCaller:
+    """
+    Shared by every session: the latency window is what decides when to hedge, so it
+    should see all traffic to the same upstream.
+    """
+
+    def __init__(
+        self, policy: Optional[RetryPolicy] = None, max_threads: int = 32, breaker: Optional[CircuitBreaker] = None
+    ):
+        self.policy = policy or RetryPolicy()
+        self.breaker = breaker
+        self.latency = LatencyTracker()
+        self.first_verdict = LatencyTracker()  # streamed calls: time until is_scam/score arrived
+        self._executor = ThreadPoolExecutor(max_workers=max_threads, thread_name_prefix="model-call")
+        self._lock = threading.Lock()
+        self._counts: Counter = Counter()
+
+    def _count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self._counts[name] += n
+
+    def hedge_delay_seconds(self) -> Optional[float]:
+        if not self.policy.hedge or len(self.latency) < self.policy.hedge_min_samples:
+            return None
+        p95 = self.latency.percentile(95)
+        return p95 / 1000.0 if p95 is not None else None
+
+    async def _attempt(self, client: Any, prompt: str, timeout: float, response_schema: Optional[Dict[str, Any]] = None) -> str:
+        loop = asyncio.get_running_loop()
+        started = time.monotonic()
+
+        def launch() -> "asyncio.Future":
+            future = loop.run_in_executor(self._executor, generate_text, client, prompt, timeout, response_schema)
+            future.add_done_callback(_consume)
+            return future
+
+        first = launch()
+        pending = {first}
+        hedge_after = self.hedge_delay_seconds()
+        if hedge_after is not None and hedge_after < timeout:
+            done, _ = await asyncio.wait(pending, timeout=hedge_after)
+            if not done:
+                self._count("hedges")
+                pending.add(launch())
+
+        error: Optional[BaseException] = None
+        while pending:
+            remaining = timeout - (time.monotonic() - started)
+            if remaining <= 0:
+                break
+            done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    self.latency.record((time.monotonic() - started) * 1000)
+                    if future is not first:
+                        self._count("hedge_wins")
+                    return future.result()
+                error = future.exception()
+        if pending or error is None:
+            raise ModelCallError("timeout", f"No model response within {timeout:.1f}s")
+        raise error
+
+    async def generate(
+        self,
+        client: Any,
+        prompt: str,
+        deadline_seconds: Optional[float] = None,
+        response_schema: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """
+        Model text for prompt, or ModelCallError once retries or the deadline run out.
+        response_schema overrides the client's default structured-output schema.
+        """
+        with METRICS.timer("model_call"):
+            return await self._generate(client, prompt, deadline_seconds, response_schema)
+
+    async def _generate(
+        self,
+        client: Any,
+        prompt: str,
+        deadline_seconds: Optional[float],
+        response_schema: Optional[Dict[str, Any]],
+    ) -> str:
+        policy = self.policy
+        deadline = time.monotonic() + (deadline_seconds if deadline_seconds is not None else policy.deadline_seconds)
+        self._count("calls")
+        last: Optional[ModelCallError] = None
+        for attempt in range(policy.max_attempts):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            if self.breaker is not None and not self.breaker.allow():
+                # Fail fast during an upstream incident instead of waiting out the deadline.
+                self._count("short_circuited")
+                METRICS.inc("model_errors", category="circuit_open")
+                last = ModelCallError("circuit_open", "Model upstream is failing; circuit breaker open")
+                break
+            if attempt:
+                self._count("retries")
+            self._count("attempts")
+            started = time.monotonic()
+            try:
+                text = await self._attempt(client, prompt, min(policy.attempt_timeout_seconds, remaining), response_schema)
+            except Exception as exc:
+                category = classify_error(exc)
+                self._count(f"error_{category}")
+                METRICS.inc("model_errors", category=category)
+                self.record_outcome(category, (time.monotonic() - started) * 1000)
+                last = exc if isinstance(exc, ModelCallError) else ModelCallError(category, str(exc))
+                if not last.retryable:
+                    break
+            else:
+                self.record_outcome(None, (time.monotonic() - started) * 1000)
+                return text
+            delay = policy.backoff(attempt)
+            if time.monotonic() + delay >= deadline:
+                break
+            await asyncio.sleep(delay)
+        self._count("failures")
+        raise last or ModelCallError("timeout", "Deadline passed before the model was called")
+
+    def record_outcome(self, category: Optional[str], latency_ms: float) -> None:
+        """Feed one upstream attempt to the breaker; category None means success."""
+        if self.breaker is None:
+            return
+        if category is None:
+            self.breaker.record(False, latency_ms)
+        else:
+            self.breaker.record(True if category in BREAKER_FAILURES else None, latency_ms)
+
+    def record_stream(self, first_verdict_ms: Optional[float], total_ms: float) -> None:
+        """Streamed calls bypass generate(); fold their timings into the same windows."""
+        self._count("calls")
+        self._count("streams")
+        self.latency.record(total_ms)
+        METRICS.observe("model_stream", total_ms)
+        if first_verdict_ms is not None:
+            self.first_verdict.record(first_verdict_ms)
+            METRICS.observe("first_verdict", first_verdict_ms)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self._counts)
+        calls = counts.get("calls", 0)
+        return {
+            "calls": calls,
+            "attempts": counts.get("attempts", 0),
+            "retries": counts.get("retries", 0),
+            "hedges": counts.get("hedges", 0),
+            "hedge_wins": counts.get("hedge_wins", 0),
+            "failures": counts.get("failures", 0),
+            "errors": {k[len("error_"):]: v for k, v in counts.items() if k.startswith("error_")},
+            "failure_rate": counts.get("failures", 0) / calls if calls else 0.0,
+            "p50_ms": self.latency.percentile(50),
+            "p95_ms": self.latency.percentile(95),
+            "p99_ms": self.latency.percentile(99),
+            "streams": counts.get("streams", 0),
+            "p50_first_verdict_ms": self.first_verdict.percentile(50),
+            "short_circuited": counts.get("short_circuited", 0),
+            "breaker": self.breaker.stats() if self.breaker is not None else None,
+        }
+
+
+REASK_SUFFIX = (
+    "\n\nYour previous reply was not a valid JSON object with the fields listed above. "
+    "Reply again with ONLY that JSON object."
+)
+
+
+async def call_model_and_parse_async(
+    caller: AsyncModelCaller,
+    client: Any,
+    prompt: str,
+    deadline_seconds: Optional[float] = None,
+    reask: bool = True,
+) -> Dict[str, Any]:
+    """
+    Async counterpart of model.call_model_and_parse. A reply that fails strict validation
+    and the local repair pass is re-asked once before falling back to heuristics. On
+    failure the result carries 'error' set to the failure category.
+    """
+    try:
+        raw_text = await caller.generate(client, prompt, deadline_seconds)
+    except ModelCallError as exc:
+        return error_verdict(exc)
+    if not reask:
+        with METRICS.timer("parse"):
+            return parse_model_response(raw_text)
+    return await parse_or_reask_async(caller, client, prompt, raw_text, deadline_seconds)
+
+
+def error_verdict(exc: ModelCallError) -> Dict[str, Any]:
+    """failed_verdict for a call that failed with exc, 'error' set to its category."""
+    # Keep error minimal for user, but include fallback raw JSON for debug
+    parsed = failed_verdict()
+    parsed["raw"] = json.dumps({"error": exc.category, "message": str(exc)})
+    parsed["error"] = exc.category
+    return parsed
+
+
+async def parse_or_reask_async(
+    caller: AsyncModelCaller,
+    client: Any,
+    prompt: str,
+    raw_text: str,
+    deadline_seconds: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Verdict from a complete reply to prompt: strict validation, then the repair pass, then
+    one re-ask, then heuristics over the first reply (parse "fallback"). Shared by the
+    buffered and streamed paths.
+    """
+    try:
+        with METRICS.timer("parse"):
+            verdict, outcome = parse_verdict(raw_text)
+    except VerdictParseError:
+        try:
+            retry_text = await caller.generate(client, prompt + REASK_SUFFIX, deadline_seconds)
+            verdict, _ = parse_verdict(retry_text)
+        except (ModelCallError, VerdictParseError):
+            # Heuristics over the first reply; the re-ask did no better.
+            return parse_model_response(raw_text)
+        raw_text, outcome = retry_text, "reasked"
+    PARSE_STATS.record(outcome)
+    parsed = verdict.to_dict()
+    parsed["raw"] = raw_text
+    parsed["parse"] = outcome
+    return parsed
+
+
+def run_sync(coro):
+    """Run a coroutine from synchronous code (Streamlit script thread, bulk workers, CLI)."""
+    return asyncio.run(coro)
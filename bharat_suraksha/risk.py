@@ -0,0 +1,17 @@
+"""
+Risk level/color mapping. UI layers translate the level into their own labels.
+"""
+RISK_COLORS = {
+    "safe": "#39FF14",  # Neon green
+    "unknown": "#FFD700",  # Golden-ish
+    "scam": "#FF9933",  # Neon saffron
+}
+
+
+def risk_level(score: int) -> str:
+    if score <= 33:
+        return "safe"
+    elif score <= 66:
+        return "unknown"
+    else:
+        return "scam"
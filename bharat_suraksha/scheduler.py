@@ -0,0 +1,199 @@
+"""
+Quota-aware admission for the shared app-level API key.
+
+Every signed-out session spends the same GOOGLE_API_KEY quota, so one bulk job or a
+burst of visitors can exhaust it for everyone. QuotaScheduler admits model calls against
+a requests/minute and a tokens/minute bucket:
+
+  - interactive scans always go before bulk jobs (strict priority between classes);
+  - within a class, sessions take turns (round-robin), so one session's queue cannot
+    starve the others;
+  - an interactive caller that would queue behind too many others, or wait too long, is
+    shed instead: the scan falls back to the on-box estimate rather than hang.
+
+No background thread: each waiting caller re-runs the dispatcher when it wakes, and the
+caller at the head of the fair order takes the tokens.
+"""
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+from typing import Any, Callable, Deque, Dict, Hashable, Optional
+
+from bharat_suraksha.ratelimit import TokenBucket
+from bharat_suraksha.resilience import LatencyTracker, ModelCallError
+
+INTERACTIVE = 0
+BULK = 1
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BULK: "bulk"}
+
+# admit(estimated_tokens); raises QuotaShed
+Admission = Callable[[int], None]
+
+
+class QuotaShed(ModelCallError):
+    """Not admitted: the shared quota queue is too deep or the wait ran out."""
+
+    def __init__(self, reason: str, message: str = ""):
+        super().__init__("shed", message or reason)
+        self.reason = reason  # queue_full | wait_timeout
+
+
+class _Waiter:
+    __slots__ = ("tokens", "granted", "enqueued")
+
+    def __init__(self, tokens: float):
+        self.tokens = tokens
+        self.granted = False
+        self.enqueued = time.monotonic()
+
+
+class QuotaScheduler:
+    """Thread-safe; one per shared key per process."""
+
+    def __init__(
+        self,
+        requests_per_minute: float,
+        tokens_per_minute: float,
+        max_queue_depth: int = 50,
+        max_wait_seconds: float = 10.0,
+    ):
+        self.requests = TokenBucket.per_minute(requests_per_minute)
+        # A minute's worth of tokens as burst, so one long prompt is never unservable.
+        self.tokens = TokenBucket(tokens_per_minute / 60.0, capacity=tokens_per_minute)
+        self.max_queue_depth = max(1, max_queue_depth)
+        self.max_wait_seconds = max_wait_seconds
+        self._queues: Dict[int, "OrderedDict[Hashable, Deque[_Waiter]]"] = {INTERACTIVE: OrderedDict(), BULK: OrderedDict()}
+        self._cond = threading.Condition()
+        self._counts: Counter = Counter()
+        self._max_depth = 0
+        self._waits = {priority: LatencyTracker() for priority in self._queues}
+
+    # ---------------------------
+    # Queue bookkeeping (caller holds the lock)
+    # ---------------------------
+    def _depth(self, up_to_priority: Optional[int] = None) -> int:
+        return sum(
+            len(waiters)
+            for priority, sessions in self._queues.items()
+            if up_to_priority is None or priority <= up_to_priority
+            for waiters in sessions.values()
+        )
+
+    def _head(self):
+        for priority in sorted(self._queues):
+            sessions = self._queues[priority]
+            if sessions:
+                session, waiters = next(iter(sessions.items()))
+                return priority, session, waiters
+        return None
+
+    def _remove(self, priority: int, session: Hashable, waiter: _Waiter) -> None:
+        sessions = self._queues[priority]
+        waiters = sessions.get(session)
+        if waiters is None:
+            return
+        try:
+            waiters.remove(waiter)
+        except ValueError:
+            return
+        if not waiters:
+            del sessions[session]
+
+    def _dispatch(self) -> Optional[float]:
+        """Grant waiters in fair order while both buckets allow; seconds until the next grant."""
+        granted = False
+        while True:
+            head = self._head()
+            if head is None:
+                break
+            priority, session, waiters = head
+            waiter = waiters[0]
+            wait = max(self.requests.wait_time(1), self.tokens.wait_time(waiter.tokens))
+            if wait > 0:
+                if granted:
+                    self._cond.notify_all()
+                return wait
+            self.requests.try_acquire(1)
+            self.tokens.try_acquire(waiter.tokens)
+            waiter.granted = True
+            granted = True
+            waiters.popleft()
+            sessions = self._queues[priority]
+            if waiters:
+                sessions.move_to_end(session)  # next session's turn
+            else:
+                del sessions[session]
+        if granted:
+            self._cond.notify_all()
+        return None
+
+    # ---------------------------
+    # Public API
+    # ---------------------------
+    def acquire(self, session: Hashable, priority: int = INTERACTIVE, tokens: float = 1.0, shed: bool = True) -> float:
+        """
+        Block until this call may go to the model; returns seconds waited. With shed=True
+        (interactive) raises QuotaShed instead of queueing past max_queue_depth or waiting
+        past max_wait_seconds; with shed=False (bulk) waits as long as it takes.
+        """
+        tokens = min(float(tokens), self.tokens.capacity)
+        waiter = _Waiter(tokens)
+        with self._cond:
+            self._counts[f"requests_{PRIORITY_NAMES[priority]}"] += 1
+            if shed and self._depth(priority) >= self.max_queue_depth:
+                self._counts["shed_queue_full"] += 1
+                raise QuotaShed("queue_full", f"{self._depth(priority)} calls already queued for the shared key")
+            self._queues[priority].setdefault(session, deque()).append(waiter)
+            self._max_depth = max(self._max_depth, self._depth())
+            deadline = waiter.enqueued + self.max_wait_seconds if shed else None
+            while True:
+                wait = self._dispatch()
+                if waiter.granted:
+                    break
+                now = time.monotonic()
+                if deadline is not None and now >= deadline:
+                    self._remove(priority, session, waiter)
+                    self._counts["shed_wait_timeout"] += 1
+                    # Our place in line may have been what blocked the next waiter.
+                    self._dispatch()
+                    raise QuotaShed("wait_timeout", f"No shared quota within {self.max_wait_seconds:.0f}s")
+                timeout = wait if wait is not None else None
+                if deadline is not None:
+                    timeout = min(timeout, deadline - now) if timeout is not None else deadline - now
+                self._cond.wait(timeout)
+            waited = time.monotonic() - waiter.enqueued
+            self._counts["granted"] += 1
+            self._counts["tokens_granted"] += int(tokens)
+        self._waits[priority].record(waited * 1000)
+        return waited
+
+    def admission(self, session: Hashable, priority: int = INTERACTIVE, shed: bool = True) -> Admission:
+        """Bound acquire for Scanner: admit(estimated_tokens)."""
+
+        def admit(tokens: int) -> None:
+            self.acquire(session, priority, tokens, shed)
+
+        return admit
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            counts = dict(self._counts)
+            depth = {PRIORITY_NAMES[p]: sum(len(w) for w in sessions.values()) for p, sessions in self._queues.items()}
+            sessions_waiting = sum(len(sessions) for sessions in self._queues.values())
+            max_depth = self._max_depth
+        shed = counts.get("shed_queue_full", 0) + counts.get("shed_wait_timeout", 0)
+        requested = sum(v for k, v in counts.items() if k.startswith("requests_"))
+        return {
+            "queue_depth": depth,
+            "max_queue_depth_seen": max_depth,
+            "sessions_waiting": sessions_waiting,
+            "requests": requested,
+            "granted": counts.get("granted", 0),
+            "tokens_granted": counts.get("tokens_granted", 0),
+            "shed": shed,
+            "shed_queue_full": counts.get("shed_queue_full", 0),
+            "shed_wait_timeout": counts.get("shed_wait_timeout", 0),
+            "shed_rate": shed / requested if requested else 0.0,
+            "p50_wait_ms": {PRIORITY_NAMES[p]: w.percentile(50) for p, w in self._waits.items()},
+            "p95_wait_ms": {PRIORITY_NAMES[p]: w.percentile(95) for p, w in self._waits.items()},
+        }
@@ -0,0 +1,301 @@
+"""
+Local HTTP JSON service over the scan pipeline, for partner integrations (SMS gateways,
+bank fraud desks): `python -m bharat_suraksha serve`.
+
+    POST /v1/scan        {"text": "...", "language": "English"}       -> verdict
+    POST /v1/scan/batch  {"texts": ["...", ...], "language": "..."}   -> {"results": [...]}
+    GET  /v1/stats                                                    -> service counters
+    GET  /metrics                                                     -> Prometheus text
+    GET  /healthz
+
+Connections are HTTP/1.1 keep-alive. Scans run on a bounded pool; requests beyond
+max_pending queued scans get 503 with Retry-After instead of piling up. Identical
+messages already being scanned are coalesced: later callers wait on the first caller's
+scan, so one model call answers all of them. Stdlib only; pair with StubModelClient to
+run fully offline.
+"""
+import json
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+from bharat_suraksha import config
+from bharat_suraksha.metrics import METRICS
+from bharat_suraksha.model import ModelUnavailable
+from bharat_suraksha.risk import RISK_COLORS, risk_level
+
+# Failed scans map to the status a gateway can act on; the category is in the body.
+ERROR_STATUS = {"timeout": 504, "rate_limited": 429, "model_unavailable": 503, "unavailable": 503, "internal_error": 500}
+
+
+class Overloaded(RuntimeError):
+    """The scan queue is full; retry later."""
+
+
+def scan_record(verdict: Dict[str, Any]) -> Dict[str, Any]:
+    """Public response shape for one verdict (no raw model text)."""
+    from bharat_suraksha.bulk import verdict_source
+
+    if verdict.get("error") and not verdict.get("degraded"):
+        return {"error": verdict["error"], "message": verdict.get("message", "")}
+    score = int(verdict.get("score", 0) or 0)
+    level = risk_level(score)
+    record = {
+        "is_scam": verdict.get("is_scam"),
+        "score": score,
+        "risk": level,
+        "risk_color": RISK_COLORS[level],
+        "tactics": verdict.get("tactics") or [],
+        "matched_patterns": verdict.get("matched_patterns") or [],
+        "explanations": verdict.get("explanations") or {},
+        "source": verdict_source(verdict),
+    }
+    if verdict.get("reputation"):
+        record["reputation"] = verdict["reputation"]["hits"]
+    if verdict.get("degraded"):
+        # Answered on-box (model failing, circuit open or quota shed); 200 with a flag.
+        record["degraded"] = verdict["degraded"]
+        record["source"] = "local_fallback"
+        if verdict.get("error"):
+            record["error"] = verdict["error"]
+    return record
+
+
+class ScanService:
+    """
+    Thread-safe front for a Scanner: bounded scan pool plus in-flight coalescing keyed by
+    the verdict cache key and language.
+    """
+
+    def __init__(
+        self,
+        scanner,
+        client: Any = None,
+        language: str = "English",
+        max_concurrency: int = config.SERVER_MAX_CONCURRENCY,
+        max_pending: int = config.SERVER_MAX_PENDING,
+        batcher=None,
+    ):
+        self.scanner = scanner
+        self.client = client
+        self.language = language
+        self.batcher = batcher
+        self.max_pending = max(1, max_pending)
+        self._pool = ThreadPoolExecutor(max_workers=max(1, max_concurrency), thread_name_prefix="scan")
+        self._inflight: Dict[Tuple[str, str], Future] = {}
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self._counts = {"requests": 0, "scans": 0, "coalesced": 0, "rejected": 0, "errors": 0}
+
+    def _count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self._counts[name] += n
+
+    def _run(self, text: str, language: str) -> Dict[str, Any]:
+        try:
+            verdict = self.scanner.scan(text, self.client, language, self.batcher, context={"surface": "api"})
+        except ModelUnavailable as exc:
+            verdict = {"error": "model_unavailable", "message": str(exc)}
+        except Exception as exc:
+            # Never leave a partner's connection hanging on a bug in one stage.
+            verdict = {"error": "internal_error", "message": f"{type(exc).__name__}: {exc}"}
+        if verdict.get("error"):
+            self._count("errors")
+        return scan_record(verdict)
+
+    def submit(self, text: str, language: Optional[str] = None) -> Future:
+        """Future for text's record; joins an identical scan already in flight."""
+        language = language or self.language
+        key = (self.scanner.key(text), language)
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self._counts["coalesced"] += 1
+                METRICS.inc("coalesced")
+                return future
+            if len(self._inflight) >= self.max_pending:
+                self._counts["rejected"] += 1
+                METRICS.inc("rejected")
+                raise Overloaded(f"{len(self._inflight)} scans queued")
+            self._counts["scans"] += 1
+            future = self._pool.submit(self._run, text, language)
+            self._inflight[key] = future
+
+        def release(_: Future) -> None:
+            with self._lock:
+                if self._inflight.get(key) is future:
+                    del self._inflight[key]
+
+        future.add_done_callback(release)
+        return future
+
+    def scan(self, text: str, language: Optional[str] = None) -> Dict[str, Any]:
+        self._count("requests")
+        return self.submit(text, language).result()
+
+    def scan_batch(self, texts: List[str], language: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Records in input order. A full queue fails only the items that did not fit, so a
+        caller can resend those.
+        """
+        self._count("requests")
+        futures: List[Optional[Future]] = []
+        for text in texts:
+            try:
+                futures.append(self.submit(text, language))
+            except Overloaded:
+                futures.append(None)
+        wait([f for f in futures if f is not None])
+        return [f.result() if f is not None else {"error": "overloaded", "message": "Scan queue full; retry"} for f in futures]
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        if self.batcher is not None:
+            self.batcher.close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self._counts)
+            counts["inflight"] = len(self._inflight)
+        counts["uptime_seconds"] = round(time.monotonic() - self._started, 1)
+        counts["model"] = self.scanner.caller.stats()
+        counts["tokens"] = self.scanner.token_stats()
+        if self.scanner.cache is not None:
+            counts["cache"] = self.scanner.cache.stats()
+        if self.scanner.reputation is not None:
+            counts["reputation"] = self.scanner.reputation.stats()
+        if self.scanner.audit_log is not None:
+            counts["audit"] = self.scanner.audit_log.stats()
+        if self.batcher is not None:
+            counts["batching"] = self.batcher.stats()
+        return counts
+
+
+# ---------------------------
+# HTTP layer
+# ---------------------------
+class ScanRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive; every response carries Content-Length
+    server_version = "BharatSuraksha/1"
+    timeout = config.SERVER_KEEPALIVE_SECONDS
+    verbose = False
+
+    @property
+    def service(self) -> ScanService:
+        return self.server.service
+
+    def log_message(self, format: str, *args: Any) -> None:
+        if self.verbose:
+            super().log_message(format, *args)
+
+    def _send(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status: int, error: str, message: str = "", headers: Optional[Dict[str, str]] = None) -> None:
+        self._send(status, {"error": error, "message": message}, headers)
+
+    def _read_json(self) -> Optional[Dict[str, Any]]:
+        try:
+            length = int(self.headers.get("Content-Length", ""))
+        except ValueError:
+            self._error(411, "length_required", "Send a Content-Length header")
+            return None
+        if length < 0:
+            # rfile.read(-1) would wait for the client to close the socket.
+            self.close_connection = True
+            self._error(400, "invalid_length", "Content-Length must not be negative")
+            return None
+        if length > config.SERVER_MAX_BODY_BYTES:
+            # The unread body would corrupt the next request on this connection.
+            self.close_connection = True
+            self._error(413, "body_too_large", f"Limit is {config.SERVER_MAX_BODY_BYTES} bytes")
+            return None
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._error(400, "invalid_json")
+            return None
+        if not isinstance(payload, dict):
+            self._error(400, "invalid_request", "Body must be a JSON object")
+            return None
+        return payload
+
+    def do_GET(self) -> None:
+        if self.path == "/healthz":
+            self._send(200, {"status": "ok"})
+        elif self.path == "/v1/stats":
+            self._send(200, self.service.stats())
+        elif self.path == "/metrics":
+            body = METRICS.prometheus_text().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        else:
+            self._error(404, "not_found")
+
+    def do_POST(self) -> None:
+        if self.path not in ("/v1/scan", "/v1/scan/batch"):
+            self._error(404, "not_found")
+            return
+        payload = self._read_json()
+        if payload is None:
+            return
+        language = payload.get("language")
+        if language is not None and not isinstance(language, str):
+            self._error(400, "invalid_request", "'language' must be a string")
+            return
+        if self.path == "/v1/scan":
+            text = payload.get("text")
+            if not isinstance(text, str) or not text.strip():
+                self._error(400, "invalid_request", "'text' must be a non-empty string")
+                return
+            try:
+                record = self.service.scan(text, language)
+            except Overloaded as exc:
+                self._error(503, "overloaded", str(exc), {"Retry-After": "1"})
+                return
+            failed = record.get("error") and not record.get("degraded")
+            self._send(ERROR_STATUS.get(record["error"], 502) if failed else 200, record)
+            return
+
+        texts = payload.get("texts")
+        if not isinstance(texts, list) or not texts or not all(isinstance(t, str) and t.strip() for t in texts):
+            self._error(400, "invalid_request", "'texts' must be a non-empty list of non-empty strings")
+            return
+        if len(texts) > config.SERVER_MAX_BATCH:
+            self._error(413, "batch_too_large", f"At most {config.SERVER_MAX_BATCH} texts per request")
+            return
+        self._send(200, {"results": self.service.scan_batch(texts, language)})
+
+
+class ScanHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128  # listen backlog; partners open many connections at once
+
+    def __init__(self, address: Tuple[str, int], service: ScanService, verbose: bool = False):
+        handler = type("Handler", (ScanRequestHandler,), {"verbose": verbose})
+        super().__init__(address, handler)
+        self.service = service
+
+
+def serve(service: ScanService, host: str = config.SERVER_HOST, port: int = config.SERVER_PORT, verbose: bool = False) -> None:
+    """Block serving requests until interrupted."""
+    server = ScanHTTPServer((host, port), service, verbose)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
@@ -0,0 +1,225 @@
+"""
+Registry of known Indian scam tropes, shared by the prompt builder, the fallback parser
+and the tier-0 classifier so the three never drift apart.
+
+Each trope carries English, Hinglish and native-script variants (Hindi, Bengali, Tamil,
+Telugu). All variants compile into ONE regular expression, factored as a trie so the
+regex engine never backtracks through sibling alternatives that share a prefix. A single
+`finditer` pass then reports every trope hit with offsets, however long the pasted chat.
+ASCII variants match on word boundaries; native-script variants match as substrings
+because Tamil and Telugu attach case suffixes directly to the noun. Matching runs on
+lower-cased text with a case-sensitive pattern, which is markedly cheaper than IGNORECASE.
+"""
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, NamedTuple, Tuple
+
+
+class Trope(NamedTuple):
+    name: str  # label used in prompts and matched_patterns
+    variants: Tuple[str, ...]
+
+
+class TropeMatch(NamedTuple):
+    trope: str
+    text: str
+    start: int
+    end: int
+
+
+TROPES: Tuple[Trope, ...] = (
+    Trope(
+        "electricity bill disconnected",
+        (
+            "electricity bill", "electricity connection", "light bill", "power will be disconnected",
+            "power supply will be disconnected", "disconnected tonight", "disconnection",
+            "bijli bill", "bijli ka bill", "bijli kat", "light kat jayegi", "bijli connection",
+            "बिजली बिल", "बिजली का बिल", "बिजली कनेक्शन", "बिजली काट",
+            "বিদ্যুৎ বিল", "বিদ্যুৎ সংযোগ", "ইলেকট্রিক বিল",
+            "மின் கட்டணம்", "மின்சார கட்டணம்", "மின் இணைப்பு",
+            "కరెంట్ బిల్లు", "విద్యుత్ బిల్లు", "విద్యుత్ కనెక్షన్",
+        ),
+    ),
+    Trope(
+        "KYC expiry",
+        (
+            "kyc", "kyc update", "kyc expired", "kyc pending", "re-kyc", "pan card update", "aadhaar update",
+            "account will be blocked", "account suspended",
+            "kyc update karo", "khata band",
+            "केवाईसी", "खाता बंद", "खाता ब्लॉक",
+            "কেওয়াইসি", "অ্যাকাউন্ট বন্ধ",
+            "கேஒய்சி", "கணக்கு முடக்கப்படும்",
+            "కేవైసీ", "ఖాతా బ్లాక్",
+        ),
+    ),
+    Trope(
+        "WhatsApp job offer",
+        (
+            "whatsapp job", "job offer", "part time job", "part-time job", "work from home", "daily earning",
+            "earn daily", "youtube like", "like and subscribe task", "prepaid task", "telegram task",
+            "ghar baithe kamai", "ghar se kaam", "rozana kamaye",
+            "घर बैठे कमाई", "पार्ट टाइम जॉब", "नौकरी का ऑफर",
+            "ঘরে বসে আয়", "পার্ট টাইম চাকরি",
+            "வீட்டிலிருந்து வேலை", "பகுதி நேர வேலை",
+            "ఇంటి నుండి పని", "పార్ట్ టైమ్ ఉద్యోగం",
+        ),
+    ),
+    Trope(
+        "bank OTP request",
+        (
+            "otp", "one time password", "share the otp", "cvv", "atm pin", "upi pin", "verification code",
+            "otp bataye", "otp batao", "otp share karo",
+            "ओटीपी", "पिन नंबर",
+            "ওটিপি",
+            "ஓடிபி", "ஒருமுறை கடவுச்சொல்",
+            "ఓటీపీ",
+        ),
+    ),
+    Trope(
+        "refund / payment due",
+        (
+            "refund", "cashback", "payment due", "payment pending", "pending payment", "amount due",
+            "income tax refund", "overdue",
+            "paisa wapas", "refund milega", "bakaya",
+            "रिफंड", "बकाया", "भुगतान लंबित",
+            "রিফান্ড", "বকেয়া",
+            "பணத்தைத் திரும்ப", "நிலுவைத் தொகை",
+            "రిఫండ్", "బకాయి",
+        ),
+    ),
+    Trope(
+        "lottery / prize",
+        (
+            "lottery", "lucky draw", "you have won", "prize", "jackpot", "kbc", "reward points",
+            "inaam", "lottery lagi",
+            "लॉटरी", "इनाम", "पुरस्कार",
+            "লটারি", "পুরস্কার",
+            "லாட்டரி", "பரிசு",
+            "లాటరీ", "బహుమతి",
+        ),
+    ),
+    Trope(
+        "fake URL / short link",
+        (
+            "bit.ly", "tinyurl", "goo.gl", "t.ly", "cutt.ly", "rb.gy", "is.gd", "click the link", "click here",
+            "link", "apk",
+            "link par click", "link kholo",
+            "लिंक", "यहाँ क्लिक",
+            "লিংক", "ক্লিক করুন",
+            "இணைப்பை கிளிக்", "லிங்க்",
+            "లింక్", "క్లిక్ చేయండి",
+        ),
+    ),
+    Trope(
+        "request to install an app or share KYC",
+        (
+            "anydesk", "teamviewer", "quicksupport", "install the app", "download the app", "screen share",
+            "remote access",
+            "app download karo", "app install karo",
+            "ऐप डाउनलोड", "ऐप इंस्टॉल",
+            "অ্যাপ ডাউনলোড",
+            "செயலியை பதிவிறக்க",
+            "యాప్ డౌన్‌లోడ్",
+        ),
+    ),
+    Trope(
+        "UPI collect request / QR code",
+        (
+            "upi", "collect request", "scan the qr", "qr code", "approve the request",
+            "qr scan karo",
+            "यूपीआई", "क्यूआर कोड",
+            "ইউপিআই",
+            "யுபிஐ",
+            "యూపీఐ",
+        ),
+    ),
+)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _canonical(text: str) -> str:
+    return _WHITESPACE.sub(" ", text).strip().lower()
+
+
+def _trie_regex(variants: Iterable[str]) -> str:
+    """Prefix-factored alternation; optional suffix groups are greedy, so the longest variant wins."""
+    trie: Dict[str, dict] = {}
+    for variant in variants:
+        node = trie
+        for ch in variant:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def render(node: Dict[str, dict]) -> str:
+        terminal = "" in node
+        branches = [(r"\s+" if ch == " " else re.escape(ch)) + render(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if terminal:
+            return body + "?" if len(branches) == 1 and len(body) == 1 else f"(?:{body})?"
+        return body
+
+    return render(trie)
+
+
+class TropeMatcher:
+    """Compiled multi-pattern matcher over a trope registry. Build once, share freely."""
+
+    def __init__(self, tropes: Tuple[Trope, ...] = TROPES):
+        self.tropes = tropes
+        self._lookup: Dict[str, str] = {}
+        for trope in tropes:
+            for variant in trope.variants:
+                key = _canonical(variant)
+                owner = self._lookup.setdefault(key, trope.name)
+                if owner != trope.name:
+                    raise ValueError(f"Variant {variant!r} registered for both {owner!r} and {trope.name!r}")
+        ascii_variants = [v for v in self._lookup if v.isascii()]
+        native_variants = [v for v in self._lookup if not v.isascii()]
+        parts = []
+        if ascii_variants:
+            parts.append(r"(?<!\w)" + _trie_regex(ascii_variants) + r"(?!\w)")
+        if native_variants:
+            parts.append(_trie_regex(native_variants))
+        # The leading first-character class lets the engine skip hopeless positions
+        # before evaluating the word-boundary lookbehind.
+        first_chars = "".join(sorted({re.escape(v[0]) for v in self._lookup}))
+        self.pattern = re.compile(f"(?=[{first_chars}])(?:{'|'.join(parts)})")
+        self._pattern_ignorecase = re.compile(self.pattern.pattern, re.IGNORECASE)
+
+    def find_all(self, text: str) -> List[TropeMatch]:
+        """Every non-overlapping trope hit, leftmost-longest, in one linear pass."""
+        text = text or ""
+        lowered = text.lower()
+        if len(lowered) == len(text):
+            matches = self.pattern.finditer(lowered)
+        else:
+            # A few code points change length when lower-cased; keep offsets exact for those.
+            matches = self._pattern_ignorecase.finditer(text)
+        lookup = self._lookup
+        return [TropeMatch(lookup[_canonical(m.group())], text[m.start() : m.end()], m.start(), m.end()) for m in matches]
+
+    def matched(self, text: str) -> List[str]:
+        """Distinct trope names found in text, in registry order."""
+        found = {match.trope for match in self.find_all(text)}
+        return [trope.name for trope in self.tropes if trope.name in found]
+
+
+@lru_cache(maxsize=1)
+def get_matcher() -> TropeMatcher:
+    return TropeMatcher()
+
+
+def find_tropes(text: str) -> List[TropeMatch]:
+    return get_matcher().find_all(text)
+
+
+def matched_tropes(text: str) -> List[str]:
+    return get_matcher().matched(text)
+
+
+def prompt_trope_text() -> str:
+    """Trope list as embedded in the forensic prompt."""
+    return "; ".join(trope.name for trope in TROPES)
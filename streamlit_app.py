@@ -1,12 +1,32 @@
+import calendar
+import gc
+import html
 import json
-import re
+import os
 import time
-import math
+import uuid
+from datetime import datetime, timezone
 from typing import Any, Dict, Optional
 
 import numpy as np
 import streamlit as st
-import google.generativeai as genai
+
+from bharat_suraksha import config
+from bharat_suraksha.audit import summarize as summarize_audit
+from bharat_suraksha.bulk import BulkProgress, BulkRunner, count_rows, fingerprint, iter_rows
+from bharat_suraksha.chats import ChatTimeline, analyze_chat, looks_like_chat_export
+from bharat_suraksha.clientpool import ClientPool
+from bharat_suraksha.geomap import TROPE_NAMES, ReportGrid, cell_bounds, level_for_zoom, resolve_location, today
+from bharat_suraksha.history import SessionHistory, SessionLedger, trim_raw
+from bharat_suraksha.languages import language_code, language_name, pick_explanation
+from bharat_suraksha.metrics import METRICS
+from bharat_suraksha.parsing import PARSE_STATS
+from bharat_suraksha.pipeline import Scanner
+from bharat_suraksha.qubit import make_rng, simulate_qubit_and_collapse
+from bharat_suraksha.ratelimit import TokenBucket
+from bharat_suraksha.risk import RISK_COLORS, risk_level
+from bharat_suraksha.scheduler import BULK, INTERACTIVE, QuotaScheduler
+from bharat_suraksha.tropes import matched_tropes
 
 # ---------------------------
 # Page configuration
@@ -57,6 +77,11 @@ st.markdown(
         text-align: center;
         color: #001010;
     }
+    /* Result card pieces (pre-rendered once per result and language) */
+    .muted { color: rgba(233,242,255,0.62); font-size: 0.875rem; margin: 0 0 6px 0; }
+    .meter { height: 8px; border-radius: 4px; background: rgba(255,255,255,0.08); overflow: hidden; margin: 8px 0 12px 0; }
+    .meter > div { height: 100%; background: linear-gradient(90deg, var(--neon-saffron), var(--neon-green)); }
+    .glass pre { white-space: pre-wrap; word-break: break-word; background: rgba(0,0,0,0.35); border-radius: 8px; padding: 10px; font-size: 0.8rem; }
     /* Ashoka Chakra animation */
     .chakra {
         width: 68px;
@@ -80,6 +105,14 @@ st.markdown(
     @media (max-width: 640px) {
         .glass { padding: 12px; border-radius: 10px; }
     }
+    /* Superposition bar: animated client-side so the script thread never waits on it */
+    .superposition { height: 6px; border-radius: 3px; background: rgba(255,255,255,0.06); overflow: hidden; margin-bottom: 8px; }
+    .superposition > div {
+        height: 100%;
+        background: linear-gradient(90deg, var(--neon-saffron), var(--neon-green));
+        animation: collapse 0.9s ease-out forwards;
+    }
+    @keyframes collapse { from { width: 0%; } to { width: 100%; } }
     /* Progress bar style */
     .stProgress > div > div > div > div { background: linear-gradient(90deg, var(--neon-saffron), var(--neon-green)) !important; }
     </style>
@@ -225,6 +258,7 @@ def init_state():
     defaults = {
         "language": "English",
         "last_input": "",
+        "last_scanned": None,
         "last_parsed": None,
         "last_score": None,
         "user_api_key": None,
@@ -235,28 +269,74 @@ def init_state():
     for k, v in defaults.items():
         if k not in st.session_state:
             st.session_state[k] = v
+    if "session_id" not in st.session_state:
+        # Identifies this session to the shared-key scheduler's fair queue.
+        st.session_state["session_id"] = uuid.uuid4().hex
 
 
 init_state()
 
+
+def session_rng():
+    """Per-session generator for qubit measurements; seeded from config for reproducible runs."""
+    if "qubit_rng" not in st.session_state:
+        st.session_state["qubit_rng"] = make_rng(config.QUBIT_SEED)
+    return st.session_state["qubit_rng"]
+
+
+@st.cache_resource
+def get_session_ledger() -> SessionLedger:
+    """Process-wide: every session's history counts against one memory budget."""
+    return SessionLedger()
+
+
+def session_history() -> SessionHistory:
+    """This session's recent scans; held here so it is freed when the session ends."""
+    if "history" not in st.session_state:
+        st.session_state["history"] = get_session_ledger().open(st.session_state["session_id"])
+    return st.session_state["history"]
+
+# ---------------------------
+# Garbage collection: keep process-wide objects out of the per-rerun sweep
+# ---------------------------
+def freeze_long_lived_objects() -> None:
+    """
+    Streamlit runs a full gc.collect() after every script run, fragment reruns included.
+    With the SDK, numpy and the shared pipeline loaded that sweep costs far more CPU than
+    a fragment itself, so once process-wide objects exist they are moved to the permanent
+    generation and later sweeps only walk what reruns create.
+    """
+    gc.collect()
+    gc.freeze()
+
+
+@st.cache_resource
+def freeze_startup_heap() -> bool:
+    """Once per process, after the first run has imported everything."""
+    freeze_long_lived_objects()
+    return True
+
 # ---------------------------
 # Helper: Simulated login (placeholder)
 # ---------------------------
 def login_placeholder(labels: Dict[str, str]) -> None:
     """
     Simulated login UI: sets st.session_state['logged_in_user'] to a fake value.
-    Replace with proper OAuth server-side flow in production.
+    Replace with proper OAuth server-side flow in production. Signing in or out changes
+    the session panel too, so it reruns the whole page.
     """
     if st.session_state.get("logged_in_user"):
-        st.sidebar.markdown(f"**User:** {st.session_state['logged_in_user']}")
-        if st.sidebar.button(labels["logout"]):
+        st.markdown(f"**User:** {st.session_state['logged_in_user']}")
+        if st.button(labels["logout"]):
             st.session_state["logged_in_user"] = None
-            st.sidebar.success("Signed out")
+            st.toast("Signed out")
+            st.rerun()
     else:
-        if st.sidebar.button(labels["login"]):
+        if st.button(labels["login"]):
             # simulate sign in for demo; in prod implement proper OAuth
             st.session_state["logged_in_user"] = "user@example.com"
-            st.sidebar.success("Signed in as user@example.com")
+            st.toast("Signed in as user@example.com")
+            st.rerun()
 
 
 # ---------------------------
@@ -279,225 +359,342 @@ def effective_api_key() -> Optional[str]:
 # ---------------------------
 def configure_model(api_key: Optional[str]):
     """
-    Configure google.generativeai safely. Returns a GenerativeModel instance or None.
+    Fetch the pooled client for api_key. Returns a connected client or None.
     """
     if not api_key:
         st.error("No API key available. Add GOOGLE_API_KEY to Streamlit Secrets or provide a per-session key.")
         return None
     try:
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel("gemini-1.5-flash")
-        return model
+        with METRICS.timer("configure_model"):
+            return get_client_pool().get(api_key)
     except Exception as e:
         st.error("Failed to configure GenAI client. Check key or network.")
         # Do not reveal keys or stack traces to users; show minimal message.
         return None
 
 
-# ---------------------------
-# Advanced Forensic AI prompt builder
-# ---------------------------
-def build_deep_intent_prompt(message: str, language: str) -> str:
-    """
-    Build a 'Deep Intent Analysis' prompt instructing Gemini to act as a Digital Forensic Investigator.
-    Instructs returning a strict JSON object with fields:
-      is_scam: yes|no|suspect
-      score: int 0-100
-      explanations: {"en": "...", "hi": "...", ...} (if possible)
-      social_engineering_tactics: [ "urgency", "authority", "fear", "phishing", ... ]
-      matched_patterns: [...]
-    """
-    patterns = [
-        "electricity bill disconnected",
-        "KYC expiry",
-        "WhatsApp job offer",
-        "bank OTP request",
-        "refund / payment due",
-        "lottery / prize",
-        "fake URL / short link",
-        "request to install an app or share KYC"
-    ]
-    pattern_text = "; ".join(patterns)
-    prompt = f"""
-You are a Digital Forensic Investigator specialized in scams in India. Analyze the following message for intent and social engineering tactics.
-Return ONLY a JSON object (no explanation text) with these fields:
-- is_scam: "yes"|"no"|"suspect"
-- score: integer 0-100 (100 => certain scam)
-- explanations: object with keys 'en' and 'hi' (English and Hindi concise explanations)
-- social_engineering_tactics: array of tactics detected (e.g., "urgency", "authority", "pretexting", "fear", "phishing", "baiting")
-- matched_patterns: array of pattern strings you matched (from known Indian tropes)
-
-Look specifically for these tropes: {pattern_text}
-Message: \"\"\"{message}\"\"\"
-
-Ensure score is an integer and return valid JSON only.
-"""
-    return prompt
-
-
-# ---------------------------
-# Model call wrapper + robust parsing
-# ---------------------------
-def call_model_and_parse(model, prompt: str) -> Dict[str, Any]:
-    """
-    Call model.generate_content with defensive error handling.
-    Try to extract JSON; fall back to safe heuristics.
-    """
-    raw_text = ""
-    try:
-        response = model.generate_content(prompt)
-        # Extract text safely; the response object shape may vary by client version
-        if hasattr(response, "text") and response.text:
-            raw_text = response.text
-        elif hasattr(response, "candidates") and response.candidates:
-            first = response.candidates[0]
-            raw_text = getattr(first, "content", getattr(first, "text", str(first)))
-        else:
-            raw_text = str(response)
-    except Exception as e:
-        # Keep error minimal for user, but include fallback raw JSON for debug
-        err_msg = {"error": "model_call_failed", "message": str(e)}
-        raw_text = json.dumps(err_msg)
-        st.error("AI call failed — showing conservative fallback.")
-    parsed = parse_model_response(raw_text)
-    parsed["raw"] = raw_text
-    return parsed
+@st.cache_resource
+def get_client_pool() -> ClientPool:
+    """One client per distinct API key, shared by every session and rerun."""
+    pool = ClientPool(
+        max_clients=config.CLIENT_POOL_MAX_CLIENTS,
+        idle_seconds=config.CLIENT_POOL_IDLE_SECONDS,
+        structured=config.MODEL_STRUCTURED_OUTPUT,
+    )
+    # Build the app-level client in the background so the first scan after deploy is warm.
+    pool.warm(st.secrets.get("GOOGLE_API_KEY") if "GOOGLE_API_KEY" in st.secrets else None)
+    freeze_long_lived_objects()
+    return pool
 
 
-def parse_model_response(text: str) -> Dict[str, Any]:
-    """
-    Parse the model's JSON response if possible. If not, attempt regex heuristics.
-    Returns normalized dictionary with defaults.
-    """
-    try:
-        data = json.loads(text)
-        is_scam = data.get("is_scam", "suspect")
-        score = int(data.get("score", 50))
-        explanations = data.get("explanations", {})
-        tactics = data.get("social_engineering_tactics", [])
-        matched = data.get("matched_patterns", [])
-        return {
-            "is_scam": is_scam,
-            "score": max(0, min(100, score)),
-            "explanations": explanations,
-            "tactics": tactics,
-            "matched_patterns": matched,
-            "raw": text,
-        }
-    except Exception:
-        # Fallback heuristics
-        score = 50
-        m = re.search(r"(\b[0-9]{1,3}\b)\s*(%|percent)?", text)
-        if m:
-            try:
-                c = int(m.group(1))
-                if 0 <= c <= 100:
-                    score = c
-            except:
-                pass
-        is_scam = "suspect"
-        if re.search(r"\b(scam|fraud|fake|malicious|phish)\b", text, re.I):
-            is_scam = "yes"
-        elif re.search(r"\b(safe|benign|not a scam|trustworthy)\b", text, re.I):
-            is_scam = "no"
-        # naive pattern detection
-        known = ["electricity", "bill", "KYC", "job", "WhatsApp", "OTP", "link", "refund", "lottery", "prize", "UPI"]
-        matched = [p for p in known if re.search(p, text, re.I)]
-        return {
-            "is_scam": is_scam,
-            "score": score,
-            "explanations": {"en": text},
-            "tactics": [],
-            "matched_patterns": matched,
-            "raw": text,
-        }
-
-
-# ---------------------------
-# Quantum Digital Dharma Engine (qubit simulation)
-# ---------------------------
-def hadamard_matrix():
-    return (1 / math.sqrt(2)) * np.array([[1, 1], [1, -1]], dtype=complex)
-
-
-def simulate_qubit_and_collapse(model_score: int, progress_callback=None, steps: int = 20, sleep_per_step: float = 0.03):
-    """
-    Simulate qubit |ψ> = α|0> + β|1> where |β|^2 ~= model_score/100.
-    - Show an 'Analyzing Superposition' progress via progress_callback (if provided).
-    - Apply Hadamard to generate superposition (visualized).
-    - Collapse (measure) using resulting probabilities.
-    Returns a dict with amplitudes, probabilities, and measured outcome (0 safe, 1 scam).
-    """
-    # Map model score to initial probability of |1> (scam)
-    p1 = np.clip(model_score / 100.0, 0.0, 1.0)
-    a0 = math.sqrt(max(0.0, 1 - p1))
-    a1 = math.sqrt(max(0.0, p1))
-    state = np.array([a0, a1], dtype=complex).reshape(2, 1)
-
-    # Animate progress bar (if callback provided)
-    if progress_callback:
-        for i in range(steps):
-            progress_callback((i + 1) / steps)
-            time.sleep(sleep_per_step)
-
-    # Apply Hadamard
-    H = hadamard_matrix()
-    superposed = H @ state
-    probs = np.abs(superposed.flatten()) ** 2
-    probs = probs / probs.sum()
-
-    # Random measurement
-    measured = np.random.choice([0, 1], p=[float(probs[0]), float(probs[1])])
-    return {
-        "initial_amplitudes": [float(round(a0, 4)), float(round(a1, 4))],
-        "superposed_amplitudes": [float(round(superposed[0].real, 4)), float(round(superposed[1].real, 4))],
-        "probabilities": [float(round(probs[0], 4)), float(round(probs[1], 4))],
-        "measured": int(measured),
-    }
+@st.cache_resource
+def get_quota_scheduler() -> QuotaScheduler:
+    """Admission for the shared app-level key; sessions with their own key bypass it."""
+    return QuotaScheduler(
+        requests_per_minute=config.QUOTA_REQUESTS_PER_MINUTE,
+        tokens_per_minute=config.QUOTA_TOKENS_PER_MINUTE,
+        max_queue_depth=config.QUOTA_MAX_QUEUE_DEPTH,
+        max_wait_seconds=config.QUOTA_MAX_WAIT_SECONDS,
+    )
+
+
+def quota_admission(priority: int):
+    """Admission callable when this session spends the shared key, else None."""
+    if st.session_state.get("user_api_key"):
+        return None
+    # Bulk jobs wait their turn; interactive scans are shed to the on-box estimate.
+    return get_quota_scheduler().admission(st.session_state["session_id"], priority, shed=priority == INTERACTIVE)
+
+
+# ---------------------------
+# Scan pipeline (process-wide, shared by all sessions)
+# ---------------------------
+@st.cache_resource
+def get_scanner() -> Scanner:
+    """Verdict cache, template index and tier-0 cascade, loaded once per process."""
+    scanner = Scanner.from_config()
+    freeze_long_lived_objects()
+    return scanner
 
 
 # ---------------------------
 # Risk label/color mapping
 # ---------------------------
 def risk_label_color(score: int):
-    if score <= 33:
-        return LANG[st.session_state["language"]]["safe"], "#39FF14"  # Neon green
-    elif score <= 66:
-        return LANG[st.session_state["language"]]["unknown"], "#FFD700"  # Golden-ish
-    else:
-        return LANG[st.session_state["language"]]["scam"], "#FF9933"  # Neon saffron
+    level = risk_level(score)
+    return LANG[st.session_state["language"]][level], RISK_COLORS[level]
 
 
 # ---------------------------
 # UI: Sidebar controls (language, login, API key)
 # ---------------------------
 def sidebar_controls():
-    # Language toggle
-    lang = st.sidebar.selectbox("Language / भाषा", list(LANG.keys()), index=list(LANG.keys()).index(st.session_state["language"]))
-    st.session_state["language"] = lang
+    # Language toggle: every label on the page changes, so this is a full rerun
+    # Bound to st.session_state["language"]; an index= derived from it would change the
+    # widget's identity on every switch and drop the next selection.
+    lang = st.sidebar.selectbox("Language / भाषा", list(LANG.keys()), key="language")
     labels = LANG[lang]
 
-    st.sidebar.markdown("---")
+    # The panels below are fragments: their own widgets rerun only that panel.
+    with st.sidebar:
+        st.markdown("---")
+        account_panel(labels)
+
+        st.markdown("---")
+        pipeline_panel()
+
+        st.markdown("---")
+        render_metrics_panel()
+        render_audit_panel()
+
+        st.markdown("---")
+        st.markdown("### Resources")
+        st.markdown(f"- [Cybercrime Portal](https://cybercrime.gov.in)")
+        st.markdown(f"- [Sanchar Saathi (DoT)](https://sancharsaathi.gov.in)")
+
+
+@st.fragment
+def account_panel(labels: Dict[str, str]):
     # Simulated login
     login_placeholder(labels)
 
-    st.sidebar.markdown("### API Key (session)")
+    had_key = bool(st.session_state.get("user_api_key"))
+    st.markdown("### API Key (session)")
     if st.session_state.get("logged_in_user"):
         # If logged in, allow user to paste a per-session API key (stored only in session_state)
-        key = st.sidebar.text_input(labels["upload_key"], type="password", value=st.session_state.get("user_api_key") or "")
+        key = st.text_input(labels["upload_key"], type="password", value=st.session_state.get("user_api_key") or "")
         if key:
             st.session_state["user_api_key"] = key.strip()
-            st.sidebar.success("Key stored for this session only.")
-        use_app = st.sidebar.checkbox(labels["use_app_key"], value=not bool(st.session_state.get("user_api_key")))
+            st.success("Key stored for this session only.")
+        use_app = st.checkbox(labels["use_app_key"], value=not bool(st.session_state.get("user_api_key")))
         if use_app:
             st.session_state["user_api_key"] = None
     else:
-        st.sidebar.info("Sign in to provide a per-session API key.")
+        st.info("Sign in to provide a per-session API key.")
+    if bool(st.session_state.get("user_api_key")) != had_key:
+        # The session panel shows which key is in use.
+        st.rerun()
+
+
+@st.fragment
+def pipeline_panel():
+    """Process-wide pipeline counters; refreshed on full reruns or with the button."""
+    head, refresh = st.columns([4, 1])
+    head.markdown("### Verdict cache")
+    refresh.button("↻", key="refresh_pipeline_stats", help="Refresh counters")
+    scanner = get_scanner()
+    stats = scanner.cache.stats()
+    st.markdown(
+        f"- Hits: **{stats['hits']}** (memory {stats['memory_hits']}, disk {stats['disk_hits']})\n"
+        f"- Misses: **{stats['misses']}** — hit rate {stats['hit_rate']:.0%}\n"
+        f"- Model time saved: **{stats['saved_ms'] / 1000:.1f}s**"
+    )
+
+    templates = scanner.templates.stats()
+    st.markdown(
+        f"- Near-duplicate templates: **{templates['entries']}** indexed, "
+        f"**{templates['hits']}** reused ({templates['hit_rate']:.0%})"
+    )
 
-    st.sidebar.markdown("---")
-    st.sidebar.markdown("### Resources")
-    st.sidebar.markdown(f"- [Cybercrime Portal](https://cybercrime.gov.in)")
-    st.sidebar.markdown(f"- [Sanchar Saathi (DoT)](https://sancharsaathi.gov.in)")
+    reputation = scanner.reputation.stats() if scanner.reputation is not None else None
+    if reputation and reputation["entries"]:
+        st.markdown(
+            f"- Reputation feed: **{reputation['entries']:,}** known-bad entries "
+            f"({reputation['bytes'] / 2**20:.1f} MiB mapped), **{reputation['hits']}** scans matched "
+            f"({reputation['hit_rate']:.1%}), reloaded {reputation['reloads']}×"
+        )
+
+    clients = get_client_pool().stats()
+    construct_ms = f"{clients['construct_ms_last']:.0f}ms" if clients["construct_ms_last"] is not None else "—"
+    st.markdown(
+        f"- Model clients pooled: **{clients['clients']}** — reuse rate {clients['reuse_rate']:.0%}, "
+        f"last construction {construct_ms}"
+    )
+    calls = scanner.caller.stats()
+    if calls["calls"]:
+        first = f"{calls['p50_first_verdict_ms']:.0f}ms" if calls["p50_first_verdict_ms"] is not None else "—"
+        p95 = f"{calls['p95_ms']:.0f}ms" if calls["p95_ms"] is not None else "—"
+        p99 = f"{calls['p99_ms']:.0f}ms" if calls["p99_ms"] is not None else "—"
+        st.markdown(
+            f"- Model latency p95 {p95}, p99 {p99} — retries **{calls['retries']}**, "
+            f"hedged **{calls['hedges']}** (won {calls['hedge_wins']}), failed **{calls['failures']}**\n"
+            f"- p50 time to first verdict (streamed): {first}"
+        )
+    tokens = scanner.token_stats()
+    if tokens["compacted"]:
+        st.markdown(
+            f"- Prompts compacted: **{tokens['compacted']}** / {tokens['requests']} — "
+            f"message tokens {tokens['message_tokens_before']:,} → {tokens['message_tokens_after']:,} "
+            f"({tokens['saved_ratio']:.0%} saved)"
+        )
+    parses = PARSE_STATS.stats()
+    if parses["total"]:
+        st.markdown(
+            f"- Replies parsed: **{parses['success_rate']:.1%}** — strict {parses['strict']}, "
+            f"repaired {parses['repaired']}, re-asked {parses['reasked']}, heuristic fallback **{parses['fallback']}**"
+        )
+
+    breaker = calls.get("breaker")
+    if breaker and (breaker["state"] != "closed" or breaker["opened"]):
+        state = {"open": "🔴 open", "half_open": "🟡 probing", "closed": "🟢 closed"}[breaker["state"]]
+        st.markdown(
+            f"- AI circuit breaker: **{state}** — opened {breaker['opened']}×, recovered {breaker['recovered']}×, "
+            f"**{breaker['short_circuited']}** scans answered on-box"
+        )
+    quota = get_quota_scheduler().stats()
+    if quota["requests"]:
+        waits = quota["p95_wait_ms"]
+        p95_wait = f"{waits['interactive']:.0f}ms" if waits["interactive"] is not None else "—"
+        st.markdown(
+            f"- Shared key queue: interactive **{quota['queue_depth']['interactive']}**, bulk **{quota['queue_depth']['bulk']}** "
+            f"(max seen {quota['max_queue_depth_seen']}) — p95 wait {p95_wait}\n"
+            f"- Shed to on-box estimate: **{quota['shed']}** ({quota['shed_rate']:.1%}; "
+            f"queue full {quota['shed_queue_full']}, wait timeout {quota['shed_wait_timeout']})"
+        )
+    explained = scanner.explanation_stats()
+    if explained:
+        translated = sum(row["translated"] for row in explained.values())
+        st.markdown(
+            "- Explanations in the viewer's language: "
+            + " · ".join(f"{code} **{row['hit_rate']:.0%}**" for code, row in explained.items())
+            + f" — {translated} translated on demand"
+        )
+
+    cascade = scanner.cascade
+    if cascade is not None:
+        tier0 = cascade.stats()
+        p50_local = f"{tier0['p50_local_ms']:.1f}ms" if tier0["p50_local_ms"] is not None else "—"
+        p50_escalated = f"{tier0['p50_escalated_ms']:.0f}ms" if tier0["p50_escalated_ms"] is not None else "—"
+        st.markdown(
+            f"- Tier-0 decided on-box: **{tier0['local']}** / {tier0['total']} "
+            f"({tier0['model_traffic_removed']:.0%} model traffic removed)\n"
+            f"- p50 latency: on-box {p50_local}, escalated {p50_escalated}"
+        )
+
+
+@st.fragment
+def render_metrics_panel():
+    """Opt-in: per-stage latency percentiles and counters from the process-wide registry."""
+    if not st.checkbox("Admin: stage metrics", key="metrics_panel"):
+        return
+    held = get_session_ledger().stats()
+    st.caption(
+        f"Session histories: {held['entries']:,} scans in {held['sessions']:,} sessions, "
+        f"{held['bytes'] / 1024:,.0f} KiB of {held['budget_bytes'] / 2**20:,.0f} MiB ({held['evicted']:,} trimmed to fit)"
+    )
+    enabled = st.toggle("Collect stage timings (all sessions)", value=METRICS.enabled)
+    if enabled != METRICS.enabled:
+        METRICS.enabled = enabled
+    rows = METRICS.stage_summary()
+    if not rows:
+        st.caption("No timings yet — scan a message with collection on.")
+        return
+    fmt = lambda ms: f"{ms:.1f}" if ms is not None else "—"
+    st.dataframe(
+        [
+            {"stage": r["stage"], "n": r["count"], "p50 ms": fmt(r["p50_ms"]), "p95 ms": fmt(r["p95_ms"]), "p99 ms": fmt(r["p99_ms"])}
+            for r in rows
+        ],
+        hide_index=True,
+    )
+    counters = METRICS.counters()
+    if counters:
+        st.markdown("\n".join(f"- `{name}` **{value:g}**" for name, value in counters.items()))
+    st.download_button("Download Prometheus metrics", METRICS.prometheus_text(), file_name="metrics.prom", mime="text/plain")
+    if st.button("Reset metrics"):
+        METRICS.reset()
+
+
+@st.fragment
+def render_audit_panel():
+    """Opt-in: audit writer health and one day's verdict counts, read from the segment indexes."""
+    if not st.checkbox("Admin: audit log", key="audit_panel"):
+        return
+    audit_log = get_scanner().audit_log
+    if audit_log is None:
+        st.caption("Audit log is off (BHARAT_SURAKSHA_AUDIT=0) or its directory is not writable.")
+        return
+    writer = audit_log.stats()
+    ratio = f"{writer['compression_ratio']:.0f}×" if writer["compression_ratio"] else "—"
+    st.markdown(
+        f"- Records written: **{writer['written']:,}** — queued {writer['queued']:,}, "
+        f"dropped **{writer['dropped']:,}**, failed **{writer['failed']:,}**\n"
+        f"- Compression {ratio}, {writer['bytes_out'] / 2**20:.2f} MiB written by this process"
+    )
+    if writer["last_error"]:
+        st.warning(f"Last audit write error: {writer['last_error']}")
+    day = st.date_input("UTC day", value=datetime.now(timezone.utc).date(), key="audit_day")
+    start = calendar.timegm(day.timetuple())
+    summary = summarize_audit(audit_log.directory, start, start + 86400)
+    if not summary["segments"]:
+        st.caption("No records for this day.")
+        return
+    verdicts = " · ".join(f"{name} **{count:,}**" for name, count in sorted(summary["verdicts"].items()))
+    sources = ", ".join(f"{name} {count:,}" for name, count in sorted(summary["sources"].items()))
+    st.markdown(f"- {summary['records']:,} indexed records: {verdicts or '—'}\n- By source: {sources or '—'}")
+    if summary["unindexed_bytes"]:
+        st.caption(
+            f"More records sit in blocks still open ({summary['unindexed_bytes'] / 1024:.1f} KiB); "
+            f"they are counted when the block closes, within {config.AUDIT_BLOCK_SECONDS:.0f}s."
+        )
+    st.caption(f"Records (redacted): `python -m bharat_suraksha.audit query --day {day.isoformat()}`")
+
+
+# ---------------------------
+# Single-message analysis
+# ---------------------------
+MODEL_ERROR_MESSAGES = {
+    "timeout": "AI did not answer in time — showing an on-box estimate. Please try again.",
+    "rate_limited": "AI quota exhausted for now — showing an on-box estimate. Please retry in a minute.",
+    "unavailable": "AI service temporarily unavailable — showing an on-box estimate.",
+    "circuit_open": "AI service is failing — calls are paused while it recovers. Showing an on-box estimate.",
+    "auth": "AI rejected the API key — check the key. Showing an on-box estimate.",
+    "invalid_request": "AI could not process this message — showing an on-box estimate.",
+    "model_call_failed": "AI call failed — showing an on-box estimate.",
+}
+
+
+def analyze_message(user_text: str) -> Optional[Dict[str, Any]]:
+    """
+    Return a parsed verdict for user_text, calling the model only when the verdict cache,
+    the template index and the tier-0 classifier cannot decide. None if no model is available.
+    """
+    scanner = get_scanner()
+    language = st.session_state["language"]
+    scan_started = time.monotonic()
+    parsed, decision = scanner.lookup(user_text)
+    if parsed is not None:
+        latency_ms = (time.monotonic() - scan_started) * 1000
+        METRICS.observe("scan", latency_ms)
+        scanner.audit(user_text, parsed, language, latency_ms, surface="app", session=st.session_state["session_id"])
+        return parsed
+
+    model = configure_model(effective_api_key())
+    if not model:
+        st.error("AI model unavailable. Check API key.")
+        return None
+
+    # Stream the answer: the verdict badge appears as soon as is_scam/score arrive
+    early = st.empty()
+    early.caption("Contacting forensic AI...")
+
+    def show_early(fields: Dict[str, Any], first_verdict_ms: Optional[float]) -> None:
+        with early.container():
+            render_early_verdict(fields, first_verdict_ms)
+
+    parsed = scanner.ask_model_streaming(model, user_text, language, on_update=show_early, admit=quota_admission(INTERACTIVE))
+    early.empty()
+    if parsed.get("degraded") == "shed":
+        st.warning("The shared AI key is at capacity — showing an on-box estimate. Scan again in a minute, or add your own API key.")
+    if parsed.get("error"):
+        st.error(MODEL_ERROR_MESSAGES.get(parsed["error"], MODEL_ERROR_MESSAGES["model_call_failed"]))
+    if decision is not None:
+        parsed["cascade"] = decision
+        scanner.cascade.record_escalation_latency((time.monotonic() - scan_started) * 1000)
+    latency_ms = (time.monotonic() - scan_started) * 1000
+    METRICS.observe("scan", latency_ms)
+    scanner.audit(user_text, parsed, language, latency_ms, surface="app", session=st.session_state["session_id"])
+    return parsed
 
 
 # ---------------------------
@@ -513,54 +710,14 @@ def run_analysis():
     left, right = st.columns([2, 1])
 
     with left:
-        st.markdown("<div class='glass'>", unsafe_allow_html=True)
-        user_text = st.text_area(labels["paste_prompt"], value=st.session_state.get("last_input", ""), height=170)
-        st.session_state["last_input"] = user_text
-        st.markdown("</div>", unsafe_allow_html=True)
-
-        if st.button(labels["scan_button"]):
-            if not user_text:
-                st.warning(labels["please_paste"])
-            else:
-                # Begin processing
-                st.session_state["is_processing"] = True
-                api_key = effective_api_key()
-                model = configure_model(api_key)
-                if not model:
-                    st.error("AI model unavailable. Check API key.")
-                    st.session_state["is_processing"] = False
-                    return
-
-                # Build prompt and call model
-                prompt = build_deep_intent_prompt(user_text, st.session_state["language"])
-                # Show Ashoka Chakra animation while calling model (visual)
-                with st.spinner("Contacting forensic AI..."):
-                    parsed = call_model_and_parse(model, prompt)
-
-                # Keep parsed and score in session
-                st.session_state["last_parsed"] = parsed
-                st.session_state["last_score"] = parsed.get("score", 50)
-
-                # Quantum superposition animation: progressive collapse
-                st.markdown("<div style='text-align:center'><div class='chakra'></div></div>", unsafe_allow_html=True)
-                prog = st.progress(0)
-                qres = simulate_qubit_and_collapse(st.session_state["last_score"], progress_callback=prog.progress, steps=30, sleep_per_step=0.03)
-                st.session_state["quantum_result"] = qres
-                st.session_state["is_processing"] = False
-
-                # Render results
-                render_results(parsed, qres)
-
-        # If previous results exist, show them (persistent across language toggle)
-        elif st.session_state.get("last_parsed"):
-            parsed = st.session_state["last_parsed"]
-            qres = st.session_state.get("quantum_result")
-            if not qres:
-                # Simulate a quantum run for display if not present
-                prog = st.progress(0)
-                qres = simulate_qubit_and_collapse(parsed.get("score", 50), progress_callback=prog.progress, steps=20, sleep_per_step=0.02)
-                st.session_state["quantum_result"] = qres
-            render_results(parsed, qres)
+        if st.toggle("Bulk mode (CSV / JSONL upload)", key="bulk_mode"):
+            render_bulk_mode()
+        elif st.toggle("WhatsApp chat export (.txt / .zip)", key="chat_mode"):
+            render_chat_mode(labels)
+        elif config.GEO_ENABLED and st.toggle("Scam map", key="map_mode"):
+            render_map_mode()
+        else:
+            render_single_mode(labels)
 
     with right:
         st.markdown("<div class='glass'>", unsafe_allow_html=True)
@@ -577,13 +734,7 @@ def run_analysis():
             st.markdown("- Per-session API key: **Not provided** (using app-level key if available)")
 
         st.markdown("---")
-        st.markdown(f"### {labels['emergency_action']}")
-        if st.button(labels["call_1930"]):
-            st.write("📞 Dialing 1930...")
-            st.markdown("[Click here to call 1930](tel:1930)")
-        if st.button(labels["report_cyber"]):
-            st.write("Redirecting to official portal...")
-            st.markdown("[Visit Portal](https://cybercrime.gov.in)")
+        emergency_actions(labels)
         st.markdown("---")
         st.markdown(f"### {labels['report_chakshu']}")
         st.markdown(labels["chakshu_cta"])
@@ -591,52 +742,571 @@ def run_analysis():
         st.markdown("</div>", unsafe_allow_html=True)
 
 
+@st.fragment
+def emergency_actions(labels: Dict[str, str]):
+    st.markdown(f"### {labels['emergency_action']}")
+    if st.button(labels["call_1930"]):
+        st.write("📞 Dialing 1930...")
+        st.markdown("[Click here to call 1930](tel:1930)")
+    if st.button(labels["report_cyber"]):
+        st.write("Redirecting to official portal...")
+        st.markdown("[Visit Portal](https://cybercrime.gov.in)")
+
+
+# ---------------------------
+# Single-message mode
+# ---------------------------
+@st.fragment
+def render_single_mode(labels: Dict[str, str]):
+    """Message box, scan and result; typing or scanning reruns only this fragment."""
+    st.markdown("<div class='glass'>", unsafe_allow_html=True)
+    user_text = st.text_area(labels["paste_prompt"], value=st.session_state.get("last_input", ""), height=170)
+    st.session_state["last_input"] = user_text
+    location = ""
+    if config.GEO_ENABLED:
+        location = st.text_input(
+            "📍 Where did you get it? (optional: city, or lat, lon)",
+            key="report_location",
+            help="Adds a suspicious message to the scam map as a ~1 km grid square and a date. The message itself is not shared.",
+        )
+    st.markdown("</div>", unsafe_allow_html=True)
+    if user_text.count("\n") >= 4 and looks_like_chat_export(user_text):
+        st.caption("📱 This looks like a WhatsApp chat export. Switch on “WhatsApp chat export” above to upload it and see where in the chat the risk is.")
+
+    if st.button(labels["scan_button"]):
+        if not user_text:
+            st.warning(labels["please_paste"])
+        else:
+            # Begin processing
+            st.session_state["is_processing"] = True
+            parsed = analyze_message(user_text)
+            if parsed is None:
+                st.session_state["is_processing"] = False
+                return
+
+            if location.strip():
+                report_location(location, user_text, parsed)
+
+            # Keep parsed and score in session; the full raw reply is in the audit log
+            session_history().add(user_text, parsed, st.session_state["language"])
+            parsed = trim_raw(parsed)
+            st.session_state["last_parsed"] = parsed
+            st.session_state["last_scanned"] = user_text
+            st.session_state["last_score"] = parsed.get("score", 50)
+            st.session_state["result_id"] = uuid.uuid4().hex
+
+            # Quantum superposition animation: progressive collapse (CSS, runs in the browser)
+            st.markdown(
+                "<div style='text-align:center'><div class='chakra'></div></div>"
+                "<div class='superposition'><div></div></div>",
+                unsafe_allow_html=True,
+            )
+            with METRICS.timer("qubit_collapse"):
+                qres = simulate_qubit_and_collapse(st.session_state["last_score"], session_rng())
+            st.session_state["quantum_result"] = qres
+            st.session_state["is_processing"] = False
+
+            # Render results
+            with METRICS.timer("render_results"):
+                render_results(parsed, qres)
+
+    # If previous results exist, show them (persistent across language toggle)
+    elif st.session_state.get("last_parsed"):
+        parsed = st.session_state["last_parsed"]
+        qres = st.session_state.get("quantum_result")
+        if not qres:
+            # Simulate a quantum run for display if not present
+            qres = simulate_qubit_and_collapse(parsed.get("score", 50), session_rng())
+            st.session_state["quantum_result"] = qres
+        render_results(parsed, qres)
+
+    render_history(labels)
+
+
+def reopen_history_entry(entry_id: int) -> None:
+    """Button callback: make a history record the current result (runs before the rerun)."""
+    entry = session_history().get(entry_id)
+    if entry is None:
+        return  # trimmed since the list was drawn
+    st.session_state["last_input"] = entry.text
+    st.session_state["last_scanned"] = entry.text
+    st.session_state["last_parsed"] = entry.verdict()
+    st.session_state["last_score"] = entry.score
+    st.session_state["quantum_result"] = None
+    st.session_state["result_id"] = uuid.uuid4().hex
+
+
+def render_history(labels: Dict[str, str]):
+    """This session's earlier scans, newest first, each one click from the result card."""
+    history = session_history()
+    entries = history.entries()
+    if not entries:
+        return
+    with st.expander(f"🕘 Scanned this session ({len(entries)}, last {config.HISTORY_ENTRIES} kept)"):
+        for entry in entries:
+            label, color = risk_label_color(entry.score)
+            preview = " ".join(entry.text.split())
+            if len(preview) > 90 or entry.truncated:
+                preview = preview[:90] + "…"
+            row, action = st.columns([6, 1])
+            row.markdown(
+                f"<span class='muted'>{time.strftime('%H:%M', time.gmtime(entry.ts))} UTC</span> "
+                f"<b style='color:{color}'>{html.escape(label)} {entry.score}%</b> {html.escape(preview)}",
+                unsafe_allow_html=True,
+            )
+            action.button("Open", key=f"history_open_{entry.id}", on_click=reopen_history_entry, args=(entry.id,))
+        language = st.session_state["language"]
+        download, clear = st.columns(2)
+        download.download_button(
+            "⬇️ Download history (CSV)",
+            lambda: history.to_csv(language),
+            file_name="scan-history.csv",
+            mime="text/csv",
+            on_click="ignore",
+        )
+        clear.button("Clear history", key="history_clear", on_click=history.clear)
+
+
+# ---------------------------
+# Scam map: opt-in report locations, drawn as pre-aggregated grid tiles
+# ---------------------------
+@st.cache_resource
+def get_report_grid() -> ReportGrid:
+    """Process-wide; picks up reports other app processes append to the same file."""
+    return ReportGrid()
+
+
+def report_location(location: str, text: str, parsed: Dict[str, Any]) -> None:
+    """Add a suspicious or scam verdict to the map at location (a city or "lat, lon")."""
+    point = resolve_location(location)
+    if point is None:
+        st.caption(f"📍 “{location}” is not a city we know or a lat, lon in India; not added to the scam map.")
+        return
+    if risk_level(int(parsed.get("score", 50))) == "safe":
+        return
+    tropes = set(parsed.get("matched_patterns") or []) | set(matched_tropes(text))
+    if get_report_grid().add(*point, tropes):
+        st.caption("📍 Added to the scam map. Thank you for reporting.")
+
+
+MAP_WINDOWS = {"Last 24 hours": 1, "Last 7 days": 7, "Last 30 days": 30, "Last 90 days": 90, "All time": None}
+MAP_CENTER, MAP_ZOOM = (22.5, 80.0), 5
+
+
+@st.fragment
+def render_map_mode():
+    """
+    Reports per grid cell for the current view. Filters and zoom are answered from the
+    grid's per-level tables; only the busiest GEO_MAX_CELLS cells in view are drawn.
+    """
+    import folium
+    from streamlit_folium import st_folium
+
+    trope_col, window_col = st.columns([2, 1])
+    tropes = trope_col.multiselect("Tropes (none selected = every report)", TROPE_NAMES, key="map_tropes")
+    days = MAP_WINDOWS[window_col.selectbox("Reported", list(MAP_WINDOWS), index=2, key="map_window")]
+
+    # The component's last reported view; the tiles for it are drawn on this run.
+    view = st.session_state.get("scam_map") or {}
+    zoom = view.get("zoom") or MAP_ZOOM
+    box = view.get("bounds") or {}
+    south_west, north_east = box.get("_southWest") or {}, box.get("_northEast") or {}
+    bounds = None
+    if south_west.get("lat") is not None and north_east.get("lat") is not None:
+        bounds = (south_west["lat"], south_west["lng"], north_east["lat"], north_east["lng"])
+
+    started = time.perf_counter()
+    tiles = get_report_grid().tiles(
+        level_for_zoom(zoom),
+        tropes,
+        since_day=today() - days + 1 if days else None,
+        bounds=bounds,
+        # Street-level views hide squares with too few reports to stay anonymous.
+        min_count=config.GEO_MIN_CELL_REPORTS if zoom >= 10 else 1,
+    )
+    query_ms = (time.perf_counter() - started) * 1000
+
+    layer = folium.FeatureGroup(name="Scam reports")
+    if len(tiles.counts):
+        peak = float(np.log1p(tiles.counts.max()))
+        features = []
+        for x, y, count in zip(tiles.x.tolist(), tiles.y.tolist(), tiles.counts.tolist()):
+            (south, west), (north, east) = cell_bounds(tiles.level, x, y)
+            heat = float(np.log1p(count)) / peak if peak else 1.0
+            features.append(
+                {
+                    "type": "Feature",
+                    "geometry": {"type": "Polygon", "coordinates": [[[west, south], [east, south], [east, north], [west, north], [west, south]]]},
+                    "properties": {"reports": count, "color": f"hsl({int(50 - 50 * heat)}, 95%, 50%)", "opacity": 0.25 + 0.5 * heat},
+                }
+            )
+        folium.GeoJson(
+            {"type": "FeatureCollection", "features": features},
+            style_function=lambda f: {
+                "fillColor": f["properties"]["color"],
+                "fillOpacity": f["properties"]["opacity"],
+                "color": f["properties"]["color"],
+                "weight": 0.5,
+            },
+            tooltip=folium.GeoJsonTooltip(fields=["reports"], aliases=["Reports"]),
+        ).add_to(layer)
+
+    base = folium.Map(location=MAP_CENTER, zoom_start=MAP_ZOOM, min_zoom=4, max_zoom=14, tiles="cartodbpositron")
+    st_folium(
+        base,
+        key="scam_map",
+        height=520,
+        use_container_width=True,
+        feature_group_to_add=layer,
+        returned_objects=["zoom", "bounds"],
+    )
+    shown = len(tiles.counts)
+    more = f" (busiest {shown:,} of {tiles.cells:,} squares shown)" if shown < tiles.cells else ""
+    st.caption(
+        f"{tiles.reports:,} reports in view in {tiles.cells:,} grid squares{more} · "
+        f"summed from {tiles.rows:,} index rows in {query_ms:.1f}ms. Zoom in for finer squares."
+    )
+
+
+# ---------------------------
+# Bulk mode: streamed CSV/JSONL analysis with a rate-limited worker pool
+# ---------------------------
+def render_bulk_mode():
+    st.markdown("<div class='glass'>", unsafe_allow_html=True)
+    uploaded = st.file_uploader("SMS export (CSV or JSONL, one message per row)", type=["csv", "jsonl", "ndjson"])
+    text_field = st.text_input("Text column / field (blank = auto-detect)", value="").strip() or None
+    rpm_col, workers_col = st.columns(2)
+    rpm = rpm_col.number_input("Model requests per minute", min_value=1, max_value=10000, value=config.BULK_REQUESTS_PER_MINUTE)
+    workers = workers_col.number_input("Concurrent workers", min_value=1, max_value=64, value=config.BULK_WORKERS)
+    batch_col, wait_col = st.columns(2)
+    batch_items = batch_col.number_input(
+        "Messages per model call (1 = no batching)", min_value=1, max_value=32, value=config.BATCH_MAX_ITEMS
+    )
+    batch_wait = wait_col.number_input(
+        "Max wait to fill a batch (ms)", min_value=0, max_value=5000, value=int(config.BATCH_MAX_WAIT_MS)
+    )
+    st.markdown("</div>", unsafe_allow_html=True)
+
+    if uploaded is not None and st.button("▶️ Run bulk analysis"):
+        model = configure_model(effective_api_key())
+        if not model:
+            st.error("AI model unavailable. Check API key.")
+            return
+        try:
+            total = count_rows(uploaded, uploaded.name, text_field)
+        except ValueError as e:
+            st.error(str(e))
+            return
+        scanner = get_scanner()
+        session_id = st.session_state["session_id"]
+        run_id = fingerprint(uploaded, uploaded.name, text_field or "", scanner.prompt_version, scanner.model_name)
+        limiter = TokenBucket.per_minute(rpm)
+        batcher = None
+        if batch_items > 1:
+            # The batcher charges the limiter per model call, so the runner must not.
+            batcher = scanner.batcher(
+                model,
+                max_items=int(batch_items),
+                max_wait_ms=float(batch_wait),
+                limiter=limiter,
+                admit=quota_admission(BULK),
+            )
+            ask = lambda text: scanner.ask_model_batched(batcher, text)
+            # Enough workers in flight to fill a batch.
+            workers = max(int(workers), int(batch_items))
+        else:
+            admit = quota_admission(BULK)
+            ask = lambda text: scanner.ask_model(model, text, admit=admit)
+
+        def lookup(text: str) -> Optional[Dict[str, Any]]:
+            parsed = scanner.lookup(text)[0]
+            if parsed is not None:
+                scanner.audit(text, parsed, surface="bulk", session=session_id)
+            return parsed
+
+        def call_model(text: str) -> Dict[str, Any]:
+            parsed = ask(text)
+            scanner.audit(text, parsed, surface="bulk", session=session_id)
+            return parsed
+
+        runner = BulkRunner(
+            lookup=lookup,
+            call_model=call_model,
+            output_path=os.path.join(config.BULK_DIR, f"{run_id}.jsonl"),
+            workers=int(workers),
+            limiter=None if batcher is not None else limiter,
+        )
+        bar = st.progress(0.0)
+        status = st.empty()
+
+        def show(progress: BulkProgress) -> None:
+            finished = progress.done + progress.failed + progress.resumed + progress.skipped
+            bar.progress(min(1.0, finished / total) if total else 1.0)
+            eta = progress.eta_seconds
+            status.markdown(
+                f"**{finished:,} / {total:,} rows** — {progress.rows_per_second:.1f} rows/s — "
+                f"ETA {f'{eta:.0f}s' if eta is not None else '—'}\n\n"
+                f"Model calls: {progress.model_calls:,} · answered on-box: {progress.local:,} · "
+                f"resumed from checkpoint: {progress.resumed:,} · empty rows skipped: {progress.skipped:,} · "
+                f"failed: {progress.failed:,}"
+            )
+
+        try:
+            progress = runner.run(iter_rows(uploaded, uploaded.name, text_field), total=total, on_progress=show)
+        finally:
+            if batcher is not None:
+                batcher.close()
+        if batcher is not None:
+            batch_stats = batcher.stats()
+            st.caption(
+                f"📦 {batch_stats['messages']:,} messages in {batch_stats['model_calls']:,} model calls "
+                f"(mean batch {batch_stats['mean_batch_size']:.1f}, {batch_stats['retried']:,} retried alone) · "
+                f"~{batch_stats['prompt_tokens_per_message']:.0f} prompt tokens per message"
+            )
+        st.session_state["bulk_output"] = runner.output_path
+        if progress.failed:
+            st.warning(
+                f"{progress.failed:,} rows failed (see {runner.errors_path}). "
+                "Run the same file again to retry only the unfinished rows."
+            )
+        else:
+            st.success("Bulk analysis complete.")
+
+    output_path = st.session_state.get("bulk_output")
+    if output_path and os.path.exists(output_path):
+        with open(output_path, "rb") as fh:
+            st.download_button("⬇️ Download results (JSONL)", fh, file_name=os.path.basename(output_path), mime="application/jsonl")
+
+
+# ---------------------------
+# Chat mode: a WhatsApp export as a timeline of windows
+# ---------------------------
+@st.fragment
+def render_chat_mode(labels: Dict[str, str]):
+    """Upload, windowed analysis and timeline; reruns only this fragment."""
+    st.markdown("<div class='glass'>", unsafe_allow_html=True)
+    uploaded = st.file_uploader("WhatsApp chat export (the .txt, or the .zip from Export chat)", type=["txt", "zip"])
+    st.markdown("</div>", unsafe_allow_html=True)
+
+    if uploaded is not None and st.button("▶️ Analyze chat"):
+        model = configure_model(effective_api_key())
+        if not model:
+            st.error("AI model unavailable. Check API key.")
+            return
+        scanner = get_scanner()
+        admit = quota_admission(BULK)
+        language = st.session_state["language"]
+        context = {"surface": "chat", "session": st.session_state["session_id"]}
+        status = st.empty()
+        last_shown = 0.0
+
+        def show(timeline: ChatTimeline, stats) -> None:
+            nonlocal last_shown
+            now = time.monotonic()
+            if now - last_shown < 0.5:
+                return
+            last_shown = now
+            status.markdown(
+                f"**{stats['messages']:,} messages read** — {timeline.counts['windows']:,} windows analyzed, "
+                f"{stats['repeated_forwards']:,} repeated forwards skipped"
+            )
+
+        try:
+            timeline, stats = analyze_chat(
+                uploaded,
+                uploaded.name,
+                lambda text: scanner.scan_async(text, model, language, admit=admit, context=context),
+                on_progress=show,
+            )
+        except ValueError as e:
+            st.error(str(e))
+            return
+        status.empty()
+        report = timeline.to_dict()
+        report["ingest"] = dict(stats)
+        report["name"] = uploaded.name
+        st.session_state["chat_report"] = report
+
+    report = st.session_state.get("chat_report")
+    if report:
+        render_chat_report(report, labels)
+
+
+def render_chat_report(report: Dict[str, Any], labels: Dict[str, str]):
+    summary, ingest = report["summary"], report["ingest"]
+    if not summary["windows"]:
+        st.warning("No messages found. Export the chat from WhatsApp (⋮ → More → Export chat) and upload the file it makes.")
+        return
+    label, color = risk_label_color(summary["max_score"])
+    sources = ", ".join(f"{name} {count:,}" for name, count in summary["sources"].items())
+    st.markdown(
+        f"<div class='glass' style='margin-top:12px'><h2>{html.escape(labels['analysis_result'])}</h2>"
+        f"<div class='badge' style='background:{color};'>{html.escape(label)} — peak Risk Score: {summary['max_score']}%</div>"
+        f"<p class='muted'>{html.escape(report['name'])}: {ingest.get('messages', 0):,} messages in "
+        f"{summary['windows']:,} windows ({summary['scam_windows']:,} scam, {summary['suspect_windows']:,} suspect) · "
+        f"{ingest.get('repeated_forwards', 0):,} repeated forwards analyzed once · verdicts from {html.escape(sources)}</p></div>",
+        unsafe_allow_html=True,
+    )
+    points = report["timeline"]
+    st.line_chart({"message": [p["first"] for p in points], "risk": [p["score"] for p in points]}, x="message", y="risk")
+    if summary["windows_per_point"] > 1:
+        st.caption(f"Each point is the riskiest of {summary['windows_per_point']} consecutive windows.")
+
+    code = language_code(st.session_state["language"])
+    spikes = [s for s in report["spikes"] if s["score"] > 33] or report["spikes"][:1]
+    for spike in spikes:
+        level_label, _ = risk_label_color(spike["score"])
+        when = f", {spike['start'].replace('T', ' ')}" if spike["start"] else ""
+        with st.expander(f"{level_label} {spike['score']}% — messages {spike['first']:,}–{spike['last']:,}{when}", expanded=spike is spikes[0]):
+            _, explanation = pick_explanation(spike["explanations"], code)
+            if explanation:
+                st.markdown(explanation)
+            if spike["tactics"]:
+                st.markdown(f"**{labels['social_tactics']}:** " + ", ".join(spike["tactics"]))
+            st.code(spike["text"], language=None)
+    st.download_button(
+        "⬇️ Download timeline (JSON)",
+        json.dumps(report, ensure_ascii=False, indent=2),
+        file_name=f"{os.path.splitext(report['name'])[0]}.timeline.json",
+        mime="application/json",
+    )
+
+
 # ---------------------------
 # Render analysis results
 # ---------------------------
-def render_results(parsed: Dict[str, Any], qres: Dict[str, Any]):
+def render_early_verdict(fields: Dict[str, Any], first_verdict_ms: Optional[float]):
+    """Partial verdict while the model is still streaming the rest of its answer."""
     labels = LANG[st.session_state["language"]]
-    st.markdown("<div class='glass' style='margin-top:12px'>", unsafe_allow_html=True)
-    st.markdown(f"## {labels['analysis_result']}")
+    if "score" in fields:
+        score = int(fields["score"])
+        label, color = risk_label_color(score)
+        st.markdown(f"<div class='badge' style='background:{color};'>{label} — Risk Score: {score}%</div>", unsafe_allow_html=True)
+    elif "is_scam" in fields:
+        st.markdown(f"**{labels['analysis_result']}:** {fields['is_scam']}")
+    if first_verdict_ms is not None:
+        st.caption(f"⏱️ First verdict in {first_verdict_ms:.0f}ms — details still arriving...")
+    tactics = fields.get("tactics")
+    if tactics:
+        st.markdown(f"**{labels['social_tactics']}:** " + ", ".join(tactics))
+    matched = fields.get("matched_patterns")
+    if matched:
+        st.markdown(f"**{labels['matched_patterns']}:** " + ", ".join(matched))
 
-    score = int(parsed.get("score", 50))
-    label, color = risk_label_color(score)
 
-    # Visual meter
-    st.progress(score / 100)
+def results_html(parsed: Dict[str, Any], qres: Optional[Dict[str, Any]], language: str) -> str:
+    """
+    The whole result card as one HTML block. Model and user text is escaped; newlines are
+    kept as entities so a blank line never ends the HTML block in the markdown renderer.
+    """
+    labels = LANG[language]
+    esc = lambda text: html.escape(str(text)).replace("\n", "&#10;")  # noqa: E731
+    caption = lambda text: f"<p class='muted'>{esc(text)}</p>"  # noqa: E731
+    parts = ["<div class='glass' style='margin-top:12px'>", f"<h2>{esc(labels['analysis_result'])}</h2>"]
+    reputation = parsed.get("reputation")
+    if reputation:
+        listed = ", ".join(f"{hit['value']} ({hit['source']})" for hit in reputation["hits"])
+        parts.append(caption(f"🚫 Known malicious {listed} — matched the local reputation feed, no model call needed."))
+    reopened = parsed.get("history")
+    if reopened:
+        when = time.strftime("%H:%M", time.gmtime(reopened["ts"]))
+        parts.append(caption(f"🕘 Re-opened from this session's history (scanned {when} UTC, {reopened['source']}); the raw reply is not kept here."))
+    if parsed.get("cache_hit"):
+        parts.append(caption("⚡ Served from verdict cache — no model call needed."))
+    near = parsed.get("near_duplicate")
+    if near:
+        parts.append(caption(f"🧬 Matched a known scam template (similarity {near['similarity']:.0%}) — no model call needed."))
+        parts.append(f"<pre>{esc(near['template'])}</pre>")
+    if parsed.get("degraded"):
+        parts.append(caption("🪫 On-box estimate — the forensic AI was not consulted for this message."))
+    tokens = parsed.get("tokens")
+    if tokens and tokens["message_after"] < tokens["message_before"]:
+        parts.append(
+            caption(f"✂️ Message compacted from ~{tokens['message_before']:,} to ~{tokens['message_after']:,} tokens (prompt ~{tokens['prompt']:,}).")
+        )
+    timing = parsed.get("timing")
+    if timing:
+        parts.append(caption(f"⏱️ First verdict in {timing['first_verdict_ms']:.0f}ms · full analysis in {timing['total_ms']:.0f}ms"))
+    tier0 = parsed.get("cascade")
+    if tier0:
+        if tier0["decision"] == "escalate":
+            parts.append(caption(f"🧮 Tier-0 classifier unsure (scam probability {tier0['probability']:.0%}) — escalated to the forensic AI."))
+        else:
+            parts.append(caption(f"🧮 Decided on-box by the tier-0 classifier in {tier0['latency_ms']:.1f}ms — no model call needed."))
+
+    score = int(parsed.get("score", 50))
+    level = risk_level(score)
+    label, color = labels[level], RISK_COLORS[level]
 
-    # Badge
-    st.markdown(f"<div class='badge' style='background:{color};'>{label} — Risk Score: {score}%</div>", unsafe_allow_html=True)
+    # Visual meter and badge
+    parts.append(f"<div class='meter'><div style='width:{max(0, min(100, score))}%'></div></div>")
+    parts.append(f"<div class='badge' style='background:{color};'>{esc(label)} — Risk Score: {score}%</div>")
 
-    # Quantum outcome
+    # Quantum outcome and qubit details
     measured = qres.get("measured", 0) if qres else 0
     measurement_text = labels["scam"] if measured == 1 else labels["safe"]
-    st.markdown(f"**{labels['quantum_result']}** {measurement_text}")
-
-    # Qubit details
+    parts.append(f"<p style='margin-top:12px'><b>{esc(labels['quantum_result'])}</b> {esc(measurement_text)}</p>")
     if qres:
-        st.write("Initial amplitudes (|0>, |1>):", qres["initial_amplitudes"])
-        st.write("Superposed amplitudes:", qres["superposed_amplitudes"])
-        st.write("Probabilities (|0>, |1>):", qres["probabilities"])
+        parts.append(
+            f"<p class='muted'>Initial amplitudes (|0&gt;, |1&gt;): {esc(qres['initial_amplitudes'])}<br>"
+            f"Superposed amplitudes: {esc(qres['superposed_amplitudes'])}<br>"
+            f"Probabilities (|0&gt;, |1&gt;): {esc(qres['probabilities'])}</p>"
+        )
 
     # Patterns & tactics
     matched = parsed.get("matched_patterns") or []
     tactics = parsed.get("tactics") or parsed.get("social_engineering_tactics") or []
-    st.markdown(f"**{labels['matched_patterns']}:** " + (", ".join(matched) if matched else "None"))
-    st.markdown(f"**{labels['social_tactics']}:** " + (", ".join(tactics) if tactics else "None"))
+    parts.append(f"<p><b>{esc(labels['matched_patterns'])}:</b> {esc(', '.join(matched) if matched else 'None')}</p>")
+    parts.append(f"<p><b>{esc(labels['social_tactics'])}:</b> {esc(', '.join(tactics) if tactics else 'None')}</p>")
 
-    # Explanation: prefer language-specific explanation if available
-    explanations = parsed.get("explanations", {}) or {}
-    lang_code = st.session_state["language"][:2].lower()
-    explanation_text = explanations.get(lang_code) or explanations.get("en") or parsed.get("raw", "")
-    st.markdown("**Explanation:**")
-    st.write(explanation_text)
+    # Explanation in the viewer's language (localize_explanation ran first), else English
+    code = language_code(language)
+    served, explanation_text = pick_explanation(parsed.get("explanations"), code)
+    parts.append(f"<p><b>Explanation:</b><br>{esc(explanation_text or parsed.get('raw', '')).replace('&#10;', '<br>')}</p>")
+    if served is not None and served != code:
+        parts.append(caption(f"Not available in {language}; shown in {language_name(served)}."))
 
     # Raw response (collapsible for auditors)
-    with st.expander(labels["raw_response"]):
-        st.code(parsed.get("raw", ""))
+    parts.append(f"<details><summary>{esc(labels['raw_response'])}</summary><pre>{esc(parsed.get('raw', ''))}</pre></details>")
+    parts.append("</div>")
+    return "".join(parts)
 
-    st.markdown("</div>", unsafe_allow_html=True)
+
+def localize_explanation(parsed: Dict[str, Any], language: str) -> None:
+    """
+    Make sure parsed explains itself in language. Model verdicts already carry every
+    language; anything else costs at most one small translation call per verdict and
+    language, stored in the verdict (and the verdict cache) for later toggles.
+    """
+    client = None
+    if not (parsed.get("explanations") or {}).get(language_code(language)):
+        api_key = effective_api_key()
+        if api_key:
+            try:
+                client = get_client_pool().get(api_key)
+            except Exception:
+                client = None  # served in English
+    get_scanner().explanation(
+        parsed, language, client, st.session_state.get("last_scanned"), admit=quota_admission(INTERACTIVE) if client else None
+    )
+
+
+def render_results(parsed: Dict[str, Any], qres: Dict[str, Any]):
+    """
+    Result card, built once per (result, language) and replayed as a single element on
+    every later rerun. Only the current result's renderings are kept.
+    """
+    language = st.session_state["language"]
+    result_id = st.session_state.get("result_id")
+    memo = st.session_state.get("results_html")
+    if memo is None or memo.get("result_id") != result_id:
+        memo = st.session_state["results_html"] = {"result_id": result_id}
+    card = memo.get(language) if result_id else None
+    if card is None:
+        localize_explanation(parsed, language)
+        card = results_html(parsed, qres, language)
+        memo[language] = card
+    st.markdown(card, unsafe_allow_html=True)
 
 
 # ---------------------------
@@ -645,6 +1315,7 @@ def render_results(parsed: Dict[str, Any], qres: Dict[str, Any]):
 def main():
     sidebar_controls()
     run_analysis()
+    freeze_startup_heap()
 
 
 if __name__ == "__main__":